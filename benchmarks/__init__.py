@@ -0,0 +1 @@
+"""Benchmarks de performance de Plasmik3D (exécutables avec python -m benchmarks.<module>)"""
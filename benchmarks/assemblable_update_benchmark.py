@@ -0,0 +1,94 @@
+"""
+Benchmark et contrôle de parité de la mise à jour incrémentale des nombres assemblables
+
+Applique une suite de changements de stock aléatoires à des catalogues de
+tailles croissantes: chaque changement ne recalcule que les couples
+(produit, couleur) dépendant du composant modifié. Le résultat est comparé
+à un recalcul complet (nouvelle compilation de la nomenclature), et les
+produits dépendants (lignes réaffichées par la vue) aux nomenclatures.
+
+Usage: python -m benchmarks.assemblable_update_benchmark [nombre_de_changements]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_data import write_inventory
+from config import INVENTORY_SETTINGS
+from controllers.inventory_controller import InventoryController
+from models.bom_matrix import BOMMatrix
+from models.database import Database
+
+CATALOG_SIZES = (250, 1000, 4000)
+COLOR_COUNT = 30
+
+# Contrôle de parité tous les CHECK_INTERVAL changements
+CHECK_INTERVAL = 50
+
+
+def load_inventory(tmp_dir, product_count, colors):
+    """Charge un catalogue synthétique dans un InventoryManager"""
+    db_path = os.path.join(tmp_dir, f"inventory_{product_count}.db")
+    db = Database(db_path)
+    write_inventory(db, product_count, components_per_product=8, colors=colors)
+    db.close()
+    return InventoryController(db_path).inventory
+
+
+def run(change_count=1000):
+    """Mesure le coût d'un changement de stock selon la taille du catalogue"""
+    snapshot_enabled = INVENTORY_SETTINGS["snapshot_enabled"]
+    colors = [f"Couleur {i:02d}" for i in range(COLOR_COUNT)]
+    rng = random.Random(42)
+    identical = True
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            INVENTORY_SETTINGS["snapshot_enabled"] = False
+            
+            for product_count in CATALOG_SIZES:
+                inventory = load_inventory(tmp_dir, product_count, colors)
+                
+                start = time.perf_counter()
+                inventory.get_assemblable_products()
+                compile_time = time.perf_counter() - start
+                
+                keys = [(name, color) for name, by_color in inventory.components.items() for color in by_color]
+                changes = [(*rng.choice(keys), rng.randint(-3, 5)) for _ in range(change_count)]
+                
+                update_time = 0
+                for i, (name, color, change) in enumerate(changes, 1):
+                    # Un retrait supérieur au stock est refusé, comme dans l'application
+                    change = max(change, -inventory.components[name][color].stock)
+                    start = time.perf_counter()
+                    inventory.update_component_stock(name, color, change)
+                    update_time += time.perf_counter() - start
+                    
+                    if i % CHECK_INTERVAL == 0:
+                        expected = BOMMatrix(inventory).get_assemblable_products(inventory)
+                        identical = expected == inventory.get_assemblable_products() and identical
+                        
+                        # Produits à réafficher après ce changement (index inverse)
+                        users = {product_name for product_name, product in inventory.products.items()
+                                 if any(comp["name"] == name for comp in product.components)}
+                        identical = users == inventory.get_component_dependents(name) and identical
+                
+                start = time.perf_counter()
+                inventory.get_product_assemblable(next(iter(inventory.products)))
+                lookup_time = time.perf_counter() - start
+                
+                print(f"{product_count} produits x {COLOR_COUNT} couleurs: compilation {compile_time * 1000:.1f} ms, "
+                      f"changement de stock {update_time / change_count * 1e6:.0f} µs en moyenne, "
+                      f"lecture d'un produit {lookup_time * 1e6:.0f} µs "
+                      f"({'identiques' if identical else 'DIFFÉRENTS'})")
+        finally:
+            INVENTORY_SETTINGS["snapshot_enabled"] = snapshot_enabled
+    
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
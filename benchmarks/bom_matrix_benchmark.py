@@ -0,0 +1,142 @@
+"""
+Benchmark et contrôle de parité du calcul des produits assemblables
+
+Compare le calcul par matrices de nomenclature (BOMMatrix) à l'ancien calcul
+produit par produit, couleur par couleur et composant par composant, sur un
+catalogue synthétique puis sur un inventaire de cas limites.
+
+Usage: python -m benchmarks.bom_matrix_benchmark [nombre_de_produits] [nombre_de_couleurs]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_data import write_inventory
+from config import INVENTORY_SETTINGS
+from controllers.inventory_controller import InventoryController
+from models.bom_matrix import BOMMatrix
+from models.database import Database
+from models.inventory import InventoryManager
+
+REPEAT = 5
+
+
+def get_assemblable_products_loop(inventory):
+    """Implémentation de référence par boucles, conservée pour le contrôle de parité"""
+    assemblable = {}
+    
+    component_inventory = {}
+    for comp_name, colors in inventory.components.items():
+        component_inventory[comp_name] = {}
+        for color, component in colors.items():
+            component_inventory[comp_name][color] = component.stock
+    
+    for product_name, product in inventory.products.items():
+        assemblable[product_name] = {}
+        
+        for color in inventory.get_available_colors():
+            count = product.get_assemblable_count(component_inventory, color)
+            if count > 0:
+                assemblable[product_name][color] = count
+        
+        random_count = product.get_assemblable_count(component_inventory)
+        if random_count > 0:
+            assemblable[product_name]["Aléatoire"] = random_count
+    
+    return assemblable
+
+
+def edge_case_inventory():
+    """Inventaire couvrant les cas limites du calcul (chaînes de contraintes, stocks absents...)"""
+    inventory = InventoryManager()
+    for color, stock in (("Bleu", 7), ("Noir", 3), ("Blanc", 0)):
+        inventory.add_component("socle", color, stock)
+        inventory.add_component("tige", color, stock * 2)
+    inventory.add_component("tige", "Rouge", 9)
+    inventory.add_component("capuchon", "Bleu", 4)
+    inventory.add_component("capuchon", "Noir", 5)
+    inventory.components["capuchon"]["Noir"].stock = -2  # Stock négatif en mémoire
+    
+    product = inventory.add_product("chaine")
+    product.add_component("socle", 2)
+    product.add_component("tige", 1, "same_as:socle")
+    product.add_component("capuchon", 1, "fixed:Bleu")
+    
+    product = inventory.add_product("fixe absent")
+    product.add_component("tige", 1, "fixed:Violet")
+    
+    product = inventory.add_product("fixe vide")
+    product.add_component("tige", 3)
+    product.add_component("socle", 1, "fixed:")
+    
+    product = inventory.add_product("composant inconnu")
+    product.add_component("socle", 1)
+    product.add_component("ressort", 1)
+    
+    product = inventory.add_product("quantite nulle")
+    product.add_component("tige", -1)
+    
+    inventory.add_product("sans composants")
+    
+    product = inventory.add_product("tige seule")
+    product.add_component("tige", 2, "same_as_main")
+    
+    return inventory
+
+
+def best_time(function):
+    """Meilleure durée de REPEAT exécutions"""
+    durations = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def compare(label, inventory):
+    """Calcule les produits assemblables avec les deux implémentations et vérifie qu'elles concordent"""
+    loop_time = best_time(lambda: get_assemblable_products_loop(inventory))
+    # Calcul complet, sans les nombres maintenus par l'inventaire
+    matrix_time = best_time(lambda: BOMMatrix(inventory).get_assemblable_products(inventory))
+    compile_time = best_time(lambda: BOMMatrix(inventory))
+    
+    expected = get_assemblable_products_loop(inventory)
+    actual = inventory.get_assemblable_products()
+    # Les dictionnaires sont comparés avec l'ordre de leurs clés
+    identical = [(name, list(counts.items())) for name, counts in expected.items()] == \
+                [(name, list(counts.items())) for name, counts in actual.items()]
+    
+    print(f"{label}: boucles {loop_time * 1000:.1f} ms, matrices {matrix_time * 1000:.1f} ms "
+          f"dont compilation {compile_time * 1000:.1f} ms "
+          f"({'identiques' if identical else 'DIFFÉRENTS'})")
+    return identical
+
+
+def run(product_count=500, color_count=30):
+    """Contrôle de parité sur un catalogue synthétique et sur les cas limites"""
+    snapshot_enabled = INVENTORY_SETTINGS["snapshot_enabled"]
+    colors = [f"Couleur {i:02d}" for i in range(color_count)]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "inventory.db")
+        db = Database(db_path)
+        write_inventory(db, product_count, components_per_product=8, colors=colors)
+        
+        try:
+            INVENTORY_SETTINGS["snapshot_enabled"] = False
+            inventory = InventoryController(db_path).inventory
+        finally:
+            INVENTORY_SETTINGS["snapshot_enabled"] = snapshot_enabled
+        db.close()
+    
+    identical = compare(f"{product_count} produits x {color_count} couleurs", inventory)
+    identical = compare("Cas limites", edge_case_inventory()) and identical
+    
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(*(int(arg) for arg in sys.argv[1:3])))
@@ -0,0 +1,120 @@
+"""
+Benchmark et contrôle de parité du parser CSV Shopify
+
+Compare le parser par colonnes et sa lecture par blocs (iter_orders) à
+l'ancienne implémentation ligne par ligne (DataFrame.iterrows) sur l'export
+d'exemple puis sur un export synthétique.
+
+Usage: python -m benchmarks.csv_parser_benchmark [nombre_de_lignes]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic_data import write_shopify_csv
+from config import BASE_DIR
+from models.order import Order, OrderItem
+from utils.csv_parser import ShopifyCSVParser
+
+SAMPLE_CSV = os.path.join(BASE_DIR, "orders_180420251404.csv")
+
+# Petits blocs pour que des commandes soient coupées entre deux blocs
+STREAMING_CHUNK_SIZE = 7
+
+
+def parse_file_rowwise(parser, file_path):
+    """Implémentation de référence ligne par ligne, conservée pour le contrôle de parité"""
+    df = pd.read_csv(file_path)
+    orders = {}
+    
+    for _, row in df.iterrows():
+        order_id = str(row['Name'])
+        
+        if pd.isna(row['Lineitem name']):
+            continue
+        
+        if order_id not in orders:
+            date_commande = row['Created at'].split(' ')[0] if pd.notna(row['Created at']) else ""
+            status = row.get('Fulfillment Status', 'unfulfilled')
+            if pd.isna(status):
+                status = 'unfulfilled'
+            
+            orders[order_id] = Order(
+                order_id=order_id,
+                date=date_commande,
+                client=row.get('Billing Name', order_id) if pd.notna(row.get('Billing Name', '')) else order_id,
+                email=row['Email'] if pd.notna(row['Email']) else "",
+                status="Prêt" if status == 'fulfilled' else "En attente",
+                priority="Moyenne",
+                notes=row.get('Notes', '') if pd.notna(row.get('Notes', '')) else ""
+            )
+        
+        lineitem_quantity = int(row['Lineitem quantity']) if pd.notna(row['Lineitem quantity']) else 1
+        product_info = parser.extract_product_color_quantity(row['Lineitem name'], lineitem_quantity)
+        orders[order_id].add_item(
+            product=product_info['product'],
+            color=product_info['color'],
+            quantity=product_info['quantity'],
+            status="Imprimé" if orders[order_id].status == "Prêt" else "À imprimer"
+        )
+    
+    return list(orders.values())
+
+
+def order_signature(order):
+    """Représentation comparable d'une commande (types Python compris)"""
+    return (
+        order.id, order.date, order.client, order.email, order.status, order.priority, order.notes,
+        [
+            tuple((slot, type(getattr(item, slot)), getattr(item, slot)) for slot in OrderItem.__slots__)
+            for item in order.items
+        ]
+    )
+
+
+def compare(file_path):
+    """Parse un fichier avec les deux implémentations et vérifie qu'elles concordent"""
+    parser = ShopifyCSVParser()
+    
+    start = time.perf_counter()
+    expected = parse_file_rowwise(parser, file_path)
+    rowwise_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    actual = parser.parse_file(file_path)
+    columnar_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    streamed = list(parser.iter_orders(file_path, chunk_size=STREAMING_CHUNK_SIZE))
+    streaming_time = time.perf_counter() - start
+    
+    signatures = [order_signature(o) for o in expected]
+    identical = signatures == [order_signature(o) for o in actual]
+    identical_streamed = signatures == [order_signature(o) for o in streamed]
+    print(
+        f"{os.path.basename(file_path)}: {len(actual)} commandes, "
+        f"ligne par ligne {rowwise_time:.2f} s, par colonnes {columnar_time:.2f} s "
+        f"({'identiques' if identical else 'DIFFÉRENTES'}), "
+        f"streaming {streaming_time:.2f} s ({'identiques' if identical_streamed else 'DIFFÉRENTES'})"
+    )
+    return identical and identical_streamed
+
+
+def run(line_count=200_000):
+    """Contrôle de parité sur l'export d'exemple et sur un export synthétique"""
+    identical = compare(SAMPLE_CSV)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, "synthetic_orders.csv")
+        write_shopify_csv(csv_path, line_count)
+        identical = compare(csv_path) and identical
+    
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000))
@@ -0,0 +1,155 @@
+"""
+Benchmark et contrôle de parité des agrégats du tableau de bord
+
+Remplit une base synthétique (1 million de produits commandés par défaut),
+puis calcule les chiffres du tableau de bord tirés des commandes:
+- avec les anciennes requêtes sur order_items et orders, une par chiffre
+  (six parcours pour les statistiques d'impression, puis produits et
+  couleurs les plus demandés, résumé par couleur et commandes par statut);
+- avec DashboardAggregator, qui lit les agrégats tenus à jour par triggers.
+Compare aussi PrintController.get_print_stats aux six requêtes d'origine.
+
+Usage: python -m benchmarks.dashboard_benchmark [nombre_de_produits_commandés]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import controllers.print_controller as print_controller
+from config import COLORS, INVENTORY_SETTINGS, ORDER_STATUSES, PRODUCTS
+from models.dashboard import DashboardAggregator
+from models.database import Database
+
+ITEMS_PER_ORDER = 4
+REPEAT = 3
+ITEM_STATUS_WEIGHTS = (("À imprimer", 2), ("En impression", 1), ("Imprimé", 7))
+
+
+def write_orders(db_path, item_count, seed=42):
+    """Remplit une base avec item_count produits commandés, ITEMS_PER_ORDER par commande"""
+    rng = random.Random(seed)
+    statuses = [status for status, weight in ITEM_STATUS_WEIGHTS for _ in range(weight)]
+    db = Database(db_path)
+    
+    order_count = item_count // ITEMS_PER_ORDER
+    db.cursor.executemany(
+        "INSERT INTO orders (id, date, client, email, status) VALUES (?, ?, ?, ?, ?)",
+        ((f"#{100000 + i}", f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}", f"Client {i}",
+          f"client{i}@example.com", rng.choice(ORDER_STATUSES)) for i in range(order_count))
+    )
+    db.cursor.executemany(
+        "INSERT INTO order_items (order_id, product, color, quantity, status) VALUES (?, ?, ?, ?, ?)",
+        ((f"#{100000 + i // ITEMS_PER_ORDER}", rng.choice(PRODUCTS), rng.choice(COLORS),
+          rng.choice((1, 1, 1, 2, 2, 3, 4, 6)), rng.choice(statuses)) for i in range(item_count))
+    )
+    db.conn.commit()
+    db.close()
+
+
+def print_stats_six_queries(db):
+    """Anciennes statistiques d'impression (six parcours), conservées pour le contrôle de parité"""
+    stats = {}
+    queries = (
+        ("total_to_print", "SELECT SUM(quantity) FROM order_items WHERE status = 'À imprimer'"),
+        ("products_count", "SELECT COUNT(DISTINCT product) FROM order_items WHERE status = 'À imprimer'"),
+        ("colors_count", "SELECT COUNT(DISTINCT color) FROM order_items WHERE status = 'À imprimer'"),
+        ("priority_high", "SELECT SUM(quantity) FROM order_items WHERE status = 'À imprimer' AND quantity > 3"),
+        ("priority_medium", "SELECT SUM(quantity) FROM order_items "
+                            "WHERE status = 'À imprimer' AND quantity > 1 AND quantity <= 3"),
+        ("priority_low", "SELECT SUM(quantity) FROM order_items WHERE status = 'À imprimer' AND quantity = 1"),
+    )
+    for key, query in queries:
+        db.cursor.execute(query)
+        stats[key] = db.cursor.fetchone()[0] or 0
+    return stats
+
+
+def dashboard_per_query(db):
+    """Chiffres du tableau de bord avec une requête par chiffre, comme l'ancien StatsManager"""
+    stats = {"print": print_stats_six_queries(db)}
+    
+    counts = {"En attente": 0, "En cours": 0, "Prêt": 0, "Expédié": 0, "Total": 0}
+    db.cursor.execute("SELECT status, COUNT(*) FROM orders GROUP BY status")
+    for status, count in db.cursor.fetchall():
+        if status in counts:
+            counts[status] = count
+            counts["Total"] += count
+    stats["orders"] = counts
+    
+    for key, column in (("popular_products", "product"), ("popular_colors", "color")):
+        db.cursor.execute(f"""
+            SELECT {column}, SUM(quantity) FROM order_items
+            GROUP BY {column} ORDER BY SUM(quantity) DESC, {column} LIMIT 5
+        """)
+        stats[key] = [{column: name, "total": total} for name, total in db.cursor.fetchall()]
+    
+    db.cursor.execute("""
+        SELECT color, COUNT(DISTINCT product), SUM(quantity) FROM order_items
+        WHERE status = 'À imprimer' OR status = 'En impression'
+        GROUP BY color ORDER BY SUM(quantity) DESC, color
+    """)
+    stats["color_summary"] = [
+        {"color": color, "product_count": product_count, "total_quantity": total_quantity}
+        for color, product_count, total_quantity in db.cursor.fetchall()
+    ]
+    return stats
+
+
+def dashboard_aggregated(aggregator):
+    """Chiffres du tableau de bord lus dans les agrégats"""
+    snapshot = aggregator.snapshot(inventory_summary={}, low_stock=[])
+    return {key: snapshot[key] for key in ("orders", "print", "popular_products", "popular_colors", "color_summary")}
+
+
+def best_time(function):
+    """Meilleure durée de REPEAT exécutions et dernier résultat"""
+    durations = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - start)
+    return min(durations), result
+
+
+def run(item_count=1000000):
+    """Compare la lecture des agrégats aux requêtes séparées"""
+    snapshot_enabled = INVENTORY_SETTINGS["snapshot_enabled"]
+    INVENTORY_SETTINGS["snapshot_enabled"] = False
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "orders.db")
+            start = time.perf_counter()
+            write_orders(db_path, item_count)
+            print(f"{item_count} produits commandés écrits en {time.perf_counter() - start:.1f} s")
+            
+            print_controller.DATABASE_PATH = db_path
+            db = Database(db_path)
+            printing = print_controller.PrintController()
+            aggregator = DashboardAggregator(db)
+            
+            six_time, expected_stats = best_time(lambda: print_stats_six_queries(db))
+            one_time, actual_stats = best_time(printing.get_print_stats)
+            per_query_time, expected = best_time(lambda: dashboard_per_query(db))
+            aggregated_time, actual = best_time(lambda: dashboard_aggregated(aggregator))
+            
+            printing.inventory_controller.db.close()
+            printing.db.close()
+            db.close()
+    finally:
+        INVENTORY_SETTINGS["snapshot_enabled"] = snapshot_enabled
+    
+    stats_identical = expected_stats == actual_stats
+    identical = expected == actual
+    print(f"Statistiques d'impression: six requêtes {six_time * 1000:.0f} ms, "
+          f"agrégats {one_time * 1000:.1f} ms ({'identiques' if stats_identical else 'DIFFÉRENTS'})")
+    print(f"Tableau de bord: requêtes séparées {per_query_time * 1000:.0f} ms, "
+          f"agrégats {aggregated_time * 1000:.1f} ms ({'identiques' if identical else 'DIFFÉRENTS'})")
+    return 0 if identical and stats_identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(*(int(arg) for arg in sys.argv[1:2])))
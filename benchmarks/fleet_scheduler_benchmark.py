@@ -0,0 +1,165 @@
+"""
+Simulateur et contrôle du répartiteur du parc d'imprimantes
+
+Sur des plans d'impression synthétiques, compare pour un parc de plusieurs
+imprimantes (bobines chargées tirées au hasard):
+- la répartition naïve: chaque ligne du plan, dans l'ordre couleur puis
+  produit, part sur la première imprimante libre;
+- FleetScheduler, qui tient compte de la couleur chargée.
+Rapporte les changements de bobine, la durée totale et le débit du parc.
+
+Vérifie ensuite, sur une base synthétique et par les contrôleurs, que la
+planification est enregistrée, qu'un travail démarré en partie garde le
+reste planifié sur son imprimante, qu'un travail démarré apparaît sur son
+imprimante et que l'imprimante est libérée une fois le produit imprimé.
+
+Usage: python -m benchmarks.fleet_scheduler_benchmark [nombre_de_plans] [imprimantes]
+"""
+
+import heapq
+import os
+import random
+import sys
+import tempfile
+
+import controllers.order_controller as order_controller
+import controllers.print_controller as print_controller
+import controllers.printer_controller as printer_controller
+from benchmarks.dashboard_benchmark import write_orders
+from config import COLORS, INVENTORY_SETTINGS, PRIORITIES, PRODUCTS
+from models.database import Database
+from models.printer_fleet import FleetScheduler, Printer, ScheduledJob
+
+
+def make_plan(rng):
+    """Lignes d'un plan d'impression synthétique, triées par couleur puis produit"""
+    lines = []
+    for color in rng.sample(COLORS, rng.randint(6, len(COLORS))):
+        for product in rng.sample(PRODUCTS, rng.randint(1, 6)):
+            quantity = rng.choice((1, 1, 2, 3, 4, 6, 8))
+            priority = PRIORITIES[0] if quantity > 3 else (PRIORITIES[1] if quantity > 1 else PRIORITIES[2])
+            lines.append({"product": product, "color": color, "quantity": quantity, "priority": priority})
+    return sorted(lines, key=lambda line: (line["color"], line["product"]))
+
+
+def naive_schedule(scheduler, printers, lines):
+    """Répartition naïve: les lignes du plan, dans l'ordre, sur la première imprimante libre"""
+    minutes_per_piece = scheduler.sequencer.settings["minutes_per_piece"]
+    loaded = {printer.id: printer.loaded_color for printer in printers}
+    positions = dict.fromkeys(loaded, 0)
+    free_at = [(0, printer.id) for printer in printers]
+    jobs = []
+    
+    for line in lines:
+        clock, printer_id = heapq.heappop(free_at)
+        changeover = scheduler.sequencer.transition_cost(loaded[printer_id], line["color"])
+        duration = line["quantity"] * minutes_per_piece
+        positions[printer_id] += 1
+        jobs.append(ScheduledJob(printer_id, line["product"], line["color"], line["quantity"], line["priority"],
+                                 positions[printer_id], clock, changeover, duration))
+        if line["color"] != "Aléatoire":
+            loaded[printer_id] = line["color"]
+        heapq.heappush(free_at, (clock + changeover + duration, printer_id))
+    
+    return jobs
+
+
+def check_controllers():
+    """Planifie, démarre et termine un travail par les contrôleurs sur une base synthétique"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "orders.db")
+        write_orders(db_path, 4000)
+        
+        order_controller.DATABASE_PATH = db_path
+        print_controller.DATABASE_PATH = db_path
+        printer_controller.DATABASE_PATH = db_path
+        db = Database(db_path)
+        printers = printer_controller.PrinterController()
+        printing = printers.print_controller
+        
+        fleet = printers.get_printers()
+        printers.update_printer(fleet[0].id, loaded_color="Noir")
+        jobs = printers.schedule_print_plan()
+        plan = printing.get_print_plan(include_printing=False, with_order_ids=False)
+        planned = sum(job.quantity for job in jobs) == sum(e["quantity"] for entries in plan.values() for e in entries)
+        queue = printers.get_queue(fleet[0].id)
+        first_job = next((job for job in queue if job["quantity"] > 1), queue[0])
+        
+        # Démarrer une partie du travail: le reste reste planifié sur l'imprimante
+        part = first_job["quantity"] // 2
+        kept = True
+        if part:
+            printing.start_printing_batch_partial(first_job["product"], first_job["color"], part, fleet[0].id)
+            rest = next((job for job in printers.get_queue(fleet[0].id) if job["id"] == first_job["id"]), None)
+            kept = (rest is not None and rest["quantity"] == first_job["quantity"] - part
+                    and abs(rest["duration_minutes"] * first_job["quantity"]
+                            - first_job["duration_minutes"] * rest["quantity"]) < 1e-6
+                    and printers.get_assignments().get((first_job["product"], first_job["color"], "Planifié"))
+                    == [fleet[0].name])
+        
+        started = printers.start_job(first_job["id"])
+        key = (first_job["product"], first_job["color"], "En impression")
+        printer = printers.get_printers()[0]
+        assigned = (kept and started == first_job["quantity"] - part
+                    and not any(job["id"] == first_job["id"] for job in printers.get_queue(fleet[0].id))
+                    and printers.get_assignments().get(key) == [fleet[0].name]
+                    and printer.status == "En impression" and printer.loaded_color in ("Noir", first_job["color"]))
+        
+        printing.mark_as_printed(first_job["product"], first_job["color"])
+        released = (key not in printers.get_assignments() and printers.get_printers()[0].status == "Disponible"
+                    and not db.check_rollups())
+        
+        printing.inventory_controller.db.close()
+        printing.db.close()
+        printers.db.close()
+        db.close()
+    
+    return planned, assigned, released
+
+
+def run(plan_count=50, printer_count=4):
+    """Compare la répartition naïve et le répartiteur, puis contrôle le parcours par les contrôleurs"""
+    scheduler = FleetScheduler()
+    totals = {"naive": [0, 0.0, 0.0], "fleet": [0, 0.0, 0.0]}
+    regressions = 0
+    
+    for seed in range(plan_count):
+        rng = random.Random(seed)
+        lines = make_plan(rng)
+        printers = [Printer(i, f"Imprimante {i}", rng.choice(COLORS[1:] + [None])) for i in range(printer_count)]
+        
+        naive = scheduler.summarize(naive_schedule(scheduler, printers, lines), printer_count)
+        fleet_jobs = scheduler.schedule(printers, lines)
+        fleet = scheduler.summarize(fleet_jobs, printer_count)
+        
+        if sorted((job.product, job.color) for job in fleet_jobs) != sorted((l["product"], l["color"]) for l in lines):
+            regressions += 1
+        if fleet["changeover_minutes"] > naive["changeover_minutes"]:
+            regressions += 1
+        
+        for key, summary in (("naive", naive), ("fleet", fleet)):
+            totals[key][0] += summary["swaps"]
+            totals[key][1] += summary["makespan_minutes"]
+            totals[key][2] += summary["pieces_per_hour"]
+    
+    print(f"{plan_count} plans d'impression, {printer_count} imprimantes")
+    for key, label in (("naive", "Première imprimante libre"), ("fleet", "Répartiteur")):
+        swaps, makespan, throughput = totals[key]
+        print(f"{label}: {swaps / plan_count:.1f} changements de bobine, "
+              f"durée totale {makespan / plan_count / 60:.1f} h, débit {throughput / plan_count:.2f} pièces/h")
+    
+    snapshot_enabled = INVENTORY_SETTINGS["snapshot_enabled"]
+    INVENTORY_SETTINGS["snapshot_enabled"] = False
+    try:
+        planned, assigned, released = check_controllers()
+    finally:
+        INVENTORY_SETTINGS["snapshot_enabled"] = snapshot_enabled
+    
+    print(f"Contrôleurs: planification {'enregistrée' if planned else 'INCOMPLÈTE'}, "
+          f"travail {'affecté' if assigned else 'NON AFFECTÉ'}, imprimante {'libérée' if released else 'NON LIBÉRÉE'}")
+    print(f"Changements de bobine du répartiteur: {'jamais plus nombreux' if not regressions else f'PLUS NOMBREUX ({regressions})'}")
+    return 0 if planned and assigned and released and not regressions else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(*(int(arg) for arg in sys.argv[1:3])))
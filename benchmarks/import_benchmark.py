@@ -0,0 +1,114 @@
+"""
+Benchmark de l'importation d'un export Shopify synthétique
+
+L'import est mesuré en mode complet puis en mode streaming, avec le pic
+d'allocation mémoire Python de chaque import.
+
+Vérifie ensuite sur un export dont une partie des lignes de produits a été
+déplacée en fin de fichier (commandes non contiguës) que le mode streaming,
+par petits blocs, enregistre les mêmes commandes et produits que le mode
+complet.
+
+Usage: python -m benchmarks.import_benchmark [nombre_de_lignes]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.synthetic_data import write_shopify_csv
+from config import IMPORT_SETTINGS
+from controllers.import_controller import ImportController
+from models.database import Database
+
+
+def dump(db_path):
+    """Commandes et produits enregistrés, dans un ordre comparable"""
+    db = Database(db_path)
+    db.cursor.execute("SELECT id, date, client, email, status, priority, notes FROM orders ORDER BY id")
+    orders = [tuple(row) for row in db.cursor.fetchall()]
+    db.cursor.execute("""
+        SELECT order_id, product, color, quantity, status FROM order_items
+        ORDER BY order_id, product, color, quantity, status
+    """)
+    items = [tuple(row) for row in db.cursor.fetchall()]
+    db.close()
+    return orders, items
+
+
+def check_scattered_orders(tmp_dir, line_count=20_000, chunk_size=500):
+    """Importe un export aux commandes non contiguës dans les deux modes et compare les bases"""
+    csv_path = os.path.join(tmp_dir, "scattered.csv")
+    write_shopify_csv(csv_path, line_count)
+    
+    # Déplacer en fin de fichier un produit sur cinq hors première ligne de commande
+    df = pd.read_csv(csv_path)
+    moved = df[df['Name'].duplicated()].sample(frac=0.2, random_state=1).index
+    pd.concat([df.drop(moved), df.loc[moved]]).to_csv(csv_path, index=False)
+    
+    results = {}
+    saved_chunk_size = IMPORT_SETTINGS["chunk_size"]
+    IMPORT_SETTINGS["chunk_size"] = chunk_size
+    try:
+        for streaming in (False, True):
+            controller = ImportController()
+            controller.db_path = os.path.join(tmp_dir, f"scattered_{streaming}.db")
+            success, _ = controller.import_shopify_csv(csv_path, streaming=streaming)
+            results[streaming] = dump(controller.db_path) if success else None
+    finally:
+        IMPORT_SETTINGS["chunk_size"] = saved_chunk_size
+    
+    identical = results[False] is not None and results[False] == results[True]
+    print(f"Commandes non contiguës ({len(moved)} produits déplacés, blocs de {chunk_size} lignes): "
+          f"streaming et complet {'identiques' if identical else 'DIFFÉRENTS'}")
+    return identical
+
+
+def run(line_count=500_000):
+    """Importe un export synthétique (insertion puis remplacement) dans chaque mode et affiche les durées"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, "orders.csv")
+        
+        start = time.perf_counter()
+        order_count = write_shopify_csv(csv_path, line_count)
+        print(f"Génération: {line_count} lignes, {order_count} commandes en {time.perf_counter() - start:.2f} s")
+        
+        for streaming in (False, True):
+            mode = "streaming" if streaming else "complet"
+            controller = ImportController()
+            controller.db_path = os.path.join(tmp_dir, f"benchmark_{mode}.db")
+            
+            for label, skip_existing in (("import initial", True), ("ré-import (remplacement)", False)):
+                start = time.perf_counter()
+                success, message = controller.import_shopify_csv(
+                    csv_path, skip_existing=skip_existing, streaming=streaming
+                )
+                print(f"Mode {mode}, {label}: {time.perf_counter() - start:.2f} s - {message}")
+                if not success:
+                    return 1
+            
+            # Mesure mémoire séparée, tracemalloc ralentissant fortement l'import
+            memory_controller = ImportController()
+            memory_controller.db_path = os.path.join(tmp_dir, f"benchmark_{mode}_memory.db")
+            tracemalloc.start()
+            memory_controller.import_shopify_csv(csv_path, streaming=streaming)
+            peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+            print(f"Mode {mode}, pic mémoire de l'import initial: {peak:.0f} Mio")
+            
+            db = Database(controller.db_path)
+            db.cursor.execute("SELECT COUNT(*) FROM order_items")
+            print(f"Mode {mode}, produits en base: {db.cursor.fetchone()[0]}")
+            db.close()
+        
+        identical = check_scattered_orders(tmp_dir)
+    
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000))
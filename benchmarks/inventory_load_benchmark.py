@@ -0,0 +1,132 @@
+"""
+Benchmark et contrôle de parité du chargement de l'inventaire
+
+Compare l'ancienne lecture des produits (deux requêtes par produit) à la
+lecture groupée (une requête par table), puis le rechargement complet depuis
+SQLite au rechargement depuis l'instantané.
+
+Usage: python -m benchmarks.inventory_load_benchmark [nombre_de_produits]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_data import write_inventory
+from config import INVENTORY_SETTINGS
+from controllers.inventory_controller import InventoryController
+from models.database import Database
+from models.inventory import InventoryManager
+
+REPEAT = 5
+
+
+def load_products_per_row(controller):
+    """Implémentation de référence produit par produit, conservée pour le contrôle de parité"""
+    controller.db.cursor.execute("SELECT name, description FROM products")
+    
+    for row in controller.db.cursor.fetchall():
+        product = controller.inventory.add_product(row['name'], row['description'])
+        
+        controller.db.cursor.execute("""
+            SELECT component_name, quantity, color_constraint
+            FROM product_components
+            WHERE product_name = ?
+        """, (row['name'],))
+        for comp_row in controller.db.cursor.fetchall():
+            product.add_component(comp_row['component_name'], comp_row['quantity'], comp_row['color_constraint'])
+        
+        controller.db.cursor.execute("""
+            SELECT color, quantity
+            FROM assembled_products
+            WHERE product_name = ?
+        """, (row['name'],))
+        for assembled_row in controller.db.cursor.fetchall():
+            product.add_assembled_product(assembled_row['color'], assembled_row['quantity'])
+
+
+def inventory_signature(inventory):
+    """Représentation comparable d'un inventaire (ordres d'insertion compris)"""
+    return (
+        [
+            (name, color, c.stock, c.alert_threshold)
+            for name, colors in inventory.components.items()
+            for color, c in colors.items()
+        ],
+        [
+            (name, p.description, p.components, list(p.color_constraints.items()),
+             list(p.assembled_items.items()))
+            for name, p in inventory.products.items()
+        ],
+        [
+            (name, v.base_color, v.hex_code)
+            for name, v in inventory.color_variants.items()
+        ],
+    )
+
+
+def best_time(function):
+    """Meilleure durée de REPEAT exécutions"""
+    durations = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def run(product_count=500):
+    """Mesure les chargements sur un catalogue synthétique et vérifie qu'ils concordent"""
+    snapshot_enabled = INVENTORY_SETTINGS["snapshot_enabled"]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "inventory.db")
+        db = Database(db_path)
+        combinations, bom_rows = write_inventory(db, product_count)
+        print(f"Catalogue: {product_count} produits, {combinations} composants x couleurs, "
+              f"{bom_rows} lignes de nomenclature")
+        
+        try:
+            INVENTORY_SETTINGS["snapshot_enabled"] = False
+            controller = InventoryController(db_path)
+            from_sql = inventory_signature(controller.inventory)
+            
+            def reset_products():
+                controller.inventory = InventoryManager()
+            
+            def per_row():
+                reset_products()
+                load_products_per_row(controller)
+            
+            def batched():
+                reset_products()
+                controller._load_products()
+            
+            per_row_time = best_time(per_row)
+            per_row_products = inventory_signature(controller.inventory)[1]
+            batched_time = best_time(batched)
+            identical = per_row_products == inventory_signature(controller.inventory)[1]
+            print(f"Produits: produit par produit {per_row_time * 1000:.1f} ms, "
+                  f"groupé {batched_time * 1000:.1f} ms "
+                  f"({'identiques' if identical else 'DIFFÉRENTS'})")
+            
+            sql_time = best_time(controller.reload)
+            
+            INVENTORY_SETTINGS["snapshot_enabled"] = True
+            controller.reload()  # Écrit l'instantané
+            snapshot_time = best_time(controller.reload)
+            identical_snapshot = from_sql == inventory_signature(controller.inventory)
+            print(f"Rechargement complet: SQLite {sql_time * 1000:.1f} ms, "
+                  f"instantané {snapshot_time * 1000:.1f} ms "
+                  f"({'identiques' if identical_snapshot else 'DIFFÉRENTS'})")
+        finally:
+            INVENTORY_SETTINGS["snapshot_enabled"] = snapshot_enabled
+        
+        db.close()
+    
+    return 0 if identical and identical_snapshot else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
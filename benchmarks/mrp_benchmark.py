@@ -0,0 +1,157 @@
+"""
+Benchmark et contrôle de parité du calcul des besoins en composants
+
+Éclate un carnet de commandes synthétique (couleurs imposées, Aléatoire et
+produits hors catalogue) avec le calcul vectorisé (RequirementsPlanner), puis
+compare le résultat à un éclatement de référence, commande par commande et
+composant par composant.
+
+Usage: python -m benchmarks.mrp_benchmark [nombre_de_produits] [nombre_de_lignes_de_demande]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from benchmarks.bom_matrix_benchmark import edge_case_inventory
+from benchmarks.synthetic_data import write_inventory
+from config import INVENTORY_SETTINGS
+from controllers.inventory_controller import InventoryController
+from models.database import Database
+from models.mrp import RANDOM_COLOR, RequirementsPlanner
+
+COLOR_COUNT = 30
+REPEAT = 5
+
+
+def explode_loop(inventory, demand):
+    """Implémentation de référence par boucles, conservée pour le contrôle de parité"""
+    ordered = defaultdict(int)
+    for product, color, quantity in demand:
+        if quantity > 0:
+            ordered[(product, color)] += quantity
+    
+    gross = defaultdict(int)
+    for (product_name, color), quantity in ordered.items():
+        product = inventory.products.get(product_name)
+        if product is None or not product.components:
+            # Imprimé d'une pièce: le produit est son propre composant
+            gross[(product_name, color)] += quantity
+            continue
+        
+        if color == RANDOM_COLOR:
+            available = sum(max(stock - ordered.get((product_name, c), 0), 0)
+                            for c, stock in product.assembled_items.items() if c != RANDOM_COLOR)
+        else:
+            available = product.assembled_items.get(color, 0)
+        to_assemble = max(quantity - available, 0)
+        
+        for comp in product.components:
+            comp_color = product.get_component_color(comp["name"], color) or RANDOM_COLOR
+            gross[(comp["name"], comp_color)] += to_assemble * max(comp["quantity"], 0)
+    
+    requirements = []
+    for (name, color), needed in gross.items():
+        if needed == 0:
+            continue
+        by_color = inventory.components.get(name, {})
+        if color == RANDOM_COLOR:
+            on_hand = max([max(max(c.stock, 0) - gross.get((name, c.color), 0), 0)
+                           for c in by_color.values() if c.color != RANDOM_COLOR] or [0])
+        else:
+            on_hand = max(by_color[color].stock, 0) if color in by_color else 0
+        requirements.append({
+            'component': name,
+            'color': color,
+            'gross': needed,
+            'on_hand': on_hand,
+            'net': max(needed - on_hand, 0)
+        })
+    
+    requirements.sort(key=lambda r: (r['color'] == RANDOM_COLOR, r['color'], r['component']))
+    return requirements
+
+
+def synthetic_demand(inventory, line_count, colors, seed=42):
+    """Carnet de commandes synthétique: (produit, couleur, quantité)"""
+    rng = random.Random(seed)
+    products = list(inventory.products)
+    demand = []
+    for i in range(line_count):
+        draw = rng.random()
+        if draw < 0.02:
+            product = f"Pièce unique {i % 7}"  # Hors catalogue
+        else:
+            product = rng.choice(products)
+        color = RANDOM_COLOR if draw > 0.85 else rng.choice(colors)
+        demand.append((product, color, rng.randint(1, 5)))
+    return demand
+
+
+def best_time(function):
+    """Meilleure durée de REPEAT exécutions"""
+    durations = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def run(product_count=1000, line_count=5000):
+    """Compare le calcul vectorisé à la référence et mesure le recalcul"""
+    snapshot_enabled = INVENTORY_SETTINGS["snapshot_enabled"]
+    colors = [f"Couleur {i:02d}" for i in range(COLOR_COUNT)]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "inventory.db")
+        db = Database(db_path)
+        write_inventory(db, product_count, components_per_product=8, colors=colors)
+        
+        try:
+            INVENTORY_SETTINGS["snapshot_enabled"] = False
+            inventory = InventoryController(db_path).inventory
+        finally:
+            INVENTORY_SETTINGS["snapshot_enabled"] = snapshot_enabled
+        db.close()
+    
+    demand = synthetic_demand(inventory, line_count, colors)
+    
+    loop_time = best_time(lambda: explode_loop(inventory, demand))
+    compile_time = best_time(lambda: RequirementsPlanner(inventory))
+    inventory.get_component_requirements(demand)  # Compilation mise en cache
+    explode_time = best_time(lambda: inventory.get_component_requirements(demand))
+    
+    actual = inventory.get_component_requirements(demand)
+    identical = explode_loop(inventory, demand) == actual
+    
+    missing = sum(1 for r in actual if r['net'] > 0)
+    print(f"{product_count} produits x {COLOR_COUNT} couleurs, {line_count} lignes de demande: "
+          f"boucles {loop_time * 1000:.1f} ms, vectorisé {explode_time * 1000:.1f} ms "
+          f"(+ compilation {compile_time * 1000:.1f} ms), "
+          f"{len(actual)} besoins dont {missing} à imprimer "
+          f"({'identiques' if identical else 'DIFFÉRENTS'})")
+    
+    # Cas limites: chaînes de contraintes, couleurs fixes absentes ou vides, stocks négatifs
+    inventory = edge_case_inventory()
+    inventory.products["chaine"].add_assembled_product("Bleu", 2)
+    inventory.products["tige seule"].add_assembled_product("Noir", 5)
+    demand = [
+        ("chaine", "Bleu", 3), ("chaine", "Noir", 4), ("chaine", RANDOM_COLOR, 2),
+        ("fixe absent", "Rouge", 1), ("fixe vide", "Bleu", 2), ("fixe vide", RANDOM_COLOR, 1),
+        ("composant inconnu", "Noir", 2), ("quantite nulle", "Bleu", 5),
+        ("sans composants", "Blanc", 3), ("tige seule", RANDOM_COLOR, 4),
+        ("tige seule", "Vert", 1), ("hors catalogue", RANDOM_COLOR, 2), ("chaine", "Bleu", 0)
+    ]
+    edge_identical = explode_loop(inventory, demand) == inventory.get_component_requirements(demand)
+    print(f"Cas limites: {'identiques' if edge_identical else 'DIFFÉRENTS'}")
+    identical = edge_identical and identical
+    
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(*(int(arg) for arg in sys.argv[1:3])))
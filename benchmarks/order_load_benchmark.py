@@ -0,0 +1,121 @@
+"""
+Benchmark et contrôle de parité du chargement des commandes
+
+Compare, sur des bases synthétiques de 1 000, 10 000 et 100 000 commandes
+(ITEMS_PER_ORDER produits chacune):
+- l'ancien chargement: les en-têtes, puis une requête order_items par commande;
+- OrderController.get_all_orders: en-têtes et produits en deux requêtes.
+Les deux doivent retourner les mêmes commandes, dans le même ordre.
+
+Chaque taille est mesurée avec le schéma courant, puis sans l'index sur
+order_items.order_id (schéma d'avant les migrations indexées): l'ancien
+chargement parcourt alors toute la table order_items pour chaque commande,
+d'où un coût quadratique; il n'est mesuré sans index que jusqu'à
+max_unindexed commandes (100 000 commandes prennent plus de dix minutes).
+
+Usage: python -m benchmarks.order_load_benchmark [nombre_maximal_de_commandes] [max_sans_index]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import controllers.order_controller as order_controller
+from benchmarks.csv_parser_benchmark import order_signature
+from benchmarks.dashboard_benchmark import ITEMS_PER_ORDER, write_orders
+from models.database import Database
+from models.order import Order
+
+ORDER_COUNTS = (1_000, 10_000, 100_000)
+
+
+def load_orders_per_order(db):
+    """Ancien get_all_orders: une requête order_items par commande, conservé pour la comparaison"""
+    orders = []
+    
+    db.cursor.execute("""
+        SELECT id, date, client, email, status, priority, notes
+        FROM orders
+        ORDER BY date DESC
+    """)
+    
+    for row in db.cursor.fetchall():
+        order = Order(
+            order_id=row['id'],
+            date=row['date'],
+            client=row['client'],
+            email=row['email'],
+            status=row['status'],
+            priority=row['priority'],
+            notes=row['notes']
+        )
+        
+        db.cursor.execute("""
+            SELECT product, color, quantity, status
+            FROM order_items
+            WHERE order_id = ?
+        """, (order.id,))
+        
+        for item_row in db.cursor.fetchall():
+            order.add_item(
+                product=item_row['product'],
+                color=item_row['color'],
+                quantity=item_row['quantity'],
+                status=item_row['status']
+            )
+        
+        orders.append(order)
+    
+    return orders
+
+
+def compare(db, controller, label, with_per_order=True):
+    """Chronomètre les deux chargements et compare leurs commandes"""
+    start = time.perf_counter()
+    actual = controller.get_all_orders()
+    set_based_time = time.perf_counter() - start
+    
+    if not with_per_order:
+        print(f"  {label}: une requête par commande non mesurée, deux requêtes {set_based_time:.2f} s")
+        return True
+    
+    start = time.perf_counter()
+    expected = load_orders_per_order(db)
+    per_order_time = time.perf_counter() - start
+    
+    same = [order_signature(order) for order in expected] == [order_signature(order) for order in actual]
+    print(f"  {label}: une requête par commande {per_order_time:.2f} s, "
+          f"deux requêtes {set_based_time:.2f} s ({'identiques' if same else 'DIFFÉRENTES'})")
+    return same
+
+
+def run(max_count=ORDER_COUNTS[-1], max_unindexed=10_000):
+    """Mesure les deux chargements à chaque taille, avec et sans index, et vérifie qu'ils concordent"""
+    identical = True
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for order_count in (count for count in ORDER_COUNTS if count <= max_count):
+            db_path = os.path.join(tmp_dir, f"orders_{order_count}.db")
+            write_orders(db_path, order_count * ITEMS_PER_ORDER)
+            
+            order_controller.DATABASE_PATH = db_path
+            controller = order_controller.OrderController()
+            db = Database(db_path)
+            
+            print(f"{order_count} commandes ({order_count * ITEMS_PER_ORDER} produits commandés)")
+            identical = compare(db, controller, "schéma courant") and identical
+            
+            db.cursor.execute("DROP INDEX idx_order_items_order_id")
+            db.conn.commit()
+            identical = compare(db, controller, "sans index sur order_id",
+                                with_per_order=order_count <= max_unindexed) and identical
+            
+            controller.db.close()
+            db.close()
+    
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(*(int(arg) for arg in sys.argv[1:3])))
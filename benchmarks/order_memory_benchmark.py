@@ -0,0 +1,160 @@
+"""
+Benchmark mémoire du chargement des commandes
+
+Charge toutes les commandes d'une base synthétique avec OrderController,
+une fois avec l'ancien modèle (produits en dictionnaires, objets avec
+__dict__, chaînes lues en base dupliquées), une fois avec le modèle compact
+(__slots__, OrderItem, chaînes internées). Chaque variante est mesurée dans
+un processus neuf: mémoire résidente gagnée et mémoire Python retenue
+(tracemalloc). Les valeurs calculées sur les commandes sont comparées.
+
+Usage: python -m benchmarks.order_memory_benchmark [nombre_de_commandes]
+"""
+
+import gc
+import hashlib
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from config import PRODUCTS, COLORS, ORDER_STATUSES, ITEM_STATUSES
+from models.database import Database
+
+
+class LegacyOrder:
+    """Ancien modèle de commande (produits en dictionnaires), conservé pour la comparaison"""
+    
+    def __init__(self, order_id, date, client, email, status="En attente", priority="Moyenne", notes=""):
+        self.id = order_id
+        self.date = date
+        self.client = client
+        self.email = email
+        self.status = status
+        self.priority = priority
+        self.notes = notes
+        self.items = []
+    
+    def add_item(self, product, color, quantity=1, status="À imprimer"):
+        self.items.append({
+            "product": product,
+            "color": color,
+            "quantity": quantity,
+            "status": status
+        })
+    
+    def get_total_items(self):
+        return sum(item["quantity"] for item in self.items)
+    
+    def get_progress_percentage(self):
+        if not self.items:
+            return 0
+        total_items = sum(item["quantity"] for item in self.items)
+        completed_items = sum(item["quantity"] for item in self.items if item["status"] == "Imprimé")
+        return int((completed_items / total_items) * 100)
+
+
+def write_orders(db_path, order_count, seed=42):
+    """Remplit une base avec des commandes synthétiques de 1 à 4 produits"""
+    rng = random.Random(seed)
+    db = Database(db_path)
+    order_rows = []
+    item_rows = []
+    
+    for i in range(order_count):
+        order_id = f"#{100000 + i}"
+        order_rows.append((
+            order_id, f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}", f"Client {i}",
+            f"client{i}@example.com", rng.choice(ORDER_STATUSES), "Moyenne", ""
+        ))
+        for _ in range(rng.randint(1, 4)):
+            item_rows.append((order_id, rng.choice(PRODUCTS), rng.choice(COLORS),
+                              rng.randint(1, 3), rng.choice(ITEM_STATUSES)))
+    
+    db.cursor.executemany(
+        "INSERT INTO orders (id, date, client, email, status, priority, notes) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        order_rows
+    )
+    db.cursor.executemany(
+        "INSERT INTO order_items (order_id, product, color, quantity, status) VALUES (?, ?, ?, ?, ?)",
+        item_rows
+    )
+    db.conn.commit()
+    db.close()
+    return len(item_rows)
+
+
+def resident_size():
+    """Mémoire résidente du processus en octets (Linux), 0 si indisponible"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def measure(db_path, legacy):
+    """
+    Charge toutes les commandes (exécuté dans un processus neuf)
+    
+    Returns:
+        tuple: (mémoire résidente gagnée, mémoire Python retenue, durée, empreinte des valeurs)
+    """
+    import controllers.order_controller as order_controller
+    
+    order_controller.DATABASE_PATH = db_path
+    if legacy:
+        order_controller.Order = LegacyOrder
+    controller = order_controller.OrderController()
+    
+    gc.collect()
+    rss_before = resident_size()
+    tracemalloc.start()
+    start = time.perf_counter()
+    
+    orders = controller.get_all_orders()
+    
+    duration = time.perf_counter() - start
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    rss_after = resident_size()
+    
+    digest = hashlib.sha256()
+    for order in orders:
+        digest.update(repr((
+            order.id, order.status, order.get_total_items(), order.get_progress_percentage(),
+            [(item["product"], item["color"], item["quantity"], item["status"]) for item in order.items]
+        )).encode())
+    
+    return rss_after - rss_before, retained, duration, digest.hexdigest()
+
+
+def run(order_count=100000):
+    """Compare la mémoire retenue par les deux modèles de commande"""
+    context = multiprocessing.get_context("spawn")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "orders.db")
+        item_count = write_orders(db_path, order_count)
+        print(f"{order_count} commandes, {item_count} produits commandés")
+        
+        results = {}
+        for label, legacy in (("ancien modèle", True), ("modèle compact", False)):
+            # Un processus neuf par variante: la mémoire résidente n'est pas rendue au système
+            with context.Pool(1) as pool:
+                rss, retained, duration, digest = pool.apply(measure, (db_path, legacy))
+            results[label] = digest
+            print(f"  {label}: mémoire résidente +{rss / 1e6:.1f} Mo, "
+                  f"objets Python retenus {retained / 1e6:.1f} Mo, chargement {duration:.2f} s")
+    
+    identical = len(set(results.values())) == 1
+    print(f"Valeurs calculées: {'identiques' if identical else 'DIFFÉRENTS'}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(*(int(arg) for arg in sys.argv[1:2])))
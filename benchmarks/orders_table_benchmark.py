@@ -0,0 +1,120 @@
+"""
+Benchmark de rendu du tableau des commandes
+
+Mesure le chargement, le premier rendu, le défilement et le filtrage du
+tableau modèle/vue à 50 000 commandes, et le compare à l'ancien remplissage
+d'un QTableWidget (une ligne et trois boutons par commande) sur un plus petit
+nombre de lignes.
+
+Usage: python -m benchmarks.orders_table_benchmark [commandes] [commandes_ancien_tableau]
+"""
+
+import os
+import sys
+import time
+
+# Rendu hors écran lorsque le benchmark est lancé sans affichage
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import (QApplication, QTableView, QTableWidget, QTableWidgetItem,
+                             QWidget, QHBoxLayout, QPushButton, QHeaderView)
+
+from config import PRODUCTS, COLORS, ORDER_STATUSES
+from models.order import Order
+from views.orders_view import OrdersTableModel, OrdersFilterProxyModel, OrderActionsDelegate
+
+
+def make_orders(count):
+    """Construit des commandes synthétiques en mémoire"""
+    orders = []
+    for i in range(count):
+        order = Order(
+            order_id=f"#{100000 + i}",
+            date=f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            client=f"Client {i}",
+            email=f"client{i}@example.com",
+            status=ORDER_STATUSES[i % len(ORDER_STATUSES)]
+        )
+        for j in range(1 + i % 3):
+            order.add_item(PRODUCTS[(i + j) % len(PRODUCTS)], COLORS[(i * 7 + j) % len(COLORS)], 1 + j)
+        orders.append(order)
+    return orders
+
+
+def timed(label, func):
+    """Exécute func, traite les événements en attente et affiche la durée"""
+    start = time.perf_counter()
+    result = func()
+    QApplication.processEvents()
+    print(f"{label}: {(time.perf_counter() - start) * 1000:.1f} ms")
+    return result
+
+
+def bench_model_view(orders):
+    """Tableau modèle/vue avec boutons dessinés par un délégué"""
+    model = OrdersTableModel()
+    proxy = OrdersFilterProxyModel()
+    proxy.setSourceModel(model)
+    
+    view = QTableView()
+    view.setModel(proxy)
+    delegate = OrderActionsDelegate(view)
+    view.setItemDelegateForColumn(OrdersTableModel.ACTIONS_COLUMN, delegate)
+    view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    view.verticalHeader().setDefaultSectionSize(delegate.sizeHint(None, None).height())
+    view.resize(1200, 800)
+    
+    print(f"Modèle/vue, {len(orders)} commandes")
+    timed("  chargement du modèle", lambda: model.set_orders(orders))
+    timed("  premier rendu", lambda: (view.show(), view.grab()))
+    timed("  défilement en fin de tableau et rendu", lambda: (view.scrollToBottom(), view.grab()))
+    timed("  filtre de recherche", lambda: proxy.set_search("client 4242"))
+    print(f"  lignes visibles après filtre: {proxy.rowCount()}")
+    timed("  suppression du filtre", lambda: proxy.set_search(""))
+    view.close()
+
+
+def bench_table_widget(orders):
+    """Ancien remplissage: insertRow, trois QPushButton par ligne et resizeRowToContents"""
+    table = QTableWidget()
+    table.setColumnCount(7)
+    table.resize(1200, 800)
+    
+    def fill():
+        for row_idx, order in enumerate(orders):
+            table.insertRow(row_idx)
+            table.setItem(row_idx, 0, QTableWidgetItem(order.id))
+            table.setItem(row_idx, 1, QTableWidgetItem(order.date))
+            table.setItem(row_idx, 2, QTableWidgetItem(order.client))
+            products = "\n".join(f"{item['product']} - {item['color']} (x{item['quantity']})" for item in order.items)
+            table.setItem(row_idx, 3, QTableWidgetItem(products))
+            table.setItem(row_idx, 4, QTableWidgetItem(order.status))
+            table.setItem(row_idx, 5, QTableWidgetItem(order.priority))
+            
+            actions_widget = QWidget()
+            actions_layout = QHBoxLayout(actions_widget)
+            for _ in range(3):
+                button = QPushButton("")
+                button.setFixedSize(28, 28)
+                actions_layout.addWidget(button)
+            table.setCellWidget(row_idx, 6, actions_widget)
+        
+        for row in range(table.rowCount()):
+            table.resizeRowToContents(row)
+    
+    print(f"Ancien QTableWidget, {len(orders)} commandes")
+    timed("  remplissage du tableau", fill)
+    timed("  premier rendu", lambda: (table.show(), table.grab()))
+    table.close()
+
+
+def run(count=50_000, legacy_count=2_000):
+    app = QApplication.instance() or QApplication(sys.argv)
+    bench_model_view(make_orders(count))
+    if legacy_count:
+        bench_table_widget(make_orders(legacy_count))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(*(int(arg) for arg in sys.argv[1:3])))
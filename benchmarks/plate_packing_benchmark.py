@@ -0,0 +1,205 @@
+"""
+Simulateur et contrôle du remplissage des plateaux d'impression
+
+Sur des plans d'impression synthétiques (produits de une à quatre pièces,
+d'emprises et de hauteurs tirées au hasard), compare:
+- les plateaux d'une seule ligne du plan (produit, couleur), comme le
+  démarrage ligne par ligne (une ligne trop grande pour un plateau en
+  occupe plusieurs);
+- PlatePacker, qui regroupe les produits d'une couleur sur des plateaux.
+Rapporte le nombre de lancements, la durée totale (préparation de chaque
+lancement comprise), le remplissage moyen des plateaux et le temps de calcul.
+Vérifie que chaque exemplaire est placé une fois, entier, sans chevauchement
+et dans les limites du plateau.
+
+Vérifie ensuite, sur une base synthétique et par les contrôleurs, que les
+plateaux utilisent les profils d'impression enregistrés pour les pièces
+(emprise et durée), que démarrer un plateau met tous ses produits en
+impression sur l'imprimante choisie, en une transaction, et que les tables
+de synthèse restent exactes.
+
+Usage: python -m benchmarks.plate_packing_benchmark [nombre_de_plans] [largeur_plateau]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import controllers.order_controller as order_controller
+import controllers.print_controller as print_controller
+import controllers.printer_controller as printer_controller
+import controllers.plate_controller as plate_controller
+from benchmarks.dashboard_benchmark import write_orders
+from config import COLORS, INVENTORY_SETTINGS, PLATE_SETTINGS, PRODUCTS
+from models.database import Database
+from models.plate_packer import PartProfile, PlatePacker
+
+
+def make_plan(rng):
+    """Plan synthétique {couleur: [(produit, quantité, [PartProfile] d'un exemplaire)]}"""
+    plan = {}
+    for color in rng.sample(COLORS, rng.randint(3, len(COLORS))):
+        units = []
+        for product in rng.sample(PRODUCTS, rng.randint(1, 6)):
+            parts = []
+            for index in range(rng.choice((1, 1, 2, 3, 4))):
+                parts.append(PartProfile(f"{product} {index + 1}", rng.randint(15, 120), rng.randint(15, 120),
+                                         rng.randint(5, 120), rng.randint(10, 90)))
+            units.append((product, rng.choice((1, 1, 2, 3, 4, 6, 8)), parts))
+        plan[color] = units
+    return plan
+
+
+def check_plates(packer, units, plates, oversized):
+    """Exemplaires placés une fois et entiers, pièces sans chevauchement et dans le plateau"""
+    placed = {}
+    for plate in plates:
+        for product, quantity in plate.items:
+            placed[product] = placed.get(product, 0) + quantity
+        
+        parts = {}
+        for component, product, x, y, width, depth in plate.placements:
+            parts[(product, component)] = parts.get((product, component), 0) + 1
+            if x < 0 or y < 0 or x + width > packer.bed_width or y + depth > packer.bed_depth:
+                return False
+        
+        # Chaque produit du plateau a toutes ses pièces, autant de fois que d'exemplaires
+        for product, quantity, profiles in units:
+            count = plate.units.get(product, 0)
+            for profile in profiles:
+                expected = count * sum(1 for other in profiles if other.name == profile.name)
+                if parts.get((product, profile.name), 0) != expected:
+                    return False
+        
+        rectangles = sorted((x, y, x + width, y + depth) for _, _, x, y, width, depth in plate.placements)
+        for i, (x1, y1, x2, y2) in enumerate(rectangles):
+            for ox1, oy1, ox2, oy2 in rectangles[i + 1:]:
+                if ox1 >= x2:
+                    break
+                if oy1 < y2 and y1 < oy2:
+                    return False
+    
+    return all(placed.get(product, 0) + oversized.get(product, 0) == quantity for product, quantity, _ in units)
+
+
+def check_controllers():
+    """Démarre le premier plateau du plan par les contrôleurs sur une base synthétique"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "orders.db")
+        write_orders(db_path, 4000)
+        
+        order_controller.DATABASE_PATH = db_path
+        print_controller.DATABASE_PATH = db_path
+        printer_controller.DATABASE_PATH = db_path
+        plate_controller.DATABASE_PATH = db_path
+        db = Database(db_path)
+        plates_controller = plate_controller.PlateController()
+        printing = plates_controller.print_controller
+        
+        # Profils d'impression des pièces du plan, enregistrés comme depuis l'inventaire
+        rng = random.Random(0)
+        profiles = {}
+        plan = printing.get_print_plan(include_printing=False, with_order_ids=False)
+        for color, entries in plan.items():
+            for entry in entries:
+                for component, _ in printing.inventory_controller.get_printed_components(entry["product"], color):
+                    if component not in profiles:
+                        profiles[component] = (rng.randint(15, 90), rng.randint(15, 90),
+                                               rng.randint(5, 120), rng.randint(10, 90))
+                        plates_controller.set_component_profile(component, *profiles[component])
+        
+        plates, _ = plates_controller.get_plates()
+        # Chaque pièce placée a l'emprise de son profil (éventuellement pivotée),
+        # et la durée d'un plateau est la somme de celles de ses pièces
+        profiled = bool(plates) and all(
+            (width, depth) in ((profiles[component][0], profiles[component][1]),
+                               (profiles[component][1], profiles[component][0]))
+            and abs(plate.print_minutes - PLATE_SETTINGS["plate_overhead_minutes"]
+                    - sum(profiles[name][3] for name, _, _, _, _, _ in plate.placements)) < 1e-6
+            for plate in plates
+            for component, _, _, _, width, depth in plate.placements
+        )
+        
+        plate = plates[0]
+        printer = plates_controller.printer_controller.get_printers()[0]
+        before = {entry["product"]: entry["quantity"] for entry in
+                  printing.get_print_plan(include_printing=False, with_order_ids=False)[plate.color]}
+        
+        started = plates_controller.start_plate(plate, printer.id)
+        after = {entry["product"]: entry["quantity"] for entry in
+                 printing.get_print_plan(include_printing=False, with_order_ids=False).get(plate.color, [])}
+        moved = (started == sum(quantity for _, quantity in plate.items)
+                 and all(before[product] - after.get(product, 0) == quantity for product, quantity in plate.items))
+        
+        db.cursor.execute("""
+            SELECT COUNT(DISTINCT plate_id) AS plates, COUNT(*) AS jobs,
+                   SUM(duration_minutes) AS minutes, MIN(printer_id) AS printer_id
+            FROM print_jobs
+            WHERE status = 'En impression'
+        """)
+        jobs = db.cursor.fetchone()
+        assigned = (jobs["plates"] == 1 and jobs["jobs"] == len(plate.items) and jobs["printer_id"] == printer.id
+                    and abs(jobs["minutes"] - plate.print_minutes) < 1e-6)
+        consistent = not db.check_rollups()
+        
+        printing.inventory_controller.db.close()
+        printing.db.close()
+        plates_controller.printer_controller.db.close()
+        plates_controller.db.close()
+        db.close()
+    
+    return profiled, moved, assigned, consistent
+
+
+def run(plan_count=200, bed_size=256):
+    """Compare une ligne par plateau et le remplissage des plateaux, puis contrôle le parcours par les contrôleurs"""
+    packer = PlatePacker(bed_size, bed_size, bed_size)
+    line_jobs = plate_count = 0
+    line_minutes = plate_minutes = 0.0
+    fill_total = 0.0
+    elapsed = 0.0
+    failures = 0
+    
+    for seed in range(plan_count):
+        rng = random.Random(seed)
+        for color, units in make_plan(rng).items():
+            start = time.perf_counter()
+            plates, oversized = packer.pack(color, units)
+            elapsed += time.perf_counter() - start
+            
+            if not check_plates(packer, units, plates, oversized):
+                failures += 1
+            
+            for unit in units:
+                line_plates, _ = packer.pack(color, [unit])
+                line_jobs += len(line_plates)
+                line_minutes += sum(plate.print_minutes for plate in line_plates)
+            plate_count += len(plates)
+            plate_minutes += sum(plate.print_minutes for plate in plates)
+            fill_total += sum(plate.fill_ratio for plate in plates)
+    
+    print(f"{plan_count} plans d'impression, plateau {bed_size} x {bed_size} mm")
+    print(f"Une ligne par plateau: {line_jobs / plan_count:.1f} lancements, durée {line_minutes / plan_count / 60:.1f} h")
+    print(f"Plateaux: {plate_count / plan_count:.1f} lancements, durée {plate_minutes / plan_count / 60:.1f} h, "
+          f"remplissage moyen {fill_total / max(plate_count, 1):.0%}, "
+          f"calcul {elapsed / plan_count * 1000:.2f} ms par plan")
+    
+    snapshot_enabled = INVENTORY_SETTINGS["snapshot_enabled"]
+    INVENTORY_SETTINGS["snapshot_enabled"] = False
+    try:
+        profiled, moved, assigned, consistent = check_controllers()
+    finally:
+        INVENTORY_SETTINGS["snapshot_enabled"] = snapshot_enabled
+    
+    print(f"Placements: {'valides' if not failures else f'INVALIDES ({failures})'}")
+    print(f"Contrôleurs: profils {'appliqués' if profiled else 'NON APPLIQUÉS'}, "
+          f"produits {'mis en impression' if moved else 'NON DÉPLACÉS'}, "
+          f"plateau {'affecté' if assigned else 'NON AFFECTÉ'}, "
+          f"tables de synthèse {'identiques' if consistent else 'DIFFÉRENTES'}")
+    return 0 if not failures and profiled and moved and assigned and consistent else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(*(int(arg) for arg in sys.argv[1:3])))
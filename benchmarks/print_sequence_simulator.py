@@ -0,0 +1,85 @@
+"""
+Simulateur de l'ordonnancement des lots d'impression par couleur
+
+Génère des carnets de commandes synthétiques (commandes de une à trois
+couleurs, âgées de 0 à 20 jours) et compare, sur une imprimante:
+- l'ancien ordre de WorkflowController.optimize_print_plan, par score
+  décroissant (0.5 x quantité + 0.3 x produits + 0.2 x commandes);
+- l'ordre proposé par PrintSequencer.
+Rapporte les changements de bobine, leurs minutes et le délai moyen des
+commandes (ancienneté + fin du dernier lot de la commande).
+
+Usage: python -m benchmarks.print_sequence_simulator [nombre_de_carnets] [commandes_par_carnet]
+"""
+
+import random
+import sys
+import time
+
+from config import COLORS, PRODUCTS
+from models.print_sequencer import ColorBatch, PrintSequencer
+
+
+def make_backlog(rng, order_count):
+    """Lots par couleur d'un carnet de commandes synthétique, et couleur chargée au départ"""
+    colors = rng.sample(COLORS, rng.randint(6, len(COLORS)))
+    batches = {}
+    for i in range(order_count):
+        order_id = f"#{100000 + i}"
+        age = rng.randint(0, 20)
+        for color in rng.sample(colors, rng.choice((1, 1, 1, 2, 3))):
+            batch = batches.setdefault(color, ColorBatch(color, 0))
+            product = rng.choice(PRODUCTS)
+            quantity = rng.choice((1, 1, 2, 3, 5))
+            batch.quantity += quantity
+            batch.orders[order_id] = age
+            batch.products.append({"product": product, "quantity": quantity, "order_ids": [order_id]})
+    return list(batches.values()), rng.choice(colors + [None])
+
+
+def score_order(batches):
+    """Ancien ordre: score décroissant par couleur"""
+    def score(batch):
+        return batch.quantity * 0.5 + len(batch.products) * 0.3 + len(batch.orders) * 0.2
+    return sorted(batches, key=score, reverse=True)
+
+
+def run(backlog_count=20, order_count=40):
+    """Compare l'ancien ordre par score et l'ordonnanceur sur des carnets synthétiques"""
+    sequencer = PrintSequencer()
+    totals = {"score": [0, 0, 0.0], "sequencer": [0, 0, 0.0]}
+    sequencing_time = 0.0
+    regressions = 0
+    
+    for seed in range(backlog_count):
+        batches, loaded_color = make_backlog(random.Random(seed), order_count)
+        baseline = sequencer.simulate(score_order(batches), loaded_color)
+        
+        start = time.perf_counter()
+        sequence = sequencer.sequence(batches, loaded_color)
+        sequencing_time += time.perf_counter() - start
+        optimized = sequencer.simulate(sequence, loaded_color)
+        
+        if sorted(id(batch) for batch in sequence) != sorted(id(batch) for batch in batches):
+            regressions += 1
+        if optimized.objective > baseline.objective + 1e-6:
+            regressions += 1
+        
+        for key, report in (("score", baseline), ("sequencer", optimized)):
+            totals[key][0] += report.swaps
+            totals[key][1] += report.changeover_minutes
+            totals[key][2] += report.mean_lead_time_days
+    
+    print(f"{backlog_count} carnets de {order_count} commandes, une imprimante")
+    for key, label in (("score", "Ordre par score"), ("sequencer", "Ordonnanceur")):
+        swaps, minutes, lead = totals[key]
+        print(f"{label}: {swaps / backlog_count:.1f} changements de bobine, "
+              f"{minutes / backlog_count:.0f} min de changement, "
+              f"délai moyen {lead / backlog_count:.2f} jours")
+    print(f"Ordonnancement: {sequencing_time / backlog_count * 1000:.1f} ms par carnet")
+    print(f"Objectif de l'ordonnanceur: {'jamais dégradé' if not regressions else f'DÉGRADÉ ({regressions})'}")
+    return 0 if not regressions else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(*(int(arg) for arg in sys.argv[1:3])))
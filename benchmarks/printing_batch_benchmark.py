@@ -0,0 +1,201 @@
+"""
+Benchmark et contrôle de parité du démarrage d'un lot d'impression partiel
+
+Démarre un lot de 500 pièces sur une base synthétique avec
+PrintController.start_printing_batch_partial (répartition par fonction de
+fenêtre, écritures ensemblistes), puis avec l'ancienne boucle ligne par ligne
+suivie du recalcul des commandes une par une. Les produits commandés et les
+statuts des commandes obtenus sont comparés. Les commandes expédiées ou
+annulées gardent leur statut.
+
+Compare aussi le recalcul du statut de toutes les commandes, commande par
+commande (get_order_by_id, Order.update_status, UPDATE et validation) puis
+en une requête (Database.update_order_statuses).
+
+Usage: python -m benchmarks.printing_batch_benchmark [nombre_de_commandes] [taille_du_lot]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import controllers.order_controller as order_controller
+import controllers.print_controller as print_controller
+from config import COLORS, INVENTORY_SETTINGS, PRODUCTS
+from models.database import Database
+
+PRODUCT = PRODUCTS[0]
+COLOR = COLORS[1]
+REPEAT = 5
+# Statuts qui ne dépendent plus des produits de la commande
+FINAL_STATUSES = ("Expédié", "Annulé")
+
+
+def write_orders(db_path, order_count, seed=42):
+    """Base de commandes dont une sur quatre attend le produit du lot, et une sur dix est expédiée ou annulée"""
+    rng = random.Random(seed)
+    db = Database(db_path)
+    order_rows = []
+    item_rows = []
+    
+    for i in range(order_count):
+        order_id = f"#{100000 + i}"
+        order_rows.append((order_id, f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}", f"Client {i}",
+                           f"client{i}@example.com", FINAL_STATUSES[i // 10 % 2] if i % 10 == 8 else "En attente"))
+        if i % 4 == 0:
+            item_rows.append((order_id, PRODUCT, COLOR, rng.randint(1, 6), "À imprimer"))
+        for _ in range(rng.randint(0, 2)):
+            item_rows.append((order_id, rng.choice(PRODUCTS), rng.choice(COLORS), rng.randint(1, 3),
+                              rng.choice(("À imprimer", "En impression", "Imprimé"))))
+    
+    db.cursor.executemany(
+        "INSERT INTO orders (id, date, client, email, status) VALUES (?, ?, ?, ?, ?)", order_rows
+    )
+    db.cursor.executemany(
+        "INSERT INTO order_items (order_id, product, color, quantity, status) VALUES (?, ?, ?, ?, ?)",
+        item_rows
+    )
+    db.conn.commit()
+    db.close()
+
+
+def start_batch_loop(db, orders, product, color, quantity_to_print):
+    """Ancienne implémentation ligne par ligne, conservée pour le contrôle de parité"""
+    db.cursor.execute("""
+        SELECT id, order_id, quantity FROM order_items
+        WHERE product = ? AND color = ? AND status = 'À imprimer'
+        ORDER BY quantity ASC, id ASC
+    """, (product, color))
+    
+    remaining = quantity_to_print
+    updated_orders = set()
+    for item in db.cursor.fetchall():
+        if remaining <= 0:
+            break
+        if item["quantity"] <= remaining:
+            db.cursor.execute("UPDATE order_items SET status = 'En impression' WHERE id = ?", (item["id"],))
+            remaining -= item["quantity"]
+        else:
+            db.cursor.execute("UPDATE order_items SET quantity = quantity - ? WHERE id = ?",
+                              (remaining, item["id"]))
+            db.cursor.execute("""
+                INSERT INTO order_items (order_id, product, color, quantity, status)
+                VALUES (?, ?, ?, ?, 'En impression')
+            """, (item["order_id"], product, color, remaining))
+            remaining = 0
+        updated_orders.add(item["order_id"])
+    db.conn.commit()
+    
+    for order_id in updated_orders:
+        order = orders.get_order_by_id(order_id)
+        if order and order.status not in FINAL_STATUSES:
+            order.update_status()
+            orders.update_order_status(order_id, order.status)
+
+
+def dump(db_path):
+    """Contenu comparable de la base: produits commandés et statuts des commandes"""
+    db = Database(db_path)
+    db.cursor.execute("""
+        SELECT order_id, product, color, quantity, status FROM order_items
+        ORDER BY order_id, product, color, status, quantity
+    """)
+    items = [tuple(row) for row in db.cursor.fetchall()]
+    db.cursor.execute("SELECT id, status FROM orders ORDER BY id")
+    orders = [tuple(row) for row in db.cursor.fetchall()]
+    db.close()
+    return items, orders
+
+
+def run_variant(base_path, tmp_dir, label, batch_size):
+    """Démarre le lot sur des copies de la base; retourne la meilleure durée et le contenu obtenu"""
+    durations = []
+    for i in range(REPEAT):
+        db_path = os.path.join(tmp_dir, f"{label}_{i}.db")
+        shutil.copy(base_path, db_path)
+        order_controller.DATABASE_PATH = db_path
+        print_controller.DATABASE_PATH = db_path
+        
+        if label == "boucle":
+            db = Database(db_path)
+            orders = order_controller.OrderController()
+            start = time.perf_counter()
+            start_batch_loop(db, orders, PRODUCT, COLOR, batch_size)
+            durations.append(time.perf_counter() - start)
+            db.close()
+        else:
+            controller = print_controller.PrintController()
+            start = time.perf_counter()
+            controller.start_printing_batch_partial(PRODUCT, COLOR, batch_size)
+            durations.append(time.perf_counter() - start)
+            controller.db.close()
+    
+    return min(durations), dump(db_path)
+
+
+def refresh_statuses_loop(db_path):
+    """Ancien recalcul commande par commande, conservé pour le contrôle de parité"""
+    order_controller.DATABASE_PATH = db_path
+    orders = order_controller.OrderController()
+    orders.db.cursor.execute("SELECT id FROM orders")
+    for order_id in [row["id"] for row in orders.db.cursor.fetchall()]:
+        order = orders.get_order_by_id(order_id)
+        if order and order.status not in FINAL_STATUSES:
+            order.update_status()
+            orders.update_order_status(order_id, order.status)
+    orders.db.close()
+
+
+def refresh_statuses_sql(db_path):
+    """Recalcul ensembliste du statut de toutes les commandes"""
+    db = Database(db_path)
+    db.update_order_statuses("1")
+    db.conn.commit()
+    db.close()
+
+
+def compare_status_refresh(base_path, tmp_dir):
+    """Recalcule le statut de toutes les commandes des deux façons; retourne les durées et la parité"""
+    results = []
+    for label, refresh in (("statuts_boucle", refresh_statuses_loop), ("statuts_sql", refresh_statuses_sql)):
+        db_path = os.path.join(tmp_dir, f"{label}.db")
+        shutil.copy(base_path, db_path)
+        start = time.perf_counter()
+        refresh(db_path)
+        results.append((time.perf_counter() - start, dump(db_path)))
+    (loop_time, expected), (sql_time, actual) = results
+    return loop_time, sql_time, expected == actual
+
+
+def run(order_count=20000, batch_size=500):
+    """Compare le démarrage ensembliste à l'ancienne boucle"""
+    snapshot_enabled = INVENTORY_SETTINGS["snapshot_enabled"]
+    INVENTORY_SETTINGS["snapshot_enabled"] = False
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            base_path = os.path.join(tmp_dir, "orders.db")
+            write_orders(base_path, order_count)
+            
+            loop_time, expected = run_variant(base_path, tmp_dir, "boucle", batch_size)
+            set_time, actual = run_variant(base_path, tmp_dir, "ensembliste", batch_size)
+            status_loop_time, status_sql_time, status_identical = compare_status_refresh(base_path, tmp_dir)
+    finally:
+        INVENTORY_SETTINGS["snapshot_enabled"] = snapshot_enabled
+    
+    identical = expected == actual
+    print(f"{order_count} commandes, lot de {batch_size} {PRODUCT} en {COLOR}: "
+          f"boucle {loop_time * 1000:.1f} ms, ensembliste {set_time * 1000:.1f} ms "
+          f"({'identiques' if identical else 'DIFFÉRENTS'})")
+    print(f"Statut des {order_count} commandes: commande par commande {status_loop_time * 1000:.1f} ms, "
+          f"une requête {status_sql_time * 1000:.1f} ms "
+          f"({'identiques' if status_identical else 'DIFFÉRENTS'})")
+    identical = identical and status_identical
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(*(int(arg) for arg in sys.argv[1:3])))
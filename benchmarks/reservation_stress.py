@@ -0,0 +1,288 @@
+"""
+Test de charge concurrente du registre des réservations de composants
+
+Plusieurs opérateurs (processus et threads, chacun avec son propre
+InventoryController, comme des postes distincts) assemblent, réservent,
+consomment et libèrent en même temps sur un stock trop petit pour tous.
+On vérifie ensuite qu'aucun stock n'a été attribué deux fois: stocks jamais
+négatifs, stock final égal au stock initial moins les consommations du
+registre, produits assemblés égaux aux assemblages réussis.
+
+Vérifie aussi, par WorkflowController.cancel_order, qu'annuler une
+commande libère ses réservations et remet ses produits imprimés en stock.
+
+Pour comparaison, le même scénario est rejoué avec l'ancienne écriture
+(vérification sur l'inventaire en mémoire du poste, puis
+UPDATE stock = MAX(0, stock - ?)), qui vend le même stock plusieurs fois.
+
+Usage: python -m benchmarks.reservation_stress [processus] [threads] [opérations_par_opérateur]
+"""
+
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from config import INVENTORY_SETTINGS
+from models.database import Database
+
+COMPONENTS = [f"Pièce {i}" for i in range(6)]
+COLORS = ["Noir", "Blanc"]
+INITIAL_STOCK = 60
+
+# Nomenclatures: (produit, [(composant, quantité)])
+PRODUCTS = [
+    (f"Jouet {i}", [(COMPONENTS[(i + k) % len(COMPONENTS)], 1 + k % 2) for k in range(3)])
+    for i in range(4)
+]
+
+
+def create_database(db_path):
+    """Crée la base de test: composants en stock et nomenclatures"""
+    db = Database(db_path)
+    db.cursor.executemany(
+        "INSERT INTO components (name, color, stock, alert_threshold) VALUES (?, ?, ?, 3)",
+        [(name, color, INITIAL_STOCK) for name in COMPONENTS for color in COLORS]
+    )
+    db.cursor.executemany("INSERT INTO products (name, description) VALUES (?, '')",
+                          [(name,) for name, _ in PRODUCTS])
+    db.cursor.executemany(
+        "INSERT INTO product_components (product_name, component_name, quantity) VALUES (?, ?, ?)",
+        [(name, component, quantity) for name, bom in PRODUCTS for component, quantity in bom]
+    )
+    db.conn.commit()
+    db.close()
+
+
+def operator(db_path, operations, seed):
+    """
+    Opérateur utilisant le registre des réservations
+    
+    Returns:
+        dict: Produits assemblés par l'opérateur {(produit, couleur): quantité}
+    """
+    from controllers.inventory_controller import InventoryController
+    
+    INVENTORY_SETTINGS["snapshot_enabled"] = False
+    controller = InventoryController(db_path)
+    rng = random.Random(seed)
+    assembled = {}
+    
+    for _ in range(operations):
+        product, _ = rng.choice(PRODUCTS)
+        color = rng.choice(COLORS)
+        quantity = rng.randint(1, 3)
+        draw = rng.random()
+        
+        if draw < 0.5:
+            success, _ = controller.assemble_product(product, color, quantity)
+        else:
+            success, reservation_id = controller.reserve_product(product, color, quantity, order_id=f"#{seed}")
+            if not success:
+                continue
+            if draw < 0.8:
+                success, _ = controller.assemble_product(product, color, quantity, reservation_id=reservation_id)
+            else:
+                controller.release_reservation(reservation_id)
+                success = False
+        
+        if success:
+            assembled[(product, color)] = assembled.get((product, color), 0) + quantity
+    
+    controller.db.close()
+    return assembled
+
+
+def naive_operator(db_path, operations, seed):
+    """
+    Opérateur reproduisant l'ancienne écriture: vérification sur l'inventaire
+    en mémoire du poste, puis retrait borné à 0 en base
+    
+    Returns:
+        int: Nombre de composants que l'opérateur croit avoir consommés
+    """
+    db = Database(db_path)
+    db.cursor.execute("SELECT name, color, stock FROM components")
+    stock = {(row['name'], row['color']): row['stock'] for row in db.cursor.fetchall()}
+    rng = random.Random(seed)
+    consumed = 0
+    
+    for _ in range(operations):
+        _, bom = rng.choice(PRODUCTS)
+        color = rng.choice(COLORS)
+        quantity = rng.randint(1, 3)
+        
+        if any(stock[(component, color)] < q * quantity for component, q in bom):
+            continue
+        for component, q in bom:
+            stock[(component, color)] -= q * quantity
+            db.cursor.execute("UPDATE components SET stock = MAX(0, stock - ?) WHERE name = ? AND color = ?",
+                              (q * quantity, component, color))
+            consumed += q * quantity
+        db.conn.commit()
+    
+    db.close()
+    return consumed
+
+
+def run_operators(target, db_path, process_count, thread_count, operations):
+    """Lance les opérateurs en parallèle (processus puis threads) et retourne leurs résultats"""
+    seeds = list(range(process_count + thread_count))
+    
+    # spawn: les processus n'héritent pas des connexions SQLite du parent
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(process_count) as pool:
+        pending = pool.starmap_async(target, [(db_path, operations, seed) for seed in seeds[:process_count]])
+        
+        thread_results = [None] * thread_count
+        
+        def work(i):
+            thread_results[i] = target(db_path, operations, seeds[process_count + i])
+        
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        return pending.get() + thread_results
+
+
+def check_ledger(db_path, results):
+    """Vérifie les invariants du stock après le scénario avec registre"""
+    db = Database(db_path)
+    ok = True
+    
+    db.cursor.execute("SELECT name, color, stock FROM components")
+    stock = {(row['name'], row['color']): row['stock'] for row in db.cursor.fetchall()}
+    
+    db.cursor.execute("""
+        SELECT component_name, color, SUM(quantity) AS quantity FROM component_reservations
+        WHERE status = 'Consommé' GROUP BY component_name, color
+    """)
+    consumed = {(row['component_name'], row['color']): row['quantity'] for row in db.cursor.fetchall()}
+    
+    db.cursor.execute("SELECT COUNT(*) AS count FROM component_reservations WHERE status = 'Réservé'")
+    active = db.cursor.fetchone()['count']
+    
+    db.cursor.execute("SELECT product_name, color, quantity FROM assembled_products")
+    assembled = {(row['product_name'], row['color']): row['quantity'] for row in db.cursor.fetchall()}
+    db.close()
+    
+    reported = {}
+    for result in results:
+        for key, quantity in result.items():
+            reported[key] = reported.get(key, 0) + quantity
+    
+    expected_consumption = {}
+    for (product, color), quantity in reported.items():
+        for component, q in dict(PRODUCTS)[product]:
+            key = (component, color)
+            expected_consumption[key] = expected_consumption.get(key, 0) + q * quantity
+    
+    if min(stock.values()) < 0:
+        print("  Stock négatif")
+        ok = False
+    if any(INITIAL_STOCK - stock[key] != consumed.get(key, 0) for key in stock):
+        print("  Stock final différent du stock initial moins les consommations du registre")
+        ok = False
+    if consumed != expected_consumption:
+        print("  Consommations du registre différentes des assemblages réussis")
+        ok = False
+    if assembled != {key: quantity for key, quantity in reported.items() if quantity}:
+        print("  Produits assemblés différents des assemblages réussis")
+        ok = False
+    if active:
+        print(f"  {active} lignes encore réservées")
+        ok = False
+    
+    total_consumed = sum(consumed.values())
+    print(f"  {sum(reported.values())} produits assemblés, {total_consumed} composants consommés "
+          f"sur {INITIAL_STOCK * len(stock)}, stock restant {sum(stock.values())}")
+    return ok
+
+
+def check_cancel_order(db_path):
+    """Annule une commande avec une réservation et un produit imprimé"""
+    import controllers.order_controller as order_controller
+    import controllers.print_controller as print_controller
+    import controllers.workflow_controller as workflow_controller
+    
+    order_controller.DATABASE_PATH = db_path
+    print_controller.DATABASE_PATH = db_path
+    workflow_controller.DATABASE_PATH = db_path
+    
+    db = Database(db_path)
+    db.cursor.execute("INSERT INTO orders (id, date, client, email, status) "
+                      "VALUES ('#annulée', '2025-01-01', 'Client', 'client@example.com', 'En cours')")
+    db.cursor.executemany(
+        "INSERT INTO order_items (order_id, product, color, quantity, status) VALUES ('#annulée', ?, ?, ?, ?)",
+        [(PRODUCTS[0][0], COLORS[0], 2, "Imprimé"), (PRODUCTS[1][0], COLORS[1], 1, "À imprimer")]
+    )
+    db.conn.commit()
+    
+    workflow = workflow_controller.WorkflowController()
+    inventory = workflow.inventory_controller
+    reserved, _ = inventory.reserve_product(PRODUCTS[1][0], COLORS[1], 1, order_id="#annulée")
+    before = inventory.get_assembled_product_stock(PRODUCTS[0][0], COLORS[0])
+    
+    success, _ = workflow.cancel_order("#annulée")
+    db.cursor.execute("SELECT status FROM orders WHERE id = '#annulée'")
+    ok = (reserved and success and not inventory.get_reservations("#annulée")
+          and inventory.get_assembled_product_stock(PRODUCTS[0][0], COLORS[0]) == before + 2
+          and db.cursor.fetchone()["status"] == "Annulé")
+    
+    inventory.db.close()
+    workflow.print_controller.db.close()
+    workflow.order_controller.db.close()
+    workflow.db.close()
+    db.close()
+    print(f"Annulation d'une commande: {'réservations libérées, produits remis en stock' if ok else 'INCORRECTE'}")
+    return ok
+
+
+def run(process_count=4, thread_count=4, operations=150):
+    """Joue le scénario concurrent avec le registre, puis avec l'ancienne écriture"""
+    operator_count = process_count + thread_count
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "ledger.db")
+        create_database(db_path)
+        
+        start = time.perf_counter()
+        results = run_operators(operator, db_path, process_count, thread_count, operations)
+        duration = time.perf_counter() - start
+        
+        print(f"Registre des réservations: {operator_count} opérateurs x {operations} opérations "
+              f"en {duration:.1f} s ({operator_count * operations / duration:.0f} opérations/s)")
+        ok = check_ledger(db_path, results)
+        
+        cancel_path = os.path.join(tmp_dir, "cancel.db")
+        create_database(cancel_path)
+        snapshot_enabled = INVENTORY_SETTINGS["snapshot_enabled"]
+        INVENTORY_SETTINGS["snapshot_enabled"] = False
+        try:
+            ok = check_cancel_order(cancel_path) and ok
+        finally:
+            INVENTORY_SETTINGS["snapshot_enabled"] = snapshot_enabled
+        
+        naive_path = os.path.join(tmp_dir, "naive.db")
+        create_database(naive_path)
+        consumed = sum(run_operators(naive_operator, naive_path, process_count, thread_count, operations))
+        
+        db = Database(naive_path)
+        db.cursor.execute("SELECT SUM(stock) AS stock FROM components")
+        actual = INITIAL_STOCK * len(COMPONENTS) * len(COLORS) - db.cursor.fetchone()['stock']
+        db.close()
+        print(f"Ancienne écriture: {consumed} composants attribués pour {actual} réellement en stock "
+              f"({consumed - actual} vendus en trop)")
+    
+    print("Invariants du registre: " + ("respectés" if ok else "VIOLÉS"))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(*(int(arg) for arg in sys.argv[1:4])))
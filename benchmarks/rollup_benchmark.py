@@ -0,0 +1,150 @@
+"""
+Contrôle de cohérence et benchmark des agrégats des commandes
+
+Remplit une base synthétique, puis fait passer les commandes par les
+contrôleurs (lots d'impression partiels, produits imprimés, changements de
+statut, modifications et suppressions de commandes). Vérifie ensuite avec
+Database.check_rollups que les agrégats tenus par triggers correspondent à
+un recalcul complet, et qu'un écart introduit volontairement est détecté
+puis réparé.
+
+Mesure enfin le plan d'impression, le résumé par couleur et les commandes
+par statut lus dans les agrégats, comparés aux requêtes sur order_items et
+orders.
+
+Usage: python -m benchmarks.rollup_benchmark [nombre_de_produits_commandés]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import controllers.order_controller as order_controller
+import controllers.print_controller as print_controller
+from benchmarks.dashboard_benchmark import best_time, write_orders
+from config import COLORS, INVENTORY_SETTINGS, PRODUCTS
+from models.database import Database
+
+
+def run_workload(orders, printing, rng, steps=200):
+    """Fait évoluer les commandes par les contrôleurs de l'application"""
+    for _ in range(steps):
+        product, color = rng.choice(PRODUCTS), rng.choice(COLORS)
+        draw = rng.random()
+        
+        if draw < 0.3:
+            plan = printing.get_print_plan(include_printing=False, with_order_ids=False)
+            candidates = [(c, entry) for c, entries in plan.items() for entry in entries]
+            if candidates:
+                color, entry = rng.choice(candidates)
+                printing.start_printing_batch_partial(entry["product"], color,
+                                                      rng.randint(1, entry["quantity"]))
+        elif draw < 0.5:
+            printing.mark_as_printed(product, color)
+        elif draw < 0.65:
+            printing.start_printing_batch(product, color)
+        elif draw < 0.8:
+            order = orders.get_order_by_id(f"#{100000 + rng.randrange(1000)}")
+            if order and order.items:
+                item = rng.choice(order.items)
+                orders.update_item_status(order.id, item.product, item.color,
+                                          rng.choice(("À imprimer", "Imprimé")))
+        elif draw < 0.9:
+            order = orders.get_order_by_id(f"#{100000 + rng.randrange(1000)}")
+            if order:
+                order.status = rng.choice(("Expédié", "Annulé", "En attente"))
+                order.add_item(product, color, rng.randint(1, 5))
+                orders.update_order(order)
+        else:
+            orders.delete_order(f"#{100000 + rng.randrange(1000)}")
+
+
+def plan_rows(plan):
+    """Plan d'impression sans les identifiants de commandes"""
+    return {color: [(e["product"], e["quantity"], e["priority"], e["status"]) for e in entries]
+            for color, entries in plan.items()}
+
+
+def run(item_count=200000):
+    """Vérifie la cohérence des agrégats et mesure leur lecture"""
+    snapshot_enabled = INVENTORY_SETTINGS["snapshot_enabled"]
+    INVENTORY_SETTINGS["snapshot_enabled"] = False
+    rng = random.Random(7)
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "orders.db")
+            write_orders(db_path, item_count)
+            
+            order_controller.DATABASE_PATH = db_path
+            print_controller.DATABASE_PATH = db_path
+            db = Database(db_path)
+            orders = order_controller.OrderController()
+            printing = print_controller.PrintController()
+            
+            run_workload(orders, printing, rng)
+            consistent = not db.check_rollups()
+            
+            db.cursor.execute("UPDATE order_item_totals SET quantity = quantity + 1 "
+                              "WHERE rowid = (SELECT MIN(rowid) FROM order_item_totals)")
+            db.cursor.execute("DELETE FROM order_status_counts WHERE status = 'Prêt'")
+            db.conn.commit()
+            detected = db.check_rollups(repair=True)
+            repaired = len(detected) == 2 and not db.check_rollups()
+            
+            scan_plan_time, scan_plan = best_time(lambda: printing.get_print_plan(include_printing=True))
+            rollup_plan_time, rollup_plan = best_time(
+                lambda: printing.get_print_plan(include_printing=True, with_order_ids=False))
+            
+            def scan_color_summary():
+                db.cursor.execute("""
+                    SELECT color, COUNT(DISTINCT product), SUM(quantity) FROM order_items
+                    WHERE status = 'À imprimer' OR status = 'En impression'
+                    GROUP BY color ORDER BY SUM(quantity) DESC, color
+                """)
+                return [{"color": color, "product_count": count, "total_quantity": quantity}
+                        for color, count, quantity in db.cursor.fetchall()]
+            
+            scan_summary_time, scan_summary = best_time(scan_color_summary)
+            rollup_summary_time, rollup_summary = best_time(printing.get_color_summary)
+            
+            def scan_status_counts():
+                db.cursor.execute("SELECT status, COUNT(*) FROM orders GROUP BY status")
+                return dict(db.cursor.fetchall())
+            
+            scan_counts_time, scan_counts = best_time(scan_status_counts)
+            rollup_counts_time, rollup_counts = best_time(orders.get_orders_count_by_status)
+            counts_identical = all(rollup_counts[status] == scan_counts.get(status, 0)
+                                   for status in rollup_counts if status != "Total")
+            
+            start = time.perf_counter()
+            db.rebuild_rollups()
+            db.conn.commit()
+            rebuild_time = time.perf_counter() - start
+            
+            printing.inventory_controller.db.close()
+            printing.db.close()
+            orders.db.close()
+            db.close()
+    finally:
+        INVENTORY_SETTINGS["snapshot_enabled"] = snapshot_enabled
+    
+    identical = (plan_rows(scan_plan) == plan_rows(rollup_plan) and scan_summary == rollup_summary
+                 and counts_identical)
+    print(f"{item_count} produits commandés, après les opérations des contrôleurs: "
+          f"agrégats {'cohérents' if consistent else 'INCOHÉRENTS'}; "
+          f"écart volontaire {'détecté et réparé' if repaired else 'NON RÉPARÉ'}")
+    print(f"Plan d'impression: order_items {scan_plan_time * 1000:.1f} ms, agrégats {rollup_plan_time * 1000:.2f} ms")
+    print(f"Résumé par couleur: order_items {scan_summary_time * 1000:.1f} ms, "
+          f"agrégats {rollup_summary_time * 1000:.2f} ms")
+    print(f"Commandes par statut: orders {scan_counts_time * 1000:.1f} ms, "
+          f"agrégats {rollup_counts_time * 1000:.2f} ms")
+    print(f"Reconstruction complète des agrégats: {rebuild_time * 1000:.0f} ms")
+    print(f"Résultats: {'identiques' if identical else 'DIFFÉRENTS'}")
+    return 0 if consistent and repaired and identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(*(int(arg) for arg in sys.argv[1:2])))
@@ -0,0 +1,142 @@
+"""Génération de données synthétiques pour les benchmarks"""
+
+import csv
+import random
+
+from config import PRODUCTS, COLORS
+
+# Colonnes d'un export Shopify utilisées par le parser
+SHOPIFY_COLUMNS = [
+    'Name', 'Email', 'Fulfillment Status', 'Created at',
+    'Lineitem quantity', 'Lineitem name', 'Billing Name', 'Notes'
+]
+
+
+def write_shopify_csv(file_path, line_count, items_per_order=3, first_order=1000, seed=42):
+    """
+    Écrit un export Shopify synthétique
+    
+    Comme dans un vrai export, les colonnes de la commande ne sont remplies
+    que sur la première ligne de chaque commande.
+    
+    Args:
+        file_path (str): Chemin du fichier CSV à créer
+        line_count (int): Nombre de lignes de produits à générer
+        items_per_order (int): Nombre maximal de produits par commande
+        first_order (int): Numéro de la première commande
+        seed (int): Graine du générateur aléatoire
+    
+    Returns:
+        int: Nombre de commandes écrites
+    """
+    rng = random.Random(seed)
+    colors = [color for color in COLORS if color != "Aléatoire"]
+    
+    order_number = first_order
+    written = 0
+    
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(SHOPIFY_COLUMNS)
+        
+        while written < line_count:
+            order_id = f"#{order_number}"
+            day = 1 + order_number % 28
+            created_at = f"2025-{1 + order_number % 12:02d}-{day:02d} 12:00:00 +0200"
+            status = 'fulfilled' if rng.random() < 0.3 else 'unfulfilled'
+            
+            for i in range(min(rng.randint(1, items_per_order), line_count - written)):
+                lineitem = f"{rng.choice(PRODUCTS)} - {rng.choice(colors)}"
+                if rng.random() < 0.1:
+                    lineitem += f" (x{rng.randint(2, 5)})"
+                
+                if i == 0:
+                    writer.writerow([
+                        order_id, f"client{order_number}@example.com", status, created_at,
+                        rng.randint(1, 3), lineitem, f"Client {order_number}", ""
+                    ])
+                else:
+                    writer.writerow([
+                        order_id, f"client{order_number}@example.com", "", created_at,
+                        rng.randint(1, 3), lineitem, "", ""
+                    ])
+                written += 1
+            
+            order_number += 1
+    
+    return order_number - first_order
+
+
+def write_inventory(db, product_count, components_per_product=8, component_count=None, colors=None, seed=42):
+    """
+    Remplit les tables d'inventaire d'une base avec un catalogue synthétique
+    
+    Chaque composant existe dans toutes les couleurs; chaque produit a une
+    nomenclature de composants (avec quelques contraintes de couleur) et un
+    stock assemblé dans quelques couleurs.
+    
+    Args:
+        db (Database): Base de données à remplir
+        product_count (int): Nombre de produits
+        components_per_product (int): Nombre de composants par produit
+        component_count (int, optional): Nombre de composants distincts
+            (par défaut la moitié du nombre de produits, au moins components_per_product)
+        colors (list, optional): Couleurs des composants (par défaut celles de COLORS)
+        seed (int): Graine du générateur aléatoire
+    
+    Returns:
+        tuple: (nombre de composants x couleurs, nombre de lignes de nomenclature)
+    """
+    rng = random.Random(seed)
+    if colors is None:
+        colors = [color for color in COLORS if color != "Aléatoire"]
+    if component_count is None:
+        component_count = max(components_per_product, product_count // 2)
+    
+    component_names = [f"Composant {i:04d}" for i in range(component_count)]
+    component_rows = [
+        (name, color, rng.randint(0, 200), 3)
+        for name in component_names
+        for color in colors
+    ]
+    
+    product_rows = []
+    bom_rows = []
+    assembled_rows = []
+    for i in range(product_count):
+        product_name = f"Produit {i:04d}"
+        product_rows.append((product_name, f"Produit synthétique {i}"))
+        
+        bom = rng.sample(component_names, components_per_product)
+        for j, component_name in enumerate(bom):
+            draw = rng.random()
+            if draw < 0.1:
+                constraint = f"fixed:{rng.choice(colors)}"
+            elif draw < 0.2:
+                constraint = "same_as_main"
+            elif j > 0 and draw < 0.3:
+                constraint = f"same_as:{bom[j - 1]}"
+            else:
+                constraint = None
+            bom_rows.append((product_name, component_name, rng.randint(1, 4), constraint))
+        
+        for color in rng.sample(colors, 3):
+            assembled_rows.append((product_name, color, rng.randint(1, 20)))
+    
+    db.cursor.executemany(
+        "INSERT INTO components (name, color, stock, alert_threshold) VALUES (?, ?, ?, ?)",
+        component_rows
+    )
+    db.cursor.executemany("INSERT INTO products (name, description) VALUES (?, ?)", product_rows)
+    db.cursor.executemany(
+        "INSERT INTO product_components (product_name, component_name, quantity, color_constraint) "
+        "VALUES (?, ?, ?, ?)",
+        bom_rows
+    )
+    db.cursor.executemany(
+        "INSERT INTO assembled_products (product_name, color, quantity) VALUES (?, ?, ?)",
+        assembled_rows
+    )
+    db.conn.commit()
+    
+    return len(component_rows), len(bom_rows)
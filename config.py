@@ -20,6 +20,47 @@ os.makedirs(os.path.join(RESOURCES_DIR, "styles"), exist_ok=True)
 os.makedirs(os.path.join(RESOURCES_DIR, "sample_data"), exist_ok=True)
 os.makedirs(DEFAULT_EXPORT_DIR, exist_ok=True)
 
+# Paramètres de connexion SQLite
+DATABASE_SETTINGS = {
+    "journal_mode": "WAL",          # Lectures concurrentes pendant les écritures
+    "synchronous": "NORMAL",        # Suffisant et sûr en mode WAL
+    "busy_timeout_ms": 5000,        # Attente maximale d'un verrou en millisecondes
+    "cache_size_kib": 32 * 1024,    # Cache de pages par connexion en Kio
+    "mmap_size": 256 * 1024 * 1024  # Taille de la projection mémoire en octets
+}
+
+# Paramètres d'importation des exports Shopify
+IMPORT_SETTINGS = {
+    "chunk_size": 50000,               # Lignes CSV lues par bloc en mode streaming
+    "streaming_threshold_mb": 100      # Taille de fichier à partir de laquelle le streaming est utilisé
+}
+
+# Paramètres du cache d'inventaire
+INVENTORY_SETTINGS = {
+    "snapshot_enabled": True,                  # Instantané de l'inventaire réutilisé au démarrage
+    "snapshot_suffix": ".inventory.pickle"     # Suffixe ajouté au chemin de la base pour l'instantané
+}
+
+# Paramètres de l'ordonnancement des lots d'impression par couleur
+SEQUENCING_SETTINGS = {
+    "changeover_minutes": 10,          # Changement de bobine entre deux couleurs
+    "purge_minutes_to_light": 20,      # Purge en plus pour passer du noir au blanc (au prorata de l'écart de luminosité)
+    "minutes_per_piece": 45,           # Durée d'impression moyenne d'une pièce
+    "age_weight_per_day": 0.2,         # Poids d'une commande: 1 + ce facteur par jour d'attente
+    "changeover_weight": 1.0,          # Poids des minutes de changement face au délai moyen pondéré
+    "improvement_passes": 20,          # Passes maximales d'amélioration (2-opt et déplacements)
+    "transition_costs": {}             # Coûts imposés {(couleur_chargée, couleur_suivante): minutes}
+}
+
+# Paramètres du remplissage des plateaux d'impression
+PLATE_SETTINGS = {
+    "spacing_mm": 5,                   # Écart entre deux pièces et avec le bord du plateau
+    "default_width_mm": 40,            # Emprise d'une pièce sans profil d'impression
+    "default_depth_mm": 40,
+    "default_height_mm": 30,
+    "plate_overhead_minutes": 15       # Chauffe, premier calque et retrait du plateau
+}
+
 # Couleurs disponibles
 COLORS = [
     "Aléatoire",
@@ -50,6 +91,13 @@ ORDER_STATUSES = ["En attente", "En cours", "Prêt", "Expédié", "Annulé"]
 # Statuts des produits
 ITEM_STATUSES = ["À imprimer", "En impression", "Imprimé"]
 
+# Parc d'imprimantes créé avec la base (dimensions du volume d'impression en mm)
+DEFAULT_PRINTERS = [
+    {"name": "Imprimante 1", "bed_width": 256, "bed_depth": 256, "max_height": 256},
+    {"name": "Imprimante 2", "bed_width": 256, "bed_depth": 256, "max_height": 256},
+    {"name": "Imprimante 3", "bed_width": 180, "bed_depth": 180, "max_height": 180},
+]
+
 # Priorités
 PRIORITIES = ["Haute", "Moyenne", "Basse"]
 
@@ -59,7 +107,8 @@ UI_SETTINGS = {
     "theme": "light",            # Thème (light ou dark)
     "font_size": 10,             # Taille de police par défaut
     "date_format": "%d/%m/%Y",   # Format de date
-    "time_format": "%H:%M:%S"    # Format d'heure
+    "time_format": "%H:%M:%S",   # Format d'heure
+    "orders_page_size": 200      # Nombre de commandes chargées par page
 }
 
 # Correspondance entre les noms de couleurs et les codes HEX pour l'interface
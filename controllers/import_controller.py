@@ -1,7 +1,9 @@
 from utils.csv_parser import ShopifyCSVParser
 from models.database import Database
 import os
-from config import DATABASE_PATH
+import time
+import hashlib
+from config import DATABASE_PATH, IMPORT_SETTINGS
 from PyQt5.QtCore import QObject, pyqtSignal
 
 class ImportSignals(QObject):
@@ -13,6 +15,12 @@ class ImportSignals(QObject):
 class ImportController:
     """Contrôleur pour gérer l'importation des données depuis Shopify"""
     
+    # Intervalle minimal entre deux signaux de progression (en secondes)
+    PROGRESS_INTERVAL = 0.1
+    
+    # Nombre d'identifiants par requête de recherche des commandes existantes
+    ID_LOOKUP_SIZE = 500
+    
     def __init__(self):
         self.db_path = DATABASE_PATH
         self.parser = ShopifyCSVParser()
@@ -25,107 +33,298 @@ class ImportController:
         self.parser.signals.progress.connect(self.signals.progress)
         self.parser.signals.status.connect(self.signals.status)
     
-    def import_shopify_csv(self, file_path, skip_existing=True, default_status="En attente", default_priority="Moyenne"):
+    def import_shopify_csv(self, file_path, skip_existing=True, default_status="En attente", default_priority="Moyenne", streaming=None, incremental=True):
         """
         Importe les commandes depuis un fichier CSV de Shopify
         et les enregistre dans la base de données
-        """
-        # Créer une nouvelle connexion à la base de données dans ce thread
-        db = Database(self.db_path)
         
+        En mode streaming, le fichier est lu par blocs et les commandes sont
+        enregistrées par lots au fil de la lecture, pour une mémoire constante
+        quelle que soit la taille de l'export. Par défaut, ce mode est utilisé
+        pour les fichiers dépassant IMPORT_SETTINGS["streaming_threshold_mb"].
+        Dans les deux modes, l'importation se fait en une seule transaction.
+        
+        En mode incrémental (avec skip_existing), un fichier déjà importé est
+        refusé d'après son empreinte, et les lignes des commandes sous le
+        watermark du registre des importations ne sont pas analysées.
+        """
         # Vérifier que le fichier existe
         if not os.path.exists(file_path):
             self.signals.status.emit(f"Le fichier {file_path} n'existe pas")
             self.signals.finished.emit(False, f"Le fichier {file_path} n'existe pas")
             return False, f"Le fichier {file_path} n'existe pas"
         
-        # Parser le fichier CSV
-        self.signals.status.emit("Analyse du fichier CSV...")
-        orders = self.parser.parse_file(file_path)
+        if streaming is None:
+            streaming = os.path.getsize(file_path) >= IMPORT_SETTINGS["streaming_threshold_mb"] * 1024 * 1024
         
-        if not orders:
-            self.signals.status.emit("Aucune commande n'a pu être extraite du fichier")
-            self.signals.finished.emit(False, "Aucune commande n'a pu être extraite du fichier")
-            return False, "Aucune commande n'a pu être extraite du fichier"
+        # Créer une nouvelle connexion à la base de données dans ce thread
+        db = Database(self.db_path)
         
-        # Insérer les commandes dans la base de données
-        self.signals.status.emit(f"Importation de {len(orders)} commandes...")
-        imported_count = 0
-        skipped_count = 0
+        file_hash = self._file_fingerprint(file_path)
+        watermark = None
         
-        for i, order in enumerate(orders):
-            # Mettre à jour la progression
-            progress = 90 + int((i / len(orders)) * 10)  # De 90% à 100%
-            self.signals.progress.emit(progress)
+        if incremental and skip_existing:
+            # Refuser immédiatement un fichier déjà importé à l'identique
+            db.cursor.execute("SELECT imported_at FROM import_ledger WHERE file_hash = ?", (file_hash,))
+            previous = db.cursor.fetchone()
+            if previous:
+                db.close()
+                message = f"Ce fichier a déjà été importé le {previous['imported_at']}"
+                self.signals.status.emit(message)
+                self.signals.finished.emit(False, message)
+                return False, message
             
-            # Vérifier si la commande existe déjà
-            db.cursor.execute("SELECT id FROM orders WHERE id = ?", (order.id,))
-            existing = db.cursor.fetchone()
+            watermark = self.get_import_watermark(db)
+        
+        if streaming:
+            # Les commandes sont produites au fil de la lecture du fichier
+            batches = self._batched(self.parser.iter_orders(file_path, watermark=watermark), IMPORT_SETTINGS["chunk_size"])
+            total = None
+        else:
+            # Parser le fichier CSV
+            self.signals.status.emit("Analyse du fichier CSV...")
+            orders = self.parser.parse_file(file_path, watermark=watermark)
             
-            if existing and skip_existing:
-                skipped_count += 1
-                self.signals.status.emit(f"Commande {order.id} déjà existante, ignorée.")
-                continue
+            # Sans watermark calculé, le fichier n'a pas pu être analysé
+            if not orders and self.parser.high_watermark is None:
+                db.close()
+                self.signals.status.emit("Aucune commande n'a pu être extraite du fichier")
+                self.signals.finished.emit(False, "Aucune commande n'a pu être extraite du fichier")
+                return False, "Aucune commande n'a pu être extraite du fichier"
             
-            # Supprimer la commande existante si on ne skip pas
-            if existing and not skip_existing:
-                db.cursor.execute("DELETE FROM orders WHERE id = ?", (order.id,))
-                db.cursor.execute("DELETE FROM order_items WHERE order_id = ?", (order.id,))
+            self.signals.status.emit(f"Importation de {len(orders)} commandes...")
+            batches = [orders] if orders else []
+            total = len(orders)
+        
+        # Statut des produits déduit du statut par défaut des commandes
+        item_status = "À imprimer"
+        if default_status == "Prêt":
+            item_status = "Imprimé"
+        elif default_status == "En cours":
+            item_status = "En impression"
+        
+        imported_count = 0
+        skipped_count = 0
+        # Commandes déjà traitées par cette importation {id: enregistrée}
+        seen_ids = {}
+        
+        # Tout écrire dans une seule transaction
+        try:
+            for batch in batches:
+                imported, skipped = self._write_batch(
+                    db, batch, skip_existing, default_status, default_priority, item_status, total, seen_ids
+                )
+                imported_count += imported
+                skipped_count += skipped
+                
+                if streaming:
+                    self.signals.status.emit(f"{imported_count} commandes importées...")
+            
+            if self.parser.high_watermark is None or (
+                imported_count == 0 and skipped_count == 0 and self.parser.skipped_rows == 0
+            ):
+                db.conn.rollback()
+                db.close()
+                self.signals.status.emit("Aucune commande n'a pu être extraite du fichier")
+                self.signals.finished.emit(False, "Aucune commande n'a pu être extraite du fichier")
+                return False, "Aucune commande n'a pu être extraite du fichier"
             
-            # Insérer la commande
+            # Enregistrer le fichier et sa plus haute commande dans le registre
             db.cursor.execute("""
-                INSERT INTO orders (id, date, client, email, status, priority, notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                INSERT OR REPLACE INTO import_ledger (
+                    file_hash, file_name, file_size, max_order_number, max_created_at,
+                    imported_count, skipped_rows
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
             """, (
-                order.id, 
-                order.date, 
-                order.client, 
-                order.email, 
-                default_status if default_status else order.status, 
-                default_priority if default_priority else order.priority, 
-                order.notes
+                file_hash,
+                os.path.basename(file_path),
+                os.path.getsize(file_path),
+                self.parser.high_watermark["order_number"],
+                self.parser.high_watermark["created_at"],
+                imported_count,
+                self.parser.skipped_rows
             ))
             
-            # Insérer les produits de la commande
-            for item in order.items:
-                item_status = "À imprimer"
-                if default_status == "Prêt":
-                    item_status = "Imprimé"
-                elif default_status == "En cours":
-                    item_status = "En impression"
-                
-                db.cursor.execute("""
-                    INSERT INTO order_items (order_id, product, color, quantity, status)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    order.id,
-                    item["product"],
-                    item["color"],
-                    item["quantity"],
-                    item_status
-                ))
-            
-            imported_count += 1
-            
-            # Log pour chaque 10 commandes importées
-            if imported_count % 10 == 0:
-                self.signals.status.emit(f"{imported_count} commandes importées...")
-        
-        # Valider les changements
-        db.conn.commit()
+            # Valider les changements
+            db.conn.commit()
+        except Exception as e:
+            db.conn.rollback()
+            db.close()
+            message = f"Erreur lors de l'enregistrement des commandes: {e}"
+            self.signals.status.emit(message)
+            self.signals.finished.emit(False, message)
+            return False, message
         
         # Fermer la connexion
         db.close()
+        self.signals.progress.emit(100)
         
         result_message = f"{imported_count} commandes importées avec succès"
         if skipped_count > 0:
             result_message += f", {skipped_count} commandes ignorées (déjà existantes)"
+        if self.parser.skipped_rows > 0:
+            result_message += f", {self.parser.skipped_rows} lignes ignorées (déjà importées)"
         
         self.signals.status.emit(result_message)
         self.signals.finished.emit(True, result_message)
         
         return True, result_message
     
+    def get_import_watermark(self, db=None):
+        """
+        Retourne la plus haute commande déjà importée, tous fichiers confondus
+        
+        Returns:
+            dict: {"order_number": int ou None, "created_at": str UTC ou None},
+                ou None si aucun fichier n'a encore été importé
+        """
+        own_db = db is None
+        if own_db:
+            db = Database(self.db_path)
+        
+        db.cursor.execute("""
+            SELECT MAX(max_order_number) AS order_number, MAX(max_created_at) AS created_at
+            FROM import_ledger
+        """)
+        row = db.cursor.fetchone()
+        
+        if own_db:
+            db.close()
+        
+        if row['order_number'] is None and row['created_at'] is None:
+            return None
+        return {"order_number": row['order_number'], "created_at": row['created_at']}
+    
+    @staticmethod
+    def _file_fingerprint(file_path):
+        """Calcule l'empreinte SHA-256 du contenu d'un fichier"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def _write_batch(self, db, orders, skip_existing, default_status, default_priority, item_status, total=None,
+                     seen_ids=None):
+        """
+        Enregistre un lot de commandes sans valider la transaction
+        
+        Une commande dont les lignes ne sont pas contiguës dans le fichier est
+        produite en plusieurs morceaux par la lecture par blocs: les morceaux
+        d'un même lot sont fusionnés, et ceux d'une commande déjà traitée par
+        un lot précédent ajoutent leurs produits à la commande enregistrée (ou
+        sont ignorés avec elle).
+        
+        Args:
+            total (int, optional): Nombre total de commandes, pour suivre la
+                progression de 90% à 95% (None en mode streaming)
+            seen_ids (dict, optional): Commandes des lots précédents de la même
+                importation {id: enregistrée}, complété par ce lot
+        
+        Returns:
+            tuple: (nombre de commandes importées, nombre de commandes ignorées)
+        """
+        if seen_ids is None:
+            seen_ids = {}
+        
+        # Fusionner les morceaux d'une même commande, dans l'ordre du fichier
+        merged = {}
+        for order in orders:
+            if order.id in merged:
+                merged[order.id].items.extend(order.items)
+            else:
+                merged[order.id] = order
+        
+        # Produits des commandes déjà enregistrées par un lot précédent
+        item_rows = [
+            (order.id, item["product"], item["color"], item["quantity"], item_status)
+            for order in merged.values() if seen_ids.get(order.id)
+            for item in order.items
+        ]
+        orders = [order for order in merged.values() if order.id not in seen_ids]
+        
+        # Récupérer en une requête par tranche les commandes déjà présentes
+        existing_ids = self._existing_order_ids(db, [order.id for order in orders])
+        
+        order_rows = []
+        replaced_ids = []
+        skipped_count = 0
+        last_emit = 0.0
+        
+        for i, order in enumerate(orders):
+            # Mettre à jour la progression (limitée à PROGRESS_INTERVAL secondes)
+            if total:
+                now = time.monotonic()
+                if now - last_emit >= self.PROGRESS_INTERVAL:
+                    last_emit = now
+                    self.signals.progress.emit(90 + int((i / total) * 5))  # De 90% à 95%
+            
+            if order.id in existing_ids:
+                if skip_existing:
+                    seen_ids[order.id] = False
+                    skipped_count += 1
+                    continue
+                # Remplacer la commande existante si on ne skip pas
+                replaced_ids.append((order.id,))
+            
+            order_rows.append((
+                order.id, 
+                order.date, 
+                order.client, 
+                order.email, 
+                default_status if default_status else order.status, 
+                default_priority if default_priority else order.priority, 
+                order.notes
+            ))
+            seen_ids[order.id] = True
+            
+            item_rows.extend(
+                (order.id, item["product"], item["color"], item["quantity"], item_status)
+                for item in order.items
+            )
+        
+        if total:
+            self.signals.status.emit(f"Enregistrement de {len(order_rows)} commandes...")
+            self.signals.progress.emit(95)
+        
+        if replaced_ids:
+            db.cursor.executemany("DELETE FROM order_items WHERE order_id = ?", replaced_ids)
+            db.cursor.executemany("DELETE FROM orders WHERE id = ?", replaced_ids)
+        
+        db.cursor.executemany("""
+            INSERT INTO orders (id, date, client, email, status, priority, notes)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, order_rows)
+        
+        db.cursor.executemany("""
+            INSERT INTO order_items (order_id, product, color, quantity, status)
+            VALUES (?, ?, ?, ?, ?)
+        """, item_rows)
+        
+        return len(order_rows), skipped_count
+    
+    def _existing_order_ids(self, db, order_ids):
+        """Retourne l'ensemble des identifiants déjà présents dans la table orders"""
+        existing_ids = set()
+        for start in range(0, len(order_ids), self.ID_LOOKUP_SIZE):
+            chunk = order_ids[start:start + self.ID_LOOKUP_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            db.cursor.execute(f"SELECT id FROM orders WHERE id IN ({placeholders})", chunk)
+            existing_ids.update(row['id'] for row in db.cursor.fetchall())
+        return existing_ids
+    
+    @staticmethod
+    def _batched(iterable, size):
+        """Regroupe les éléments d'un itérable en listes de taille size au plus"""
+        batch = []
+        for element in iterable:
+            batch.append(element)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
     def validate_shopify_csv(self, file_path):
         """
         Vérifie si un fichier CSV est bien un export Shopify valide
@@ -3,116 +3,216 @@ Contrôleur pour la gestion de l'inventaire Plasmik3D.
 Implémente les fonctionnalités pour gérer les composants, produits et assemblages.
 """
 
+import functools
+import os
+import pickle
+import threading
+
 from models.database import Database
 from models.inventory import InventoryManager, Product, Component, ColorVariant
-from config import DATABASE_PATH, PRODUCTS, COLORS
+from models.reservation_ledger import ReservationLedger
+from config import DATABASE_PATH, PRODUCTS, COLORS, INVENTORY_SETTINGS
+
+
+def synchronized(method):
+    """Exécute la méthode sous le verrou de l'inventaire partagé"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class InventoryController:
-    """Contrôleur pour la gestion de l'inventaire"""
+    """
+    Contrôleur pour la gestion de l'inventaire
+    
+    L'inventaire est chargé une seule fois par processus: shared() retourne
+    l'instance commune, dont les écritures sont répercutées à la fois en
+    mémoire et en base (write-through) puis signalées aux abonnés.
+    """
+    
+    # Tables chargées en mémoire par le contrôleur
+    DATA_TABLES = ("components", "products", "product_components",
+                   "assembled_products", "color_variants")
     
-    def __init__(self):
-        self.db = Database(DATABASE_PATH)
+    # À incrémenter quand la structure des objets d'inventaire change
+    SNAPSHOT_FORMAT = 4
+    
+    _shared = {}
+    _shared_lock = threading.Lock()
+    
+    @classmethod
+    def shared(cls, db_path=DATABASE_PATH):
+        """Retourne le contrôleur partagé pour un fichier de base de données"""
+        key = os.path.abspath(db_path)
+        with cls._shared_lock:
+            controller = cls._shared.get(key)
+            if controller is None:
+                controller = cls(db_path)
+                cls._shared[key] = controller
+            return controller
+    
+    def __init__(self, db_path=DATABASE_PATH):
+        self.db = Database(db_path)
+        self.reservations = ReservationLedger(self.db)
+        self.snapshot_path = db_path + INVENTORY_SETTINGS["snapshot_suffix"]
         self.inventory = InventoryManager()
+        # Protège l'inventaire en mémoire, lu depuis les threads de chargement
+        self.lock = threading.RLock()
+        self.subscribers = []
+        # Versions des tables correspondant à l'inventaire en mémoire
+        self.loaded_versions = None
+        # Listes de get_all_components / get_all_products, refaites après chaque modification
+        self._listings = {}
         
         # Charger les données depuis la base de données
-        self.initialize_inventory()
+        self.reload()
     
-    def initialize_inventory(self):
-        """Initialise l'inventaire avec les données de la base de données"""
-        # Vérifier si les tables nécessaires existent
-        self._ensure_tables_exist()
+    def reload(self):
+        """
+        Recharge tout l'inventaire, depuis l'instantané s'il correspond
+        aux versions courantes des tables, sinon depuis la base de données
+        """
+        with self.lock:
+            # Versions lues avant les données qu'elles décrivent
+            versions = self.db.get_data_versions(self.DATA_TABLES)
+            inventory = self._read_snapshot(versions)
+            
+            if inventory is not None:
+                self.inventory = inventory
+                self.loaded_versions = versions
+            else:
+                self.inventory = InventoryManager()
+                self.initialize_inventory()
+                self.loaded_versions = versions
+                self.save_snapshot()
+            self._listings = {}
+        self._notify(self.DATA_TABLES)
+    
+    def save_snapshot(self):
+        """
+        Enregistre l'inventaire en mémoire dans l'instantané, avec les
+        versions des tables qu'il reflète
         
-        # Charger les composants
-        self._load_components()
+        Returns:
+            bool: True si l'instantané a été écrit
+        """
+        if not INVENTORY_SETTINGS["snapshot_enabled"]:
+            return False
         
-        # Charger les produits et leurs définitions
-        self._load_products()
+        with self.lock:
+            payload = {
+                "format": self.SNAPSHOT_FORMAT,
+                "schema_version": self.db.get_schema_version(),
+                "versions": self.loaded_versions,
+                "inventory": self.inventory
+            }
+            data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
         
-        # Charger les variantes de couleurs
-        self._load_color_variants()
+        # Écriture dans un fichier temporaire puis remplacement atomique
+        temp_path = self.snapshot_path + ".tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, self.snapshot_path)
+            return True
+        except OSError as e:
+            print(f"Erreur lors de l'enregistrement de l'instantané d'inventaire: {e}")
+            return False
     
-    def _ensure_tables_exist(self):
-        """S'assure que toutes les tables nécessaires existent dans la base de données"""
-        # Vérifier et créer la table des composants
-        self.db.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS components (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                color TEXT NOT NULL,
-                stock INTEGER DEFAULT 0,
-                alert_threshold INTEGER DEFAULT 3,
-                description TEXT DEFAULT '',
-                UNIQUE(name, color)
-            )
-        """)
+    def _read_snapshot(self, versions):
+        """
+        Lit l'instantané s'il a été pris avec les mêmes versions de tables
         
-        # Vérifier et créer la table des produits
-        self.db.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS products (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                description TEXT
-            )
-        """)
+        Returns:
+            InventoryManager: Inventaire de l'instantané, ou None s'il est absent ou périmé
+        """
+        if not INVENTORY_SETTINGS["snapshot_enabled"] or not os.path.exists(self.snapshot_path):
+            return None
         
-        # Vérifier et créer la table des définitions de produits (composants requis)
-        self.db.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS product_components (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                product_name TEXT NOT NULL,
-                component_name TEXT NOT NULL,
-                quantity INTEGER DEFAULT 1,
-                color_constraint TEXT,
-                UNIQUE(product_name, component_name)
-            )
-        """)
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                payload = pickle.load(f)
+            
+            if (payload.get("format") != self.SNAPSHOT_FORMAT or
+                payload.get("schema_version") != self.db.get_schema_version() or
+                payload.get("versions") != versions):
+                return None
+            return payload["inventory"]
+        except Exception as e:
+            # Instantané illisible (fichier tronqué, classes modifiées): relire la base
+            print(f"Instantané d'inventaire ignoré: {e}")
+            return None
+    
+    @synchronized
+    def reload_if_changed(self):
+        """
+        Recharge l'inventaire si ses tables ont été modifiées sans passer
+        par ce contrôleur (autre processus, autre instance)
         
-        # Vérifier et créer la table des produits assemblés
-        self.db.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS assembled_products (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                product_name TEXT NOT NULL,
-                color TEXT NOT NULL,
-                quantity INTEGER DEFAULT 0,
-                UNIQUE(product_name, color)
-            )
-        """)
+        Returns:
+            bool: True si l'inventaire a été rechargé
+        """
+        if self.db.get_data_versions(self.DATA_TABLES) == self.loaded_versions:
+            return False
+        self.reload()
+        return True
+    
+    def subscribe(self, callback):
+        """
+        Abonne une fonction aux modifications de l'inventaire
         
-        # Vérifier et créer la table des variantes de couleurs
-        self.db.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS color_variants (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                base_color TEXT NOT NULL,
-                variant_name TEXT NOT NULL,
-                hex_code TEXT NOT NULL,
-                UNIQUE(variant_name)
-            )
-        """)
+        Args:
+            callback (callable): Appelée avec le tuple des tables modifiées,
+                depuis le thread qui a effectué la modification
+        """
+        with self.lock:
+            if callback not in self.subscribers:
+                self.subscribers.append(callback)
+    
+    def unsubscribe(self, callback):
+        """Désabonne une fonction des modifications de l'inventaire"""
+        with self.lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+    
+    def _notify(self, tables):
+        """Signale aux abonnés la modification des tables"""
+        with self.lock:
+            subscribers = list(self.subscribers)
         
-        # Mettre à jour le schéma si nécessaire pour ajouter des colonnes manquantes
+        for callback in subscribers:
+            try:
+                callback(tuple(tables))
+            except Exception as e:
+                print(f"Erreur lors de la notification d'un abonné de l'inventaire: {e}")
+    
+    def _commit(self, *tables):
+        """Valide une écriture, synchronise les versions et prévient les abonnés"""
+        self.db.conn.commit()
+        self.loaded_versions = self.db.get_data_versions(self.DATA_TABLES)
+        self._listings = {}
+        self._notify(tables)
+    
+    def _recover(self):
+        """Annule l'écriture en échec et recharge l'inventaire depuis la base"""
         try:
-            # Vérifier si la colonne description existe dans la table components
-            self.db.cursor.execute("PRAGMA table_info(components)")
-            columns = [column[1] for column in self.db.cursor.fetchall()]
-            
-            # Ajouter la colonne description si elle n'existe pas
-            if 'description' not in columns:
-                self.db.cursor.execute("ALTER TABLE components ADD COLUMN description TEXT DEFAULT ''")
-                print("Colonne 'description' ajoutée à la table 'components'")
-            
-            # Vérifier si la colonne color_constraint existe dans la table product_components
-            self.db.cursor.execute("PRAGMA table_info(product_components)")
-            pc_columns = [column[1] for column in self.db.cursor.fetchall()]
-            
-            # Ajouter la colonne color_constraint si elle n'existe pas
-            if 'color_constraint' not in pc_columns:
-                self.db.cursor.execute("ALTER TABLE product_components ADD COLUMN color_constraint TEXT")
-                print("Colonne 'color_constraint' ajoutée à la table 'product_components'")
-                
+            self.db.conn.rollback()
+            self.reload()
         except Exception as e:
-            print(f"Erreur lors de la mise à jour du schéma de la base de données: {e}")
+            print(f"Erreur lors du rechargement de l'inventaire: {e}")
+    
+    def initialize_inventory(self):
+        """Initialise l'inventaire avec les données de la base de données"""
+        # Charger les composants
+        self._load_components()
         
-        self.db.conn.commit()
+        # Charger les produits et leurs définitions
+        self._load_products()
+        
+        # Charger les variantes de couleurs
+        self._load_color_variants()
     
     def _load_components(self):
         """Charge les composants depuis la base de données"""
@@ -151,7 +251,10 @@ class InventoryController:
         self.db.conn.commit()
     
     def _load_products(self):
-        """Charge les produits et leurs définitions depuis la base de données"""
+        """
+        Charge les produits et leurs définitions depuis la base de données
+        (une requête par table, assemblées en mémoire)
+        """
         # Charger les produits
         self.db.cursor.execute("SELECT name, description FROM products")
         products_data = self.db.cursor.fetchall()
@@ -163,36 +266,38 @@ class InventoryController:
             self.db.cursor.execute("SELECT name, description FROM products")
             products_data = self.db.cursor.fetchall()
         
-        # Créer les objets de produit
+        # Composants et stocks assemblés de tous les produits, lus en une
+        # requête par table (tuples simples: plus rapides que sqlite3.Row)
+        cursor = self.db.conn.cursor()
+        cursor.row_factory = None
+        
+        components_by_product = {}
+        cursor.execute("""
+            SELECT product_name, component_name, quantity, color_constraint
+            FROM product_components
+        """)
+        for product_name, component_name, quantity, color_constraint in cursor.fetchall():
+            components_by_product.setdefault(product_name, []).append(
+                (component_name, quantity, color_constraint)
+            )
+        
+        assembled_by_product = {}
+        cursor.execute("SELECT product_name, color, quantity FROM assembled_products")
+        for product_name, color, quantity in cursor.fetchall():
+            assembled_by_product.setdefault(product_name, []).append((color, quantity))
+        
+        cursor.close()
+        
+        # Créer les objets de produit, dans l'ordre de l'index UNIQUE(product_name, ...)
+        # que suivait la lecture produit par produit
         for row in products_data:
             product = self.inventory.add_product(row['name'], row['description'])
             
-            # Charger les composants du produit
-            self.db.cursor.execute("""
-                SELECT component_name, quantity, color_constraint
-                FROM product_components
-                WHERE product_name = ?
-            """, (row['name'],))
+            for component_name, quantity, color_constraint in sorted(components_by_product.get(row['name'], ())):
+                product.add_component(component_name, quantity, color_constraint)
             
-            for comp_row in self.db.cursor.fetchall():
-                product.add_component(
-                    comp_row['component_name'],
-                    comp_row['quantity'],
-                    comp_row['color_constraint']
-                )
-            
-            # Charger les produits assemblés
-            self.db.cursor.execute("""
-                SELECT color, quantity
-                FROM assembled_products
-                WHERE product_name = ?
-            """, (row['name'],))
-            
-            for assembled_row in self.db.cursor.fetchall():
-                product.add_assembled_product(
-                    assembled_row['color'],
-                    assembled_row['quantity']
-                )
+            for color, quantity in sorted(assembled_by_product.get(row['name'], ())):
+                product.add_assembled_product(color, quantity)
     
     def _initialize_default_products(self):
         """Initialise des produits par défaut avec leurs composants"""
@@ -293,26 +398,34 @@ class InventoryController:
     # Méthodes publiques pour la gestion des composants
     #
     
+    @synchronized
     def get_all_components(self):
         """
         Récupère tous les composants disponibles
         
         Returns:
-            list: Liste des composants avec leur stock
+            list: Liste des composants avec leur stock (partagée par les appelants
+                  jusqu'à la prochaine modification de l'inventaire: ne pas la modifier)
         """
-        components_list = []
-        
-        for comp_name, colors in self.inventory.components.items():
-            for color, component in colors.items():
-                components_list.append({
-                    'name': comp_name,
-                    'color': color,
-                    'stock': component.stock,
-                    'alert_threshold': component.alert_threshold
-                })
+        components_list = self._listings.get("components")
+        if components_list is not None:
+            return components_list
+        
+        components_list = [
+            {
+                'name': comp_name,
+                'color': color,
+                'stock': component.stock,
+                'alert_threshold': component.alert_threshold
+            }
+            for comp_name, colors in self.inventory.components.items()
+            for color, component in colors.items()
+        ]
         
+        self._listings["components"] = components_list
         return components_list
     
+    @synchronized
     def get_component_stock(self, component_name, color):
         """
         Récupère le stock d'un composant spécifique
@@ -329,6 +442,25 @@ class InventoryController:
             return self.inventory.components[component_name][color].stock
         return 0
     
+    @synchronized
+    def get_component_details(self, component_name, color):
+        """
+        Récupère le stock et le seuil d'alerte d'un composant spécifique
+        
+        Returns:
+            dict: Comme une entrée de get_all_components, ou None si le composant n'existe pas
+        """
+        component = self.inventory.components.get(component_name, {}).get(color)
+        if component is None:
+            return None
+        return {
+            'name': component_name,
+            'color': color,
+            'stock': component.stock,
+            'alert_threshold': component.alert_threshold
+        }
+    
+    @synchronized
     def update_component_stock(self, component_name, color, quantity_change):
         """
         Met à jour le stock d'un composant (ajoute ou retire)
@@ -364,13 +496,15 @@ class InventoryController:
                     WHERE name = ? AND color = ?
                 """, (quantity_change, component_name, color))
             
-            self.db.conn.commit()
+            self._commit("components")
             return True
             
         except Exception as e:
             print(f"Erreur lors de la mise à jour du stock du composant: {e}")
+            self._recover()
             return False
     
+    @synchronized
     def set_component_alert_threshold(self, component_name, color, threshold):
         """
         Définit le seuil d'alerte pour un composant
@@ -405,13 +539,15 @@ class InventoryController:
                     WHERE name = ? AND color = ?
                 """, (threshold, component_name, color))
             
-            self.db.conn.commit()
+            self._commit("components")
             return True
             
         except Exception as e:
             print(f"Erreur lors de la mise à jour du seuil d'alerte: {e}")
+            self._recover()
             return False
     
+    @synchronized
     def add_new_component(self, component_name, initial_stock=None, description=""):
         """
         Ajoute un nouveau type de composant (dans toutes les couleurs)
@@ -441,13 +577,15 @@ class InventoryController:
                     VALUES (?, ?, ?, 3, ?)
                 """, (component_name, color, stock, description))
             
-            self.db.conn.commit()
+            self._commit("components")
             return True
             
         except Exception as e:
             print(f"Erreur lors de l'ajout du nouveau composant: {e}")
+            self._recover()
             return False
     
+    @synchronized
     def delete_component(self, component_name, color=None):
         """
         Supprime un composant de l'inventaire
@@ -486,13 +624,17 @@ class InventoryController:
                     WHERE name = ?
                 """, (component_name,))
             
-            self.db.conn.commit()
+            self.inventory.invalidate_assemblable()
+            
+            self._commit("components")
             return True
             
         except Exception as e:
             print(f"Erreur lors de la suppression du composant: {e}")
+            self._recover()
             return False
     
+    @synchronized
     def get_low_stock_components(self, threshold_override=None):
         """
         Récupère les composants dont le stock est inférieur au seuil d'alerte
@@ -523,13 +665,19 @@ class InventoryController:
     # Méthodes publiques pour la gestion des produits
     #
     
+    @synchronized
     def get_all_products(self):
         """
         Récupère tous les produits avec leurs définitions et stocks assemblés
         
         Returns:
-            list: Liste des produits avec leurs détails
+            list: Liste des produits avec leurs détails (partagée par les appelants
+                  jusqu'à la prochaine modification de l'inventaire: ne pas la modifier)
         """
+        products_list = self._listings.get("products")
+        if products_list is not None:
+            return products_list
+        
         products_list = []
         
         for product_name, product in self.inventory.products.items():
@@ -557,8 +705,10 @@ class InventoryController:
             
             products_list.append(product_data)
         
+        self._listings["products"] = products_list
         return products_list
     
+    @synchronized
     def get_product_details(self, product_name):
         """
         Récupère les détails d'un produit spécifique
@@ -599,6 +749,33 @@ class InventoryController:
         
         return product_data
     
+    @synchronized
+    def get_printed_components(self, product_name, color):
+        """
+        Composants d'un produit imprimés dans une couleur donnée
+        
+        Les composants dont la contrainte impose une autre couleur sont exclus.
+        Un produit sans nomenclature est imprimé d'une pièce: il est son propre
+        composant, comme le considère mark_as_printed.
+        
+        Args:
+            product_name (str): Nom du produit
+            color (str): Couleur imprimée
+        
+        Returns:
+            list: [(composant, quantité par produit)]
+        """
+        product = self.inventory.products.get(product_name)
+        if product is None or not product.components:
+            return [(product_name, 1)]
+        
+        return [
+            (comp["name"], comp["quantity"])
+            for comp in product.components
+            if comp["quantity"] > 0 and product.get_component_color(comp["name"], color) == color
+        ]
+    
+    @synchronized
     def get_assembled_product_stock(self, product_name, color=None):
         """
         Récupère le stock d'un produit assemblé
@@ -620,6 +797,7 @@ class InventoryController:
         else:
             return product.assembled_items.copy()
     
+    @synchronized
     def update_assembled_product_stock(self, product_name, color, quantity_change):
         """
         Met à jour le stock d'un produit assemblé (ajoute ou retire)
@@ -672,13 +850,15 @@ class InventoryController:
                     print(f"Erreur: {e}")
                     return False
             
-            self.db.conn.commit()
+            self._commit("assembled_products")
             return True
             
         except Exception as e:
             print(f"Erreur lors de la mise à jour du stock du produit assemblé: {e}")
+            self._recover()
             return False
     
+    @synchronized
     def add_product(self, product_name, description=""):
         """
         Ajoute un nouveau produit au catalogue avec diagnostic renforcé
@@ -745,7 +925,7 @@ class InventoryController:
             
             # Commit des changements
             print("Commit des changements...")
-            self.db.conn.commit()
+            self._commit("products")
             print(f"--- Fin de add_product pour '{product_name}': SUCCÈS ---")
             return True
             
@@ -762,9 +942,11 @@ class InventoryController:
                 print(f"Erreur lors du rollback: {rollback_err}")
             
             print(f"--- Fin de add_product pour '{product_name}': ÉCHEC ---")
+            self._recover()
             return False
         
         
+    @synchronized
     def add_component_to_product(self, product_name, component_name, quantity=1, color_constraint=None):
         """
         Ajoute un composant à un produit
@@ -786,6 +968,7 @@ class InventoryController:
             
             # Ajouter en mémoire
             product.add_component(component_name, quantity, color_constraint)
+            self.inventory.invalidate_assemblable()
             
             # Ajouter dans la base de données
             self.db.cursor.execute("""
@@ -799,13 +982,15 @@ class InventoryController:
                 quantity, color_constraint
             ))
             
-            self.db.conn.commit()
+            self._commit("product_components")
             return True
             
         except Exception as e:
             print(f"Erreur lors de l'ajout du composant au produit: {e}")
+            self._recover()
             return False
     
+    @synchronized
     def remove_component_from_product(self, product_name, component_name):
         """
         Retire un composant d'un produit
@@ -829,6 +1014,7 @@ class InventoryController:
             # Retirer toute contrainte de couleur associée
             if component_name in product.color_constraints:
                 del product.color_constraints[component_name]
+            self.inventory.invalidate_assemblable()
             
             # Retirer de la base de données
             self.db.cursor.execute("""
@@ -836,13 +1022,15 @@ class InventoryController:
                 WHERE product_name = ? AND component_name = ?
             """, (product_name, component_name))
             
-            self.db.conn.commit()
+            self._commit("product_components")
             return True
             
         except Exception as e:
             print(f"Erreur lors du retrait du composant du produit: {e}")
+            self._recover()
             return False
     
+    @synchronized
     def delete_product(self, product_name):
         """
         Supprime un produit du catalogue
@@ -859,6 +1047,7 @@ class InventoryController:
             
             # Supprimer en mémoire
             del self.inventory.products[product_name]
+            self.inventory.invalidate_assemblable()
             
             # Supprimer de la base de données
             self.db.cursor.execute("""
@@ -873,17 +1062,19 @@ class InventoryController:
                 DELETE FROM assembled_products WHERE product_name = ?
             """, (product_name,))
             
-            self.db.conn.commit()
+            self._commit("products", "product_components", "assembled_products")
             return True
             
         except Exception as e:
             print(f"Erreur lors de la suppression du produit: {e}")
+            self._recover()
             return False
     
     #
     # Méthodes publiques pour l'assemblage
     #
     
+    @synchronized
     def get_assemblable_products(self):
         """
         Récupère la liste des produits assemblables avec les stocks actuels
@@ -893,10 +1084,49 @@ class InventoryController:
         """
         return self.inventory.get_assemblable_products()
     
-    def assemble_product(self, product_name, color, quantity=1, component_colors=None, auto_assign=False, order_id=None):
+    @synchronized
+    def get_product_assemblable(self, product_name):
+        """
+        Récupère les quantités assemblables d'un seul produit
+        
+        Returns:
+            dict: {couleur: quantité_assemblable}, ou None si le produit n'existe pas
+        """
+        return self.inventory.get_product_assemblable(product_name)
+    
+    @synchronized
+    def get_component_dependents(self, component_name):
+        """
+        Produits dont les quantités assemblables dépendent du stock d'un composant
+        
+        Returns:
+            list: Noms des produits, triés
+        """
+        return sorted(self.inventory.get_component_dependents(component_name))
+    
+    @synchronized
+    def get_component_requirements(self, demand):
+        """
+        Calcule les besoins nets en composants d'une demande de produits
+        
+        Args:
+            demand (iterable): Lignes (produit, couleur, quantité)
+            
+        Returns:
+            list: [{'component', 'color', 'gross', 'on_hand', 'net'}]
+        """
+        return self.inventory.get_component_requirements(demand)
+    
+    @synchronized
+    def assemble_product(self, product_name, color, quantity=1, component_colors=None, auto_assign=False, order_id=None, reservation_id=None):
         """
         Assemble un produit à partir de ses composants
         
+        La consommation des composants et l'ajout du produit assemblé sont
+        écrits dans une seule transaction du registre des réservations: le
+        stock disponible (hors réservations actives) est vérifié en base, si
+        bien que deux opérateurs ne peuvent pas consommer le même stock.
+        
         Args:
             product_name (str): Nom du produit à assembler
             color (str): Couleur principale du produit
@@ -905,56 +1135,173 @@ class InventoryController:
                                             {nom_composant: couleur}
             auto_assign (bool): Si True, attribue automatiquement à une commande
             order_id (str): ID de la commande pour attribution automatique
+            reservation_id (str, optional): Réservation à consommer (voir reserve_product),
+                                            au lieu du stock disponible
             
         Returns:
             tuple: (bool, str) - (succès, message)
         """
         try:
-            # Vérifier si le produit peut être assemblé
-            assemblable = self.get_assemblable_products()
-            if (product_name not in assemblable or 
-                (color != "Aléatoire" and color not in assemblable[product_name]) or
-                (color != "Aléatoire" and assemblable[product_name][color] < quantity) or
-                (color == "Aléatoire" and assemblable[product_name].get("Aléatoire", 0) < quantity)):
-                
-                return False, "Stock de composants insuffisant pour l'assemblage"
-            
-            # Si couleur aléatoire, choisir une couleur disponible
             actual_color = color
-            if color == "Aléatoire":
-                # Trouver les couleurs disponibles (sauf "Aléatoire")
-                available_colors = [c for c in assemblable[product_name].keys() if c != "Aléatoire"]
-                if available_colors:
-                    # Choisir la première couleur disponible
-                    actual_color = available_colors[0]
+            if reservation_id is not None:
+                if color == "Aléatoire":
+                    return False, "Une réservation s'assemble dans la couleur pour laquelle elle a été faite"
+            else:
+                # Vérifier si le produit peut être assemblé (nombres de ce seul produit)
+                assemblable = self.inventory.get_product_assemblable(product_name)
+                if (assemblable is None or 
+                    (color != "Aléatoire" and color not in assemblable) or
+                    (color != "Aléatoire" and assemblable[color] < quantity) or
+                    (color == "Aléatoire" and assemblable.get("Aléatoire", 0) < quantity)):
+                    
+                    return False, "Stock de composants insuffisant pour l'assemblage"
+                
+                # Si couleur aléatoire, choisir une couleur disponible
+                if color == "Aléatoire":
+                    # Trouver les couleurs disponibles (sauf "Aléatoire")
+                    available_colors = [c for c in assemblable.keys() if c != "Aléatoire"]
+                    if available_colors:
+                        # Choisir la première couleur disponible
+                        actual_color = available_colors[0]
+                    else:
+                        return False, "Aucune couleur disponible pour l'assemblage aléatoire"
+            
+            # Le produit attribué à une commande ne rejoint pas le stock de produits assemblés
+            assign = auto_assign and order_id
+            
+            with self.reservations.transaction() as cursor:
+                if reservation_id is not None:
+                    stocks = self.reservations.commit(reservation_id)
                 else:
-                    return False, "Aucune couleur disponible pour l'assemblage aléatoire"
-            
-            # Effectuer l'assemblage
-            self.inventory.assemble_product(product_name, actual_color, quantity, component_colors)
+                    stocks = self.reservations.allocate(
+                        self.inventory.get_component_consumption(product_name, actual_color, quantity, component_colors),
+                        order_id
+                    )
+                
+                if not assign:
+                    cursor.execute("""
+                        INSERT INTO assembled_products (product_name, color, quantity)
+                        VALUES (?, ?, ?)
+                        ON CONFLICT(product_name, color) DO UPDATE SET
+                        quantity = quantity + ?
+                    """, (product_name, actual_color, quantity, quantity))
+            
+            # Répercuter en mémoire le stock des composants relu en base
+            for (component_name, comp_color), stock in stocks.items():
+                self.inventory.set_component_stock(component_name, comp_color, stock)
             
             # Attribution automatique à une commande si demandé
-            if auto_assign and order_id:
+            if assign:
+                self._commit("components", "component_reservations")
+                
                 from controllers.order_controller import OrderController
                 order_controller = OrderController()
                 
                 # Mettre à jour le statut du produit dans la commande
                 order_controller.update_item_status(order_id, product_name, actual_color, "Imprimé")
                 
-                # Si l'attribution automatique est réussie, ne pas ajouter au stock de produits assemblés
                 return True, f"{quantity} {product_name} de couleur {actual_color} assemblé(s) et attribué(s) à la commande {order_id}"
             
-            # Sinon, mettre à jour le stock de produits assemblés
-            self.update_assembled_product_stock(product_name, actual_color, quantity)
+            # Sinon, ajouter au stock de produits assemblés
+            self.inventory.update_assembled_product_stock(product_name, actual_color, quantity)
+            self._commit("components", "assembled_products", "component_reservations")
             
             return True, f"{quantity} {product_name} de couleur {actual_color} assemblé(s) avec succès"
             
+        except ValueError as e:
+            # Stock insuffisant en base (consommé ou réservé par un autre
+            # opérateur): rien n'a été écrit, l'inventaire en mémoire est resynchronisé
+            self.reload_if_changed()
+            return False, str(e)
         except Exception as e:
+            self._recover()
             return False, f"Erreur lors de l'assemblage: {str(e)}"
+    
+    #
+    # Méthodes pour les réservations de composants
+    #
+    
+    @synchronized
+    def reserve_product(self, product_name, color, quantity=1, component_colors=None, order_id=None):
+        """
+        Réserve les composants d'un assemblage futur, tous ou aucun
+        
+        Args:
+            product_name (str): Nom du produit à assembler
+            color (str): Couleur principale du produit (pas Aléatoire)
+            quantity (int): Nombre de produits à assembler
+            component_colors (dict, optional): Couleurs spécifiques pour certains composants
+            order_id (str, optional): Commande pour laquelle le stock est réservé
+            
+        Returns:
+            tuple: (bool, str) - (succès, identifiant de la réservation ou message)
+        """
+        if color == "Aléatoire":
+            return False, "Choisir une couleur pour réserver les composants"
+        
+        try:
+            reservation_id = self.reservations.reserve(
+                self.inventory.get_component_consumption(product_name, color, quantity, component_colors),
+                order_id
+            )
+        except ValueError as e:
+            return False, str(e)
+        
+        self._notify(("component_reservations",))
+        return True, reservation_id
+    
+    @synchronized
+    def release_reservation(self, reservation_id):
+        """
+        Libère une réservation active
+        
+        Returns:
+            bool: True si des composants ont été libérés
+        """
+        released = self.reservations.release(reservation_id)
+        if released:
+            self._notify(("component_reservations",))
+        return released > 0
+    
+    @synchronized
+    def release_order_reservations(self, order_id):
+        """
+        Libère les réservations actives d'une commande (commande annulée)
+        
+        Returns:
+            int: Nombre de lignes de réservation libérées
+        """
+        released = self.reservations.release_order(order_id)
+        if released:
+            self._notify(("component_reservations",))
+        return released
+    
+    def get_reservations(self, order_id=None):
+        """
+        Récupère les réservations actives
+        
+        Args:
+            order_id (str, optional): Filtrer par commande
+            
+        Returns:
+            list: Lignes actives du registre (voir ReservationLedger.get_reservations)
+        """
+        return self.reservations.get_reservations(order_id)
+    
+    def get_available_component_stock(self, component_name, color):
+        """
+        Récupère le stock d'un composant non réservé, lu en base
+        
+        Returns:
+            int: Stock moins les réservations actives
+        """
+        return self.reservations.get_available_stock(component_name, color)
+    
     #
     # Méthodes pour les variantes de couleurs
     #
     
+    @synchronized
     def get_color_variants(self, base_color=None):
         """
         Récupère les variantes de couleurs
@@ -977,6 +1324,7 @@ class InventoryController:
         
         return variants
     
+    @synchronized
     def add_color_variant(self, base_color, variant_name, hex_code):
         """
         Ajoute une variante de couleur
@@ -1000,13 +1348,15 @@ class InventoryController:
                 VALUES (?, ?, ?)
             """, (base_color, variant_name, hex_code))
             
-            self.db.conn.commit()
+            self._commit("color_variants")
             return True
             
         except Exception as e:
             print(f"Erreur lors de l'ajout de la variante de couleur: {e}")
+            self._recover()
             return False
     
+    @synchronized
     def delete_color_variant(self, variant_name):
         """
         Supprime une variante de couleur
@@ -1030,13 +1380,15 @@ class InventoryController:
                 WHERE variant_name = ?
             """, (variant_name,))
             
-            self.db.conn.commit()
+            self._commit("color_variants")
             return True
             
         except Exception as e:
             print(f"Erreur lors de la suppression de la variante de couleur: {e}")
+            self._recover()
             return False
     
+    @synchronized
     def get_available_colors(self):
         """
         Récupère la liste de toutes les couleurs disponibles dans l'inventaire
@@ -1046,6 +1398,7 @@ class InventoryController:
         """
         return self.inventory.get_available_colors()
     
+    @synchronized
     def get_inventory_summary(self):
         """
         Récupère un résumé des statistiques d'inventaire
@@ -1084,6 +1437,7 @@ class InventoryController:
             "avg_stock_per_product": round(avg_stock, 1)    # Stock moyen par produit
         }
     
+    @synchronized
     def get_low_stock_products(self):
         """
         Récupère la liste des composants en rupture de stock ou sous le seuil d'alerte
@@ -10,15 +10,36 @@ class OrderController:
     
     def get_all_orders(self):
         """Récupère toutes les commandes depuis la base de données"""
-        orders = []
+        return self._load_orders(order_by="date DESC")
+    
+    def _load_orders(self, where="", params=(), order_by="date DESC"):
+        """
+        Charge des commandes et leurs produits en deux requêtes ensemblistes
+        
+        Les en-têtes de commandes sont lus en une requête, puis tous les produits
+        associés en une seconde requête (sous-requête sur le même filtre), au lieu
+        d'une requête par commande.
+        
+        Args:
+            where (str): Condition SQL sur la table orders (sans le mot-clé WHERE)
+            params (tuple): Paramètres de la condition
+            order_by (str): Tri des commandes
+            
+        Returns:
+            list: Liste des commandes avec leurs produits
+        """
+        where_clause = f"WHERE {where}" if where else ""
         
         # Récupérer les commandes
-        self.db.cursor.execute("""
+        self.db.cursor.execute(f"""
             SELECT id, date, client, email, status, priority, notes
             FROM orders
-            ORDER BY date DESC
-        """)
+            {where_clause}
+            ORDER BY {order_by}
+        """, params)
         
+        orders = []
+        orders_by_id = {}
         for row in self.db.cursor.fetchall():
             order = Order(
                 order_id=row['id'],
@@ -29,23 +50,127 @@ class OrderController:
                 priority=row['priority'],
                 notes=row['notes']
             )
-            
-            # Récupérer les produits de la commande
-            self.db.cursor.execute("""
-                SELECT product, color, quantity, status
-                FROM order_items
-                WHERE order_id = ?
-            """, (order.id,))
-            
-            for item_row in self.db.cursor.fetchall():
+            orders.append(order)
+            orders_by_id[order.id] = order
+        
+        if not orders:
+            return orders
+        
+        # Récupérer les produits de toutes les commandes en une seule requête
+        self.db.cursor.execute(f"""
+            SELECT oi.order_id, oi.product, oi.color, oi.quantity, oi.status
+            FROM order_items oi
+            WHERE oi.order_id IN (SELECT id FROM orders {where_clause})
+            ORDER BY oi.id
+        """, params)
+        
+        for item_row in self.db.cursor.fetchall():
+            order = orders_by_id.get(item_row['order_id'])
+            if order:
                 order.add_item(
                     product=item_row['product'],
                     color=item_row['color'],
                     quantity=item_row['quantity'],
                     status=item_row['status']
                 )
+        
+        return orders
+    
+    def get_orders_page(self, page_size=100, cursor=None, status=None, search=None):
+        """
+        Récupère une page d'en-têtes de commandes (sans leurs produits)
+        
+        La pagination se fait par curseur sur (date, id) dans l'ordre
+        date DESC, id DESC : le coût d'une page ne dépend pas de sa position
+        dans la table, contrairement à un OFFSET.
+        
+        Args:
+            page_size (int): Nombre maximal de commandes à retourner
+            cursor (tuple, optional): (date, id) de la dernière commande de la page précédente
+            status (str, optional): Filtrer par statut de commande
+            search (str, optional): Texte recherché dans l'ID, le client ou l'email
             
-            orders.append(order)
+        Returns:
+            tuple: (liste des commandes sans produits, curseur de la page suivante ou None)
+        """
+        conditions = []
+        params = []
+        
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        
+        if search:
+            conditions.append("(id LIKE ? OR client LIKE ? OR email LIKE ?)")
+            params.extend([f"%{search}%"] * 3)
+        
+        if cursor:
+            cursor_date, cursor_id = cursor
+            conditions.append("(date < ? OR (date = ? AND id < ?))")
+            params.extend([cursor_date, cursor_date, cursor_id])
+        
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        # Lire une ligne de plus pour savoir s'il existe une page suivante
+        self.db.cursor.execute(f"""
+            SELECT id, date, client, email, status, priority, notes
+            FROM orders
+            {where_clause}
+            ORDER BY date DESC, id DESC
+            LIMIT ?
+        """, params + [page_size + 1])
+        
+        rows = self.db.cursor.fetchall()
+        has_more = len(rows) > page_size
+        
+        orders = [
+            Order(
+                order_id=row['id'],
+                date=row['date'],
+                client=row['client'],
+                email=row['email'],
+                status=row['status'],
+                priority=row['priority'],
+                notes=row['notes']
+            )
+            for row in rows[:page_size]
+        ]
+        
+        next_cursor = (orders[-1].date, orders[-1].id) if has_more else None
+        return orders, next_cursor
+    
+    def hydrate_items(self, orders):
+        """
+        Charge les produits d'une liste de commandes en une seule requête
+        
+        Args:
+            orders (list): Commandes dont les produits doivent être chargés
+            
+        Returns:
+            list: Les mêmes commandes, avec leurs produits
+        """
+        orders_by_id = {order.id: order for order in orders}
+        if not orders_by_id:
+            return orders
+        
+        for order in orders_by_id.values():
+            order.items = []
+        
+        placeholders = ', '.join(['?'] * len(orders_by_id))
+        self.db.cursor.execute(f"""
+            SELECT order_id, product, color, quantity, status
+            FROM order_items
+            WHERE order_id IN ({placeholders})
+            ORDER BY id
+        """, list(orders_by_id))
+        
+        for item_row in self.db.cursor.fetchall():
+            orders_by_id[item_row['order_id']].add_item(
+                product=item_row['product'],
+                color=item_row['color'],
+                quantity=item_row['quantity'],
+                status=item_row['status']
+            )
         
         return orders
     
@@ -107,98 +232,24 @@ class OrderController:
             WHERE order_id = ? AND product = ? AND color = ?
         """, (new_status, order_id, product, color))
         
+        # Mettre à jour le statut de la commande dans la même transaction
+        self.db.update_order_statuses("id = ?", (order_id,))
         self.db.conn.commit()
         
-        # Mettre à jour le statut de la commande
-        order = self.get_order_by_id(order_id)
-        if order:
-            order.update_status()
-            self.update_order_status(order_id, order.status)
-        
         return True
     
     def get_orders_by_status(self, status):
         """Récupère les commandes par statut"""
-        orders = []
-        
-        self.db.cursor.execute("""
-            SELECT id, date, client, email, status, priority, notes
-            FROM orders
-            WHERE status = ?
-            ORDER BY date DESC
-        """, (status,))
-        
-        for row in self.db.cursor.fetchall():
-            order = Order(
-                order_id=row['id'],
-                date=row['date'],
-                client=row['client'],
-                email=row['email'],
-                status=row['status'],
-                priority=row['priority'],
-                notes=row['notes']
-            )
-            
-            # Récupérer les produits de la commande
-            self.db.cursor.execute("""
-                SELECT product, color, quantity, status
-                FROM order_items
-                WHERE order_id = ?
-            """, (order.id,))
-            
-            for item_row in self.db.cursor.fetchall():
-                order.add_item(
-                    product=item_row['product'],
-                    color=item_row['color'],
-                    quantity=item_row['quantity'],
-                    status=item_row['status']
-                )
-            
-            orders.append(order)
-        
-        return orders
+        return self._load_orders("status = ?", (status,))
+    
     def search_orders(self, query):
         """Recherche des commandes par ID, client ou email"""
-        orders = []
-        
         # Utiliser une recherche avec LIKE pour trouver les correspondances partielles
-        self.db.cursor.execute("""
-            SELECT id, date, client, email, status, priority, notes
-            FROM orders
-            WHERE id LIKE ? OR client LIKE ? OR email LIKE ?
-            ORDER BY date DESC
-        """, (f"%{query}%", f"%{query}%", f"%{query}%"))
-        
-        for row in self.db.cursor.fetchall():
-            order = Order(
-                order_id=row['id'],
-                date=row['date'],
-                client=row['client'],
-                email=row['email'],
-                status=row['status'],
-                priority=row['priority'],
-                notes=row['notes']
-            )
-            
-            # Récupérer les produits de la commande
-            self.db.cursor.execute("""
-                SELECT product, color, quantity, status
-                FROM order_items
-                WHERE order_id = ?
-            """, (order.id,))
-            
-            for item_row in self.db.cursor.fetchall():
-                order.add_item(
-                    product=item_row['product'],
-                    color=item_row['color'],
-                    quantity=item_row['quantity'],
-                    status=item_row['status']
-                )
-            
-            orders.append(order)
-        
-        return orders
-
+        return self._load_orders(
+            "id LIKE ? OR client LIKE ? OR email LIKE ?",
+            (f"%{query}%", f"%{query}%", f"%{query}%")
+        )
+    
     def update_order(self, order):
         """Met à jour une commande complète"""
         # Mettre à jour la commande elle-même
@@ -237,7 +288,7 @@ class OrderController:
         
         self.db.conn.commit()
         return True
-
+    
     def delete_order(self, order_id):
         """Supprime une commande et tous ses produits"""
         # Supprimer les produits
@@ -254,7 +305,7 @@ class OrderController:
         
         self.db.conn.commit()
         return True
-
+    
     def get_orders_count_by_status(self):
         """Récupère le nombre de commandes par statut"""
         counts = {
@@ -265,10 +316,10 @@ class OrderController:
             "Total": 0
         }
         
+        # Compteurs tenus à jour par triggers (table order_status_counts)
         self.db.cursor.execute("""
-            SELECT status, COUNT(*) as count
-            FROM orders
-            GROUP BY status
+            SELECT status, order_count as count
+            FROM order_status_counts
         """)
         
         for row in self.db.cursor.fetchall():
@@ -280,7 +331,7 @@ class OrderController:
                 counts["Total"] += count
         
         return counts
-
+    
     def get_orders_waiting_for_product(self, product, color):
         """
         Récupère les commandes qui attendent un produit spécifique, classées par ancienneté
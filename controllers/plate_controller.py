@@ -0,0 +1,174 @@
+import uuid
+
+from models.database import Database
+from models.plate_packer import PartProfile, PlatePacker
+from models.printer_fleet import PRINTER_OFFLINE
+from controllers.printer_controller import PrinterController
+from config import DATABASE_PATH, PLATE_SETTINGS, SEQUENCING_SETTINGS
+
+class PlateController:
+    """Contrôleur pour les profils d'impression des composants et les plateaux à imprimer"""
+    
+    def __init__(self):
+        self.db = Database(DATABASE_PATH)
+        self.printer_controller = PrinterController()
+        self.print_controller = self.printer_controller.print_controller
+        self.inventory_controller = self.print_controller.inventory_controller
+    
+    def get_component_profiles(self):
+        """
+        Récupère les profils d'impression enregistrés
+        
+        Returns:
+            dict: {composant: PartProfile}
+        """
+        self.db.cursor.execute("""
+            SELECT component_name, width_mm, depth_mm, height_mm, print_minutes
+            FROM component_print_profiles
+        """)
+        return {
+            row["component_name"]: PartProfile(row["component_name"], row["width_mm"], row["depth_mm"],
+                                               row["height_mm"], row["print_minutes"])
+            for row in self.db.cursor.fetchall()
+        }
+    
+    def get_component_profile(self, component_name):
+        """
+        Récupère le profil d'impression d'un composant
+        
+        Returns:
+            PartProfile: Profil enregistré, ou None si le composant n'en a pas
+        """
+        self.db.cursor.execute("""
+            SELECT component_name, width_mm, depth_mm, height_mm, print_minutes
+            FROM component_print_profiles
+            WHERE component_name = ?
+        """, (component_name,))
+        row = self.db.cursor.fetchone()
+        if row is None:
+            return None
+        return PartProfile(row["component_name"], row["width_mm"], row["depth_mm"],
+                           row["height_mm"], row["print_minutes"])
+    
+    def set_component_profile(self, component_name, width_mm, depth_mm, height_mm, print_minutes):
+        """
+        Enregistre l'emprise, la hauteur et la durée d'impression d'un composant
+        
+        Returns:
+            bool: True si le profil a été enregistré
+        """
+        if min(width_mm, depth_mm, height_mm, print_minutes) <= 0:
+            print(f"Profil d'impression invalide pour {component_name}: dimensions et durée doivent être positives")
+            return False
+        
+        try:
+            self.db.cursor.execute("""
+                INSERT INTO component_print_profiles (component_name, width_mm, depth_mm, height_mm, print_minutes)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (component_name) DO UPDATE SET
+                    width_mm = excluded.width_mm, depth_mm = excluded.depth_mm,
+                    height_mm = excluded.height_mm, print_minutes = excluded.print_minutes
+            """, (component_name, width_mm, depth_mm, height_mm, print_minutes))
+            self.db.conn.commit()
+            return True
+        except Exception as e:
+            print(f"Erreur lors de l'enregistrement du profil d'impression: {e}")
+            self.db.conn.rollback()
+            return False
+    
+    def delete_component_profile(self, component_name):
+        """
+        Supprime le profil d'impression d'un composant (il reprend le profil par défaut)
+        
+        Returns:
+            bool: True si le profil a été supprimé
+        """
+        try:
+            self.db.cursor.execute("DELETE FROM component_print_profiles WHERE component_name = ?",
+                                   (component_name,))
+            self.db.conn.commit()
+            return True
+        except Exception as e:
+            print(f"Erreur lors de la suppression du profil d'impression: {e}")
+            self.db.conn.rollback()
+            return False
+    
+    def get_bed_size(self):
+        """
+        Plateau commun à toutes les imprimantes en service (le plus petit volume)
+        
+        Returns:
+            tuple: (largeur, profondeur, hauteur) en mm, ou None sans imprimante en service
+        """
+        printers = [printer for printer in self.printer_controller.get_printers() if printer.status != PRINTER_OFFLINE]
+        if not printers:
+            return None
+        return (min(printer.bed_width for printer in printers),
+                min(printer.bed_depth for printer in printers),
+                min(printer.max_height for printer in printers))
+    
+    def _unit_parts(self, product, color, profiles):
+        """Pièces d'un exemplaire d'un produit imprimées dans une couleur (profils par défaut si absents)"""
+        # Produit dont aucune pièce n'est de cette couleur: imprimé d'une pièce
+        components = self.inventory_controller.get_printed_components(product, color) or [(product, 1)]
+        piece_count = sum(quantity for _, quantity in components) or 1
+        parts = []
+        for component, quantity in components:
+            profile = profiles.get(component)
+            if profile is None:
+                # Sans profil: emprise par défaut, durée moyenne d'un produit répartie entre ses pièces
+                profile = PartProfile(component, PLATE_SETTINGS["default_width_mm"],
+                                      PLATE_SETTINGS["default_depth_mm"], PLATE_SETTINGS["default_height_mm"],
+                                      SEQUENCING_SETTINGS["minutes_per_piece"] / piece_count)
+            parts.extend([profile] * quantity)
+        return parts
+    
+    def get_plates(self, color=None):
+        """
+        Regroupe les produits restant à imprimer en plateaux, couleur par couleur
+        
+        Args:
+            color (str, optional): Limiter à une couleur
+        
+        Returns:
+            tuple: (plateaux (Plate) par couleur puis numéro,
+                    produits trop grands pour le plateau {(produit, couleur): quantité})
+        """
+        bed = self.get_bed_size()
+        if bed is None:
+            return [], {}
+        
+        plan = self.print_controller.get_print_plan(include_printing=False, with_order_ids=False)
+        profiles = self.get_component_profiles()
+        packer = PlatePacker(*bed)
+        
+        plates = []
+        oversized = {}
+        for plan_color in sorted(plan):
+            if color is not None and plan_color != color:
+                continue
+            units = [
+                (entry["product"], entry["quantity"], self._unit_parts(entry["product"], plan_color, profiles))
+                for entry in plan[plan_color]
+            ]
+            color_plates, color_oversized = packer.pack(plan_color, units)
+            plates.extend(color_plates)
+            oversized.update({(product, plan_color): quantity for product, quantity in color_oversized.items()})
+        
+        return plates, oversized
+    
+    def start_plate(self, plate, printer_id=None):
+        """
+        Met en impression tous les produits d'un plateau
+        
+        Args:
+            plate (Plate): Plateau à imprimer (voir get_plates)
+            printer_id (int, optional): Imprimante qui imprime le plateau
+        
+        Returns:
+            int: Nombre de produits mis en impression
+        """
+        return self.print_controller.start_printing_plate(
+            plate.color, plate.items, printer_id,
+            plate_id=uuid.uuid4().hex, duration_minutes=plate.print_minutes
+        )
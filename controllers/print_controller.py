@@ -1,36 +1,47 @@
 from models.database import Database
 from controllers.inventory_controller import InventoryController
-from config import DATABASE_PATH, PRIORITIES
+from config import DATABASE_PATH, PRIORITIES, SEQUENCING_SETTINGS
 
 class PrintController:
     """Contrôleur pour la gestion du plan d'impression"""
     
     def __init__(self):
         self.db = Database(DATABASE_PATH)
-        self.inventory_controller = InventoryController()
+        self.inventory_controller = InventoryController.shared(DATABASE_PATH)
     
-    def get_print_plan(self, include_printing=True):
+    def get_print_plan(self, include_printing=True, with_order_ids=True):
         """
         Récupère le plan d'impression organisé par couleur
         et regroupé par produit/composant
         
         Args:
             include_printing (bool): Si True, inclut aussi les produits en cours d'impression
+            with_order_ids (bool): Si False, les quantités sont lues dans les agrégats
+                                   order_item_totals et order_ids est une liste vide
         """
         plan = {}
         
         # Préparer la condition pour le statut
         status_condition = "'À imprimer'" if not include_printing else "'À imprimer', 'En impression'"
         
-        # Récupérer tous les produits à imprimer et en cours d'impression
-        query = f"""
-            SELECT oi.product, oi.color, SUM(oi.quantity) as total_quantity,
-                   GROUP_CONCAT(oi.order_id) as order_ids, oi.status
-            FROM order_items oi
-            WHERE oi.status IN ({status_condition})
-            GROUP BY oi.product, oi.color, oi.status
-            ORDER BY oi.color, oi.product
-        """
+        if with_order_ids:
+            # Récupérer tous les produits à imprimer et en cours d'impression
+            query = f"""
+                SELECT oi.product, oi.color, SUM(oi.quantity) as total_quantity,
+                       GROUP_CONCAT(oi.order_id) as order_ids, oi.status
+                FROM order_items oi
+                WHERE oi.status IN ({status_condition})
+                GROUP BY oi.product, oi.color, oi.status
+                ORDER BY oi.color, oi.product, oi.status
+            """
+        else:
+            # Agrégats tenus à jour par triggers: une ligne par produit, couleur et statut
+            query = f"""
+                SELECT product, color, quantity as total_quantity, NULL as order_ids, status
+                FROM order_item_totals
+                WHERE status IN ({status_condition})
+                ORDER BY color, product, status
+            """
         
         self.db.cursor.execute(query)
         
@@ -58,6 +69,32 @@ class PrintController:
         
         return plan
     
+    def get_component_requirements(self, include_printing=False):
+        """
+        Éclate les produits restant à imprimer en besoins nets de composants,
+        après le stock de produits assemblés puis le stock de composants
+        
+        Args:
+            include_printing (bool): Si True, compte aussi les produits en cours d'impression
+            
+        Returns:
+            list: [{'component', 'color', 'gross', 'on_hand', 'net'}], triés par couleur
+        """
+        status_condition = "'À imprimer'" if not include_printing else "'À imprimer', 'En impression'"
+        
+        # Les commandes expédiées ou annulées ne génèrent plus de besoins
+        self.db.cursor.execute(f"""
+            SELECT oi.product, oi.color, SUM(oi.quantity) as total_quantity
+            FROM order_items oi
+            JOIN orders o ON o.id = oi.order_id
+            WHERE oi.status IN ({status_condition})
+              AND o.status NOT IN ('Expédié', 'Annulé')
+            GROUP BY oi.product, oi.color
+        """)
+        demand = [(row['product'], row['color'], row['total_quantity']) for row in self.db.cursor.fetchall()]
+        
+        return self.inventory_controller.get_component_requirements(demand)
+    
     def get_print_plan_by_color(self, color):
         """Récupère le plan d'impression pour une couleur spécifique"""
         items = []
@@ -142,96 +179,55 @@ class PrintController:
             params = [product, color]
         
         self.db.cursor.execute(query, params)
-        self.db.conn.commit()
         
-        # Mettre à jour le statut des commandes concernées
-        self.db.cursor.execute("""
+        # Mettre à jour le statut des commandes concernées, dans la même transaction
+        impacted_orders = """
             SELECT DISTINCT order_id
             FROM order_items
             WHERE product = ? AND color = ? AND status = 'Imprimé'
-        """, (product, color))
-        
-        updated_orders = [row['order_id'] for row in self.db.cursor.fetchall()]
+        """
+        self.db.update_order_statuses(f"id IN ({impacted_orders})", (product, color))
         
-        # Pour chaque commande mise à jour, vérifier si elle est complète
-        from controllers.order_controller import OrderController
-        order_controller = OrderController()
+        self.db.cursor.execute(f"SELECT COUNT(*) as count FROM ({impacted_orders})", (product, color))
+        updated_orders = self.db.cursor.fetchone()["count"]
         
-        for order_id in updated_orders:
-            order = order_controller.get_order_by_id(order_id)
-            if order:
-                order.update_status()
-                order_controller.update_order_status(order_id, order.status)
+        # Libérer les imprimantes dont le travail est terminé
+        self.db.finish_print_jobs(product, color)
+        self.db.conn.commit()
         
         # Ajouter le composant imprimé à l'inventaire
         if printed_quantity > 0:
             self.inventory_controller.update_component_stock(product, color, printed_quantity)
             print(f"Ajouté {printed_quantity} {product} de couleur {color} à l'inventaire.")
         
-        return len(updated_orders)
+        return updated_orders
+    
     def get_print_stats(self):
         """
         Récupère des statistiques sur le plan d'impression
         """
-        stats = {
-            "total_to_print": 0,
-            "products_count": 0,
-            "colors_count": 0,
-            "priority_high": 0,
-            "priority_medium": 0,
-            "priority_low": 0
-        }
-        
-        # Nombre total de pièces à imprimer
+        # Lecture des agrégats: la priorité de chaque ligne (selon sa quantité) y est déjà ventilée
         self.db.cursor.execute("""
-            SELECT SUM(quantity) as total
-            FROM order_items
+            SELECT SUM(quantity) as total,
+                   COUNT(DISTINCT product) as products_count,
+                   COUNT(DISTINCT color) as colors_count,
+                   SUM(quantity_high) as priority_high,
+                   SUM(quantity_medium) as priority_medium,
+                   SUM(quantity_low) as priority_low
+            FROM order_item_totals
             WHERE status = 'À imprimer'
         """)
         row = self.db.cursor.fetchone()
-        stats["total_to_print"] = row["total"] if row["total"] else 0
-        
-        # Nombre de produits différents à imprimer
-        self.db.cursor.execute("""
-            SELECT COUNT(DISTINCT product) as count
-            FROM order_items
-            WHERE status = 'À imprimer'
-        """)
-        stats["products_count"] = self.db.cursor.fetchone()["count"]
-        
-        # Nombre de couleurs différentes à imprimer
-        self.db.cursor.execute("""
-            SELECT COUNT(DISTINCT color) as count
-            FROM order_items
-            WHERE status = 'À imprimer'
-        """)
-        stats["colors_count"] = self.db.cursor.fetchone()["count"]
-        
-        # Nombre de pièces par priorité
-        # La priorité est déterminée par la quantité
-        self.db.cursor.execute("""
-            SELECT SUM(quantity) as count
-            FROM order_items
-            WHERE status = 'À imprimer' AND quantity > 3
-        """)
-        stats["priority_high"] = self.db.cursor.fetchone()["count"] or 0
         
-        self.db.cursor.execute("""
-            SELECT SUM(quantity) as count
-            FROM order_items
-            WHERE status = 'À imprimer' AND quantity > 1 AND quantity <= 3
-        """)
-        stats["priority_medium"] = self.db.cursor.fetchone()["count"] or 0
-        
-        self.db.cursor.execute("""
-            SELECT SUM(quantity) as count
-            FROM order_items
-            WHERE status = 'À imprimer' AND quantity = 1
-        """)
-        stats["priority_low"] = self.db.cursor.fetchone()["count"] or 0
-        
-        return stats
-
+        return {
+            "total_to_print": row["total"] or 0,
+            "products_count": row["products_count"],
+            "colors_count": row["colors_count"],
+            "priority_high": row["priority_high"] or 0,
+            "priority_medium": row["priority_medium"] or 0,
+            "priority_low": row["priority_low"] or 0
+        }
+    
     def get_most_common_products(self, limit=5):
         """
         Récupère les produits les plus commandés
@@ -240,9 +236,9 @@ class PrintController:
         
         self.db.cursor.execute("""
             SELECT product, SUM(quantity) as total
-            FROM order_items
+            FROM order_item_totals
             GROUP BY product
-            ORDER BY total DESC
+            ORDER BY total DESC, product
             LIMIT ?
         """, (limit,))
         
@@ -253,7 +249,7 @@ class PrintController:
             })
         
         return products
-
+    
     def get_most_common_colors(self, limit=5):
         """
         Récupère les couleurs les plus demandées
@@ -262,9 +258,9 @@ class PrintController:
         
         self.db.cursor.execute("""
             SELECT color, SUM(quantity) as total
-            FROM order_items
+            FROM order_item_totals
             GROUP BY color
-            ORDER BY total DESC
+            ORDER BY total DESC, color
             LIMIT ?
         """, (limit,))
         
@@ -275,7 +271,7 @@ class PrintController:
             })
         
         return colors
-
+    
     def start_printing_batch(self, product, color):
         """
         Marque un lot de produits comme 'En impression'
@@ -293,32 +289,15 @@ class PrintController:
                 WHERE product = ? AND color = ? AND status = 'À imprimer'
             """, (product, color))
             
-            # Mettre à jour le statut des commandes concernées
-            self.db.cursor.execute("""
-                SELECT DISTINCT order_id
-                FROM order_items
-                WHERE product = ? AND color = ? AND status = 'En impression'
+            # Mettre à jour le statut des commandes concernées dans la même transaction
+            self.db.update_order_statuses("""
+                id IN (
+                    SELECT order_id
+                    FROM order_items
+                    WHERE product = ? AND color = ? AND status = 'En impression'
+                )
             """, (product, color))
             
-            updated_orders = [row['order_id'] for row in self.db.cursor.fetchall()]
-            
-            # Valider les changements immédiatement avant d'appeler d'autres contrôleurs
-            self.db.conn.commit()
-            
-            # Pour chaque commande mise à jour, vérifier si elle est complète
-            # Utiliser une nouvelle connexion pour éviter les blocages
-            from controllers.order_controller import OrderController
-            order_controller = OrderController()
-            
-            for order_id in updated_orders:
-                order = order_controller.get_order_by_id(order_id)
-                if order:
-                    order.update_status()
-                    try:
-                        order_controller.update_order_status(order_id, order.status)
-                    except Exception as e:
-                        print(f"Erreur lors de la mise à jour du statut de la commande {order_id}: {e}")
-            
             # Retourner le nombre de produits concernés
             self.db.cursor.execute("""
                 SELECT SUM(quantity) as count
@@ -327,6 +306,8 @@ class PrintController:
             """, (product, color))
             
             count = self.db.cursor.fetchone()["count"] or 0
+            
+            self.db.conn.commit()
             return count
             
         except Exception as e:
@@ -334,8 +315,8 @@ class PrintController:
             print(f"Erreur lors du démarrage de l'impression: {e}")
             self.db.conn.rollback()
             raise
-
-    def start_printing_batch_partial(self, product, color, quantity_to_print):
+    
+    def start_printing_batch_partial(self, product, color, quantity_to_print, printer_id=None):
         """
         Marque un lot partiel de produits comme 'En impression'
         
@@ -343,109 +324,24 @@ class PrintController:
             product (str): Nom du produit
             color (str): Couleur du produit
             quantity_to_print (int): Quantité à imprimer dans ce lot
+            printer_id (int, optional): Imprimante qui imprime le lot; le travail
+                                        est enregistré et la quantité démarrée est
+                                        retirée de celui planifié
         
         Returns:
             int: Nombre de produits mis en impression
         """
         try:
-            # Utiliser un timeout plus long pour les opérations sur la base de données
-            self.db.conn.execute("PRAGMA busy_timeout = 5000")
-            
-            # Vérifier que la quantité demandée est disponible
-            self.db.cursor.execute("""
-                SELECT SUM(quantity) as total
-                FROM order_items
-                WHERE product = ? AND color = ? AND status = 'À imprimer'
-            """, (product, color))
+            # Verrou d'écriture pris d'emblée: la quantité disponible et la
+            # répartition ne peuvent pas changer avant l'écriture
+            self.db.conn.execute("BEGIN IMMEDIATE")
             
-            total_available = self.db.cursor.fetchone()["total"] or 0
+            self._allocate_batch(product, color, quantity_to_print)
             
-            if total_available < quantity_to_print:
-                raise ValueError(f"Quantité demandée ({quantity_to_print}) supérieure à la quantité disponible ({total_available})")
-            
-            # Démarrer une transaction explicite
-            self.db.conn.execute("BEGIN TRANSACTION")
+            if printer_id is not None:
+                self._assign_printer(printer_id, product, color, quantity_to_print)
             
-            # Si on ne demande pas d'imprimer la totalité, on doit diviser les entrées
-            if quantity_to_print < total_available:
-                # Stratégie: on commence par les commandes les plus petites
-                self.db.cursor.execute("""
-                    SELECT id, order_id, quantity
-                    FROM order_items
-                    WHERE product = ? AND color = ? AND status = 'À imprimer'
-                    ORDER BY quantity ASC
-                """, (product, color))
-                
-                items = self.db.cursor.fetchall()
-                remaining = quantity_to_print
-                updated_orders = set()
-                
-                # Parcourir les items à mettre en impression
-                for item in items:
-                    item_id = item["id"]
-                    order_id = item["order_id"]
-                    item_quantity = item["quantity"]
-                    
-                    if remaining <= 0:
-                        break
-                    
-                    if item_quantity <= remaining:
-                        # Si tout l'item peut être mis en impression
-                        self.db.cursor.execute("""
-                            UPDATE order_items
-                            SET status = 'En impression'
-                            WHERE id = ?
-                        """, (item_id,))
-                        
-                        remaining -= item_quantity
-                        updated_orders.add(order_id)
-                    else:
-                        # Si on ne peut imprimer qu'une partie de l'item
-                        # 1. Réduire la quantité de l'item original
-                        self.db.cursor.execute("""
-                            UPDATE order_items
-                            SET quantity = quantity - ?
-                            WHERE id = ?
-                        """, (remaining, item_id))
-                        
-                        # 2. Créer un nouvel item pour la quantité en impression
-                        self.db.cursor.execute("""
-                            INSERT INTO order_items (order_id, product, color, quantity, status)
-                            VALUES (?, ?, ?, ?, 'En impression')
-                        """, (order_id, product, color, remaining))
-                        
-                        remaining = 0
-                        updated_orders.add(order_id)
-            else:
-                # Si on imprime tout, c'est plus simple
-                self.db.cursor.execute("""
-                    UPDATE order_items
-                    SET status = 'En impression'
-                    WHERE product = ? AND color = ? AND status = 'À imprimer'
-                """, (product, color))
-                
-                # Récupérer les commandes concernées
-                self.db.cursor.execute("""
-                    SELECT DISTINCT order_id
-                    FROM order_items
-                    WHERE product = ? AND color = ? AND status = 'En impression'
-                """, (product, color))
-                
-                updated_orders = {row['order_id'] for row in self.db.cursor.fetchall()}
-            
-            # Valider les changements
             self.db.conn.commit()
-            
-            # Mettre à jour les statuts des commandes
-            from controllers.order_controller import OrderController
-            order_controller = OrderController()
-            
-            for order_id in updated_orders:
-                order = order_controller.get_order_by_id(order_id)
-                if order:
-                    order.update_status()
-                    order_controller.update_order_status(order_id, order.status)
-            
             return quantity_to_print
             
         except Exception as e:
@@ -453,7 +349,155 @@ class PrintController:
             print(f"Erreur lors du démarrage de l'impression partielle: {e}")
             self.db.conn.rollback()
             raise
-
+    
+    def _allocate_batch(self, product, color, quantity_to_print):
+        """
+        Met en impression quantity_to_print produits d'une couleur, ligne par
+        ligne, et recalcule le statut des commandes (sans valider la transaction)
+        
+        Raises:
+            ValueError: Si la quantité demandée dépasse la quantité à imprimer
+        """
+        # Vérifier que la quantité demandée est disponible
+        self.db.cursor.execute("""
+            SELECT SUM(quantity) as total
+            FROM order_items
+            WHERE product = ? AND color = ? AND status = 'À imprimer'
+        """, (product, color))
+        
+        total_available = self.db.cursor.fetchone()["total"] or 0
+        
+        if total_available < quantity_to_print:
+            raise ValueError(f"Quantité demandée ({quantity_to_print}) supérieure à la quantité disponible ({total_available})")
+        
+        # Répartition du lot, en commençant par les produits commandés en plus
+        # petite quantité: cumul des quantités dans cet ordre, puis part mise
+        # en impression de chaque ligne (la dernière peut être partielle)
+        self.db.cursor.execute("DROP TABLE IF EXISTS temp.batch_allocation")
+        self.db.cursor.execute("""
+            CREATE TEMP TABLE batch_allocation AS
+            SELECT id, order_id, quantity, MIN(quantity, ? - (running - quantity)) AS allocated
+            FROM (
+                SELECT id, order_id, quantity,
+                       SUM(quantity) OVER (ORDER BY quantity, id ROWS UNBOUNDED PRECEDING) AS running
+                FROM order_items
+                WHERE product = ? AND color = ? AND status = 'À imprimer'
+            )
+            WHERE running - quantity < ?
+        """, (quantity_to_print, product, color, quantity_to_print))
+        
+        # Ligne partiellement imprimée: la part en impression devient une nouvelle ligne
+        self.db.cursor.execute("""
+            INSERT INTO order_items (order_id, product, color, quantity, status)
+            SELECT order_id, ?, ?, allocated, 'En impression'
+            FROM batch_allocation
+            WHERE allocated < quantity
+        """, (product, color))
+        
+        # Lignes entièrement imprimées: changement de statut; ligne partielle: reste à imprimer
+        self.db.cursor.execute("""
+            UPDATE order_items
+            SET status = CASE WHEN a.allocated = a.quantity THEN 'En impression' ELSE order_items.status END,
+                quantity = order_items.quantity - CASE WHEN a.allocated = a.quantity THEN 0 ELSE a.allocated END
+            FROM batch_allocation AS a
+            WHERE order_items.id = a.id
+        """)
+        
+        # Mettre à jour les statuts des commandes dans la même transaction
+        self.db.update_order_statuses("id IN (SELECT order_id FROM batch_allocation)")
+        self.db.cursor.execute("DROP TABLE temp.batch_allocation")
+    
+    def start_printing_plate(self, color, items, printer_id=None, plate_id=None, duration_minutes=None):
+        """
+        Met en impression tous les produits d'un plateau, en une transaction
+        
+        Args:
+            color (str): Couleur du plateau
+            items (list): Produits du plateau [(produit, quantité)]
+            printer_id (int, optional): Imprimante qui imprime le plateau
+            plate_id (str, optional): Identifiant du plateau, enregistré avec les travaux
+            duration_minutes (float, optional): Durée d'impression du plateau,
+                                                répartie entre ses produits
+        
+        Returns:
+            int: Nombre de produits mis en impression
+        """
+        total = sum(quantity for _, quantity in items)
+        try:
+            self.db.conn.execute("BEGIN IMMEDIATE")
+            
+            for product, quantity in items:
+                self._allocate_batch(product, color, quantity)
+                if printer_id is not None:
+                    share = None if duration_minutes is None else duration_minutes * quantity / total
+                    self._assign_printer(printer_id, product, color, quantity, share, plate_id)
+            
+            self.db.conn.commit()
+            return total
+            
+        except Exception as e:
+            # Un plateau démarre entier ou pas du tout
+            print(f"Erreur lors du démarrage du plateau: {e}")
+            self.db.conn.rollback()
+            raise
+    
+    def _assign_printer(self, printer_id, product, color, quantity, duration_minutes=None, plate_id=None):
+        """
+        Enregistre le travail en cours d'une imprimante (sans valider la transaction)
+        
+        Les quantités démarrées sont retirées des travaux planifiés de cette
+        imprimante pour ce produit, dans l'ordre de sa file: le reste garde
+        son imprimante. Les travaux planifiés sans plus rien à imprimer sont
+        supprimés.
+        """
+        if duration_minutes is None:
+            duration_minutes = quantity * SEQUENCING_SETTINGS["minutes_per_piece"]
+        
+        self.db.cursor.execute("""
+            SELECT id, quantity
+            FROM print_jobs
+            WHERE printer_id = ? AND product = ? AND color = ? AND status = 'Planifié'
+            ORDER BY position, id
+        """, (printer_id, product, color))
+        remaining = quantity
+        for job in self.db.cursor.fetchall():
+            if remaining <= 0:
+                break
+            if job["quantity"] <= remaining:
+                self.db.cursor.execute("DELETE FROM print_jobs WHERE id = ?", (job["id"],))
+            else:
+                # Durée planifiée réduite au prorata des produits restants
+                self.db.cursor.execute("""
+                    UPDATE print_jobs
+                    SET quantity = quantity - ?,
+                        duration_minutes = duration_minutes * (quantity - ?) / quantity
+                    WHERE id = ?
+                """, (remaining, remaining, job["id"]))
+            remaining -= job["quantity"]
+        
+        self.db.cursor.execute("""
+            DELETE FROM print_jobs
+            WHERE printer_id = ? AND product = ? AND color = ? AND status = 'Planifié'
+              AND NOT EXISTS (
+                  SELECT 1 FROM order_items
+                  WHERE product = ? AND color = ? AND status = 'À imprimer'
+              )
+        """, (printer_id, product, color, product, color))
+        
+        self.db.cursor.execute("""
+            INSERT INTO print_jobs
+                (printer_id, product, color, quantity, status, duration_minutes, plate_id, started_at)
+            VALUES (?, ?, ?, ?, 'En impression', ?, ?, CURRENT_TIMESTAMP)
+        """, (printer_id, product, color, quantity, duration_minutes, plate_id))
+        
+        # Une impression Aléatoire utilise la bobine déjà chargée
+        self.db.cursor.execute("""
+            UPDATE printers
+            SET status = 'En impression',
+                loaded_color = CASE WHEN ? = 'Aléatoire' THEN loaded_color ELSE ? END
+            WHERE id = ?
+        """, (color, color, printer_id))
+    
     def get_color_summary(self):
         """
         Récupère un résumé des couleurs à imprimer pour le tableau de bord
@@ -465,10 +509,10 @@ class PrintController:
         
         self.db.cursor.execute("""
             SELECT color, COUNT(DISTINCT product) as product_count, SUM(quantity) as total_quantity
-            FROM order_items
+            FROM order_item_totals
             WHERE status = 'À imprimer' OR status = 'En impression'
             GROUP BY color
-            ORDER BY total_quantity DESC
+            ORDER BY total_quantity DESC, color
         """)
         
         for row in self.db.cursor.fetchall():
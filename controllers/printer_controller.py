@@ -0,0 +1,201 @@
+from models.database import Database
+from models.printer_fleet import FleetScheduler, Printer
+from controllers.print_controller import PrintController
+from config import DATABASE_PATH
+
+class PrinterController:
+    """Contrôleur pour le parc d'imprimantes et la répartition des travaux d'impression"""
+    
+    # Colonnes modifiables d'une imprimante
+    EDITABLE_FIELDS = ("name", "loaded_color", "bed_width", "bed_depth", "max_height", "status")
+    
+    def __init__(self):
+        self.db = Database(DATABASE_PATH)
+        self.print_controller = PrintController()
+        self.scheduler = FleetScheduler()
+    
+    def get_printers(self):
+        """Récupère les imprimantes du parc, par nom"""
+        self.db.cursor.execute("""
+            SELECT id, name, loaded_color, bed_width, bed_depth, max_height, status
+            FROM printers
+            ORDER BY name
+        """)
+        return [Printer.from_row(row) for row in self.db.cursor.fetchall()]
+    
+    def add_printer(self, name, bed_width, bed_depth, max_height, loaded_color=None):
+        """
+        Ajoute une imprimante au parc
+        
+        Returns:
+            int: Identifiant de l'imprimante, None si le nom existe déjà
+        """
+        try:
+            self.db.cursor.execute("""
+                INSERT INTO printers (name, loaded_color, bed_width, bed_depth, max_height)
+                VALUES (?, ?, ?, ?, ?)
+            """, (name, loaded_color, bed_width, bed_depth, max_height))
+            self.db.conn.commit()
+            return self.db.cursor.lastrowid
+        except Exception as e:
+            print(f"Erreur lors de l'ajout de l'imprimante: {e}")
+            self.db.conn.rollback()
+            return None
+    
+    def update_printer(self, printer_id, **fields):
+        """
+        Modifie une imprimante (couleur chargée, volume d'impression, statut...)
+        
+        Args:
+            printer_id (int): Identifiant de l'imprimante
+            **fields: Valeurs des colonnes de EDITABLE_FIELDS
+        
+        Returns:
+            bool: True si l'imprimante a été modifiée
+        """
+        unknown = set(fields) - set(self.EDITABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Champs d'imprimante inconnus: {', '.join(sorted(unknown))}")
+        if not fields:
+            return False
+        
+        assignments = ", ".join(f"{field} = ?" for field in fields)
+        try:
+            self.db.cursor.execute(f"UPDATE printers SET {assignments} WHERE id = ?",
+                                   tuple(fields.values()) + (printer_id,))
+            self.db.conn.commit()
+            return self.db.cursor.rowcount > 0
+        except Exception as e:
+            # Nom déjà pris par une autre imprimante, volume invalide...
+            print(f"Erreur lors de la modification de l'imprimante: {e}")
+            self.db.conn.rollback()
+            return False
+    
+    def remove_printer(self, printer_id):
+        """
+        Retire une imprimante du parc, avec sa file de travaux planifiés
+        
+        Raises:
+            ValueError: Si l'imprimante a des travaux en cours d'impression
+                        (la passer Hors service en attendant leur fin)
+        """
+        self.db.cursor.execute("""
+            SELECT COUNT(*) FROM print_jobs WHERE printer_id = ? AND status = 'En impression'
+        """, (printer_id,))
+        if self.db.cursor.fetchone()[0]:
+            raise ValueError("L'imprimante a des travaux en cours d'impression: "
+                             "la passer Hors service jusqu'à leur fin avant de la retirer")
+        
+        self.db.cursor.execute("DELETE FROM print_jobs WHERE printer_id = ? AND status = 'Planifié'", (printer_id,))
+        self.db.cursor.execute("DELETE FROM printers WHERE id = ?", (printer_id,))
+        self.db.conn.commit()
+        return self.db.cursor.rowcount > 0
+    
+    def get_busy_minutes(self):
+        """
+        Minutes restantes estimées des imprimantes en cours d'impression
+        
+        Returns:
+            dict: {printer_id: minutes}
+        """
+        self.db.cursor.execute("""
+            SELECT printer_id,
+                   SUM(changeover_minutes + duration_minutes)
+                   - (julianday('now') - julianday(MIN(started_at))) * 1440 AS remaining
+            FROM print_jobs
+            WHERE status = 'En impression'
+            GROUP BY printer_id
+        """)
+        return {row["printer_id"]: max(row["remaining"] or 0, 0) for row in self.db.cursor.fetchall()}
+    
+    def schedule_print_plan(self):
+        """
+        Répartit les produits restant à imprimer sur les imprimantes du parc et
+        enregistre la file de chaque imprimante (remplace la planification précédente)
+        
+        Returns:
+            list: Travaux planifiés (ScheduledJob), par imprimante puis par position
+        """
+        plan = self.print_controller.get_print_plan(include_printing=False, with_order_ids=False)
+        lines = [
+            {"product": entry["product"], "color": color, "quantity": entry["quantity"],
+             "priority": entry["priority"]}
+            for color, entries in plan.items() for entry in entries
+        ]
+        jobs = self.scheduler.schedule(self.get_printers(), lines, self.get_busy_minutes())
+        
+        try:
+            self.db.conn.execute("BEGIN IMMEDIATE")
+            self.db.cursor.execute("DELETE FROM print_jobs WHERE status = 'Planifié'")
+            self.db.cursor.executemany("""
+                INSERT INTO print_jobs
+                    (printer_id, product, color, quantity, status, position, changeover_minutes, duration_minutes)
+                VALUES (?, ?, ?, ?, 'Planifié', ?, ?, ?)
+            """, [(job.printer_id, job.product, job.color, job.quantity, job.position,
+                   job.changeover_minutes, job.duration_minutes) for job in jobs])
+            self.db.conn.commit()
+        except Exception as e:
+            print(f"Erreur lors de la planification des imprimantes: {e}")
+            self.db.conn.rollback()
+            raise
+        
+        return jobs
+    
+    def get_queue(self, printer_id):
+        """Travaux planifiés d'une imprimante, dans l'ordre de sa file"""
+        self.db.cursor.execute("""
+            SELECT id, product, color, quantity, position, changeover_minutes, duration_minutes
+            FROM print_jobs
+            WHERE printer_id = ? AND status = 'Planifié'
+            ORDER BY position
+        """, (printer_id,))
+        return [dict(row) for row in self.db.cursor.fetchall()]
+    
+    def get_assignments(self):
+        """
+        Imprimantes affectées aux produits planifiés ou en impression
+        
+        Returns:
+            dict: {(produit, couleur, statut du travail): [noms des imprimantes]}
+        """
+        self.db.cursor.execute("""
+            SELECT j.product, j.color, j.status, p.name
+            FROM print_jobs j
+            JOIN printers p ON p.id = j.printer_id
+            WHERE j.status != 'Terminé'
+            ORDER BY p.name, j.position
+        """)
+        
+        assignments = {}
+        for row in self.db.cursor.fetchall():
+            names = assignments.setdefault((row["product"], row["color"], row["status"]), [])
+            if row["name"] not in names:
+                names.append(row["name"])
+        return assignments
+    
+    def start_job(self, job_id):
+        """
+        Démarre un travail planifié sur son imprimante, dans la limite des produits restant à imprimer
+        
+        Returns:
+            int: Nombre de produits mis en impression (0 si plus rien à imprimer)
+        """
+        self.db.cursor.execute("""
+            SELECT j.printer_id, j.product, j.color, j.quantity,
+                   (SELECT SUM(quantity) FROM order_items
+                    WHERE product = j.product AND color = j.color AND status = 'À imprimer') AS available
+            FROM print_jobs j
+            WHERE j.id = ? AND j.status = 'Planifié'
+        """, (job_id,))
+        job = self.db.cursor.fetchone()
+        if job is None:
+            raise ValueError(f"Travail planifié introuvable: {job_id}")
+        
+        quantity = min(job["quantity"], job["available"] or 0)
+        if quantity <= 0:
+            self.db.cursor.execute("DELETE FROM print_jobs WHERE id = ?", (job_id,))
+            self.db.conn.commit()
+            return 0
+        
+        return self.print_controller.start_printing_batch_partial(
+            job["product"], job["color"], quantity, printer_id=job["printer_id"])
@@ -1,4 +1,7 @@
+import datetime
+
 from models.database import Database
+from models.print_sequencer import ColorBatch, PrintSequencer, order_age_days
 from config import DATABASE_PATH
 from controllers.order_controller import OrderController
 from controllers.print_controller import PrintController
@@ -13,7 +16,7 @@ class WorkflowController:
         self.db = Database(DATABASE_PATH)
         self.order_controller = OrderController()
         self.print_controller = PrintController()
-        self.inventory_controller = InventoryController()
+        self.inventory_controller = InventoryController.shared(DATABASE_PATH)
     
     def process_printing_batch(self, product, color, quantity):
         """
@@ -28,32 +31,24 @@ class WorkflowController:
         # Ajuster l'inventaire
         self.inventory_controller.adjust_inventory_after_printing(product, color, quantity)
         
-        # Récupérer les commandes impactées
-        self.db.cursor.execute("""
+        # Recalculer en une requête le statut des commandes impactées
+        impacted_orders = """
             SELECT DISTINCT order_id
             FROM order_items
             WHERE product = ? AND color = ? AND status = 'Imprimé'
-        """, (product, color))
-        
-        impacted_orders = [row["order_id"] for row in self.db.cursor.fetchall()]
+        """
+        self.db.cursor.execute(f"SELECT COUNT(*) as count FROM ({impacted_orders})", (product, color))
+        impacted_count = self.db.cursor.fetchone()["count"]
         
-        # Mettre à jour le statut de chaque commande
-        updated_orders = []
-        for order_id in impacted_orders:
-            order = self.order_controller.get_order_by_id(order_id)
-            if order:
-                previous_status = order.status
-                order.update_status()
-                if previous_status != order.status:
-                    self.order_controller.update_order_status(order_id, order.status)
-                    updated_orders.append(order_id)
+        updated_count = self.db.update_order_statuses(f"id IN ({impacted_orders})", (product, color))
+        self.db.conn.commit()
         
         return {
             "product": product,
             "color": color,
             "quantity": quantity,
-            "impacted_orders": len(impacted_orders),
-            "updated_orders": len(updated_orders)
+            "impacted_orders": impacted_count,
+            "updated_orders": updated_count
         }
     
     def ship_order(self, order_id):
@@ -82,71 +77,82 @@ class WorkflowController:
     def cancel_order(self, order_id):
         """
         Annule une commande:
-        1. Met à jour le statut de la commande
-        2. Remet les produits en stock si nécessaire
+        1. Libère les composants réservés pour la commande
+        2. Remet les produits imprimés dans le stock des produits assemblés
+        3. Met à jour le statut de la commande
         """
         # Récupérer la commande
         order = self.order_controller.get_order_by_id(order_id)
         if not order:
             return False, "Commande non trouvée"
         
-        # Récupérer les produits qui ont été imprimés
-        printed_items = order.get_items_by_status("Imprimé")
+        # Libérer les composants réservés avant tout le reste: une erreur de
+        # remise en stock ne doit pas les laisser bloqués
+        self.inventory_controller.release_order_reservations(order_id)
         
-        # Remettre ces produits en stock
-        for item in printed_items:
-            current_stock = self.inventory_controller.get_product_stock(item["product"], item["color"])
-            new_stock = current_stock + item["quantity"]
-            self.inventory_controller.update_stock(item["product"], item["color"], new_stock)
+        # Remettre en stock les produits qui ont été imprimés
+        restocked = 0
+        for item in order.get_items_by_status("Imprimé"):
+            if self.inventory_controller.update_assembled_product_stock(item["product"], item["color"], item["quantity"]):
+                restocked += item["quantity"]
         
         # Marquer la commande comme annulée
         self.order_controller.update_order_status(order_id, "Annulé")
         
-        return True, f"Commande annulée avec succès. {len(printed_items)} produits remis en stock."
+        return True, f"Commande annulée avec succès. {restocked} produits remis en stock."
     
-    def optimize_print_plan(self):
+    def optimize_print_plan(self, loaded_color=None):
         """
-        Optimise le plan d'impression en fonction de différents critères:
-        - Priorité des commandes
-        - Regroupement par couleur
-        - Stock disponible
-        - Etc.
+        Ordonne le plan d'impression par lots de couleur, en minimisant les
+        changements de bobine et le délai des commandes pondéré par leur
+        ancienneté (voir PrintSequencer et SEQUENCING_SETTINGS)
+        
+        Args:
+            loaded_color (str, optional): Couleur chargée sur l'imprimante
+        
+        Returns:
+            list: [{'color', 'stats', 'products'}] dans l'ordre d'impression proposé;
+                  stats contient total_quantity, product_count, order_count,
+                  changeover_minutes (avant le lot) et finish_minutes (fin du lot)
         """
         # Récupérer le plan d'impression actuel
         print_plan = self.print_controller.get_print_plan()
         
-        # Pour chaque couleur, calculer un score de priorité
-        color_priorities = {}
+        # Ancienneté des commandes ayant des produits à imprimer
+        self.db.cursor.execute("""
+            SELECT id, date FROM orders
+            WHERE id IN (SELECT order_id FROM order_items WHERE status = 'À imprimer' OR status = 'En impression')
+        """)
+        today = datetime.date.today()
+        order_ages = {row["id"]: order_age_days(row["date"], today) for row in self.db.cursor.fetchall()}
+        
+        batches = []
         for color, products in print_plan.items():
-            # Somme des quantités
-            total_quantity = sum(prod["quantity"] for prod in products)
-            
-            # Nombre de produits différents
-            product_count = len(products)
-            
-            # Nombre de commandes impactées
-            order_count = len(set(order_id for prod in products for order_id in prod["order_ids"]))
-            
-            # Calculer un score (plus il est élevé, plus la couleur est prioritaire)
-            score = (total_quantity * 0.5) + (product_count * 0.3) + (order_count * 0.2)
-            
-            color_priorities[color] = {
-                "score": score,
-                "total_quantity": total_quantity,
-                "product_count": product_count,
-                "order_count": order_count
-            }
-        
-        # Trier les couleurs par score décroissant
-        sorted_colors = sorted(color_priorities.items(), key=lambda x: x[1]["score"], reverse=True)
+            order_ids = set(order_id for prod in products for order_id in prod["order_ids"])
+            batches.append(ColorBatch(
+                color,
+                sum(prod["quantity"] for prod in products),
+                orders={order_id: order_ages.get(order_id, 0) for order_id in order_ids},
+                products=products
+            ))
+        
+        sequencer = PrintSequencer()
+        sequence = sequencer.sequence(batches, loaded_color)
+        report = sequencer.simulate(sequence, loaded_color)
         
         # Retourner le plan d'impression optimisé
         optimized_plan = []
-        for color, stats in sorted_colors:
+        for batch, changeover, finish in zip(sequence, report.changeovers, report.finish_minutes):
             optimized_plan.append({
-                "color": color,
-                "stats": stats,
-                "products": print_plan[color]
+                "color": batch.color,
+                "stats": {
+                    "total_quantity": batch.quantity,
+                    "product_count": len(batch.products),
+                    "order_count": len(batch.orders),
+                    "changeover_minutes": round(changeover),
+                    "finish_minutes": round(finish)
+                },
+                "products": batch.products
             })
         
-        return optimized_plan
\ No newline at end of file
+        return optimized_plan
@@ -67,7 +67,7 @@ def initialize_database(splash=None):
         splash.showMessage("Initialisation du contrôleur d'inventaire...",
                          Qt.AlignBottom | Qt.AlignCenter, Qt.white)
     
-    inventory_controller = InventoryController()
+    inventory_controller = InventoryController.shared()
     
     if splash:
         splash.showMessage("Initialisation du contrôleur d'importation...",
@@ -0,0 +1,353 @@
+"""
+Nomenclatures compilées en matrices NumPy pour le calcul des produits assemblables.
+
+La nomenclature de tous les produits est compilée une seule fois:
+- une matrice produits x composants des quantités nécessaires
+- les contraintes de couleur résolues en indices de colonnes de stock
+- une matrice composants x couleurs des stocks
+Le nombre assemblable de chaque couple produit/couleur s'obtient alors par une
+division entière et un minimum vectorisés, au lieu de parcourir chaque produit,
+chaque couleur et chaque composant en Python.
+"""
+
+import numpy as np
+
+# Marqueur de la couleur principale lors de la résolution des contraintes
+_MAIN_COLOR = object()
+
+# Stock des cases de bourrage: ne limite jamais le minimum
+_PADDING_STOCK = np.iinfo(np.int64).max
+
+
+class BOMMatrix:
+    """
+    Nomenclature compilée des produits d'un InventoryManager
+    
+    Les colonnes de la matrice de stock sont les couleurs disponibles, suivies
+    d'une colonne "n'importe quelle couleur" (stock de la couleur la mieux
+    fournie, utilisée pour l'option Aléatoire) et d'une colonne de stock nul
+    (couleur fixée absente de l'inventaire).
+    """
+    
+    def __init__(self, inventory):
+        """
+        Compile la nomenclature des produits de l'inventaire
+        
+        Args:
+            inventory (InventoryManager): Inventaire dont les produits sont compilés
+        """
+        self.colors = inventory.get_available_colors()
+        color_count = len(self.colors)
+        self.color_columns = {color: i for i, color in enumerate(self.colors)}
+        self.any_column = color_count
+        self.zero_column = color_count + 1
+        
+        self.product_names = list(inventory.products)
+        self.component_names = list(inventory.components)
+        self.component_rows = {name: i for i, name in enumerate(self.component_names)}
+        
+        # Produits calculés par Product.get_assemblable_count (quantités non
+        # strictement positives, que la division vectorisée ne reproduit pas)
+        self.fallback_products = set()
+        # Nomenclature de chaque produit compilé: [(ligne composant, quantité, colonne fixée ou -1)]
+        lines_by_product = []
+        self.product_rows = {}
+        
+        for product_name, product in inventory.products.items():
+            if not product.components:
+                continue
+            
+            if any(not isinstance(comp["quantity"], int) or comp["quantity"] <= 0
+                   for comp in product.components):
+                self.fallback_products.add(product_name)
+                continue
+            
+            lines = []
+            for comp in product.components:
+                row = self.component_rows.get(comp["name"])
+                if row is None:
+                    # Composant absent de l'inventaire: ligne de stock nul
+                    row = len(self.component_names)
+                    self.component_names.append(comp["name"])
+                    self.component_rows[comp["name"]] = row
+                
+                # La contrainte (éventuellement en chaîne) aboutit soit à la
+                # couleur principale, soit à une couleur fixe
+                resolved = product.get_component_color(comp["name"], _MAIN_COLOR)
+                if resolved is _MAIN_COLOR:
+                    column = -1
+                elif not resolved:
+                    column = self.any_column
+                else:
+                    column = self.color_columns.get(resolved, self.zero_column)
+                
+                lines.append((row, comp["quantity"], column))
+            
+            self.product_rows[product_name] = len(lines_by_product)
+            lines_by_product.append(lines)
+        
+        component_count = len(self.component_names)
+        product_count = len(lines_by_product)
+        width = max((len(lines) for lines in lines_by_product), default=0)
+        
+        # Matrice produits x composants des quantités nécessaires
+        self.quantities = np.zeros((product_count, component_count), dtype=np.int64)
+        
+        # Mêmes nomenclatures en tableaux (produit, ligne) complétés par une
+        # ligne de stock de bourrage (indice component_count)
+        self.bom_components = np.full((product_count, width), component_count, dtype=np.int64)
+        self.bom_quantities = np.ones((product_count, width), dtype=np.int64)
+        fixed_columns = np.full((product_count, width), -1, dtype=np.int64)
+        
+        for p, lines in enumerate(lines_by_product):
+            for k, (row, quantity, column) in enumerate(lines):
+                self.quantities[p, row] += quantity
+                self.bom_components[p, k] = row
+                self.bom_quantities[p, k] = quantity
+                fixed_columns[p, k] = column
+        
+        # Colonne de stock lue par chaque ligne pour chaque couleur demandée,
+        # la dernière correspondant à l'option Aléatoire (toute couleur)
+        main_columns = np.array(
+            [i if color else self.any_column for i, color in enumerate(self.colors)] + [self.any_column],
+            dtype=np.int64
+        )
+        self.stock_columns = np.where(
+            fixed_columns[:, :, None] >= 0,
+            fixed_columns[:, :, None],
+            main_columns[None, None, :]
+        )
+        self.stock_columns[:, :, -1] = self.any_column
+    
+    def stock_matrix(self, inventory):
+        """
+        Construit la matrice composants x colonnes des stocks de l'inventaire
+        
+        Returns:
+            numpy.ndarray: Stocks (composants absents à 0, ligne de bourrage en dernier)
+        """
+        stock = np.zeros((len(self.component_names) + 1, len(self.colors) + 2), dtype=np.int64)
+        
+        for component_name, colors in inventory.components.items():
+            row = self.component_rows[component_name]
+            for color, component in colors.items():
+                stock[row, self.color_columns[color]] = component.stock
+        
+        # Couleur la mieux fournie (jamais négative, comme le calcul par composant)
+        if self.colors:
+            stock[:, self.any_column] = np.maximum(stock[:, :len(self.colors)].max(axis=1), 0)
+        stock[-1, :] = _PADDING_STOCK
+        
+        return stock
+    
+    def assemblable_counts(self, stock):
+        """
+        Calcule le nombre assemblable de chaque produit compilé
+        
+        Args:
+            stock (numpy.ndarray): Matrice retournée par stock_matrix()
+        
+        Returns:
+            numpy.ndarray: Tableau produits x (couleurs + Aléatoire)
+        """
+        if not self.product_rows:
+            return np.zeros((0, len(self.colors) + 1), dtype=np.int64)
+        
+        available = stock[self.bom_components[:, :, None], self.stock_columns] // self.bom_quantities[:, :, None]
+        return available.min(axis=1)
+    
+    def reverse_index(self):
+        """
+        Index inverse des dépendances des nombres assemblables, au format CSR
+        
+        La clé d'une case de stock est ligne composant * largeur + colonne; la
+        cible d'un nombre assemblable est produit * (couleurs + 1) + couleur.
+        
+        Returns:
+            tuple: (clés triées, début de chaque clé dans les cibles (une case
+                    de plus que les clés), cibles regroupées par clé)
+        """
+        product_count, width, count_width = self.stock_columns.shape
+        stock_width = len(self.colors) + 2
+        
+        rows = np.broadcast_to(self.bom_components[:, :, None], self.stock_columns.shape).ravel()
+        keys = rows * stock_width + self.stock_columns.ravel()
+        targets = np.broadcast_to(
+            np.arange(product_count)[:, None, None] * count_width + np.arange(count_width)[None, None, :],
+            self.stock_columns.shape
+        ).ravel()
+        
+        # Ignorer les cases de bourrage, puis trier et dédoublonner les couples (clé, cible)
+        real = rows < len(self.component_names)
+        pairs = np.sort(keys[real] * (product_count * count_width) + targets[real])
+        if not len(pairs):
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, np.zeros(1, dtype=np.int64), empty
+        
+        pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+        keys, targets = np.divmod(pairs, product_count * count_width)
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        return keys[starts], np.append(starts, len(keys)), targets
+    
+    def get_assemblable_products(self, inventory, counts=None):
+        """
+        Calcule les produits assemblables avec le stock actuel de l'inventaire
+        
+        Args:
+            inventory (InventoryManager): Inventaire compilé
+            counts (numpy.ndarray, optional): Nombres déjà calculés par assemblable_counts()
+        
+        Returns:
+            dict: {nom_produit: {couleur: quantité_assemblable}}, identique à
+                  l'ancien calcul produit par produit
+        """
+        if counts is None:
+            counts = self.assemblable_counts(self.stock_matrix(inventory))
+        counts = counts.tolist()
+        component_inventory = self._component_inventory(inventory)
+        
+        return {
+            product_name: self._product_counts(
+                inventory, product_name, counts[self.product_rows[product_name]]
+                if product_name in self.product_rows else None, component_inventory
+            )
+            for product_name in self.product_names
+        }
+    
+    def get_product_assemblable(self, inventory, product_name, counts):
+        """
+        Nombres assemblables d'un seul produit, par couleur
+        
+        Returns:
+            dict: {couleur: quantité_assemblable}, ou None si le produit n'existe pas
+        """
+        if product_name not in inventory.products:
+            return None
+        
+        row = self.product_rows.get(product_name)
+        return self._product_counts(
+            inventory, product_name,
+            counts[row].tolist() if row is not None else None,
+            self._component_inventory(inventory) if product_name in self.fallback_products else None
+        )
+    
+    def _component_inventory(self, inventory):
+        """Stocks au format {nom: {couleur: quantité}} pour les produits non compilés"""
+        if not self.fallback_products:
+            return None
+        return {
+            name: {color: component.stock for color, component in colors.items()}
+            for name, colors in inventory.components.items()
+        }
+    
+    def _product_counts(self, inventory, product_name, counts_row, component_inventory):
+        """Met en forme les nombres assemblables d'un produit"""
+        product_counts = {}
+        
+        if counts_row is not None:
+            *color_counts, random_count = counts_row
+            for color, count in zip(self.colors, color_counts):
+                if count > 0:
+                    product_counts[color] = count
+        elif product_name in self.fallback_products:
+            product = inventory.products[product_name]
+            for color in self.colors:
+                count = product.get_assemblable_count(component_inventory, color)
+                if count > 0:
+                    product_counts[color] = count
+            random_count = product.get_assemblable_count(component_inventory)
+        else:
+            random_count = 0
+        
+        # Ajouter l'option "Aléatoire" si disponible
+        if random_count > 0:
+            product_counts["Aléatoire"] = random_count
+        
+        return product_counts
+
+
+class AssemblableCounts:
+    """
+    Nombres assemblables maintenus incrémentalement
+    
+    La nomenclature compilée, la matrice de stock et les nombres calculés sont
+    conservés; un changement de stock d'un couple (composant, couleur) ne
+    recalcule, grâce à l'index inverse, que les couples (produit, couleur) qui
+    en dépendent.
+    """
+    
+    def __init__(self, inventory):
+        self.bom = BOMMatrix(inventory)
+        self.stock = self.bom.stock_matrix(inventory)
+        self.counts = self.bom.assemblable_counts(self.stock)
+        self.dependent_keys, self.dependent_starts, self.dependents = self.bom.reverse_index()
+        self.stock_width = self.stock.shape[1]
+        self.row_products = sorted(self.bom.product_rows, key=self.bom.product_rows.get)
+    
+    def update_stock(self, component_name, color, stock):
+        """
+        Répercute le nouveau stock d'un composant sur les nombres qui en dépendent
+        
+        Returns:
+            bool: False si le composant ou la couleur est inconnu de la
+                  nomenclature compilée (elle doit alors être recompilée)
+        """
+        row = self.bom.component_rows.get(component_name)
+        column = self.bom.color_columns.get(color)
+        if row is None or column is None:
+            return False
+        
+        if self.stock[row, column] == stock:
+            return True
+        self.stock[row, column] = stock
+        changed = [row * self.stock_width + column]
+        
+        # La colonne "n'importe quelle couleur" suit la couleur la mieux fournie
+        any_stock = max(int(self.stock[row, :len(self.bom.colors)].max()), 0)
+        if self.stock[row, self.bom.any_column] != any_stock:
+            self.stock[row, self.bom.any_column] = any_stock
+            changed.append(row * self.stock_width + self.bom.any_column)
+        
+        groups = []
+        for key in changed:
+            i = np.searchsorted(self.dependent_keys, key)
+            if i < len(self.dependent_keys) and self.dependent_keys[i] == key:
+                groups.append(self.dependents[self.dependent_starts[i]:self.dependent_starts[i + 1]])
+        if not groups:
+            return True
+        
+        products, columns = np.divmod(np.unique(np.concatenate(groups)), self.counts.shape[1])
+        available = (
+            self.stock[self.bom.bom_components[products], self.bom.stock_columns[products, :, columns]]
+            // self.bom.bom_quantities[products]
+        )
+        self.counts[products, columns] = available.min(axis=1)
+        return True
+    
+    def dependent_products(self, inventory, component_name):
+        """
+        Produits dont les nombres assemblables dépendent du stock d'un composant
+        
+        Returns:
+            set: Noms des produits (compilés ou non) qui utilisent le composant
+        """
+        products = {
+            product_name for product_name in self.bom.fallback_products
+            if any(comp["name"] == component_name for comp in inventory.products[product_name].components)
+        }
+        
+        row = self.bom.component_rows.get(component_name)
+        if row is not None:
+            # Les cases de stock d'une ligne composant forment un intervalle de clés
+            first, last = np.searchsorted(self.dependent_keys, [row * self.stock_width, (row + 1) * self.stock_width])
+            targets = self.dependents[self.dependent_starts[first]:self.dependent_starts[last]]
+            products.update(self.row_products[p] for p in np.unique(targets // self.counts.shape[1]).tolist())
+        return products
+    
+    def get_assemblable_products(self, inventory):
+        """Produits assemblables de tout le catalogue (voir BOMMatrix.get_assemblable_products)"""
+        return self.bom.get_assemblable_products(inventory, self.counts)
+    
+    def get_product_assemblable(self, inventory, product_name):
+        """Produits assemblables d'un seul produit (voir BOMMatrix.get_product_assemblable)"""
+        return self.bom.get_product_assemblable(inventory, product_name, self.counts)
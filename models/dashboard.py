@@ -0,0 +1,178 @@
+"""
+Agrégats du tableau de bord Plasmik3D.
+
+Tous les chiffres du tableau de bord tirés des commandes (plan d'impression,
+priorités, produits et couleurs les plus demandés, résumé par couleur,
+nombre de commandes par statut) sont calculés à partir des agrégats tenus à
+jour par triggers: order_item_totals (quantités par produit, couleur et
+statut, ventilées par priorité) et order_status_counts. Les quelques
+centaines de lignes lues sont combinées en Python, sans parcourir
+l'historique des commandes.
+"""
+
+# Statuts de commande comptés par le tableau de bord
+COUNTED_ORDER_STATUSES = ("En attente", "En cours", "Prêt", "Expédié")
+
+# Produits commandés restant à imprimer, et ceux du résumé par couleur
+TO_PRINT = "À imprimer"
+PLANNED_STATUSES = ("À imprimer", "En impression")
+
+
+class DashboardSnapshot:
+    """
+    Statistiques du tableau de bord à un instant donné
+    
+    Attributs:
+        orders (dict): Nombre de commandes par statut et "Total"
+        print (dict): total_to_print, products_count, colors_count,
+                      priority_high, priority_medium, priority_low
+        inventory (dict): Résumé de l'inventaire (get_inventory_summary)
+        popular_products (list): [{'product', 'total'}] les plus commandés
+        popular_colors (list): [{'color', 'total'}] les plus demandées
+        low_stock (list): Produits en rupture de stock (get_low_stock_products)
+        color_summary (list): [{'color', 'product_count', 'total_quantity'}] à imprimer
+    
+    Reste accessible comme l'ancien dictionnaire: stats["orders"]...
+    """
+    
+    __slots__ = ("orders", "print", "inventory", "popular_products",
+                 "popular_colors", "low_stock", "color_summary")
+    
+    def __init__(self, orders, print, inventory, popular_products, popular_colors, low_stock, color_summary):
+        self.orders = orders
+        self.print = print
+        self.inventory = inventory
+        self.popular_products = popular_products
+        self.popular_colors = popular_colors
+        self.low_stock = low_stock
+        self.color_summary = color_summary
+    
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def as_dict(self):
+        """Retourne les statistiques sous forme de dictionnaire"""
+        return {key: getattr(self, key) for key in self.__slots__}
+    
+    def __repr__(self):
+        return f"DashboardSnapshot({self.as_dict()!r})"
+
+
+class DashboardAggregator:
+    """Calcule les statistiques du tableau de bord à partir des agrégats des commandes"""
+    
+    def __init__(self, db):
+        """
+        Args:
+            db (Database): Base de données des commandes
+        """
+        self.db = db
+    
+    def snapshot(self, inventory_summary, low_stock, limit=5):
+        """
+        Calcule les statistiques du tableau de bord
+        
+        Args:
+            inventory_summary (dict): Résumé de l'inventaire, calculé en mémoire
+            low_stock (list): Produits en rupture de stock, calculés en mémoire
+            limit (int): Nombre de produits et de couleurs les plus demandés
+        
+        Returns:
+            DashboardSnapshot: Statistiques du tableau de bord
+        """
+        print_stats, popular_products, popular_colors, color_summary = self._item_aggregates(limit)
+        
+        return DashboardSnapshot(
+            orders=self._order_counts(),
+            print=print_stats,
+            inventory=inventory_summary,
+            popular_products=popular_products,
+            popular_colors=popular_colors,
+            low_stock=low_stock,
+            color_summary=color_summary
+        )
+    
+    def _order_counts(self):
+        """Nombre de commandes par statut"""
+        counts = dict.fromkeys(COUNTED_ORDER_STATUSES, 0)
+        counts["Total"] = 0
+        
+        self.db.cursor.execute("SELECT status, order_count as count FROM order_status_counts")
+        for row in self.db.cursor.fetchall():
+            if row["status"] in COUNTED_ORDER_STATUSES:
+                counts[row["status"]] = row["count"]
+                counts["Total"] += row["count"]
+        
+        return counts
+    
+    def _item_aggregates(self, limit):
+        """
+        Statistiques tirées des produits commandés
+        
+        Returns:
+            tuple: (statistiques d'impression, produits populaires, couleurs populaires, résumé par couleur)
+        """
+        self.db.cursor.execute("""
+            SELECT product, color, status, quantity,
+                   quantity_high as high, quantity_medium as medium, quantity_low as low
+            FROM order_item_totals
+        """)
+        
+        print_stats = {
+            "total_to_print": 0,
+            "products_count": 0,
+            "colors_count": 0,
+            "priority_high": 0,
+            "priority_medium": 0,
+            "priority_low": 0
+        }
+        to_print_products = set()
+        to_print_colors = set()
+        product_totals = {}
+        color_totals = {}
+        planned = {}  # {couleur: [produits, quantité]}
+        
+        for row in self.db.cursor.fetchall():
+            product, color, status = row["product"], row["color"], row["status"]
+            quantity = row["quantity"] or 0
+            
+            product_totals[product] = product_totals.get(product, 0) + quantity
+            color_totals[color] = color_totals.get(color, 0) + quantity
+            
+            if status == TO_PRINT:
+                print_stats["total_to_print"] += quantity
+                print_stats["priority_high"] += row["high"]
+                print_stats["priority_medium"] += row["medium"]
+                print_stats["priority_low"] += row["low"]
+                to_print_products.add(product)
+                to_print_colors.add(color)
+            
+            if status in PLANNED_STATUSES:
+                entry = planned.setdefault(color, [set(), 0])
+                entry[0].add(product)
+                entry[1] += quantity
+        
+        print_stats["products_count"] = len(to_print_products)
+        print_stats["colors_count"] = len(to_print_colors)
+        
+        popular_products = [
+            {"product": product, "total": total}
+            for product, total in self._most_common(product_totals, limit)
+        ]
+        popular_colors = [
+            {"color": color, "total": total}
+            for color, total in self._most_common(color_totals, limit)
+        ]
+        color_summary = [
+            {"color": color, "product_count": len(products), "total_quantity": quantity}
+            for color, (products, quantity) in sorted(planned.items(), key=lambda entry: (-entry[1][1], entry[0]))
+        ]
+        
+        return print_stats, popular_products, popular_colors, color_summary
+    
+    @staticmethod
+    def _most_common(totals, limit):
+        """Les limit plus grands totaux, par total décroissant puis par nom"""
+        return sorted(totals.items(), key=lambda entry: (-entry[1], entry[0]))[:limit]
@@ -1,5 +1,99 @@
 import sqlite3
 import os
+import threading
+
+from config import DATABASE_SETTINGS, DEFAULT_PRINTERS
+
+# Statut d'une commande d'après ses produits (équivalent SQL de Order.update_status)
+ORDER_STATUS_FROM_ITEMS = """
+    CASE
+        WHEN NOT EXISTS (
+            SELECT 1 FROM order_items
+            WHERE order_id = orders.id AND status IS NOT 'Imprimé'
+        ) THEN 'Prêt'
+        WHEN EXISTS (
+            SELECT 1 FROM order_items
+            WHERE order_id = orders.id AND status = 'En impression'
+        ) THEN 'En cours'
+        ELSE 'En attente'
+    END
+"""
+
+class ConnectionManager:
+    """
+    Gestionnaire de connexions partagé pour un fichier de base de données
+    
+    Une seule instance existe par chemin de fichier. Chaque thread reçoit sa
+    propre connexion SQLite, ouverte à la demande et partagée par toutes les
+    instances de Database de ce thread. Le schéma n'est initialisé qu'une fois
+    par processus.
+    """
+    
+    _managers = {}
+    _managers_lock = threading.Lock()
+    
+    @classmethod
+    def for_path(cls, db_path):
+        """Retourne le gestionnaire associé à un fichier de base de données"""
+        key = os.path.abspath(db_path)
+        with cls._managers_lock:
+            manager = cls._managers.get(key)
+            if manager is None:
+                manager = cls(key)
+                cls._managers[key] = manager
+            return manager
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.schema_lock = threading.Lock()
+        self.schema_ready = False
+        self._local = threading.local()
+    
+    def acquire(self):
+        """
+        Retourne la connexion du thread courant en incrémentant son compteur
+        de références (la connexion est ouverte si nécessaire)
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            self._local.refcount = 0
+        self._local.refcount += 1
+        return conn
+    
+    def release(self):
+        """
+        Décrémente le compteur de références de la connexion du thread courant
+        et la ferme lorsqu'elle n'est plus utilisée
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        
+        self._local.refcount -= 1
+        if self._local.refcount <= 0:
+            conn.close()
+            self._local.conn = None
+            self._local.refcount = 0
+    
+    def _open(self):
+        """Ouvre une connexion configurée avec les pragmas de DATABASE_SETTINGS"""
+        busy_timeout = DATABASE_SETTINGS["busy_timeout_ms"]
+        conn = sqlite3.connect(self.db_path, timeout=busy_timeout / 1000)
+        conn.row_factory = sqlite3.Row  # Pour accéder aux colonnes par nom
+        
+        # Le mode WAL permet de lire pendant qu'un autre thread écrit
+        conn.execute(f"PRAGMA journal_mode = {DATABASE_SETTINGS['journal_mode']}")
+        conn.execute(f"PRAGMA synchronous = {DATABASE_SETTINGS['synchronous']}")
+        conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout)}")
+        # Valeur négative: taille du cache en Kio plutôt qu'en pages
+        conn.execute(f"PRAGMA cache_size = -{int(DATABASE_SETTINGS['cache_size_kib'])}")
+        conn.execute(f"PRAGMA mmap_size = {int(DATABASE_SETTINGS['mmap_size'])}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        
+        return conn
+
 
 class Database:
     """Gestionnaire de la base de données SQLite"""
@@ -7,28 +101,45 @@ class Database:
     def __init__(self, db_path):
         """Initialise la connexion à la base de données"""
         self.db_path = db_path
-        self.conn = None
-        self.cursor = None
+        self.manager = ConnectionManager.for_path(db_path)
+        # Connexion et curseur propres à chaque thread utilisant cette instance
+        self._local = threading.local()
         
         # Créer le dossier parent si nécessaire
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
-        # Initialiser la base de données
+        # Initialiser la base de données (une seule fois par processus)
         self.connect()
-        self.create_tables()
+        with self.manager.schema_lock:
+            if not self.manager.schema_ready:
+                self.create_tables()
+                self.manager.schema_ready = True
     
     def connect(self):
-        """Établit la connexion à la base de données"""
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.row_factory = sqlite3.Row  # Pour accéder aux colonnes par nom
-        self.cursor = self.conn.cursor()
+        """Établit la connexion à la base de données pour le thread courant"""
+        if getattr(self._local, 'conn', None) is None:
+            self._local.conn = self.manager.acquire()
+            self._local.cursor = self._local.conn.cursor()
+        return self._local.conn
+    
+    @property
+    def conn(self):
+        """Connexion SQLite du thread courant"""
+        return self.connect()
+    
+    @property
+    def cursor(self):
+        """Curseur de cette instance pour le thread courant"""
+        self.connect()
+        return self._local.cursor
     
     def close(self):
-        """Ferme la connexion à la base de données"""
-        if self.conn:
-            self.conn.close()
-            self.conn = None
-            self.cursor = None
+        """Libère la connexion du thread courant (fermée quand plus aucune instance ne l'utilise)"""
+        if getattr(self._local, 'conn', None) is not None:
+            self._local.cursor.close()
+            self._local.conn = None
+            self._local.cursor = None
+            self.manager.release()
     
     def create_tables(self):
         """Crée les tables de la base de données si elles n'existent pas"""
@@ -110,15 +221,71 @@ class Database:
         
         self.conn.commit()
         
-    def migrate_inventory_data(self):
-        """Migration des données d'inventaire vers le nouveau schéma avec composants"""
-        # Vérifier si la colonne component existe déjà dans la table inventory
-        self.cursor.execute("PRAGMA table_info(inventory)")
-        columns = self.cursor.fetchall()
-        column_names = [column['name'] for column in columns]
+        # Appliquer les migrations de schéma en attente
+        self.migrate()
+    
+    def migrate(self):
+        """
+        Applique dans l'ordre les migrations de schéma non encore appliquées
+        
+        Chaque migration est exécutée dans sa propre transaction, ouverte
+        explicitement par BEGIN IMMEDIATE: sans elle, le module sqlite3
+        exécute CREATE, ALTER et les triggers hors transaction, et une
+        migration interrompue laisserait ses tables sans sa ligne dans
+        schema_version. La version est relue une fois le verrou d'écriture
+        pris: une migration appliquée entre-temps par un autre processus
+        n'est pas rejouée.
+        
+        Returns:
+            int: Version du schéma après migration
+        """
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        self.conn.commit()
+        
+        current_version = self.get_schema_version()
+        
+        for version, description, method_name in self.MIGRATIONS:
+            if version <= current_version:
+                continue
+            
+            try:
+                self.conn.execute("BEGIN IMMEDIATE")
+                if self.get_schema_version() < version:
+                    getattr(self, method_name)()
+                    self.cursor.execute(
+                        "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                        (version, description)
+                    )
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            
+            current_version = version
         
-        # Si la migration est déjà faite, ne rien faire
-        if 'component' in column_names:
+        return current_version
+    
+    def get_schema_version(self):
+        """Retourne la version actuelle du schéma (0 si aucune migration appliquée)"""
+        self.cursor.execute("SELECT MAX(version) AS version FROM schema_version")
+        row = self.cursor.fetchone()
+        return row['version'] or 0
+    
+    def _column_exists(self, table, column):
+        """Vérifie si une colonne existe dans une table"""
+        self.cursor.execute(f"PRAGMA table_info({table})")
+        return any(row['name'] == column for row in self.cursor.fetchall())
+    
+    def _migrate_inventory_components(self):
+        """Migration des données d'inventaire vers le nouveau schéma avec composants"""
+        # Les bases créées avec le schéma actuel ont déjà la colonne
+        if self._column_exists('inventory', 'component'):
             return
             
         # Sauvegarde des données actuelles
@@ -150,5 +317,532 @@ class Database:
         
         # Supprimer l'ancienne table
         self.cursor.execute("DROP TABLE inventory_old")
+    
+    def _migrate_component_tables(self):
+        """Crée les tables de gestion des composants et des produits assemblés"""
+        # Table des composants
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS components (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            color TEXT NOT NULL,
+            stock INTEGER DEFAULT 0,
+            alert_threshold INTEGER DEFAULT 3,
+            description TEXT DEFAULT '',
+            UNIQUE(name, color)
+        )
+        ''')
+        
+        # Table des produits
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS products (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            description TEXT
+        )
+        ''')
+        
+        # Table des produits assemblés
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS assembled_products (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_name TEXT NOT NULL,
+            color TEXT NOT NULL,
+            quantity INTEGER DEFAULT 0,
+            UNIQUE(product_name, color)
+        )
+        ''')
+        
+        # Colonnes ajoutées après la création des premières bases
+        if not self._column_exists('components', 'description'):
+            self.cursor.execute("ALTER TABLE components ADD COLUMN description TEXT DEFAULT ''")
+        
+        if not self._column_exists('product_components', 'color_constraint'):
+            self.cursor.execute("ALTER TABLE product_components ADD COLUMN color_constraint TEXT")
+    
+    def _migrate_indexes(self):
+        """Crée les index secondaires utilisés par le plan d'impression et les listes de commandes"""
+        # Plan d'impression: filtres sur statut, couleur et produit
+        self.cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_order_items_status_color_product
+        ON order_items (status, color, product)
+        ''')
+        
+        # Chargement des produits d'une commande
+        self.cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_order_items_order_id
+        ON order_items (order_id)
+        ''')
+        
+        # Listes de commandes filtrées par statut et triées par date
+        self.cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_orders_status_date
+        ON orders (status, date)
+        ''')
+        
+        # Liste de toutes les commandes triées par date (pagination par curseur)
+        self.cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_orders_date_id
+        ON orders (date, id)
+        ''')
+    
+    def _migrate_import_ledger(self):
+        """Crée le registre des fichiers Shopify importés"""
+        # Une ligne par fichier importé: empreinte et plus haute commande vue
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS import_ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_hash TEXT UNIQUE NOT NULL,
+            file_name TEXT NOT NULL,
+            file_size INTEGER NOT NULL,
+            max_order_number INTEGER,
+            max_created_at TEXT,
+            imported_count INTEGER DEFAULT 0,
+            skipped_rows INTEGER DEFAULT 0,
+            imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+    
+    def _migrate_data_versions(self):
+        """Crée les compteurs de version des tables, incrémentés par des triggers"""
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS data_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        
+        for table in self.VERSIONED_TABLES:
+            self._create_version_triggers(table)
+    
+    def _create_version_triggers(self, table):
+        """Crée le compteur de version d'une table et les triggers qui l'incrémentent"""
+        self.cursor.execute(
+            "INSERT OR IGNORE INTO data_versions (table_name, version) VALUES (?, 0)",
+            (table,)
+        )
+        
+        # Toute écriture sur la table, quel que soit le contrôleur, change sa version
+        for operation in ("INSERT", "UPDATE", "DELETE"):
+            self.cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_{operation.lower()}_version
+            AFTER {operation} ON {table}
+            BEGIN
+                UPDATE data_versions SET version = version + 1 WHERE table_name = '{table}';
+            END
+            ''')
+    
+    def _migrate_component_reservations(self):
+        """Crée le registre des réservations de composants"""
+        # Une ligne par composant et couleur réservés; les lignes d'une même
+        # réservation partagent son identifiant
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS component_reservations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            reservation_id TEXT NOT NULL,
+            component_name TEXT NOT NULL,
+            color TEXT NOT NULL,
+            quantity INTEGER NOT NULL CHECK (quantity > 0),
+            order_id TEXT,
+            status TEXT NOT NULL DEFAULT 'Réservé',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            closed_at TIMESTAMP
+        )
+        ''')
+        
+        self.cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_component_reservations_reservation
+        ON component_reservations (reservation_id)
+        ''')
+        
+        self.cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_component_reservations_order
+        ON component_reservations (order_id)
+        ''')
+        
+        # Stock réservé d'un composant: seules les réservations actives sont indexées
+        self.cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_component_reservations_active
+        ON component_reservations (component_name, color)
+        WHERE status = 'Réservé'
+        ''')
+        
+        self._create_version_triggers("component_reservations")
+    
+    def _migrate_order_rollups(self):
+        """Crée les tables d'agrégats des commandes, tenues à jour par des triggers"""
+        # Quantités par produit, couleur et statut (statut NULL enregistré comme '')
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS order_item_totals (
+            product TEXT NOT NULL,
+            color TEXT NOT NULL,
+            status TEXT NOT NULL,
+            line_count INTEGER NOT NULL DEFAULT 0,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            quantity_high INTEGER NOT NULL DEFAULT 0,
+            quantity_medium INTEGER NOT NULL DEFAULT 0,
+            quantity_low INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (product, color, status)
+        )
+        ''')
+        
+        # Nombre de commandes par statut
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS order_status_counts (
+            status TEXT PRIMARY KEY,
+            order_count INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        
+        for operation, changes in self.ROLLUP_TRIGGERS.items():
+            table, event = operation
+            self.cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.split()[0].lower()}_rollup
+            AFTER {event} ON {table}
+            BEGIN
+                {changes}
+            END
+            ''')
+        
+        self.rebuild_rollups()
+    
+    def _migrate_printer_fleet(self):
+        """Crée le parc d'imprimantes et les travaux d'impression qui leur sont affectés"""
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS printers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            loaded_color TEXT,
+            bed_width INTEGER NOT NULL,
+            bed_depth INTEGER NOT NULL,
+            max_height INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'Disponible'
+        )
+        ''')
+        
+        # File de chaque imprimante (travaux planifiés, par position) et
+        # travaux en cours ou terminés; un travail porte sur un produit et une couleur
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS print_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            printer_id INTEGER NOT NULL,
+            product TEXT NOT NULL,
+            color TEXT NOT NULL,
+            quantity INTEGER NOT NULL CHECK (quantity > 0),
+            status TEXT NOT NULL DEFAULT 'Planifié',
+            position INTEGER,
+            changeover_minutes REAL NOT NULL DEFAULT 0,
+            duration_minutes REAL NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP,
+            FOREIGN KEY (printer_id) REFERENCES printers (id)
+        )
+        ''')
+        
+        # Travaux actifs (planifiés ou en cours) d'une imprimante et d'un produit
+        self.cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_print_jobs_active
+        ON print_jobs (product, color, status)
+        WHERE status != 'Terminé'
+        ''')
+        
+        self.cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_print_jobs_printer
+        ON print_jobs (printer_id, status, position)
+        ''')
+        
+        self.cursor.executemany(
+            "INSERT OR IGNORE INTO printers (name, bed_width, bed_depth, max_height) VALUES (?, ?, ?, ?)",
+            [(printer["name"], printer["bed_width"], printer["bed_depth"], printer["max_height"])
+             for printer in DEFAULT_PRINTERS]
+        )
+        
+        self._create_version_triggers("printers")
+        self._create_version_triggers("print_jobs")
+    
+    def _migrate_plate_packing(self):
+        """Crée les profils d'impression des composants et regroupe les travaux par plateau"""
+        # Emprise sur le plateau (mm), hauteur et durée d'impression d'une pièce,
+        # par composant comme dans product_components (un produit sans
+        # nomenclature est son propre composant)
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS component_print_profiles (
+            component_name TEXT PRIMARY KEY,
+            width_mm REAL NOT NULL CHECK (width_mm > 0),
+            depth_mm REAL NOT NULL CHECK (depth_mm > 0),
+            height_mm REAL NOT NULL CHECK (height_mm > 0),
+            print_minutes REAL NOT NULL CHECK (print_minutes > 0)
+        )
+        ''')
+        
+        if not self._column_exists('print_jobs', 'plate_id'):
+            self.cursor.execute("ALTER TABLE print_jobs ADD COLUMN plate_id TEXT")
+        
+        self._create_version_triggers("component_print_profiles")
+    
+    # Ajout (signe 1) ou retrait (signe -1) d'une ligne de commande dans order_item_totals;
+    # la priorité d'une ligne dépend de sa quantité (voir get_print_plan)
+    _ITEM_TOTALS_DELTA = """
+        INSERT INTO order_item_totals
+            (product, color, status, line_count, quantity, quantity_high, quantity_medium, quantity_low)
+        VALUES ({row}.product, {row}.color, COALESCE({row}.status, ''), {sign},
+                {sign} * COALESCE({row}.quantity, 0),
+                {sign} * (CASE WHEN {row}.quantity > 3 THEN {row}.quantity ELSE 0 END),
+                {sign} * (CASE WHEN {row}.quantity > 1 AND {row}.quantity <= 3 THEN {row}.quantity ELSE 0 END),
+                {sign} * (CASE WHEN {row}.quantity = 1 THEN {row}.quantity ELSE 0 END))
+        ON CONFLICT (product, color, status) DO UPDATE SET
+            line_count = line_count + excluded.line_count,
+            quantity = quantity + excluded.quantity,
+            quantity_high = quantity_high + excluded.quantity_high,
+            quantity_medium = quantity_medium + excluded.quantity_medium,
+            quantity_low = quantity_low + excluded.quantity_low;
+    """
+    
+    # Suppression du groupe d'une ligne retirée lorsqu'il ne compte plus aucune ligne
+    _ITEM_TOTALS_CLEANUP = """
+        DELETE FROM order_item_totals
+        WHERE product = OLD.product AND color = OLD.color
+          AND status = COALESCE(OLD.status, '') AND line_count = 0;
+    """
+    
+    _STATUS_COUNTS_DELTA = """
+        INSERT INTO order_status_counts (status, order_count)
+        VALUES (COALESCE({row}.status, ''), {sign})
+        ON CONFLICT (status) DO UPDATE SET order_count = order_count + excluded.order_count;
+    """
+    
+    _STATUS_COUNTS_CLEANUP = """
+        DELETE FROM order_status_counts
+        WHERE status = COALESCE(OLD.status, '') AND order_count = 0;
+    """
+    
+    # Triggers des agrégats: {(table, événement): instructions}; une insertion
+    # ne peut pas vider un groupe, seul le retrait d'une ligne est suivi d'un nettoyage
+    ROLLUP_TRIGGERS = {
+        ("order_items", "INSERT"): _ITEM_TOTALS_DELTA.format(row="NEW", sign=1),
+        ("order_items", "DELETE"): _ITEM_TOTALS_DELTA.format(row="OLD", sign=-1) + _ITEM_TOTALS_CLEANUP,
+        ("order_items", "UPDATE OF product, color, quantity, status"):
+            _ITEM_TOTALS_DELTA.format(row="OLD", sign=-1) + _ITEM_TOTALS_DELTA.format(row="NEW", sign=1)
+            + _ITEM_TOTALS_CLEANUP,
+        ("orders", "INSERT"): _STATUS_COUNTS_DELTA.format(row="NEW", sign=1),
+        ("orders", "DELETE"): _STATUS_COUNTS_DELTA.format(row="OLD", sign=-1) + _STATUS_COUNTS_CLEANUP,
+        ("orders", "UPDATE OF status"):
+            _STATUS_COUNTS_DELTA.format(row="OLD", sign=-1) + _STATUS_COUNTS_DELTA.format(row="NEW", sign=1)
+            + _STATUS_COUNTS_CLEANUP,
+    }
+    
+    # Contenu attendu des agrégats, recalculé depuis les tables de commandes
+    ROLLUP_QUERIES = {
+        "order_item_totals": """
+            SELECT product, color, COALESCE(status, '') AS status,
+                   COUNT(*) AS line_count,
+                   SUM(COALESCE(quantity, 0)) AS quantity,
+                   SUM(CASE WHEN quantity > 3 THEN quantity ELSE 0 END) AS quantity_high,
+                   SUM(CASE WHEN quantity > 1 AND quantity <= 3 THEN quantity ELSE 0 END) AS quantity_medium,
+                   SUM(CASE WHEN quantity = 1 THEN quantity ELSE 0 END) AS quantity_low
+            FROM order_items
+            GROUP BY product, color, COALESCE(status, '')
+        """,
+        "order_status_counts": """
+            SELECT COALESCE(status, '') AS status, COUNT(*) AS order_count
+            FROM orders
+            GROUP BY COALESCE(status, '')
+        """,
+    }
+    
+    # Tables dont les modifications sont suivies dans data_versions
+    # (les tables créées par des migrations ultérieures ajoutent leurs triggers)
+    VERSIONED_TABLES = (
+        "orders", "order_items", "components", "products",
+        "product_components", "assembled_products", "color_variants"
+    )
+    
+    def get_data_versions(self, tables=None):
+        """
+        Retourne la version courante des tables suivies
+        
+        Args:
+            tables (iterable, optional): Tables à lire (toutes par défaut)
+        
+        Returns:
+            dict: {nom_table: version}
+        """
+        self.cursor.execute("SELECT table_name, version FROM data_versions")
+        versions = {row['table_name']: row['version'] for row in self.cursor.fetchall()}
+        if tables is None:
+            return versions
+        return {table: versions.get(table, 0) for table in tables}
+    
+    def update_order_statuses(self, where, params=()):
+        """
+        Recalcule en une requête le statut des commandes à partir de leurs
+        produits, comme Order.update_status (sans valider la transaction)
+        
+        Les commandes expédiées ou annulées gardent leur statut: il ne dépend
+        plus de leurs produits.
+        
+        Args:
+            where (str): Condition SQL sur la table orders (ex: "id IN (...)")
+            params (tuple): Paramètres de la condition
+        
+        Returns:
+            int: Nombre de commandes dont le statut a changé
+        """
+        # Seules les commandes dont le statut change sont écrites
+        self.cursor.execute(f"""
+            UPDATE orders
+            SET status = {ORDER_STATUS_FROM_ITEMS}
+            WHERE ({where})
+              AND COALESCE(status, '') NOT IN ('Expédié', 'Annulé')
+              AND status IS NOT {ORDER_STATUS_FROM_ITEMS}
+        """, params)
+        return self.cursor.rowcount
+    
+    def finish_print_jobs(self, product, color):
+        """
+        Termine les travaux en cours d'un produit et d'une couleur lorsque plus
+        aucun produit commandé n'est en impression, puis libère les imprimantes
+        sans autre travail en cours (sans valider la transaction)
+        
+        Returns:
+            int: Nombre de travaux terminés
+        """
+        self.cursor.execute("""
+            UPDATE print_jobs
+            SET status = 'Terminé', finished_at = CURRENT_TIMESTAMP
+            WHERE product = ? AND color = ? AND status = 'En impression'
+              AND NOT EXISTS (
+                  SELECT 1 FROM order_items
+                  WHERE product = ? AND color = ? AND status = 'En impression'
+              )
+        """, (product, color, product, color))
+        finished = self.cursor.rowcount
+        
+        if finished:
+            self.cursor.execute("""
+                UPDATE printers
+                SET status = 'Disponible'
+                WHERE status = 'En impression'
+                  AND NOT EXISTS (
+                      SELECT 1 FROM print_jobs
+                      WHERE printer_id = printers.id AND status = 'En impression'
+                  )
+            """)
+        return finished
+    
+    def rebuild_rollups(self):
+        """Recalcule entièrement les tables d'agrégats des commandes (sans valider la transaction)"""
+        for table, query in self.ROLLUP_QUERIES.items():
+            self.cursor.execute(f"DELETE FROM {table}")
+            self.cursor.execute(f"INSERT INTO {table} {query}")
+    
+    def check_rollups(self, repair=False):
+        """
+        Compare les tables d'agrégats à un recalcul depuis les tables de commandes
+        
+        Args:
+            repair (bool): Si True, reconstruit les agrégats en cas d'écart
+        
+        Returns:
+            dict: Écarts par table {table: [(ligne attendue ou None, ligne enregistrée ou None)]}
+                  (vide si les agrégats sont cohérents)
+        """
+        differences = {}
+        for table, query in self.ROLLUP_QUERIES.items():
+            self.cursor.execute(query)
+            expected = {tuple(row) for row in self.cursor.fetchall()}
+            self.cursor.execute(f"SELECT * FROM {table}")
+            stored = {tuple(row) for row in self.cursor.fetchall()}
+            
+            if expected != stored:
+                # Lignes indexées par leur clé (produit, couleur, statut) ou (statut)
+                key_size = 3 if table == "order_item_totals" else 1
+                expected_rows = {row[:key_size]: row for row in expected}
+                stored_rows = {row[:key_size]: row for row in stored}
+                differences[table] = [
+                    (expected_rows.get(key), stored_rows.get(key))
+                    for key in sorted(expected_rows.keys() | stored_rows.keys())
+                    if expected_rows.get(key) != stored_rows.get(key)
+                ]
+        
+        if differences and repair:
+            self.rebuild_rollups()
+            self.conn.commit()
+        
+        return differences
+    
+    # Migrations de schéma: (version, description, méthode), dans l'ordre d'application
+    MIGRATIONS = [
+        (1, "Colonne component dans la table inventory", "_migrate_inventory_components"),
+        (2, "Tables des composants, produits et produits assemblés", "_migrate_component_tables"),
+        (3, "Index secondaires sur order_items et orders", "_migrate_indexes"),
+        (4, "Registre des importations Shopify", "_migrate_import_ledger"),
+        (5, "Compteurs de version des tables", "_migrate_data_versions"),
+        (6, "Registre des réservations de composants", "_migrate_component_reservations"),
+        (7, "Agrégats des commandes tenus par triggers", "_migrate_order_rollups"),
+        (8, "Parc d'imprimantes et travaux d'impression", "_migrate_printer_fleet"),
+        (9, "Profils d'impression des composants et plateaux", "_migrate_plate_packing"),
+    ]
+    
+    # Requêtes fréquentes dont le plan d'exécution doit utiliser les index
+    HOT_QUERIES = {
+        "print_plan": (
+            "SELECT product, color, SUM(quantity), GROUP_CONCAT(order_id), status "
+            "FROM order_items WHERE status IN ('À imprimer', 'En impression') "
+            "GROUP BY product, color, status",
+            ()
+        ),
+        "print_plan_by_color": (
+            "SELECT product, SUM(quantity) FROM order_items "
+            "WHERE status = 'À imprimer' AND color = ? GROUP BY product",
+            ("Noir",)
+        ),
+        "printing_batch": (
+            "SELECT id, order_id, quantity FROM order_items "
+            "WHERE product = ? AND color = ? AND status = 'À imprimer'",
+            ("SpinRing", "Noir")
+        ),
+        "order_items": (
+            "SELECT product, color, quantity, status FROM order_items WHERE order_id = ?",
+            ("#1000",)
+        ),
+        "orders_by_status": (
+            "SELECT id, date FROM orders WHERE status = ? ORDER BY date DESC",
+            ("En attente",)
+        ),
+        "available_stock": (
+            "SELECT c.stock - COALESCE(SUM(r.quantity), 0) FROM components c "
+            "LEFT JOIN component_reservations r ON r.component_name = c.name "
+            "AND r.color = c.color AND r.status = 'Réservé' "
+            "WHERE c.name = ? AND c.color = ? GROUP BY c.id",
+            ("Corps", "Noir")
+        ),
+        "orders_page": (
+            "SELECT id, date FROM orders WHERE (date < ? OR (date = ? AND id < ?)) "
+            "ORDER BY date DESC, id DESC LIMIT 200",
+            ("2025-04-18", "2025-04-18", "#1000")
+        ),
+    }
+    
+    def explain_query_plan(self, query, params=()):
+        """
+        Retourne le plan d'exécution SQLite d'une requête
+        
+        Returns:
+            list: Lignes de détail de EXPLAIN QUERY PLAN
+        """
+        self.cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+        return [row['detail'] for row in self.cursor.fetchall()]
+    
+    def report_query_plans(self):
+        """
+        Calcule le plan d'exécution des requêtes fréquentes
         
-        self.conn.commit()
\ No newline at end of file
+        Returns:
+            dict: {nom_requête: [lignes de détail du plan]}
+        """
+        return {
+            name: self.explain_query_plan(query, params)
+            for name, (query, params) in self.HOT_QUERIES.items()
+        }
@@ -7,9 +7,15 @@ Ce module définit les structures pour:
 - Les relations entre composants et produits
 """
 
+from models.bom_matrix import AssemblableCounts
+from models.mrp import RequirementsPlanner
+
 class InventoryItem:
     """Classe de base pour tout élément d'inventaire (composant ou produit)"""
     
+    # Attributs fixes: pas de __dict__ par instance (un objet par composant et couleur)
+    __slots__ = ("name", "color", "stock", "alert_threshold")
+    
     def __init__(self, name, color=None, stock=0, alert_threshold=3):
         self.name = name
         self.color = color  # Peut être None pour les composants sans couleur spécifique
@@ -42,6 +48,8 @@ class InventoryItem:
 class Component(InventoryItem):
     """Modèle pour un composant (pièce individuelle)"""
     
+    __slots__ = ("used_in_products",)
+    
     def __init__(self, name, color=None, stock=0, alert_threshold=3):
         super().__init__(name, color, stock, alert_threshold)
         self.used_in_products = []  # Liste des produits utilisant ce composant
@@ -55,6 +63,8 @@ class Component(InventoryItem):
 class Product:
     """Modèle pour un produit (composé de plusieurs composants)"""
     
+    __slots__ = ("name", "description", "components", "assembled_items", "color_constraints")
+    
     def __init__(self, name, description=""):
         self.name = name
         self.description = description
@@ -216,6 +226,8 @@ class Product:
 class ColorVariant:
     """Modèle pour gérer les variantes de couleurs"""
     
+    __slots__ = ("base_color", "variant_name", "hex_code")
+    
     def __init__(self, base_color, variant_name, hex_code):
         self.base_color = base_color  # Couleur de base (ex: "Bleu")
         self.variant_name = variant_name  # Nom de la variante (ex: "Bleu Ciel")
@@ -232,6 +244,32 @@ class InventoryManager:
         self.components = {}  # {nom: {couleur: Component}}
         self.products = {}  # {nom: Product}
         self.color_variants = {}  # {variante: ColorVariant}
+        # Nombres assemblables compilés, maintenus à chaque changement de stock
+        self._assemblable = None
+        # Nomenclatures compilées pour le calcul des besoins en composants
+        self._requirements = None
+    
+    def __getstate__(self):
+        # Les caches sont recompilés à la demande plutôt que sérialisés
+        state = self.__dict__.copy()
+        state['_assemblable'] = None
+        state['_requirements'] = None
+        return state
+    
+    def invalidate_assemblable(self):
+        """
+        Oublie les nomenclatures compilées (nombres assemblables et besoins):
+        à appeler après toute modification de la structure (produits,
+        nomenclatures, composants supprimés)
+        """
+        self._assemblable = None
+        self._requirements = None
+    
+    def _stock_changed(self, component):
+        """Répercute le stock d'un composant sur les nombres assemblables compilés"""
+        if self._assemblable is not None and not self._assemblable.update_stock(
+                component.name, component.color, component.stock):
+            self._assemblable = None
     
     def add_product(self, name, description=""):
         """Ajoute un produit au catalogue"""
@@ -243,6 +281,7 @@ class InventoryManager:
             # Créer un nouveau produit
             product = Product(name, description)
             self.products[name] = product
+            self.invalidate_assemblable()
             return product
         except Exception as e:
             # Pour le diagnostic
@@ -263,6 +302,7 @@ class InventoryManager:
             self.components[name][color].stock += stock
             self.components[name][color].alert_threshold = alert_threshold
         
+        self._stock_changed(self.components[name][color])
         return self.components[name][color]
     
     def update_component_stock(self, component_name, color, quantity):
@@ -281,6 +321,7 @@ class InventoryManager:
         else:
             component.remove_stock(abs(quantity))
         
+        self._stock_changed(component)
         return component
     
     def update_assembled_product_stock(self, product_name, color, quantity):
@@ -297,61 +338,80 @@ class InventoryManager:
         
         return product
     
-    def assemble_product(self, product_name, color, quantity=1, component_colors=None):
+    def set_component_stock(self, component_name, color, stock):
+        """Fixe le stock d'un composant (relu de la base après une écriture concurrente)"""
+        if component_name not in self.components or color not in self.components[component_name]:
+            return self.add_component(component_name, color, stock)
+        
+        component = self.components[component_name][color]
+        component.stock = stock
+        self._stock_changed(component)
+        return component
+    
+    def get_component_consumption(self, product_name, color, quantity=1, component_colors=None):
         """
-        Assemble un produit à partir de ses composants
+        Calcule les composants consommés par l'assemblage d'un produit
         
         Args:
             product_name (str): Nom du produit à assembler
             color (str): Couleur principale du produit
             quantity (int): Nombre de produits à assembler
             component_colors (dict, optional): Couleurs spécifiques pour certains composants
-                                             {nom_composant: couleur}
         
         Returns:
-            bool: True si l'assemblage a réussi, False sinon
+            list: Lignes (composant, couleur, quantité), une par composant et couleur
         """
         if product_name not in self.products:
             raise ValueError(f"Produit {product_name} non trouvé")
         
         product = self.products[product_name]
         
-        # Vérifier si suffisamment de composants sont disponibles
+        # Un même composant et une même couleur peuvent venir de plusieurs lignes
+        consumption = {}
         for comp in product.components:
-            component_name = comp["name"]
-            comp_quantity = comp["quantity"] * quantity
-            
-            # Déterminer la couleur du composant selon les contraintes
-            comp_color = product.get_component_color(component_name, color, component_colors)
-            
-            # Vérifier le stock
+            comp_color = product.get_component_color(comp["name"], color, component_colors)
+            key = (comp["name"], comp_color)
+            consumption[key] = consumption.get(key, 0) + comp["quantity"] * quantity
+        
+        return [(name, comp_color, comp_quantity) for (name, comp_color), comp_quantity in consumption.items()]
+    
+    def assemble_product(self, product_name, color, quantity=1, component_colors=None):
+        """
+        Assemble un produit à partir de ses composants (en mémoire)
+        
+        Tous les composants sont vérifiés avant d'être retirés: l'assemblage
+        est fait en entier ou pas du tout. Entre plusieurs opérateurs,
+        l'atomicité est assurée par le registre des réservations
+        (voir ReservationLedger).
+        
+        Args:
+            product_name (str): Nom du produit à assembler
+            color (str): Couleur principale du produit
+            quantity (int): Nombre de produits à assembler
+            component_colors (dict, optional): Couleurs spécifiques pour certains composants
+                                             {nom_composant: couleur}
+        
+        Returns:
+            bool: True si l'assemblage a réussi
+        
+        Raises:
+            ValueError: Si le produit n'existe pas ou si un composant manque
+        """
+        consumption = self.get_component_consumption(product_name, color, quantity, component_colors)
+        
+        # Vérifier si suffisamment de composants sont disponibles
+        for component_name, comp_color, comp_quantity in consumption:
             if (component_name not in self.components or 
                 comp_color not in self.components[component_name] or 
                 self.components[component_name][comp_color].stock < comp_quantity):
                 raise ValueError(f"Stock insuffisant pour le composant {component_name} en {comp_color}")
         
-        # Tous les composants sont disponibles, procéder à l'assemblage
-        try:
-            # Retirer les composants de l'inventaire
-            for comp in product.components:
-                component_name = comp["name"]
-                comp_quantity = comp["quantity"] * quantity
-                
-                # Déterminer la couleur du composant
-                comp_color = product.get_component_color(component_name, color, component_colors)
-                
-                # Retirer du stock
-                self.update_component_stock(component_name, comp_color, -comp_quantity)
-            
-            # Ajouter le produit assemblé à l'inventaire
-            self.update_assembled_product_stock(product_name, color, quantity)
-            
-            return True
-            
-        except Exception as e:
-            # En cas d'erreur, annuler l'opération
-            # Note: Dans une vraie application, il faudrait implémenter un système de transactions
-            raise ValueError(f"Erreur lors de l'assemblage: {str(e)}")
+        # Tous les composants sont disponibles: les retirer puis ajouter le produit assemblé
+        for component_name, comp_color, comp_quantity in consumption:
+            self.update_component_stock(component_name, comp_color, -comp_quantity)
+        
+        self.update_assembled_product_stock(product_name, color, quantity)
+        return True
     
     def get_available_stock(self, include_components=True, include_products=True):
         """
@@ -377,34 +437,51 @@ class InventoryManager:
     def get_assemblable_products(self):
         """
         Calcule le nombre de produits assemblables avec le stock actuel
+        (nomenclatures compilées en matrices, voir AssemblableCounts)
         
         Returns:
             dict: {nom_produit: {couleur: quantité_assemblable}}
         """
-        assemblable = {}
+        return self._assemblable_counts().get_assemblable_products(self)
+    
+    def get_product_assemblable(self, product_name):
+        """
+        Calcule le nombre assemblable d'un seul produit, par couleur
         
-        # Convertir l'inventaire des composants au format attendu par get_assemblable_count
-        component_inventory = {}
-        for comp_name, colors in self.components.items():
-            component_inventory[comp_name] = {}
-            for color, component in colors.items():
-                component_inventory[comp_name][color] = component.stock
+        Returns:
+            dict: {couleur: quantité_assemblable}, ou None si le produit n'existe pas
+        """
+        return self._assemblable_counts().get_product_assemblable(self, product_name)
+    
+    def get_component_requirements(self, demand):
+        """
+        Calcule les besoins nets en composants d'une demande de produits,
+        après le stock de produits assemblés puis le stock de composants
         
-        for product_name, product in self.products.items():
-            assemblable[product_name] = {}
-            
-            # Pour chaque produit, calculer le nombre assemblable par couleur
-            for color in self.get_available_colors():
-                count = product.get_assemblable_count(component_inventory, color)
-                if count > 0:
-                    assemblable[product_name][color] = count
+        Args:
+            demand (iterable): Lignes (produit, couleur, quantité)
             
-            # Ajouter l'option "Aléatoire" si disponible
-            random_count = product.get_assemblable_count(component_inventory)
-            if random_count > 0:
-                assemblable[product_name]["Aléatoire"] = random_count
+        Returns:
+            list: [{'component', 'color', 'gross', 'on_hand', 'net'}], voir RequirementsPlanner.explode
+        """
+        if self._requirements is None:
+            self._requirements = RequirementsPlanner(self)
+        return self._requirements.explode(self, demand, self._assemblable_counts())
+    
+    def get_component_dependents(self, component_name):
+        """
+        Produits dont les nombres assemblables dépendent du stock d'un composant
         
-        return assemblable
+        Returns:
+            set: Noms des produits qui utilisent le composant
+        """
+        return self._assemblable_counts().dependent_products(self, component_name)
+    
+    def _assemblable_counts(self):
+        """Retourne les nombres assemblables compilés (compilés au premier appel)"""
+        if self._assemblable is None:
+            self._assemblable = AssemblableCounts(self)
+        return self._assemblable
     
     def get_low_stock_items(self):
         """
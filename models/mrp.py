@@ -0,0 +1,179 @@
+"""
+Calcul des besoins en composants (MRP) du carnet de commandes Plasmik3D.
+
+Les produits commandés sont d'abord couverts par le stock de produits
+assemblés; le reste est éclaté, selon les nomenclatures et leurs contraintes
+de couleur, en besoins bruts par composant et par couleur, puis couvert par
+le stock de composants (matrice tenue à jour par AssemblableCounts). Le
+calcul est vectorisé: seule la compilation des nomenclatures parcourt les
+produits en Python.
+"""
+
+import numpy as np
+
+# Couleur "au choix" des commandes: toute couleur disponible convient
+RANDOM_COLOR = "Aléatoire"
+
+# Marqueur de la couleur principale lors de la résolution des contraintes
+_MAIN_COLOR = object()
+
+
+class RequirementsPlanner:
+    """
+    Nomenclatures compilées pour l'éclatement des besoins
+    
+    Chaque ligne de nomenclature est soit à la couleur du produit, soit à une
+    couleur fixe (contrainte fixed:, éventuellement atteinte par same_as:).
+    Un produit sans nomenclature (ou inconnu du catalogue) est imprimé d'une
+    pièce: il est son propre composant, comme le considère mark_as_printed.
+    """
+    
+    def __init__(self, inventory):
+        """
+        Compile les nomenclatures du catalogue
+        
+        Args:
+            inventory (InventoryManager): Inventaire dont les produits sont compilés
+        """
+        self.product_names = [name for name, product in inventory.products.items() if product.components]
+        self.product_rows = {name: i for i, name in enumerate(self.product_names)}
+        
+        self.component_names = list(inventory.components)
+        self.component_rows = {name: i for i, name in enumerate(self.component_names)}
+        
+        main_lines = []
+        fixed_lines = []
+        fixed_colors = []
+        for p, product_name in enumerate(self.product_names):
+            product = inventory.products[product_name]
+            for comp in product.components:
+                row = self.component_row(comp["name"])
+                quantity = max(comp["quantity"], 0)
+                
+                resolved = product.get_component_color(comp["name"], _MAIN_COLOR)
+                if resolved is _MAIN_COLOR:
+                    main_lines.append((p, row, quantity))
+                else:
+                    # Couleur fixe vide: n'importe quelle couleur
+                    fixed_lines.append((p, row, quantity))
+                    fixed_colors.append(resolved or RANDOM_COLOR)
+        
+        self.main_products, self.main_components, self.main_quantities = self._columns(main_lines)
+        self.fixed_products, self.fixed_components, self.fixed_quantities = self._columns(fixed_lines)
+        self.fixed_colors = fixed_colors
+    
+    @staticmethod
+    def _columns(lines):
+        """Convertit une liste de lignes (produit, composant, quantité) en trois tableaux"""
+        if not lines:
+            return tuple(np.zeros(0, dtype=np.int64) for _ in range(3))
+        return tuple(np.array(column, dtype=np.int64) for column in zip(*lines))
+    
+    def component_row(self, component_name):
+        """Retourne la ligne d'un composant, en l'ajoutant s'il est inconnu"""
+        row = self.component_rows.get(component_name)
+        if row is None:
+            row = len(self.component_names)
+            self.component_names.append(component_name)
+            self.component_rows[component_name] = row
+        return row
+    
+    def explode(self, inventory, demand, assemblable):
+        """
+        Éclate la demande en besoins nets de composants
+        
+        Args:
+            inventory (InventoryManager): Inventaire fournissant le stock assemblé
+            demand (iterable): Lignes (produit, couleur, quantité) du carnet de commandes
+            assemblable (AssemblableCounts): Nombres assemblables de l'inventaire,
+                dont la matrice de stock des composants est tenue à jour
+        
+        Returns:
+            list: Besoins par composant et couleur, triés par couleur puis composant:
+                  {'component', 'color', 'gross', 'on_hand', 'net'}
+                  (pour Aléatoire, on_hand est le reste de la couleur la mieux fournie)
+        """
+        demand = [(product, color, quantity) for product, color, quantity in demand if quantity > 0]
+        
+        # Produits commandés sans nomenclature: imprimés comme un composant
+        leaf_rows = {}
+        for product, _, _ in demand:
+            if product not in self.product_rows and product not in leaf_rows:
+                leaf_rows[product] = len(self.product_rows) + len(leaf_rows)
+                self.component_row(product)
+        
+        colors = sorted(
+            {color for _, color, _ in demand} |
+            {color for colors in inventory.components.values() for color in colors} |
+            set(self.fixed_colors)
+        )
+        colors = [color for color in colors if color != RANDOM_COLOR] + [RANDOM_COLOR]
+        color_columns = {color: i for i, color in enumerate(colors)}
+        color_count = len(colors)
+        
+        # Demande et stock assemblé par produit et couleur (dernière colonne: Aléatoire)
+        product_count = len(self.product_rows) + len(leaf_rows)
+        ordered = np.zeros((product_count, color_count), dtype=np.int64)
+        if demand:
+            np.add.at(ordered, (
+                [self.product_rows.get(product, leaf_rows.get(product)) for product, _, _ in demand],
+                [color_columns[color] for _, color, _ in demand]
+            ), [quantity for _, _, quantity in demand])
+        
+        assembled = np.zeros_like(ordered)
+        for product_name, row in self.product_rows.items():
+            for color, quantity in inventory.products[product_name].assembled_items.items():
+                if color in color_columns and color != RANDOM_COLOR:
+                    assembled[row, color_columns[color]] = quantity
+        
+        # Produits restant à assembler: la demande Aléatoire est couverte par
+        # le stock assemblé restant, toutes couleurs confondues
+        to_assemble = np.maximum(ordered - assembled, 0)
+        spare_assembled = np.maximum(assembled - ordered, 0)[:, :-1].sum(axis=1)
+        to_assemble[:, -1] = np.maximum(ordered[:, -1] - spare_assembled, 0)
+        
+        # Besoins bruts en composants
+        component_count = len(self.component_names)
+        gross = np.zeros((component_count, color_count), dtype=np.int64)
+        
+        if len(self.main_products):
+            np.add.at(gross, self.main_components,
+                      to_assemble[self.main_products] * self.main_quantities[:, None])
+        if len(self.fixed_products):
+            fixed_columns = np.array([color_columns[color] for color in self.fixed_colors], dtype=np.int64)
+            np.add.at(gross, (self.fixed_components, fixed_columns),
+                      to_assemble[self.fixed_products].sum(axis=1) * self.fixed_quantities)
+        if leaf_rows:
+            leaf_products = np.array(list(leaf_rows.values()), dtype=np.int64)
+            leaf_components = np.array([self.component_rows[name] for name in leaf_rows], dtype=np.int64)
+            np.add.at(gross, leaf_components, to_assemble[leaf_products])
+        
+        # Stock de composants, puis besoins nets; Aléatoire puise dans le reste
+        # de la couleur la mieux fournie de chaque composant
+        bom = assemblable.bom
+        stock_rows = np.array([bom.component_rows.get(name, -1) for name in self.component_names], dtype=np.int64)
+        stock_columns = np.array([bom.color_columns.get(color, -1) for color in colors[:-1]], dtype=np.int64)
+        known = (stock_rows >= 0)[:, None] & (stock_columns >= 0)[None, :]
+        
+        on_hand = np.zeros_like(gross)
+        on_hand[:, :-1] = np.where(known, np.maximum(assemblable.stock[stock_rows][:, stock_columns], 0), 0)
+        
+        net = np.maximum(gross - on_hand, 0)
+        on_hand[:, -1] = np.maximum(on_hand - gross, 0)[:, :-1].max(axis=1, initial=0)
+        net[:, -1] = np.maximum(gross[:, -1] - on_hand[:, -1], 0)
+        
+        # Tri par couleur (colonnes déjà triées, Aléatoire en dernier) puis composant
+        name_ranks = np.empty(component_count, dtype=np.int64)
+        name_ranks[sorted(range(component_count), key=self.component_names.__getitem__)] = np.arange(component_count)
+        rows, columns = np.nonzero(gross)
+        order = np.lexsort((name_ranks[rows], columns))
+        rows, columns = rows[order], columns[order]
+        
+        requirements = [
+            {'component': self.component_names[row], 'color': colors[column],
+             'gross': g, 'on_hand': h, 'net': n}
+            for row, column, g, h, n in zip(
+                rows.tolist(), columns.tolist(), gross[rows, columns].tolist(),
+                on_hand[rows, columns].tolist(), net[rows, columns].tolist())
+        ]
+        return requirements
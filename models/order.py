@@ -1,29 +1,78 @@
+import sys
+
+
+def _intern(value):
+    """
+    Retourne l'exemplaire unique d'une chaîne (produit, couleur, statut):
+    les valeurs répétées sur des milliers de commandes ne sont stockées qu'une fois
+    """
+    return sys.intern(value) if type(value) is str else value
+
+
+class OrderItem:
+    """
+    Produit d'une commande
+    
+    Structure compacte (__slots__, chaînes internées) qui reste accessible
+    comme l'ancien dictionnaire: item["product"], item["status"]...
+    """
+    
+    __slots__ = ("product", "color", "quantity", "status")
+    
+    def __init__(self, product, color, quantity=1, status="À imprimer"):
+        self.product = _intern(product)
+        self.color = _intern(color)
+        self.quantity = quantity
+        self.status = _intern(status)
+    
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, _intern(value))
+    
+    def get(self, key, default=None):
+        """Comme dict.get"""
+        return getattr(self, key, default) if key in self.__slots__ else default
+    
+    def __eq__(self, other):
+        if not isinstance(other, OrderItem):
+            return NotImplemented
+        return (self.product, self.color, self.quantity, self.status) == \
+               (other.product, other.color, other.quantity, other.status)
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return f"OrderItem({self.product!r}, {self.color!r}, {self.quantity!r}, {self.status!r})"
+
+
 class Order:
     """Modèle de données pour une commande"""
     
+    __slots__ = ("id", "date", "client", "email", "status", "priority", "notes", "items")
+    
     def __init__(self, order_id, date, client, email, status="En attente", priority="Moyenne", notes=""):
         self.id = order_id
         self.date = date
         self.client = client
         self.email = email
-        self.status = status
-        self.priority = priority
+        self.status = _intern(status)
+        self.priority = _intern(priority)
         self.notes = notes
-        self.items = []  # Liste des produits commandés
+        self.items = []  # Liste des produits commandés (OrderItem)
     
     def add_item(self, product, color, quantity=1, status="À imprimer"):
         """Ajoute un produit à la commande"""
-        item = {
-            "product": product,
-            "color": color,
-            "quantity": quantity,
-            "status": status
-        }
-        self.items.append(item)
+        self.items.append(OrderItem(product, color, quantity, status))
     
     def get_total_items(self):
         """Retourne le nombre total d'articles dans la commande"""
-        return sum(item["quantity"] for item in self.items)
+        return sum(item.quantity for item in self.items)
     
     def get_total_unique_items(self):
         """Retourne le nombre de produits différents dans la commande"""
@@ -31,11 +80,11 @@ class Order:
     
     def is_complete(self):
         """Vérifie si tous les produits de la commande sont prêts"""
-        return all(item["status"] == "Imprimé" for item in self.items)
+        return all(item.status == "Imprimé" for item in self.items)
     
     def is_in_progress(self):
         """Vérifie si la commande est en cours de traitement"""
-        return any(item["status"] == "En impression" for item in self.items) and not self.is_complete()
+        return any(item.status == "En impression" for item in self.items) and not self.is_complete()
     
     def update_status(self):
         """Met à jour le statut de la commande en fonction des produits"""
@@ -52,14 +101,14 @@ class Order:
         if not self.items:
             return 0
         
-        total_items = sum(item["quantity"] for item in self.items)
-        completed_items = sum(item["quantity"] for item in self.items if item["status"] == "Imprimé")
+        total_items = sum(item.quantity for item in self.items)
+        completed_items = sum(item.quantity for item in self.items if item.status == "Imprimé")
         
         return int((completed_items / total_items) * 100)
     
     def get_items_by_status(self, status):
         """Récupère les produits de la commande selon leur statut"""
-        return [item for item in self.items if item["status"] == status]
+        return [item for item in self.items if item.status == status]
     
     def __str__(self):
-        return f"Commande {self.id} - {self.client} - {self.status}"
\ No newline at end of file
+        return f"Commande {self.id} - {self.client} - {self.status}"
@@ -0,0 +1,212 @@
+"""
+Remplissage des plateaux d'impression Plasmik3D.
+
+Les produits restant à imprimer d'une couleur sont éclatés en pièces (les
+composants de leur nomenclature imprimés dans cette couleur), chacune avec
+son emprise sur le plateau. Les pièces sont rangées par étagères, en
+meilleur ajustement: les produits sont pris par surface décroissante de
+leur plus grande pièce (leurs pièces par plus grand côté décroissant), et
+chaque pièce va sur l'étagère existante où elle laisse le moins de hauteur
+d'étagère perdue (mesurée sur la profondeur du plateau), pivotée d'un
+quart de tour si cela convient mieux; si aucune ne convient, une nouvelle
+étagère est ouverte à la profondeur de la pièce couchée sur son plus petit
+côté. Les plateaux sont essayés dans leur ordre d'ouverture. Un produit
+n'est placé sur un plateau que si toutes ses pièces y trouvent place: un
+plateau imprime des produits entiers, et démarrer un plateau met ses
+produits en impression.
+"""
+
+from config import PLATE_SETTINGS
+
+
+class PartProfile:
+    """
+    Profil d'impression d'une pièce
+    
+    Attributs:
+        name (str): Composant imprimé
+        width, depth (float): Emprise sur le plateau en mm
+        height (float): Hauteur en mm
+        minutes (float): Durée d'impression de la pièce
+    """
+    
+    __slots__ = ("name", "width", "depth", "height", "minutes")
+    
+    def __init__(self, name, width, depth, height, minutes):
+        self.name = name
+        self.width = width
+        self.depth = depth
+        self.height = height
+        self.minutes = minutes
+    
+    @property
+    def area(self):
+        return self.width * self.depth
+    
+    def __repr__(self):
+        return f"PartProfile({self.name!r}, {self.width}x{self.depth}x{self.height} mm, {self.minutes} min)"
+
+
+class Plate:
+    """
+    Plateau d'impression d'une couleur
+    
+    Attributs:
+        color (str): Couleur du plateau
+        number (int): Numéro du plateau dans sa couleur (à partir de 1)
+        width, depth (float): Dimensions du plateau en mm
+        units (dict): Produits entiers du plateau {produit: quantité}
+        placements (list): Pièces placées (composant, produit, x, y, largeur, profondeur)
+        print_minutes (float): Durée d'impression du plateau, préparation comprise
+    """
+    
+    __slots__ = ("color", "number", "width", "depth", "units", "placements", "print_minutes",
+                 "_shelves", "_next_y")
+    
+    def __init__(self, color, number, width, depth, overhead_minutes):
+        self.color = color
+        self.number = number
+        self.width = width
+        self.depth = depth
+        self.units = {}
+        self.placements = []
+        self.print_minutes = overhead_minutes
+        self._shelves = []  # [y, hauteur, x libre]
+        self._next_y = 0
+    
+    @property
+    def label(self):
+        return f"{self.color} #{self.number}"
+    
+    @property
+    def piece_count(self):
+        return len(self.placements)
+    
+    @property
+    def fill_ratio(self):
+        """Part de la surface du plateau occupée par les pièces"""
+        return sum(width * depth for _, _, _, _, width, depth in self.placements) / (self.width * self.depth)
+    
+    @property
+    def items(self):
+        """Produits du plateau [(produit, quantité)], par nom"""
+        return sorted(self.units.items())
+    
+    def __repr__(self):
+        return f"Plate({self.label!r}, {self.units!r}, {self.fill_ratio:.0%})"
+
+
+class PlatePacker:
+    """Répartit les produits d'une couleur sur des plateaux, par étagères en meilleur ajustement"""
+    
+    def __init__(self, bed_width, bed_depth, max_height, settings=None):
+        """
+        Args:
+            bed_width, bed_depth, max_height (float): Volume d'impression en mm
+            settings (dict, optional): Paramètres (PLATE_SETTINGS par défaut)
+        """
+        self.settings = dict(PLATE_SETTINGS, **(settings or {}))
+        self.bed_width = bed_width
+        self.bed_depth = bed_depth
+        self.max_height = max_height
+    
+    def pack(self, color, units):
+        """
+        Range les produits d'une couleur sur le moins de plateaux possible
+        
+        Args:
+            color (str): Couleur des plateaux
+            units (list): Produits à imprimer [(produit, quantité, [PartProfile] d'un exemplaire)]
+        
+        Returns:
+            tuple: (plateaux (Plate) dans l'ordre de remplissage,
+                    produits trop grands pour le plateau {produit: quantité})
+        """
+        spacing = self.settings["spacing_mm"]
+        overhead = self.settings["plate_overhead_minutes"]
+        plates = []
+        oversized = {}
+        
+        # Produits à la plus grande pièce (en surface) d'abord; pièces d'un produit par plus grand côté décroissant
+        ordered = sorted(
+            ((product, quantity, sorted(parts, key=lambda part: (-max(part.depth, part.width), part.name)))
+             for product, quantity, parts in units if quantity > 0 and parts),
+            key=lambda unit: (-max(part.area for part in unit[2]), unit[0])
+        )
+        
+        for product, quantity, parts in ordered:
+            if any(part.height > self.max_height for part in parts):
+                oversized[product] = quantity
+                continue
+            
+            # Les plateaux ne font que se remplir: un exemplaire refusé par un
+            # plateau le sera aussi pour les exemplaires suivants
+            first_candidate = 0
+            for _ in range(quantity):
+                while first_candidate < len(plates) and not self._place(plates[first_candidate], product, parts):
+                    first_candidate += 1
+                
+                if first_candidate == len(plates):
+                    plate = Plate(color, len(plates) + 1, self.bed_width, self.bed_depth, overhead)
+                    plate._next_y = spacing
+                    if not self._place(plate, product, parts):
+                        oversized[product] = oversized.get(product, 0) + quantity
+                        break
+                    plates.append(plate)
+        
+        return plates, oversized
+    
+    def _place(self, plate, product, parts):
+        """Place toutes les pièces d'un exemplaire sur un plateau, ou aucune"""
+        shelves = [shelf[:] for shelf in plate._shelves]
+        next_y = plate._next_y
+        placements = []
+        
+        for part in parts:
+            position = self._position(plate, shelves, next_y, part)
+            if position is None:
+                return False
+            x, y, width, depth, next_y = position
+            placements.append((part.name, product, x, y, width, depth))
+        
+        plate._shelves = shelves
+        plate._next_y = next_y
+        plate.placements.extend(placements)
+        plate.units[product] = plate.units.get(product, 0) + 1
+        plate.print_minutes += sum(part.minutes for part in parts)
+        return True
+    
+    def _position(self, plate, shelves, next_y, part):
+        """
+        Emplacement d'une pièce: l'étagère qui perd le moins de hauteur (meilleur ajustement),
+        sinon une nouvelle étagère
+        
+        Returns:
+            tuple: (x, y, largeur, profondeur, prochaine étagère) ou None si le plateau est plein
+                   (les étagères sont mises à jour)
+        """
+        spacing = self.settings["spacing_mm"]
+        orientations = {(part.width, part.depth), (part.depth, part.width)}
+        
+        best = None
+        for shelf in shelves:
+            y, height, free_x = shelf
+            for width, depth in orientations:
+                if depth <= height and free_x + width + spacing <= plate.width:
+                    waste = height - depth
+                    if best is None or waste < best[0]:
+                        best = (waste, shelf, width, depth)
+        
+        if best is not None:
+            _, shelf, width, depth = best
+            x = shelf[2]
+            shelf[2] += width + spacing
+            return x, shelf[0], width, depth, next_y
+        
+        # Nouvelle étagère, la pièce couchée sur sa plus petite profondeur
+        for width, depth in sorted(orientations, key=lambda size: size[1]):
+            if spacing + width + spacing <= plate.width and next_y + depth + spacing <= plate.depth:
+                shelves.append([next_y, depth, spacing + width + spacing])
+                return spacing, next_y, width, depth, next_y + depth + spacing
+        
+        return None
@@ -0,0 +1,313 @@
+"""
+Ordonnancement des lots d'impression par couleur Plasmik3D.
+
+Sur une imprimante, l'opération coûteuse est le changement de bobine: passer
+d'une couleur claire à une couleur foncée demande peu de purge, l'inverse
+beaucoup plus. L'ordonnanceur choisit l'ordre des lots (un lot par couleur)
+qui minimise les minutes de changement et le délai moyen des commandes,
+pondéré par leur ancienneté: un ordre glouton (règle de Smith: durée avec
+changement rapportée au poids du lot) est amélioré par des inversions de
+segments (2-opt) et des déplacements de lots, tant que l'objectif baisse.
+
+Un lot Aléatoire s'imprime avec la bobine déjà chargée: il ne coûte aucun
+changement et ne modifie pas la couleur chargée.
+"""
+
+import datetime
+
+from config import COLOR_HEX_MAP, SEQUENCING_SETTINGS
+
+# Couleur "au choix" des commandes: imprimée avec la bobine chargée
+RANDOM_COLOR = "Aléatoire"
+
+# Luminosité supposée d'une couleur sans code HEX connu
+DEFAULT_LIGHTNESS = 0.5
+
+
+def order_age_days(order_date, today=None):
+    """Nombre de jours écoulés depuis la date d'une commande (0 si la date est illisible)"""
+    today = today or datetime.date.today()
+    try:
+        date = datetime.date.fromisoformat(str(order_date)[:10])
+    except ValueError:
+        return 0
+    return max((today - date).days, 0)
+
+
+class ColorBatch:
+    """
+    Lot d'impression d'une couleur
+    
+    Attributs:
+        color (str): Couleur du lot
+        quantity (int): Nombre de pièces à imprimer
+        orders (dict): Ancienneté en jours des commandes servies {order_id: jours}
+        products (list): Produits du lot, tels que dans le plan d'impression
+    """
+    
+    __slots__ = ("color", "quantity", "orders", "products")
+    
+    def __init__(self, color, quantity, orders=None, products=None):
+        self.color = color
+        self.quantity = quantity
+        self.orders = orders or {}
+        self.products = products or []
+    
+    def __repr__(self):
+        return f"ColorBatch({self.color!r}, {self.quantity!r}, {len(self.orders)} commandes)"
+
+
+class SequenceReport:
+    """Résultat de la simulation d'un ordre d'impression"""
+    
+    __slots__ = ("swaps", "changeover_minutes", "makespan_minutes", "mean_lead_time_days",
+                 "weighted_lead_time_days", "objective", "changeovers", "finish_minutes")
+    
+    def __init__(self, swaps, changeover_minutes, makespan_minutes, mean_lead_time_days,
+                 weighted_lead_time_days, objective, changeovers, finish_minutes):
+        self.swaps = swaps
+        self.changeover_minutes = changeover_minutes
+        self.makespan_minutes = makespan_minutes
+        self.mean_lead_time_days = mean_lead_time_days
+        self.weighted_lead_time_days = weighted_lead_time_days
+        self.objective = objective
+        self.changeovers = changeovers
+        self.finish_minutes = finish_minutes
+    
+    def __repr__(self):
+        return (f"SequenceReport(swaps={self.swaps}, changeover_minutes={self.changeover_minutes:.0f}, "
+                f"mean_lead_time_days={self.mean_lead_time_days:.2f})")
+
+
+class PrintSequencer:
+    """Ordonnanceur des lots d'impression minimisant les changements de couleur"""
+    
+    def __init__(self, settings=None, color_hex=None):
+        """
+        Args:
+            settings (dict, optional): Paramètres (SEQUENCING_SETTINGS par défaut)
+            color_hex (dict, optional): Codes HEX des couleurs (COLOR_HEX_MAP par défaut)
+        """
+        self.settings = dict(SEQUENCING_SETTINGS, **(settings or {}))
+        self.color_hex = COLOR_HEX_MAP if color_hex is None else color_hex
+        self._costs = dict(self.settings["transition_costs"])
+    
+    def lightness(self, color):
+        """Luminance relative d'une couleur, entre 0 (noir) et 1 (blanc)"""
+        hex_code = self.color_hex.get(color)
+        if not hex_code:
+            return DEFAULT_LIGHTNESS
+        red, green, blue = (int(hex_code.lstrip("#")[i:i + 2], 16) / 255 for i in (0, 2, 4))
+        return 0.2126 * red + 0.7152 * green + 0.0722 * blue
+    
+    def transition_cost(self, loaded_color, next_color):
+        """
+        Minutes de changement entre la bobine chargée et la couleur suivante
+        
+        Args:
+            loaded_color (str): Couleur chargée (None si aucune bobine)
+            next_color (str): Couleur du lot suivant
+        """
+        if next_color == RANDOM_COLOR or next_color == loaded_color:
+            return 0
+        key = (loaded_color, next_color)
+        cost = self._costs.get(key)
+        if cost is None:
+            cost = self.settings["changeover_minutes"]
+            if loaded_color is not None:
+                # Vers plus clair: la couleur précédente doit être purgée
+                cost += self.settings["purge_minutes_to_light"] * max(
+                    self.lightness(next_color) - self.lightness(loaded_color), 0)
+            self._costs[key] = cost
+        return cost
+    
+    def simulate(self, batches, loaded_color=None):
+        """
+        Simule l'impression des lots dans l'ordre donné, sur une imprimante
+        
+        Args:
+            batches (list): Lots (ColorBatch) dans l'ordre d'impression
+            loaded_color (str, optional): Couleur chargée au départ
+        
+        Returns:
+            SequenceReport: Changements, durée totale et délais des commandes
+                (délai = ancienneté + fin du dernier lot de la commande), avec
+                pour chaque lot les minutes de changement et l'heure de fin
+        """
+        settings = self.settings
+        minutes_per_day = 24 * 60
+        clock = 0
+        swaps = 0
+        changeover = 0
+        changeovers = []
+        finish_minutes = []
+        order_finish = {}
+        order_age = {}
+        
+        for batch in batches:
+            cost = self.transition_cost(loaded_color, batch.color)
+            if cost:
+                swaps += 1
+                changeover += cost
+            if batch.color != RANDOM_COLOR:
+                loaded_color = batch.color
+            clock += cost + batch.quantity * settings["minutes_per_piece"]
+            changeovers.append(cost)
+            finish_minutes.append(clock)
+            for order_id, age in batch.orders.items():
+                order_finish[order_id] = clock
+                order_age[order_id] = age
+        
+        lead_times = [order_age[order_id] + finish / minutes_per_day for order_id, finish in order_finish.items()]
+        weights = [1 + settings["age_weight_per_day"] * order_age[order_id] for order_id in order_finish]
+        mean_lead = sum(lead_times) / len(lead_times) if lead_times else 0.0
+        weighted_lead = (sum(w * lead for w, lead in zip(weights, lead_times)) / sum(weights)
+                         if weights else 0.0)
+        
+        return SequenceReport(
+            swaps=swaps,
+            changeover_minutes=changeover,
+            makespan_minutes=clock,
+            mean_lead_time_days=mean_lead,
+            weighted_lead_time_days=weighted_lead,
+            objective=self._objective_value(changeover, weighted_lead),
+            changeovers=changeovers,
+            finish_minutes=finish_minutes
+        )
+    
+    def _objective_value(self, changeover_minutes, weighted_lead_days):
+        """Objectif minimisé: minutes de changement et délai pondéré (exprimé en minutes)"""
+        return self.settings["changeover_weight"] * changeover_minutes + weighted_lead_days * 24 * 60
+    
+    def sequence(self, batches, loaded_color=None):
+        """
+        Ordonne les lots pour minimiser changements de couleur et délai pondéré
+        
+        Args:
+            batches (list): Lots (ColorBatch) à ordonner
+            loaded_color (str, optional): Couleur chargée sur l'imprimante
+        
+        Returns:
+            list: Les mêmes lots, dans l'ordre d'impression proposé
+        """
+        if len(batches) < 2:
+            return list(batches)
+        
+        problem = _SequencingProblem(self, batches, loaded_color)
+        order = problem.greedy()
+        order = problem.improve(order, self.settings["improvement_passes"])
+        return [batches[i] for i in order]
+
+
+class _SequencingProblem:
+    """
+    Données précalculées pour évaluer rapidement un ordre de lots
+    
+    Une commande présente dans un seul lot pèse sur la fin de ce lot; une
+    commande répartie sur plusieurs couleurs pèse sur la fin du dernier.
+    """
+    
+    def __init__(self, sequencer, batches, loaded_color):
+        settings = sequencer.settings
+        self.sequencer = sequencer
+        self.batches = batches
+        self.loaded_color = loaded_color
+        self.durations = [batch.quantity * settings["minutes_per_piece"] for batch in batches]
+        
+        order_batches = {}
+        order_weights = {}
+        for i, batch in enumerate(batches):
+            for order_id, age in batch.orders.items():
+                order_batches.setdefault(order_id, []).append(i)
+                order_weights[order_id] = 1 + settings["age_weight_per_day"] * age
+        
+        self.total_weight = sum(order_weights.values()) or 1.0
+        self.batch_weights = [0.0] * len(batches)
+        self.shared_orders = []  # [(poids, indices des lots)]
+        for order_id, indices in order_batches.items():
+            if len(indices) == 1:
+                self.batch_weights[indices[0]] += order_weights[order_id]
+            else:
+                self.shared_orders.append((order_weights[order_id], indices))
+        
+        # Poids indicatif par lot pour l'ordre glouton (commandes partagées réparties)
+        self.greedy_weights = list(self.batch_weights)
+        for weight, indices in self.shared_orders:
+            for i in indices:
+                self.greedy_weights[i] += weight / len(indices)
+    
+    def cost(self, order):
+        """Objectif d'un ordre de lots (indices), en minutes"""
+        transition = self.sequencer.transition_cost
+        colors = [batch.color for batch in self.batches]
+        loaded = self.loaded_color
+        clock = 0
+        changeover = 0
+        weighted_finish = 0.0
+        finish = [0] * len(order)
+        
+        for i in order:
+            color = colors[i]
+            step = transition(loaded, color)
+            if color != RANDOM_COLOR:
+                loaded = color
+            changeover += step
+            clock += step + self.durations[i]
+            finish[i] = clock
+            weighted_finish += self.batch_weights[i] * clock
+        
+        for weight, indices in self.shared_orders:
+            weighted_finish += weight * max(finish[i] for i in indices)
+        
+        # Les anciennetés sont constantes: seul le temps de fin varie d'un ordre à l'autre
+        return self.sequencer.settings["changeover_weight"] * changeover + weighted_finish / self.total_weight
+    
+    def greedy(self):
+        """Ordre glouton: à chaque étape, le lot au plus faible (changement + durée) / poids"""
+        transition = self.sequencer.transition_cost
+        remaining = set(range(len(self.batches)))
+        loaded = self.loaded_color
+        order = []
+        
+        while remaining:
+            def ratio(i):
+                step = transition(loaded, self.batches[i].color)
+                return ((step + self.durations[i]) / (self.greedy_weights[i] + 1e-9), i)
+            
+            best = min(remaining, key=ratio)
+            order.append(best)
+            remaining.remove(best)
+            if self.batches[best].color != RANDOM_COLOR:
+                loaded = self.batches[best].color
+        
+        return order
+    
+    def improve(self, order, max_passes):
+        """Améliore un ordre par inversions de segments (2-opt) et déplacements de lots"""
+        best_cost = self.cost(order)
+        size = len(order)
+        
+        for _ in range(max_passes):
+            improved = False
+            
+            for i in range(size - 1):
+                for j in range(i + 1, size):
+                    candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                    candidate_cost = self.cost(candidate)
+                    if candidate_cost < best_cost - 1e-9:
+                        order, best_cost, improved = candidate, candidate_cost, True
+            
+            for i in range(size):
+                for j in range(size):
+                    if i == j:
+                        continue
+                    candidate = order[:i] + order[i + 1:]
+                    candidate.insert(j, order[i])
+                    candidate_cost = self.cost(candidate)
+                    if candidate_cost < best_cost - 1e-9:
+                        order, best_cost, improved = candidate, candidate_cost, True
+            
+            if not improved:
+                break
+        
+        return order
@@ -0,0 +1,193 @@
+"""
+Parc d'imprimantes Plasmik3D et répartition des travaux d'impression.
+
+Le répartiteur affecte les lignes du plan d'impression (un produit dans une
+couleur) aux imprimantes du parc. Les imprimantes sont tenues dans une file
+de priorité par heure de disponibilité: la première libre reçoit le travail
+qui lui coûte le moins de changement de bobine (couleur déjà chargée, ou
+Aléatoire), puis le plus prioritaire. Une couleur chargée sur une autre
+imprimante lui est laissée tant qu'une couleur libre coûte autant.
+"""
+
+import heapq
+
+from config import PRIORITIES
+from models.print_sequencer import RANDOM_COLOR, PrintSequencer
+
+# Statuts des imprimantes
+PRINTER_AVAILABLE = "Disponible"
+PRINTER_PRINTING = "En impression"
+PRINTER_OFFLINE = "Hors service"
+
+
+class Printer:
+    """
+    Imprimante du parc
+    
+    Attributs:
+        id (int): Identifiant en base
+        name (str): Nom de l'imprimante
+        loaded_color (str): Couleur de la bobine chargée (None si aucune)
+        bed_width, bed_depth, max_height (int): Volume d'impression en mm
+        status (str): Disponible, En impression ou Hors service
+    """
+    
+    __slots__ = ("id", "name", "loaded_color", "bed_width", "bed_depth", "max_height", "status")
+    
+    def __init__(self, id, name, loaded_color=None, bed_width=0, bed_depth=0, max_height=0,
+                 status=PRINTER_AVAILABLE):
+        self.id = id
+        self.name = name
+        self.loaded_color = loaded_color
+        self.bed_width = bed_width
+        self.bed_depth = bed_depth
+        self.max_height = max_height
+        self.status = status
+    
+    @classmethod
+    def from_row(cls, row):
+        """Crée une imprimante à partir d'une ligne de la table printers"""
+        return cls(row["id"], row["name"], row["loaded_color"], row["bed_width"],
+                   row["bed_depth"], row["max_height"], row["status"])
+    
+    def __repr__(self):
+        return f"Printer({self.name!r}, {self.loaded_color!r}, {self.status!r})"
+
+
+class ScheduledJob:
+    """
+    Travail d'impression affecté à une imprimante
+    
+    Attributs:
+        printer_id (int): Imprimante affectée
+        product, color (str): Produit et couleur imprimés
+        quantity (int): Nombre de pièces
+        priority (str): Priorité de la ligne du plan d'impression
+        position (int): Rang dans la file de l'imprimante (à partir de 1)
+        start_minutes (float): Début prévu, changement de bobine compris
+        changeover_minutes (float): Minutes de changement de bobine avant le travail
+        duration_minutes (float): Durée d'impression
+    """
+    
+    __slots__ = ("printer_id", "product", "color", "quantity", "priority", "position",
+                 "start_minutes", "changeover_minutes", "duration_minutes")
+    
+    def __init__(self, printer_id, product, color, quantity, priority, position,
+                 start_minutes, changeover_minutes, duration_minutes):
+        self.printer_id = printer_id
+        self.product = product
+        self.color = color
+        self.quantity = quantity
+        self.priority = priority
+        self.position = position
+        self.start_minutes = start_minutes
+        self.changeover_minutes = changeover_minutes
+        self.duration_minutes = duration_minutes
+    
+    @property
+    def end_minutes(self):
+        """Fin prévue du travail"""
+        return self.start_minutes + self.changeover_minutes + self.duration_minutes
+    
+    def __repr__(self):
+        return (f"ScheduledJob(printer={self.printer_id!r}, {self.product!r}, {self.color!r}, "
+                f"{self.quantity}, position={self.position})")
+
+
+class FleetScheduler:
+    """Répartit les lignes du plan d'impression sur les imprimantes du parc"""
+    
+    def __init__(self, sequencer=None):
+        """
+        Args:
+            sequencer (PrintSequencer, optional): Coûts de changement de bobine et
+                                                  durée par pièce (SEQUENCING_SETTINGS)
+        """
+        self.sequencer = sequencer or PrintSequencer()
+    
+    def schedule(self, printers, lines, busy_until=None):
+        """
+        Affecte chaque ligne du plan d'impression à une imprimante
+        
+        Args:
+            printers (list): Imprimantes du parc (Printer); celles hors service sont ignorées
+            lines (list): Lignes à imprimer [{'product', 'color', 'quantity', 'priority'}]
+            busy_until (dict, optional): Minutes restantes des imprimantes occupées {printer_id: minutes}
+        
+        Returns:
+            list: Travaux affectés (ScheduledJob), par imprimante puis par position
+        """
+        busy_until = busy_until or {}
+        minutes_per_piece = self.sequencer.settings["minutes_per_piece"]
+        transition = self.sequencer.transition_cost
+        ranks = {priority: len(PRIORITIES) - index for index, priority in enumerate(PRIORITIES)}
+        
+        active = [printer for printer in printers if printer.status != PRINTER_OFFLINE]
+        if not active:
+            return []
+        
+        # File de chaque couleur: la ligne la plus prioritaire, puis la plus grande, en tête
+        queues = {}
+        remaining = {}
+        for index, line in enumerate(lines):
+            if line["quantity"] <= 0:
+                continue
+            heapq.heappush(queues.setdefault(line["color"], []),
+                           (-ranks.get(line["priority"], 0), -line["quantity"], line["product"], index))
+            remaining[line["color"]] = remaining.get(line["color"], 0) + line["quantity"]
+        
+        # Imprimantes par heure de disponibilité
+        loaded = {printer.id: printer.loaded_color for printer in active}
+        positions = dict.fromkeys(loaded, 0)
+        free_at = [(busy_until.get(printer.id, 0), order, printer.id) for order, printer in enumerate(active)]
+        heapq.heapify(free_at)
+        
+        jobs = []
+        while queues:
+            clock, order, printer_id = heapq.heappop(free_at)
+            current = loaded[printer_id]
+            claimed = {color for other, color in loaded.items() if other != printer_id}
+            
+            def cost(color):
+                head = queues[color][0]
+                return (transition(current, color), color in claimed, head[0], -remaining[color], color)
+            
+            color = min(queues, key=cost)
+            index = heapq.heappop(queues[color])[3]
+            if not queues[color]:
+                del queues[color]
+            line = lines[index]
+            remaining[color] -= line["quantity"]
+            
+            changeover = transition(current, color)
+            duration = line["quantity"] * minutes_per_piece
+            positions[printer_id] += 1
+            jobs.append(ScheduledJob(printer_id, line["product"], color, line["quantity"], line["priority"],
+                                     positions[printer_id], clock, changeover, duration))
+            
+            if color != RANDOM_COLOR:
+                loaded[printer_id] = color
+            heapq.heappush(free_at, (clock + changeover + duration, order, printer_id))
+        
+        jobs.sort(key=lambda job: (job.printer_id, job.position))
+        return jobs
+    
+    @staticmethod
+    def summarize(jobs, printer_count):
+        """
+        Indicateurs d'une répartition
+        
+        Returns:
+            dict: swaps, changeover_minutes, makespan_minutes (fin du dernier travail),
+                  pieces_per_hour (débit du parc) et utilization (part du temps à imprimer)
+        """
+        makespan = max((job.end_minutes for job in jobs), default=0)
+        pieces = sum(job.quantity for job in jobs)
+        printing = sum(job.duration_minutes for job in jobs)
+        return {
+            "swaps": sum(1 for job in jobs if job.changeover_minutes),
+            "changeover_minutes": sum(job.changeover_minutes for job in jobs),
+            "makespan_minutes": makespan,
+            "pieces_per_hour": pieces * 60 / makespan if makespan else 0.0,
+            "utilization": printing / (makespan * printer_count) if makespan and printer_count else 0.0
+        }
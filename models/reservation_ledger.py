@@ -0,0 +1,242 @@
+"""
+Registre des réservations de composants Plasmik3D.
+
+Une réservation bloque des quantités de plusieurs composants pour une commande
+ou un assemblage. Le stock disponible d'un composant est son stock moins ses
+réservations actives. Réserver, consommer et libérer sont des opérations
+atomiques, exécutées chacune dans une seule transaction SQLite ouverte par
+BEGIN IMMEDIATE: le disponible est vérifié sous le verrou d'écriture de la
+base, si bien que plusieurs opérateurs (threads ou processus) ne peuvent pas
+attribuer deux fois le même stock.
+"""
+
+import threading
+import uuid
+from contextlib import contextmanager
+
+# Statuts des lignes du registre
+RESERVED = "Réservé"
+CONSUMED = "Consommé"
+RELEASED = "Libéré"
+
+# Stock d'un composant moins ses réservations actives
+AVAILABLE_QUERY = """
+    SELECT c.stock - COALESCE(SUM(r.quantity), 0) AS available
+    FROM components c
+    LEFT JOIN component_reservations r
+      ON r.component_name = c.name AND r.color = c.color AND r.status = 'Réservé'
+    WHERE c.name = ? AND c.color = ?
+    GROUP BY c.id
+"""
+
+
+class ReservationLedger:
+    """Réservations de composants enregistrées dans la table component_reservations"""
+    
+    def __init__(self, db):
+        """
+        Args:
+            db (Database): Base de données (une connexion par thread)
+        """
+        self.db = db
+        self._local = threading.local()
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Transaction d'écriture prise immédiatement (BEGIN IMMEDIATE); une
+        transaction imbriquée rejoint la transaction englobante
+        
+        Yields:
+            sqlite3.Cursor: Curseur du thread courant
+        """
+        depth = getattr(self._local, 'depth', 0)
+        if depth == 0:
+            self.db.conn.execute("BEGIN IMMEDIATE")
+        
+        self._local.depth = depth + 1
+        try:
+            yield self.db.cursor
+            if depth == 0:
+                self.db.conn.commit()
+        except BaseException:
+            if depth == 0:
+                self.db.conn.rollback()
+            raise
+        finally:
+            self._local.depth = depth
+    
+    @staticmethod
+    def _aggregate(lines):
+        """Regroupe des lignes (composant, couleur, quantité) par composant et couleur"""
+        requested = {}
+        for component_name, color, quantity in lines:
+            if quantity > 0:
+                requested[(component_name, color)] = requested.get((component_name, color), 0) + quantity
+        return requested
+    
+    def get_available_stock(self, component_name, color):
+        """Stock d'un composant non réservé (0 si le composant n'existe pas)"""
+        self.db.cursor.execute(AVAILABLE_QUERY, (component_name, color))
+        row = self.db.cursor.fetchone()
+        return row['available'] if row else 0
+    
+    def reserve(self, lines, order_id=None):
+        """
+        Réserve plusieurs composants, tous ou aucun
+        
+        Args:
+            lines (iterable): Lignes (composant, couleur, quantité)
+            order_id (str, optional): Commande pour laquelle le stock est réservé
+        
+        Returns:
+            str: Identifiant de la réservation
+        
+        Raises:
+            ValueError: Si le stock disponible d'un composant est insuffisant
+        """
+        requested = self._aggregate(lines)
+        if not requested:
+            raise ValueError("Aucun composant à réserver")
+        
+        reservation_id = uuid.uuid4().hex
+        with self.transaction() as cursor:
+            for (component_name, color), quantity in requested.items():
+                available = self.get_available_stock(component_name, color)
+                if available < quantity:
+                    raise ValueError(
+                        f"Stock insuffisant pour le composant {component_name} en {color}: "
+                        f"{available} disponible, {quantity} demandé"
+                    )
+            
+            cursor.executemany("""
+                INSERT INTO component_reservations
+                (reservation_id, component_name, color, quantity, order_id)
+                VALUES (?, ?, ?, ?, ?)
+            """, [
+                (reservation_id, component_name, color, quantity, order_id)
+                for (component_name, color), quantity in requested.items()
+            ])
+        
+        return reservation_id
+    
+    def commit(self, reservation_id):
+        """
+        Consomme une réservation: le stock réservé est retiré des composants
+        
+        Returns:
+            dict: Nouveau stock des composants consommés {(composant, couleur): stock}
+        
+        Raises:
+            ValueError: Si la réservation n'est pas active, ou si le stock d'un
+                        composant a été retiré depuis la réservation
+        """
+        with self.transaction() as cursor:
+            lines = self._active_lines(cursor, reservation_id)
+            
+            for component_name, color, quantity in lines:
+                cursor.execute("""
+                    UPDATE components SET stock = stock - ?
+                    WHERE name = ? AND color = ? AND stock >= ?
+                """, (quantity, component_name, color, quantity))
+                if cursor.rowcount != 1:
+                    raise ValueError(f"Stock du composant {component_name} en {color} retiré depuis la réservation")
+            
+            self._close(cursor, reservation_id, CONSUMED)
+            
+            stocks = {}
+            for component_name, color, _ in lines:
+                cursor.execute("SELECT stock FROM components WHERE name = ? AND color = ?", (component_name, color))
+                stocks[(component_name, color)] = cursor.fetchone()['stock']
+        
+        return stocks
+    
+    def allocate(self, lines, order_id=None):
+        """
+        Réserve et consomme immédiatement, dans une seule transaction
+        
+        Returns:
+            dict: Nouveau stock des composants consommés {(composant, couleur): stock}
+        """
+        with self.transaction():
+            return self.commit(self.reserve(lines, order_id))
+    
+    def release(self, reservation_id):
+        """
+        Libère une réservation active
+        
+        Returns:
+            int: Nombre de lignes libérées (0 si la réservation n'est pas active)
+        """
+        with self.transaction() as cursor:
+            return self._close(cursor, reservation_id, RELEASED)
+    
+    def release_order(self, order_id):
+        """
+        Libère toutes les réservations actives d'une commande
+        
+        Returns:
+            int: Nombre de lignes libérées
+        """
+        with self.transaction() as cursor:
+            cursor.execute("""
+                UPDATE component_reservations SET status = ?, closed_at = CURRENT_TIMESTAMP
+                WHERE order_id = ? AND status = ?
+            """, (RELEASED, order_id, RESERVED))
+            return cursor.rowcount
+    
+    def get_reservations(self, order_id=None, status=RESERVED):
+        """
+        Récupère les lignes du registre
+        
+        Args:
+            order_id (str, optional): Filtrer par commande
+            status (str, optional): Filtrer par statut (None pour tous)
+        
+        Returns:
+            list: [{'reservation_id', 'component', 'color', 'quantity', 'order_id', 'status', 'created_at'}]
+        """
+        conditions = []
+        params = []
+        if order_id is not None:
+            conditions.append("order_id = ?")
+            params.append(order_id)
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        self.db.cursor.execute(f"""
+            SELECT reservation_id, component_name, color, quantity, order_id, status, created_at
+            FROM component_reservations {where}
+            ORDER BY id
+        """, params)
+        
+        return [{
+            'reservation_id': row['reservation_id'],
+            'component': row['component_name'],
+            'color': row['color'],
+            'quantity': row['quantity'],
+            'order_id': row['order_id'],
+            'status': row['status'],
+            'created_at': row['created_at']
+        } for row in self.db.cursor.fetchall()]
+    
+    def _active_lines(self, cursor, reservation_id):
+        """Lignes actives d'une réservation: [(composant, couleur, quantité)]"""
+        cursor.execute("""
+            SELECT component_name, color, quantity FROM component_reservations
+            WHERE reservation_id = ? AND status = ?
+        """, (reservation_id, RESERVED))
+        lines = [(row['component_name'], row['color'], row['quantity']) for row in cursor.fetchall()]
+        if not lines:
+            raise ValueError(f"Réservation {reservation_id} introuvable ou déjà clôturée")
+        return lines
+    
+    def _close(self, cursor, reservation_id, status):
+        """Clôture les lignes actives d'une réservation avec le statut donné"""
+        cursor.execute("""
+            UPDATE component_reservations SET status = ?, closed_at = CURRENT_TIMESTAMP
+            WHERE reservation_id = ? AND status = ?
+        """, (status, reservation_id, RESERVED))
+        return cursor.rowcount
@@ -3,6 +3,7 @@ import re
 import os
 from PyQt5.QtCore import QObject, pyqtSignal
 from models.order import Order
+from config import IMPORT_SETTINGS
 
 class CSVParserSignals(QObject):
     """Signaux pour le processus d'analyse CSV"""
@@ -12,13 +13,38 @@ class CSVParserSignals(QObject):
 class ShopifyCSVParser:
     """Classe pour analyser les fichiers CSV exportés de Shopify"""
     
+    # Colonnes de la commande, remplies uniquement sur sa première ligne
+    ORDER_COLUMNS = ['Email', 'Created at', 'Fulfillment Status', 'Billing Name', 'Notes']
+    
+    # Colonnes nécessaires à la construction des commandes
+    REQUIRED_COLUMNS = ['Name', 'Email', 'Created at', 'Lineitem quantity', 'Lineitem name']
+    
+    # Format de la colonne Created at des exports Shopify
+    CREATED_AT_FORMAT = '%Y-%m-%d %H:%M:%S %z'
+    
+    # Format des dates (UTC) enregistrées dans les watermarks
+    WATERMARK_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+    
     def __init__(self):
         self.signals = CSVParserSignals()
+        
+        # Plus haute commande vue lors du dernier parsing:
+        # {"order_number": int ou None, "created_at": str UTC ou None}
+        self.high_watermark = None
+        # Nombre de lignes ignorées car sous le watermark lors du dernier parsing
+        self.skipped_rows = 0
     
-    def parse_file(self, file_path):
+    def parse_file(self, file_path, watermark=None):
         """
         Parse un fichier CSV exporté de Shopify et retourne une liste de commandes
+        
+        Si un watermark est fourni (même format que high_watermark), les lignes
+        des commandes déjà importées sont ignorées avant la construction des
+        commandes.
         """
+        self.high_watermark = None
+        self.skipped_rows = 0
+        
         if not os.path.exists(file_path):
             self.signals.status.emit(f"Erreur: Le fichier {file_path} n'existe pas")
             return []
@@ -37,8 +63,7 @@ class ShopifyCSVParser:
         self.signals.progress.emit(30)
         
         # Vérifier les colonnes nécessaires
-        required_columns = ['Name', 'Email', 'Created at', 'Lineitem quantity', 'Lineitem name']
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        missing_columns = [col for col in self.REQUIRED_COLUMNS if col not in df.columns]
         if missing_columns:
             self.signals.status.emit(f"Colonnes manquantes dans le CSV: {', '.join(missing_columns)}")
             return []
@@ -46,67 +71,216 @@ class ShopifyCSVParser:
         self.signals.status.emit("Vérification des colonnes réussie")
         self.signals.progress.emit(40)
         
-        # Grouper par commande (Name/ID)
-        orders = {}
-        total_rows = len(df)
-        
         self.signals.status.emit("Traitement des commandes...")
+        orders = self._build_orders(df, watermark)
         
-        for idx, row in df.iterrows():
-            # Mettre à jour la progression
-            if idx % 10 == 0:  # Mettre à jour tous les 10 lignes
-                progress = 40 + int((idx / total_rows) * 50)  # De 40% à 90%
-                self.signals.progress.emit(progress)
-            
-            order_id = str(row['Name'])
-            
-            # Ignorer les lignes sans nom de produit
-            if pd.isna(row['Lineitem name']):
-                continue
+        self.signals.status.emit(f"Traitement terminé: {len(orders)} commandes extraites")
+        self.signals.progress.emit(90)
+        
+        return orders
+    
+    def iter_orders(self, file_path, chunk_size=None, watermark=None):
+        """
+        Parse un fichier CSV exporté de Shopify par blocs et génère les commandes
+        une à une, sans charger le fichier entier en mémoire
+        
+        Les lignes d'une commande sont contiguës dans un export Shopify: les lignes
+        de la dernière commande d'un bloc sont conservées et rattachées au bloc
+        suivant, de sorte qu'une commande n'est produite qu'une fois complète.
+        Si les lignes d'une commande sont dispersées dans le fichier (export
+        retravaillé), la commande est produite une fois par bloc où elle
+        apparaît, avec le même identifiant: l'appelant doit fusionner ces
+        morceaux (voir ImportController._write_batch).
+        
+        Args:
+            file_path (str): Chemin du fichier CSV
+            chunk_size (int, optional): Nombre de lignes lues par bloc
+            watermark (dict, optional): Plus haute commande déjà importée,
+                les lignes en dessous sont ignorées
+        
+        Yields:
+            Order: Commandes dans l'ordre du fichier
+        
+        Raises:
+            Exception: Erreurs de lecture du CSV, propagées pour que l'appelant
+                puisse annuler une importation partielle
+        """
+        self.high_watermark = None
+        self.skipped_rows = 0
+        
+        if not os.path.exists(file_path):
+            self.signals.status.emit(f"Erreur: Le fichier {file_path} n'existe pas")
+            return
+        
+        chunk_size = chunk_size or IMPORT_SETTINGS["chunk_size"]
+        file_size = os.path.getsize(file_path) or 1
+        
+        self.signals.status.emit("Lecture du fichier CSV par blocs...")
+        self.signals.progress.emit(10)
+        
+        with open(file_path, 'rb') as f:
+            pending = None
+            row_count = 0
+            order_count = 0
             
-            if order_id not in orders:
-                # Formater la date (juste la partie date, pas l'heure)
-                date_commande = row['Created at'].split(' ')[0] if pd.notna(row['Created at']) else ""
+            for chunk in pd.read_csv(f, chunksize=chunk_size):
+                if pending is None:
+                    missing_columns = [col for col in self.REQUIRED_COLUMNS if col not in chunk.columns]
+                    if missing_columns:
+                        self.signals.status.emit(f"Colonnes manquantes dans le CSV: {', '.join(missing_columns)}")
+                        return
+                else:
+                    chunk = pd.concat([pending, chunk], ignore_index=True)
                 
-                # Extraire le statut de la commande
-                status = row.get('Fulfillment Status', 'unfulfilled')
-                if pd.isna(status):
-                    status = 'unfulfilled'
+                # Conserver la dernière commande du bloc, peut-être incomplète
+                names = chunk['Name'].astype(str)
+                last_start = len(chunk) - int((names.iloc[::-1] == names.iloc[-1]).cummin().sum())
+                pending = chunk.iloc[last_start:]
                 
-                # Convertir le statut Shopify en statut application
-                order_status = "Prêt" if status == 'fulfilled' else "En attente"
+                for order in self._build_orders(chunk.iloc[:last_start], watermark):
+                    order_count += 1
+                    yield order
                 
-                # Créer une nouvelle commande
-                orders[order_id] = Order(
-                    order_id=order_id,
-                    date=date_commande,
-                    client=row.get('Billing Name', order_id) if pd.notna(row.get('Billing Name', '')) else order_id,
-                    email=row['Email'] if pd.notna(row['Email']) else "",
-                    status=order_status,
-                    priority="Moyenne",
-                    notes=row.get('Notes', '') if pd.notna(row.get('Notes', '')) else ""
-                )
-            
-            # Extraire les informations du produit
-            lineitem_name = row['Lineitem name']
-            lineitem_quantity = int(row['Lineitem quantity']) if pd.notna(row['Lineitem quantity']) else 1
+                row_count += last_start
+                self.signals.status.emit(f"{row_count} lignes traitées, {order_count} commandes extraites...")
+                self.signals.progress.emit(10 + int(min(f.tell() / file_size, 1) * 85))  # De 10% à 95%
             
-            # Extraire le produit et la couleur
-            product_info = self.extract_product_color_quantity(lineitem_name, lineitem_quantity)
-            
-            # Ajouter le produit à la commande
-            orders[order_id].add_item(
-                product=product_info['product'],
-                color=product_info['color'],
-                quantity=product_info['quantity'],
-                status="Imprimé" if orders[order_id].status == "Prêt" else "À imprimer"
+            if pending is not None:
+                for order in self._build_orders(pending, watermark):
+                    order_count += 1
+                    yield order
+        
+        self.signals.status.emit(f"Traitement terminé: {order_count} commandes extraites")
+        self.signals.progress.emit(95)
+    
+    def _build_orders(self, df, watermark=None):
+        """
+        Construit les commandes à partir d'un DataFrame d'export Shopify
+        
+        Shopify ne remplit les colonnes de la commande que sur sa première ligne:
+        elles sont propagées aux lignes suivantes de la même commande, puis
+        produits, couleurs et quantités sont extraits en une passe sur les colonnes.
+        Les lignes sous le watermark sont écartées avant toute extraction.
+        """
+        df = df.copy()
+        df['Name'] = df['Name'].astype(str)
+        
+        # Propager les colonnes de la commande sur toutes ses lignes
+        order_columns = [col for col in self.ORDER_COLUMNS if col in df.columns]
+        df[order_columns] = df.groupby('Name', sort=False)[order_columns].ffill()
+        
+        # Ignorer les commandes déjà importées lors d'un import précédent
+        order_numbers = pd.to_numeric(df['Name'].str.extract(r'(\d+)', expand=False), errors='coerce')
+        created_at = pd.to_datetime(df['Created at'], utc=True, errors='coerce', format=self.CREATED_AT_FORMAT)
+        self._update_high_watermark(order_numbers, created_at)
+        
+        if watermark:
+            below = self._below_watermark(order_numbers, created_at, watermark)
+            self.skipped_rows += int(below.sum())
+            df = df[~below]
+        
+        # Ignorer les lignes sans nom de produit
+        df = df[df['Lineitem name'].notna()]
+        if df.empty:
+            return []
+        
+        # Extraire le produit, la couleur et la quantité de chaque ligne
+        lineitem_names = df['Lineitem name'].astype(str)
+        name_quantities = lineitem_names.str.extract(r'\(x(\d+)\)', expand=False)
+        names = lineitem_names.str.replace(r'\(x\d+\)', '', regex=True).str.strip()
+        parts = names.str.extract(r'(?s)^(.*?) - (.*?)(?: - |$)')
+        
+        has_color = parts[0].notna()
+        products = parts[0].str.strip().where(has_color, names)
+        colors = parts[1].str.strip().where(has_color, 'Aléatoire')
+        
+        quantities = pd.to_numeric(df['Lineitem quantity'], errors='coerce').fillna(1).astype(int)
+        quantities = quantities.where(name_quantities.isna(), pd.to_numeric(name_quantities, errors='coerce'))
+        
+        # Une commande par valeur de Name, construite depuis sa première ligne
+        heads = df.groupby('Name', sort=False).head(1)
+        
+        def column(name, default):
+            """Valeurs d'une colonne de la commande, valeurs manquantes remplacées par default"""
+            if name not in heads.columns:
+                return [default] * len(heads)
+            values = heads[name].astype(object)
+            return values.where(values.notna(), default).tolist()
+        
+        order_ids = heads['Name'].tolist()
+        orders = {}
+        for order_id, created_at, email, status, client, notes in zip(
+            order_ids,
+            column('Created at', ""),
+            column('Email', ""),
+            column('Fulfillment Status', 'unfulfilled'),
+            column('Billing Name', None),
+            column('Notes', "")
+        ):
+            orders[order_id] = Order(
+                order_id=order_id,
+                # Formater la date (juste la partie date, pas l'heure)
+                date=created_at.split(' ')[0],
+                client=client if client is not None else order_id,
+                email=email,
+                # Convertir le statut Shopify en statut application
+                status="Prêt" if status == 'fulfilled' else "En attente",
+                priority="Moyenne",
+                notes=notes
             )
         
-        self.signals.status.emit(f"Traitement terminé: {len(orders)} commandes extraites")
-        self.signals.progress.emit(90)
+        # Ajouter les produits dans l'ordre des lignes du fichier
+        for order_id, product, color, quantity in zip(
+            df['Name'].tolist(), products.tolist(), colors.tolist(), quantities.astype(int).tolist()
+        ):
+            order = orders[order_id]
+            order.add_item(
+                product=product,
+                color=color,
+                quantity=quantity,
+                status="Imprimé" if order.status == "Prêt" else "À imprimer"
+            )
         
         return list(orders.values())
     
+    def _update_high_watermark(self, order_numbers, created_at):
+        """Met à jour la plus haute commande vue avec les numéros et dates d'un bloc"""
+        watermark = self.high_watermark or {"order_number": None, "created_at": None}
+        
+        max_number = order_numbers.max()
+        if pd.notna(max_number):
+            max_number = int(max_number)
+            if watermark["order_number"] is None or max_number > watermark["order_number"]:
+                watermark["order_number"] = max_number
+        
+        max_created_at = created_at.max()
+        if pd.notna(max_created_at):
+            max_created_at = max_created_at.strftime(self.WATERMARK_DATE_FORMAT)
+            # Le format choisi permet une comparaison lexicographique
+            if watermark["created_at"] is None or max_created_at > watermark["created_at"]:
+                watermark["created_at"] = max_created_at
+        
+        self.high_watermark = watermark
+    
+    def _below_watermark(self, order_numbers, created_at, watermark):
+        """
+        Masque des lignes déjà couvertes par le watermark
+        
+        Une ligne est couverte si son numéro de commande est inférieur ou égal au
+        plus haut numéro importé, ou, pour une commande sans numéro, si elle a été
+        créée strictement avant la plus récente commande importée.
+        """
+        below = pd.Series(False, index=order_numbers.index)
+        
+        if watermark.get("order_number") is not None:
+            below |= order_numbers.notna() & (order_numbers <= watermark["order_number"])
+        
+        if watermark.get("created_at"):
+            watermark_date = pd.Timestamp(watermark["created_at"], tz='UTC')
+            below |= order_numbers.isna() & created_at.notna() & (created_at < watermark_date)
+        
+        return below
+    
     def extract_product_color_quantity(self, lineitem_name, default_quantity=1):
         """
         Extrait le produit, la couleur et la quantité à partir du nom de l'article
@@ -163,9 +337,14 @@ class ShopifyCSVParser:
             if len(df) == 0:
                 return False, "Le fichier CSV est vide"
             
-            # Compter le nombre approximatif de commandes
-            all_df = pd.read_csv(file_path)
-            unique_orders = all_df['Name'].nunique()
+            # Compter les commandes en une passe sur la seule colonne Name,
+            # une nouvelle commande commençant à chaque changement de valeur
+            unique_orders = 0
+            last_name = None
+            for chunk in pd.read_csv(file_path, usecols=['Name'], chunksize=IMPORT_SETTINGS["chunk_size"]):
+                names = chunk['Name'].astype(str)
+                unique_orders += int((names != names.shift(fill_value=last_name)).sum())
+                last_name = names.iloc[-1]
             
             return True, f"Le fichier semble être un export Shopify valide. {unique_orders} commande(s) détectée(s)"
             
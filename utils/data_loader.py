@@ -0,0 +1,196 @@
+import threading
+import traceback
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+from models.database import Database
+from config import DATABASE_PATH
+
+
+class LoadTaskSignals(QObject):
+    """Signaux d'une tâche de chargement, émis depuis le thread du pool"""
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+
+class LoadTask(QRunnable):
+    """
+    Exécute une fonction de chargement dans un thread du pool
+    
+    Les tâches lancées sont référencées par la classe jusqu'à la fin de run():
+    la vue qui les a demandées peut être détruite pendant leur exécution.
+    """
+    
+    _active = set()
+    _active_lock = threading.Lock()
+    
+    def __init__(self, request_id, fetch):
+        super().__init__()
+        # La tâche est détruite par Python, pas par le pool
+        self.setAutoDelete(False)
+        self.request_id = request_id
+        self.fetch = fetch
+        self.cancelled = False
+        # Les signaux appartiennent à la tâche: ils restent valides même si la vue disparaît
+        self.signals = LoadTaskSignals()
+    
+    def start(self, pool):
+        """Place la tâche dans la file du pool"""
+        with self._active_lock:
+            self._active.add(self)
+        pool.start(self)
+    
+    def take(self, pool):
+        """Retire la tâche de la file du pool si elle n'a pas démarré"""
+        if pool.tryTake(self):
+            self._release()
+    
+    def run(self):
+        try:
+            if self.cancelled:
+                return
+            try:
+                result = self.fetch()
+            except Exception as e:
+                # La trace reste visible dans la console, comme une erreur du thread de l'interface
+                traceback.print_exc()
+                self.signals.failed.emit(self.request_id, str(e))
+                return
+            if not self.cancelled:
+                self.signals.finished.emit(self.request_id, result)
+        finally:
+            self._release()
+    
+    def _release(self):
+        with self._active_lock:
+            self._active.discard(self)
+
+
+class DataLoader(QObject):
+    """
+    Charge les données d'une vue hors du thread de l'interface
+    
+    La fonction passée à load() s'exécute dans un thread du QThreadPool et doit
+    créer ses propres contrôleurs, qui ouvrent ainsi la connexion SQLite de ce
+    thread. Son résultat est remis à la vue par le signal loaded, dans le thread
+    de l'interface. Une nouvelle demande annule la précédente: une tâche encore
+    en file n'est pas exécutée, et le résultat d'une tâche déjà lancée est ignoré.
+    Une exception levée par la fonction est affichée dans la console et son
+    message est remis par le signal failed: la vue doit le signaler, car elle
+    garde sinon ses données précédentes sans le dire.
+    """
+    
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    busy_changed = pyqtSignal(bool)
+    
+    # Nombre maximal de threads de chargement pour toute l'application
+    MAX_THREADS = 4
+    
+    _pool = None
+    
+    @classmethod
+    def pool(cls):
+        """Pool de threads partagé par tous les chargeurs"""
+        if cls._pool is None:
+            cls._pool = QThreadPool()
+            cls._pool.setMaxThreadCount(cls.MAX_THREADS)
+        return cls._pool
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.request_id = 0
+        self.current_task = None
+    
+    def load(self, fetch):
+        """
+        Lance le chargement en arrière-plan, en remplaçant la demande en cours
+        
+        Args:
+            fetch (callable): Fonction sans argument exécutée hors du thread de l'interface
+        
+        Returns:
+            int: Identifiant de la demande
+        """
+        self.cancel()
+        
+        self.request_id += 1
+        task = LoadTask(self.request_id, fetch)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        self.current_task = task
+        
+        task.start(self.pool())
+        self.busy_changed.emit(True)
+        return self.request_id
+    
+    def cancel(self):
+        """Annule la demande en cours, si elle n'est pas encore terminée"""
+        if self.current_task is None:
+            return
+        
+        self.current_task.cancelled = True
+        # Retirer la tâche de la file si elle n'a pas encore démarré
+        self.current_task.take(self.pool())
+        self.current_task = None
+        self.busy_changed.emit(False)
+    
+    def is_busy(self):
+        """Indique si une demande est en cours"""
+        return self.current_task is not None
+    
+    @pyqtSlot(int, object)
+    def _on_finished(self, request_id, result):
+        # Ignorer le résultat d'une demande remplacée entre-temps
+        if request_id != self.request_id or self.current_task is None:
+            return
+        self.current_task = None
+        self.busy_changed.emit(False)
+        self.loaded.emit(result)
+    
+    @pyqtSlot(int, str)
+    def _on_failed(self, request_id, message):
+        if request_id != self.request_id or self.current_task is None:
+            return
+        self.current_task = None
+        self.busy_changed.emit(False)
+        self.failed.emit(message)
+
+
+class DataVersionTracker:
+    """
+    Mémorise la version des tables dont dépend l'affichage d'une vue
+    
+    Les versions sont lues avant les données (dans le thread de chargement),
+    puis enregistrées par mark() une fois les données affichées: une écriture
+    concurrente au chargement sera donc vue comme un changement au tick suivant.
+    """
+    
+    def __init__(self, tables):
+        self.tables = tuple(tables)
+        self.rendered = None
+    
+    @staticmethod
+    def read(tables):
+        """Lit la version courante des tables (depuis n'importe quel thread)"""
+        db = Database(DATABASE_PATH)
+        try:
+            return db.get_data_versions(tables)
+        finally:
+            db.close()
+    
+    def changed_tables(self):
+        """Retourne les tables modifiées depuis le dernier affichage"""
+        if self.rendered is None:
+            return set(self.tables)
+        
+        current = self.read(self.tables)
+        return {table for table in self.tables if current[table] != self.rendered.get(table)}
+    
+    def has_changed(self):
+        """Indique si une des tables a changé depuis le dernier affichage"""
+        return bool(self.changed_tables())
+    
+    def mark(self, versions):
+        """Enregistre les versions correspondant aux données affichées"""
+        self.rendered = versions
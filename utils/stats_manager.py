@@ -1,6 +1,7 @@
 from controllers.order_controller import OrderController
 from controllers.print_controller import PrintController
 from controllers.inventory_controller import InventoryController
+from models.dashboard import DashboardAggregator
 import datetime
 
 class StatsManager:
@@ -9,40 +10,23 @@ class StatsManager:
     def __init__(self):
         self.order_controller = OrderController()
         self.print_controller = PrintController()
-        self.inventory_controller = InventoryController()
+        self.inventory_controller = InventoryController.shared()
+        self.aggregator = DashboardAggregator(self.print_controller.db)
     
     def get_dashboard_stats(self):
-        stats = {}
-        
-        # Statistiques des commandes
-        order_stats = self.order_controller.get_orders_count_by_status()
-        stats["orders"] = order_stats
-        
-        # Statistiques du plan d'impression
-        print_stats = self.print_controller.get_print_stats()
-        stats["print"] = print_stats
+        """
+        Récupère toutes les statistiques du tableau de bord: deux passes
+        groupées sur les commandes, l'inventaire étant résumé en mémoire
         
-        # Statistiques de l'inventaire
+        Returns:
+            DashboardSnapshot: Statistiques (accessibles aussi comme stats["orders"]...)
+        """
+        # Statistiques de l'inventaire (relu seulement s'il a changé hors du contrôleur)
+        self.inventory_controller.reload_if_changed()
         inventory_stats = self.inventory_controller.get_inventory_summary()
-        stats["inventory"] = inventory_stats
-        
-        # Produits les plus populaires
-        popular_products = self.print_controller.get_most_common_products(5)
-        stats["popular_products"] = popular_products
-        
-        # Couleurs les plus populaires
-        popular_colors = self.print_controller.get_most_common_colors(5)
-        stats["popular_colors"] = popular_colors
-        
-        # Produits en rupture de stock
         low_stock = self.inventory_controller.get_low_stock_products()
-        stats["low_stock"] = low_stock
-        
-        # Plan d'impression par couleur
-        color_summary = self.print_controller.get_color_summary()
-        stats["color_summary"] = color_summary
         
-        return stats 
+        return self.aggregator.snapshot(inventory_stats, low_stock, limit=5)
     
     """  
     def get_dashboard_stats(self):
@@ -9,19 +9,30 @@ from controllers.order_controller import OrderController
 from controllers.print_controller import PrintController
 from controllers.inventory_controller import InventoryController
 from utils.stats_manager import StatsManager
+from utils.data_loader import DataLoader, DataVersionTracker
 from utils.helpers import format_date
 from config import COLOR_HEX_MAP, UI_COLORS
 
 class DashboardWidget(QWidget):
     """Widget principal pour le tableau de bord"""
     
+    # Tables dont dépendent les statistiques affichées
+    DATA_TABLES = ("orders", "order_items", "components", "products",
+                   "product_components", "assembled_products")
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.order_controller = OrderController()
         self.print_controller = PrintController()
-        self.inventory_controller = InventoryController()
+        self.inventory_controller = InventoryController.shared()
         self.stats_manager = StatsManager()
         
+        # Chargement des statistiques hors du thread de l'interface
+        self.loader = DataLoader(self)
+        self.loader.loaded.connect(self.on_data_loaded)
+        self.loader.failed.connect(self.on_load_failed)
+        self.versions = DataVersionTracker(self.DATA_TABLES)
+        
         self.setup_ui()
         self.load_data()
     
@@ -65,6 +76,13 @@ class DashboardWidget(QWidget):
         scroll_area.setWidget(scroll_content)
         main_layout.addWidget(scroll_area)
         
+        # Erreur du dernier chargement (les statistiques affichées ne sont plus à jour)
+        self.error_label = QLabel()
+        self.error_label.setStyleSheet("color: #C00;")
+        self.error_label.setWordWrap(True)
+        self.error_label.hide()
+        main_layout.addWidget(self.error_label)
+        
         # Bouton de rafraîchissement
         refresh_button = QPushButton("Actualiser le tableau de bord")
         refresh_button.setIcon(self.style().standardIcon(self.style().SP_BrowserReload))
@@ -473,9 +491,30 @@ class DashboardWidget(QWidget):
         self.colors_chart_view.setChart(chart)
     
     def load_data(self):
-        """Charge les données pour le tableau de bord"""
-        # Récupérer les statistiques
-        dashboard_stats = self.stats_manager.get_dashboard_stats()
+        """Lance le chargement des données du tableau de bord en arrière-plan"""
+        self.loader.load(self.fetch_data)
+    
+    def refresh_if_changed(self):
+        """Recharge le tableau de bord seulement si ses tables ont changé"""
+        if self.versions.has_changed():
+            self.load_data()
+    
+    @classmethod
+    def fetch_data(cls):
+        """Calcule les statistiques (exécuté dans un thread du pool, avec ses propres contrôleurs)"""
+        versions = DataVersionTracker.read(cls.DATA_TABLES)
+        return versions, StatsManager().get_dashboard_stats()
+    
+    def on_load_failed(self, message):
+        """Signale l'échec du chargement: les statistiques affichées sont conservées"""
+        self.error_label.setText(f"Impossible d'actualiser le tableau de bord: {message}")
+        self.error_label.show()
+    
+    def on_data_loaded(self, result):
+        """Met à jour le tableau de bord avec les statistiques chargées"""
+        versions, dashboard_stats = result
+        self.versions.mark(versions)
+        self.error_label.hide()
         
         # Mettre à jour les tuiles d'informations
         self.orders_tile.value_label.setText(str(dashboard_stats["orders"]["En attente"]))
@@ -11,10 +11,11 @@ class ImportWorker(QThread):
     status = pyqtSignal(str)
     finished_with_result = pyqtSignal(bool, str)
     
-    def __init__(self, file_path, skip_existing=True, default_status="En attente", default_priority="Moyenne"):
+    def __init__(self, file_path, skip_existing=True, default_status="En attente", default_priority="Moyenne", incremental=True):
         super().__init__()
         self.file_path = file_path
         self.skip_existing = skip_existing
+        self.incremental = incremental
         self.default_status = default_status
         self.default_priority = default_priority
         self.import_controller = ImportController()
@@ -33,7 +34,8 @@ class ImportWorker(QThread):
             self.file_path,
             skip_existing=self.skip_existing,
             default_status=self.default_status,
-            default_priority=self.default_priority
+            default_priority=self.default_priority,
+            incremental=self.incremental
         )
         
         self.progress.emit(100)
@@ -78,6 +80,11 @@ class ImportDialog(QDialog):
         self.skip_existing_check.setChecked(True)
         options_layout.addWidget(self.skip_existing_check)
         
+        self.incremental_check = QCheckBox("Ignorer les commandes antérieures au dernier import")
+        self.incremental_check.setChecked(True)
+        self.skip_existing_check.toggled.connect(self.incremental_check.setEnabled)
+        options_layout.addWidget(self.incremental_check)
+        
         status_layout = QHBoxLayout()
         status_layout.addWidget(QLabel("Statut initial des commandes:"))
         self.status_combo = QComboBox()
@@ -147,6 +154,7 @@ class ImportDialog(QDialog):
         
         # Récupérer les options
         skip_existing = self.skip_existing_check.isChecked()
+        incremental = self.incremental_check.isChecked()
         default_status = self.status_combo.currentText()
         default_priority = self.priority_combo.currentText()
         
@@ -154,7 +162,7 @@ class ImportDialog(QDialog):
         self.import_button.setEnabled(False)
         
         # Créer et démarrer le worker thread
-        self.worker = ImportWorker(file_path, skip_existing, default_status, default_priority)
+        self.worker = ImportWorker(file_path, skip_existing, default_status, default_priority, incremental)
         self.worker.progress.connect(self.update_progress)
         self.worker.status.connect(self.update_status)
         self.worker.finished_with_result.connect(self.import_finished)
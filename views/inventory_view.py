@@ -9,12 +9,14 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QDialog, QFormLayout, QLineEdit, QGroupBox,
                              QTabWidget, QSplitter, QFrame, QRadioButton,
                              QCheckBox, QListWidget, QListWidgetItem, QGridLayout,
-                             QSizePolicy, QMenu, QAction, QInputDialog)
-from PyQt5.QtCore import Qt, QSize, QTimer
+                             QSizePolicy, QMenu, QAction, QInputDialog, QDoubleSpinBox)
+from PyQt5.QtCore import Qt, QSize, QTimer, pyqtSignal
 from PyQt5.QtGui import QColor, QBrush, QCursor, QFont
 from controllers.inventory_controller import InventoryController
 from controllers.order_controller import OrderController
-from config import COLORS, PRODUCTS, UI_COLORS, COLOR_HEX_MAP
+from controllers.plate_controller import PlateController
+from utils.data_loader import DataLoader, DataVersionTracker
+from config import COLORS, PRODUCTS, UI_COLORS, COLOR_HEX_MAP, PLATE_SETTINGS, SEQUENCING_SETTINGS
 
 class ColorIndicator(QFrame):
     """Widget pour afficher un indicateur de couleur"""
@@ -253,6 +255,7 @@ class AssembleDialog(QDialog):
         
         # Récupérer les composants nécessaires
         required_components = []
+        inventory_controller = InventoryController.shared()
         
         for component in self.product_details["components"]:
             comp_name = component["name"]
@@ -308,7 +311,7 @@ class AssembleDialog(QDialog):
             self.components_table.setItem(row, 2, QTableWidgetItem(str(comp["quantity"])))
             
             # Stock disponible (peut être implémenté avec les données réelles)
-            available = InventoryController().get_component_stock(comp["name"], comp["color"])
+            available = inventory_controller.get_component_stock(comp["name"], comp["color"])
             available_item = QTableWidgetItem(str(available))
             
             # Mettre en rouge si le stock est insuffisant
@@ -345,12 +348,41 @@ class AssembleDialog(QDialog):
 class InventoryView(QWidget):
     """Widget principal pour la gestion de l'inventaire"""
     
+    # Tables dont dépend l'affichage de l'inventaire
+    DATA_TABLES = InventoryController.DATA_TABLES
+    
+    # Émis (depuis n'importe quel thread) quand l'inventaire partagé est modifié
+    inventory_changed = pyqtSignal(tuple)
+    
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.inventory_controller = InventoryController()
+        # Versions lues avant l'inventaire qu'elles décrivent
+        initial_versions = DataVersionTracker.read(self.DATA_TABLES)
+        self.inventory_controller = InventoryController.shared()
+        # Profils d'impression des composants, créé à la première édition
+        self.plate_controller = None
+        
+        # Rechargement de l'inventaire hors du thread de l'interface
+        self.loader = DataLoader(self)
+        self.loader.loaded.connect(self.on_data_loaded)
+        self.loader.failed.connect(self.on_load_failed)
+        self.versions = DataVersionTracker(self.DATA_TABLES)
+        
+        # Les modifications faites ailleurs (plan d'impression, workflow)
+        # déclenchent une actualisation regroupée
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(300)
+        self.refresh_timer.timeout.connect(self.load_data)
+        self.inventory_changed.connect(self.on_inventory_changed)
+        
+        notify = self.inventory_changed.emit
+        self.inventory_controller.subscribe(notify)
+        self.destroyed.connect(lambda: InventoryController.shared().unsubscribe(notify))
         
         self.setup_ui()
-        self.load_data()
+        self.versions.mark(initial_versions)
+        self.render_data()
     
     def setup_ui(self):
         """Configure l'interface utilisateur"""
@@ -619,15 +651,57 @@ class InventoryView(QWidget):
         # Bouton pour raffraîchir les données
         refresh_btn = QPushButton("Actualiser les assemblables")
         refresh_btn.setIcon(self.style().standardIcon(self.style().SP_BrowserReload))
-        refresh_btn.clicked.connect(self.update_assemblable_products)
+        refresh_btn.clicked.connect(lambda: self.update_assemblable_products())
         layout.addWidget(refresh_btn)
     
     def load_data(self):
-        """Charge toutes les données de l'inventaire"""
+        """Lance l'actualisation de l'inventaire en arrière-plan"""
+        self.refresh_timer.stop()
+        self.loader.load(self.fetch_data)
+    
+    def refresh_if_changed(self):
+        """Recharge l'inventaire seulement si ses tables ont changé"""
+        if self.versions.has_changed():
+            self.load_data()
+    
+    def on_inventory_changed(self, tables):
+        """Planifie une actualisation après une modification de l'inventaire partagé"""
+        # Un chargement en cours affichera déjà l'inventaire modifié
+        if not self.loader.is_busy():
+            self.refresh_timer.start()
+    
+    @classmethod
+    def fetch_data(cls):
+        """
+        Calcule les produits assemblables (exécuté dans un thread du pool)
+        
+        L'inventaire partagé n'est relu que si ses tables ont été modifiées
+        sans passer par le contrôleur.
+        
+        Returns:
+            tuple: (versions des tables, produits assemblables)
+        """
+        versions = DataVersionTracker.read(cls.DATA_TABLES)
+        inventory_controller = InventoryController.shared()
+        inventory_controller.reload_if_changed()
+        return versions, inventory_controller.get_assemblable_products()
+    
+    def on_data_loaded(self, result):
+        """Met à jour les tableaux avec l'inventaire partagé"""
+        versions, assemblable = result
+        self.versions.mark(versions)
+        self.render_data(assemblable)
+    
+    def on_load_failed(self, message):
+        """Signale l'échec de l'actualisation: les tableaux affichés sont conservés"""
+        self.status_label.setText(f"Échec de l'actualisation de l'inventaire: {message}")
+    
+    def render_data(self, assemblable=None):
+        """Affiche toutes les données de l'inventaire"""
         self.load_components_data()
         self.load_products_data()
         self.load_definitions_data()
-        self.update_assemblable_products()
+        self.update_assemblable_products(assemblable)
         
         self.status_label.setText(f"Données actualisées: {self.count_components()} composants, {self.count_products()} produits assemblés")
     
@@ -696,8 +770,11 @@ class InventoryView(QWidget):
         
         # Mise à jour du tableau
         self.components_table.setRowCount(len(filtered_components))
+        self.component_rows = {}
         
         for row, comp in enumerate(filtered_components):
+            self.component_rows[(comp["name"], comp["color"])] = row
+            
             # Composant
             self.components_table.setItem(row, 0, QTableWidgetItem(comp["name"]))
             
@@ -711,10 +788,7 @@ class InventoryView(QWidget):
             self.components_table.setItem(row, 2, QTableWidgetItem(", ".join(sorted(used_in_products))))
             
             # Stock
-            stock_item = QTableWidgetItem(str(comp["stock"]))
-            if comp["stock"] <= comp["alert_threshold"]:
-                stock_item.setBackground(QColor("#FFCCCC"))  # Rouge clair pour le stock bas
-            self.components_table.setItem(row, 3, stock_item)
+            self.components_table.setItem(row, 3, self.create_stock_item(comp["stock"], comp["alert_threshold"]))
             
             # Seuil d'alerte
             self.components_table.setItem(row, 4, QTableWidgetItem(str(comp["alert_threshold"])))
@@ -738,9 +812,12 @@ class InventoryView(QWidget):
             
             # Bouton de modification
             edit_btn = QPushButton("Modifier")
+            # (le stock affiché peut avoir été ajusté depuis la création du bouton)
             edit_btn.clicked.connect(lambda checked=False, name=comp["name"], color=comp["color"], 
-                                    stock=comp["stock"], threshold=comp["alert_threshold"]: 
-                                   self.edit_component_dialog(name, color, stock, threshold))
+                                    threshold=comp["alert_threshold"]: 
+                                   self.edit_component_dialog(
+                                       name, color, self.inventory_controller.get_component_stock(name, color),
+                                       threshold))
             
             actions_layout.addWidget(add_btn)
             actions_layout.addWidget(remove_btn)
@@ -908,18 +985,19 @@ class InventoryView(QWidget):
         # Ajuster la hauteur des lignes
         self.components_detail_table.resizeRowsToContents()
     
-    def update_assemblable_products(self):
-        """Met à jour la liste des produits assemblables"""
+    def update_assemblable_products(self, assemblable=None):
+        """Met à jour la liste des produits assemblables (calculés si non fournis)"""
         # Récupérer les données des produits assemblables
-        assemblable = self.inventory_controller.get_assemblable_products()
-        all_products = self.inventory_controller.get_all_products()
+        if assemblable is None:
+            assemblable = self.inventory_controller.get_assemblable_products()
+        products_by_name = {p["name"]: p for p in self.inventory_controller.get_all_products()}
         
         # Préparer les données pour l'affichage
         assemblable_products = []
         
         for product_name, colors in assemblable.items():
             # Trouver les détails du produit
-            product_details = next((p for p in all_products if p["name"] == product_name), None)
+            product_details = products_by_name.get(product_name)
             
             if not product_details:
                 continue
@@ -939,38 +1017,71 @@ class InventoryView(QWidget):
         
         # Mise à jour du tableau des assemblables
         self.assemblable_table.setRowCount(len(assemblable_products))
+        self.assemblable_rows = {}
         
         for row, product in enumerate(assemblable_products):
-            # Produit
-            self.assemblable_table.setItem(row, 0, QTableWidgetItem(product["name"]))
-            
-            # Couleur
-            color_item = QTableWidgetItem(product["color"])
-            color_item.setBackground(QColor(COLOR_HEX_MAP.get(product["color"], "#CCCCCC")))
-            self.assemblable_table.setItem(row, 1, color_item)
-            
-            # Quantité assemblable
-            self.assemblable_table.setItem(row, 2, QTableWidgetItem(str(product["quantity"])))
-            
-            # Composants (résumé)
-            components_summary = ", ".join(f"{c['quantity']} {c['name']}" for c in product["components"])
-            self.assemblable_table.setItem(row, 3, QTableWidgetItem(components_summary))
-            
-            # Action d'assemblage
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout(actions_widget)
-            actions_layout.setContentsMargins(2, 2, 2, 2)
-            
-            assemble_btn = QPushButton("Assembler")
-            assemble_btn.clicked.connect(lambda checked=False, name=product["name"], color=product["color"]:
-                                       self.assemble_product_dialog(name, color))
-            actions_layout.addWidget(assemble_btn)
-            
-            self.assemblable_table.setCellWidget(row, 4, actions_widget)
+            self.set_assemblable_row(row, product["name"], product["color"], product["quantity"],
+                                     product["components"])
         
         # Mettre à jour le tableau des composants disponibles
         self.update_components_stock_table()
     
+    def set_assemblable_row(self, row, product_name, color, quantity, components):
+        """Remplit une ligne du tableau des produits assemblables"""
+        self.assemblable_rows.setdefault(product_name, {})[color] = row
+        self.assemblable_table.setRowHidden(row, False)
+        
+        # Produit
+        self.assemblable_table.setItem(row, 0, QTableWidgetItem(product_name))
+        
+        # Couleur
+        color_item = QTableWidgetItem(color)
+        color_item.setBackground(QColor(COLOR_HEX_MAP.get(color, "#CCCCCC")))
+        self.assemblable_table.setItem(row, 1, color_item)
+        
+        # Quantité assemblable
+        self.assemblable_table.setItem(row, 2, QTableWidgetItem(str(quantity)))
+        
+        # Composants (résumé)
+        components_summary = ", ".join(f"{c['quantity']} {c['name']}" for c in components)
+        self.assemblable_table.setItem(row, 3, QTableWidgetItem(components_summary))
+        
+        # Action d'assemblage
+        assemble_btn = QPushButton("Assembler")
+        assemble_btn.clicked.connect(lambda checked=False, name=product_name, color=color:
+                                   self.assemble_product_dialog(name, color))
+        self.assemblable_table.setCellWidget(row, 4, assemble_btn)
+    
+    def update_assemblable_rows(self, product_names):
+        """
+        Met à jour les lignes assemblables de quelques produits seulement
+        
+        Les lignes tombées à zéro sont masquées et les nouvelles ajoutées en fin
+        de tableau, pour ne pas décaler les autres; l'actualisation complète
+        suivante les remet en ordre.
+        """
+        for product_name in product_names:
+            colors = self.inventory_controller.get_product_assemblable(product_name) or {}
+            rows = self.assemblable_rows.get(product_name, {})
+            
+            # Couleurs déjà affichées qui ne sont plus assemblables
+            for color, row in rows.items():
+                if colors.get(color, 0) <= 0:
+                    self.assemblable_table.setRowHidden(row, True)
+            
+            for color, quantity in colors.items():
+                if quantity <= 0:
+                    continue
+                row = rows.get(color)
+                if row is None:
+                    product = self.inventory_controller.get_product_details(product_name)
+                    row = self.assemblable_table.rowCount()
+                    self.assemblable_table.insertRow(row)
+                    self.set_assemblable_row(row, product_name, color, quantity, product["components"])
+                else:
+                    self.assemblable_table.item(row, 2).setText(str(quantity))
+                    self.assemblable_table.setRowHidden(row, False)
+    
     def update_components_stock_table(self):
         """Met à jour le tableau des stocks de composants"""
         # Récupérer les données des composants
@@ -981,8 +1092,11 @@ class InventoryView(QWidget):
         
         # Mise à jour du tableau
         self.assembly_components_table.setRowCount(len(available_components))
+        self.assembly_component_rows = {}
         
         for row, comp in enumerate(available_components):
+            self.assembly_component_rows[(comp["name"], comp["color"])] = row
+            
             # Composant
             self.assembly_components_table.setItem(row, 0, QTableWidgetItem(comp["name"]))
             
@@ -992,14 +1106,45 @@ class InventoryView(QWidget):
             self.assembly_components_table.setItem(row, 1, color_item)
             
             # Stock
-            stock_item = QTableWidgetItem(str(comp["stock"]))
-            if comp["stock"] <= comp["alert_threshold"]:
-                stock_item.setBackground(QColor("#FFCCCC"))  # Rouge clair pour le stock bas
-            self.assembly_components_table.setItem(row, 2, stock_item)
+            self.assembly_components_table.setItem(row, 2, self.create_stock_item(comp["stock"], comp["alert_threshold"]))
         
         # Ajuster la hauteur des lignes
         self.assembly_components_table.resizeRowsToContents()
     
+    @staticmethod
+    def create_stock_item(stock, alert_threshold):
+        """Cellule de stock, en rouge clair sous le seuil d'alerte"""
+        stock_item = QTableWidgetItem(str(stock))
+        if stock <= alert_threshold:
+            stock_item.setBackground(QColor("#FFCCCC"))  # Rouge clair pour le stock bas
+        return stock_item
+    
+    def apply_component_stock_change(self, component_name, color):
+        """
+        Répercute le nouveau stock d'un composant sur les tableaux affichés,
+        sans recharger l'inventaire: sa ligne dans les tableaux de composants
+        et les produits assemblables qui l'utilisent
+        """
+        details = self.inventory_controller.get_component_details(component_name, color)
+        stock = details["stock"] if details else 0
+        threshold = details["alert_threshold"] if details else 0
+        
+        row = self.component_rows.get((component_name, color))
+        if row is not None:
+            self.components_table.setItem(row, 3, self.create_stock_item(stock, threshold))
+        elif details is not None:
+            # Composant (ou couleur) nouveau: il doit apparaître dans les filtres
+            self.load_components_data()
+        
+        row = self.assembly_component_rows.get((component_name, color))
+        if row is not None and stock > 0:
+            self.assembly_components_table.setItem(row, 2, self.create_stock_item(stock, threshold))
+        elif row is not None or stock > 0:
+            # Le composant entre dans la liste des stocks disponibles ou en sort
+            self.update_components_stock_table()
+        
+        self.update_assemblable_rows(self.inventory_controller.get_component_dependents(component_name))
+    
     def assemble_product_dialog(self, product_name, color):
         """Affiche le dialogue pour assembler un produit"""
         # Récupérer les détails du produit
@@ -1046,11 +1191,17 @@ class InventoryView(QWidget):
             
             # Mettre à jour les données
             self.load_data()
+    
     def adjust_component_stock(self, component_name, color, change):
         """Ajuste le stock d'un composant"""
+        # Un rechargement en cours a lu le stock avant cette modification
+        self.loader.cancel()
+        success = False
+        
         # Pour les ajustements importants, demander la quantité
         if change == 1 or change == -1:
             # Pour des changements simples, ajuster directement
+            in_sync = self.display_matches_inventory()
             success = self.inventory_controller.update_component_stock(component_name, color, change)
             if not success:
                 QMessageBox.warning(self, "Erreur", f"Impossible d'ajuster le stock de {component_name} ({color}).")
@@ -1068,12 +1219,22 @@ class InventoryView(QWidget):
                 change = quantity - current_stock
                 
                 # Appliquer le changement
+                in_sync = self.display_matches_inventory()
                 success = self.inventory_controller.update_component_stock(component_name, color, change)
                 if not success:
                     QMessageBox.warning(self, "Erreur", f"Impossible d'ajuster le stock de {component_name} ({color}).")
         
-        # Mettre à jour les données
-        self.load_components_data()
+        # Seules les lignes touchées par ce composant sont mises à jour; sinon
+        # (échec, affichage déjà en retard) l'actualisation complète planifiée suit son cours
+        if success and in_sync:
+            self.refresh_timer.stop()
+            self.versions.mark(self.inventory_controller.loaded_versions)
+            self.apply_component_stock_change(component_name, color)
+    
+    def display_matches_inventory(self):
+        """Indique si les tableaux affichent l'inventaire en mémoire, sans actualisation en attente"""
+        return (not self.refresh_timer.isActive() and not self.loader.is_busy()
+                and self.versions.rendered == self.inventory_controller.loaded_versions)
     
     def edit_component_dialog(self, name, color, stock, threshold):
         """Affiche le dialogue pour modifier un composant"""
@@ -1096,6 +1257,33 @@ class InventoryView(QWidget):
         threshold_spin.setValue(threshold)
         layout.addRow("Seuil d'alerte:", threshold_spin)
         
+        # Profil d'impression, commun à toutes les couleurs du composant:
+        # décoché, les plateaux utilisent l'emprise et la durée par défaut
+        if self.plate_controller is None:
+            self.plate_controller = PlateController()
+        profile = self.plate_controller.get_component_profile(name)
+        
+        profile_group = QGroupBox("Profil d'impression (toutes couleurs)")
+        profile_group.setCheckable(True)
+        profile_group.setChecked(profile is not None)
+        profile_layout = QFormLayout(profile_group)
+        
+        profile_spins = {}
+        for key, label, default, value in (
+            ("width", "Largeur (mm):", PLATE_SETTINGS["default_width_mm"], profile and profile.width),
+            ("depth", "Profondeur (mm):", PLATE_SETTINGS["default_depth_mm"], profile and profile.depth),
+            ("height", "Hauteur (mm):", PLATE_SETTINGS["default_height_mm"], profile and profile.height),
+            ("minutes", "Durée d'impression (min):", SEQUENCING_SETTINGS["minutes_per_piece"],
+             profile and profile.minutes)
+        ):
+            spin = QDoubleSpinBox()
+            spin.setDecimals(1)
+            spin.setRange(0.1, 2000)
+            spin.setValue(value if value is not None else default)
+            profile_layout.addRow(label, spin)
+            profile_spins[key] = spin
+        layout.addRow(profile_group)
+        
         # Boutons
         buttons = QHBoxLayout()
         cancel_btn = QPushButton("Annuler")
@@ -1126,6 +1314,16 @@ class InventoryView(QWidget):
                 if not success:
                     QMessageBox.warning(self, "Erreur", f"Impossible de mettre à jour le seuil d'alerte de {name} ({color}).")
             
+            # Mettre à jour le profil d'impression
+            if profile_group.isChecked():
+                values = tuple(profile_spins[key].value() for key in ("width", "depth", "height", "minutes"))
+                if profile is None or values != (profile.width, profile.depth, profile.height, profile.minutes):
+                    if not self.plate_controller.set_component_profile(name, *values):
+                        QMessageBox.warning(self, "Erreur", f"Impossible d'enregistrer le profil d'impression de {name}.")
+            elif profile is not None:
+                if not self.plate_controller.delete_component_profile(name):
+                    QMessageBox.warning(self, "Erreur", f"Impossible de supprimer le profil d'impression de {name}.")
+            
             # Mettre à jour les données
             self.load_components_data()
     
@@ -1240,6 +1438,9 @@ class InventoryView(QWidget):
     
     def adjust_product_stock(self, product_name, color, change):
         """Ajuste le stock d'un produit assemblé"""
+        # Un rechargement en cours a lu le stock avant cette modification
+        self.loader.cancel()
+        
         success = self.inventory_controller.update_assembled_product_stock(product_name, color, change)
         
         if not success:
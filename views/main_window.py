@@ -404,7 +404,7 @@ class MainWindow(QMainWindow):
     def setup_auto_refresh(self):
         """Configure le rafraîchissement automatique des données"""
         self.refresh_timer = QTimer(self)
-        self.refresh_timer.timeout.connect(self.refresh_data)
+        self.refresh_timer.timeout.connect(lambda: self.refresh_data(only_changed=True))
         
         # Rafraîchir toutes les 5 minutes
         self.refresh_timer.start(5 * 60 * 1000)
@@ -540,13 +540,25 @@ class MainWindow(QMainWindow):
         
         self.tabs.removeTab(index)
     
-    def refresh_data(self):
-        """Rafraîchit les données de l'application"""
-        # À implémenter: actualiser les données
-        self.status_message.setText("Actualisation des données...")
+    def refresh_data(self, only_changed=False):
+        """
+        Rafraîchit les données de tous les onglets ouverts
         
-        # Simuler un délai d'actualisation
-        QTimer.singleShot(500, lambda: self.status_message.setText("Données actualisées"))
+        Avec only_changed (rafraîchissement automatique), une vue n'est
+        rechargée que si les tables qu'elle affiche ont changé.
+        """
+        self.status_message.setText("Actualisation des données en arrière-plan...")
+        
+        # Chaque vue recharge ses données en arrière-plan, la demande
+        # précédente encore en cours étant remplacée
+        for i in range(self.tabs.count()):
+            widget = self.tabs.widget(i)
+            if only_changed and hasattr(widget, "refresh_if_changed"):
+                widget.refresh_if_changed()
+                continue
+            reload = getattr(widget, "load_data", None) or getattr(widget, "load_orders", None)
+            if reload:
+                reload()
         
         # Mettre à jour la date de dernière actualisation
         self.last_refresh = datetime.now()
@@ -671,6 +683,10 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """Gère l'événement de fermeture de la fenêtre"""
         self.save_settings()
+        
+        # L'instantané permet au prochain démarrage de ne pas relire l'inventaire
+        from controllers.inventory_controller import InventoryController
+        InventoryController.shared().save_snapshot()
         event.accept()
         
     def setup_ui(self):
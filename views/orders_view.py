@@ -1,23 +1,220 @@
 # views/orders_view.py
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, 
-                           QTableWidgetItem, QPushButton, QComboBox, QLineEdit,
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableView, 
+                           QPushButton, QComboBox, QLineEdit, QStyle, QStyleOptionButton,
+                           QStyledItemDelegate, QApplication, QAbstractItemView, QToolTip,
                            QHeaderView, QFrame, QMessageBox, QMenu)
-from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtCore import (Qt, QSize, QRect, QEvent, QTimer, QModelIndex, QAbstractTableModel,
+                          QSortFilterProxyModel, pyqtSignal)
 from PyQt5.QtGui import QIcon, QColor
 from controllers.order_controller import OrderController
 from controllers.workflow_controller import WorkflowController
 from utils.helpers import format_date
-from config import ORDER_STATUSES, PRIORITIES, UI_COLORS
+from utils.data_loader import DataLoader, DataVersionTracker
+from config import ORDER_STATUSES, PRIORITIES, UI_COLORS, UI_SETTINGS
+
+# Couleur de fond des cellules de statut
+STATUS_BACKGROUNDS = {
+    "En attente": QColor(255, 200, 200),  # Rouge clair
+    "En cours": QColor(255, 230, 180),    # Orange clair
+    "Prêt": QColor(200, 255, 200),        # Vert clair
+    "Expédié": QColor(220, 220, 255),     # Bleu clair
+}
+
+class OrdersTableModel(QAbstractTableModel):
+    """
+    Modèle des commandes affichées, stockées sous forme de tuples de texte
+    
+    Chaque ligne contient (id, date, client, produits, statut, priorité, email):
+    le texte est préparé une fois au chargement et la vue ne demande que les
+    cellules visibles, seules mises en forme à l'affichage.
+    """
+    
+    HEADERS = ["ID", "Date", "Client", "Produits", "Statut", "Priorité", "Actions"]
+    
+    # Indices des champs dans une ligne
+    ID, DATE, CLIENT, PRODUCTS, STATUS, PRIORITY, EMAIL = range(7)
+    ACTIONS_COLUMN = 6
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+    
+    @staticmethod
+    def order_to_row(order):
+        """Convertit une commande en ligne du modèle"""
+        products = [f"{item['product']} - {item['color']} (x{item['quantity']})" for item in order.items]
+        return (
+            order.id,
+            order.date,
+            order.client,
+            "\n".join(products),
+            order.status,
+            order.priority,
+            order.email or ""
+        )
+    
+    def set_orders(self, orders):
+        """Remplace toutes les lignes du modèle"""
+        self.beginResetModel()
+        self.rows = [self.order_to_row(order) for order in orders]
+        self.endResetModel()
+    
+    def append_orders(self, orders):
+        """Ajoute des commandes à la fin du modèle"""
+        if not orders:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(orders) - 1)
+        self.rows.extend(self.order_to_row(order) for order in orders)
+        self.endInsertRows()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        
+        row = self.rows[index.row()]
+        column = index.column()
+        
+        if role == Qt.DisplayRole:
+            if column == self.PRODUCTS:
+                # Une seule ligne par commande, la liste complète est dans l'infobulle
+                return row[self.PRODUCTS].replace("\n", ", ")
+            if column == self.DATE:
+                # Formatée à l'affichage, uniquement pour les lignes visibles
+                return format_date(row[self.DATE])
+            if column < self.ACTIONS_COLUMN:
+                return row[column]
+        elif role == Qt.ToolTipRole and column == self.PRODUCTS:
+            return row[self.PRODUCTS]
+        elif role == Qt.BackgroundRole and column == self.STATUS:
+            return STATUS_BACKGROUNDS.get(row[self.STATUS])
+        
+        return None
+    
+    def row_data(self, row):
+        """Retourne le tuple d'une ligne du modèle"""
+        return self.rows[row]
+
+class OrdersFilterProxyModel(QSortFilterProxyModel):
+    """Filtre les lignes chargées sur l'ID, le client ou l'email, sans toucher au modèle source"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.search = ""
+    
+    def set_search(self, text):
+        """Met à jour le texte recherché et réévalue le filtre"""
+        text = text.strip().lower()
+        if text != self.search:
+            self.search = text
+            self.invalidateFilter()
+    
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self.search:
+            return True
+        
+        # Lecture directe du tuple, sans passer par data() pour chaque colonne
+        row = self.sourceModel().row_data(source_row)
+        return any(
+            self.search in row[field].lower()
+            for field in (OrdersTableModel.ID, OrdersTableModel.CLIENT, OrdersTableModel.EMAIL)
+        )
+
+class OrderActionsDelegate(QStyledItemDelegate):
+    """Dessine les boutons d'action d'une ligne et signale le bouton cliqué"""
+    
+    # (action, icône standard, infobulle)
+    ACTIONS = [
+        ("view", QStyle.SP_FileDialogDetailedView, "Voir les détails"),
+        ("edit", QStyle.SP_FileDialogContentsView, "Éditer la commande"),
+        ("status", QStyle.SP_ArrowRight, "Changer le statut"),
+    ]
+    
+    BUTTON_SIZE = 28
+    SPACING = 2
+    
+    # action, index de la cellule, rectangle du bouton (coordonnées du viewport)
+    action_triggered = pyqtSignal(str, QModelIndex, QRect)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        style = QApplication.style()
+        self.icons = [style.standardIcon(icon) for _, icon, _ in self.ACTIONS]
+    
+    def button_rects(self, cell_rect):
+        """Rectangles des boutons dans une cellule"""
+        top = cell_rect.top() + (cell_rect.height() - self.BUTTON_SIZE) // 2
+        return [
+            QRect(
+                cell_rect.left() + self.SPACING + i * (self.BUTTON_SIZE + self.SPACING),
+                top, self.BUTTON_SIZE, self.BUTTON_SIZE
+            )
+            for i in range(len(self.ACTIONS))
+        ]
+    
+    def paint(self, painter, option, index):
+        style = QApplication.style()
+        for rect, icon in zip(self.button_rects(option.rect), self.icons):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.icon = icon
+            button.iconSize = QSize(16, 16)
+            button.state = QStyle.State_Enabled | QStyle.State_Raised
+            style.drawControl(QStyle.CE_PushButton, button, painter)
+    
+    def sizeHint(self, option, index):
+        count = len(self.ACTIONS)
+        return QSize(count * self.BUTTON_SIZE + (count + 1) * self.SPACING, self.BUTTON_SIZE + 2 * self.SPACING)
+    
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            for rect, (action, _, _) in zip(self.button_rects(option.rect), self.ACTIONS):
+                if rect.contains(event.pos()):
+                    self.action_triggered.emit(action, index, rect)
+                    return True
+        return super().editorEvent(event, model, option, index)
+    
+    def helpEvent(self, event, view, option, index):
+        if event.type() == QEvent.ToolTip:
+            for rect, (_, _, tooltip) in zip(self.button_rects(option.rect), self.ACTIONS):
+                if rect.contains(event.pos()):
+                    QToolTip.showText(event.globalPos(), tooltip, view)
+                    return True
+        return super().helpEvent(event, view, option, index)
 
 class OrdersWidget(QWidget):
     """Widget pour la gestion des commandes"""
     
+    # Tables dont dépend la liste des commandes
+    DATA_TABLES = ("orders", "order_items")
+    
     def __init__(self, parent=None, filter_status=None):
         super().__init__(parent)
         self.order_controller = OrderController()
         self.workflow_controller = WorkflowController()
         self.filter_status = filter_status  # Pour filtrer par statut (en attente, en cours, etc.)
         
+        # Pagination des commandes affichées
+        self.page_size = UI_SETTINGS["orders_page_size"]
+        self.next_cursor = None
+        
+        # Chargement des pages hors du thread de l'interface
+        self.loader = DataLoader(self)
+        self.loader.loaded.connect(self.on_orders_loaded)
+        self.loader.failed.connect(self.on_load_failed)
+        self.versions = DataVersionTracker(self.DATA_TABLES)
+        
         self.setup_ui()
         self.load_orders()
     
@@ -25,6 +222,12 @@ class OrdersWidget(QWidget):
         """Configure l'interface utilisateur"""
         layout = QVBoxLayout(self)
         
+        # Recharger depuis la base une fois la saisie de recherche terminée
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(300)
+        self.search_timer.timeout.connect(self.filter_orders)
+        
         # Titre et filtres
         header_layout = QHBoxLayout()
         
@@ -49,7 +252,7 @@ class OrdersWidget(QWidget):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Rechercher une commande...")
         self.search_input.setMinimumWidth(200)
-        self.search_input.textChanged.connect(self.filter_orders)
+        self.search_input.textChanged.connect(self.on_search_changed)
         header_layout.addWidget(self.search_input)
         
         # Filtre de statut
@@ -73,26 +276,39 @@ class OrdersWidget(QWidget):
         
         layout.addLayout(header_layout)
         
-        # Tableau des commandes
-        self.orders_table = QTableWidget()
-        self.orders_table.setColumnCount(7)
-        self.orders_table.setHorizontalHeaderLabels([
-            "ID", "Date", "Client", "Produits", "Statut", "Priorité", "Actions"
-        ])
+        # Tableau des commandes (modèle/vue, filtre de recherche par proxy)
+        self.orders_model = OrdersTableModel(self)
+        self.orders_proxy = OrdersFilterProxyModel(self)
+        self.orders_proxy.setSourceModel(self.orders_model)
+        
+        self.orders_table = QTableView()
+        self.orders_table.setModel(self.orders_proxy)
+        
+        self.actions_delegate = OrderActionsDelegate(self.orders_table)
+        self.actions_delegate.action_triggered.connect(self.on_order_action)
+        self.orders_table.setItemDelegateForColumn(OrdersTableModel.ACTIONS_COLUMN, self.actions_delegate)
         
         # Configuration du tableau
-        self.orders_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.orders_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.orders_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.orders_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.orders_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)  # Colonne Produits extensible
         self.orders_table.horizontalHeader().setStretchLastSection(True)
+        self.orders_table.horizontalHeader().resizeSection(
+            OrdersTableModel.ACTIONS_COLUMN, self.actions_delegate.sizeHint(None, None).width()
+        )
         self.orders_table.verticalHeader().setVisible(False)
+        # Hauteur de ligne fixe: pas de calcul de taille par ligne
+        self.orders_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.orders_table.verticalHeader().setDefaultSectionSize(
+            self.actions_delegate.sizeHint(None, None).height()
+        )
         self.orders_table.setAlternatingRowColors(True)
         self.orders_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 gridline-color: #ddd;
                 selection-background-color: #e0e0e0;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 color: black;
             }
         """)
@@ -114,144 +330,144 @@ class OrdersWidget(QWidget):
         
         buttons_layout.addStretch()
         
+        # Nombre de commandes affichées
+        self.count_label = QLabel()
+        buttons_layout.addWidget(self.count_label)
+        
+        # Chargement de la page suivante
+        self.load_more_button = QPushButton("Charger plus")
+        self.load_more_button.setIcon(self.style().standardIcon(self.style().SP_ArrowDown))
+        self.load_more_button.clicked.connect(self.load_more_orders)
+        buttons_layout.addWidget(self.load_more_button)
+        
         layout.addLayout(buttons_layout)
     
     def load_orders(self):
-        """Charge les commandes depuis le contrôleur"""
-        # Récupérer les commandes
-        if self.filter_status == "pending":
-            orders = self.order_controller.get_orders_by_status("En attente")
-        elif self.filter_status == "in_progress":
-            orders = self.order_controller.get_orders_by_status("En cours")
-        elif self.filter_status == "ready":
-            orders = self.order_controller.get_orders_by_status("Prêt")
-        elif self.filter_status == "shipped":
-            orders = self.order_controller.get_orders_by_status("Expédié")
-        else:
-            orders = self.order_controller.get_all_orders()
+        """Lance le chargement de la première page de commandes en arrière-plan"""
+        self.request_orders_page(append=False)
+    
+    def load_more_orders(self):
+        """Ajoute la page de commandes suivante au tableau"""
+        if not self.next_cursor:
+            return
+        
+        self.load_more_button.setEnabled(False)
+        self.request_orders_page(self.next_cursor, append=True)
+    
+    def request_orders_page(self, cursor=None, append=False):
+        """Lit les filtres actuels et lance la lecture d'une page de commandes"""
+        page_size = self.page_size
+        status = self.get_current_status()
+        search = self.search_input.text().strip()
         
-        # Remplir le tableau
-        self.update_table(orders)
+        self.loader.load(
+            lambda: (
+                append,
+                DataVersionTracker.read(self.DATA_TABLES),
+                *self.fetch_orders_page(page_size, cursor, status, search)
+            )
+        )
     
-    def update_table(self, orders):
+    def refresh_if_changed(self):
+        """Recharge la liste seulement si les commandes ont changé"""
+        if self.versions.has_changed():
+            self.load_orders()
+    
+    @staticmethod
+    def fetch_orders_page(page_size, cursor=None, status=None, search=None):
+        """
+        Récupère une page de commandes et charge leurs produits
+        (exécuté dans un thread du pool, avec son propre contrôleur)
+        
+        Returns:
+            tuple: (commandes avec leurs produits, curseur de la page suivante ou None)
+        """
+        order_controller = OrderController()
+        orders, next_cursor = order_controller.get_orders_page(
+            page_size=page_size,
+            cursor=cursor,
+            status=status,
+            search=search
+        )
+        
+        # Charger les produits uniquement pour les commandes affichées
+        return order_controller.hydrate_items(orders), next_cursor
+    
+    def on_orders_loaded(self, result):
+        """Affiche une page de commandes chargée"""
+        append, versions, orders, self.next_cursor = result
+        # Une page ajoutée ne met pas à jour les lignes déjà affichées
+        if not append:
+            self.versions.mark(versions)
+        self.update_table(orders, append=append)
+    
+    def on_load_failed(self, message):
+        """Signale l'échec du chargement: les commandes affichées sont conservées"""
+        self.count_label.setText(f"Échec du chargement des commandes: {message}")
+        self.load_more_button.setEnabled(self.next_cursor is not None)
+    
+    def get_current_status(self):
+        """Retourne le statut à filtrer selon la liste déroulante et l'onglet"""
+        status_filter = self.status_filter.currentData()
+        if status_filter != "all":
+            return status_filter
+        
+        # Si on est dans un onglet filtré mais qu'on a choisi "Tous les statuts",
+        # on respecte quand même le filtre de l'onglet
+        return {
+            "pending": "En attente",
+            "in_progress": "En cours",
+            "ready": "Prêt",
+            "shipped": "Expédié"
+        }.get(self.filter_status)
+    
+    def update_table(self, orders, append=False):
         """Met à jour le tableau avec les commandes"""
-        # Vider le tableau
-        self.orders_table.setRowCount(0)
+        # Remplacer les lignes, sauf si on ajoute une page
+        if append:
+            self.orders_model.append_orders(orders)
+        else:
+            self.orders_model.set_orders(orders)
         
-        # Remplir avec les nouvelles données
-        for row_idx, order in enumerate(orders):
-            self.orders_table.insertRow(row_idx)
-            
-            # ID
-            id_item = QTableWidgetItem(order.id)
-            self.orders_table.setItem(row_idx, 0, id_item)
-            
-            # Date
-            date_item = QTableWidgetItem(format_date(order.date))
-            self.orders_table.setItem(row_idx, 1, date_item)
-            
-            # Client
-            client_item = QTableWidgetItem(order.client)
-            self.orders_table.setItem(row_idx, 2, client_item)
-            
-            # Produits
-            products_text = ""
-            for item in order.items:
-                products_text += f"{item['product']} - {item['color']} (x{item['quantity']})\n"
-            products_item = QTableWidgetItem(products_text.strip())
-            self.orders_table.setItem(row_idx, 3, products_item)
-            
-            # Statut
-            status_item = QTableWidgetItem(order.status)
-            
-            # Colorer selon le statut
-            if order.status == "En attente":
-                status_item.setBackground(QColor(255, 200, 200))  # Rouge clair
-            elif order.status == "En cours":
-                status_item.setBackground(QColor(255, 230, 180))  # Orange clair
-            elif order.status == "Prêt":
-                status_item.setBackground(QColor(200, 255, 200))  # Vert clair
-            elif order.status == "Expédié":
-                status_item.setBackground(QColor(220, 220, 255))  # Bleu clair
-            
-            self.orders_table.setItem(row_idx, 4, status_item)
-            
-            # Priorité
-            priority_item = QTableWidgetItem(order.priority)
-            self.orders_table.setItem(row_idx, 5, priority_item)
-            
-            # Actions
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout(actions_widget)
-            actions_layout.setContentsMargins(2, 2, 2, 2)
-            actions_layout.setSpacing(2)
-            
-            # Bouton Voir détails
-            view_button = QPushButton("")
-            view_button.setIcon(self.style().standardIcon(self.style().SP_FileDialogDetailedView))
-            view_button.setToolTip("Voir les détails")
-            view_button.setFixedSize(28, 28)
-            view_button.clicked.connect(lambda checked, o=order: self.view_order(o))
-            actions_layout.addWidget(view_button)
-            
-            # Bouton Éditer
-            edit_button = QPushButton("")
-            edit_button.setIcon(self.style().standardIcon(self.style().SP_FileDialogContentsView))
-            edit_button.setToolTip("Éditer la commande")
-            edit_button.setFixedSize(28, 28)
-            edit_button.clicked.connect(lambda checked, o=order: self.edit_order(o))
-            actions_layout.addWidget(edit_button)
-            
-            # Bouton Changer statut
-            status_button = QPushButton("")
-            status_button.setIcon(self.style().standardIcon(self.style().SP_ArrowRight))
-            status_button.setToolTip("Changer le statut")
-            status_button.setFixedSize(28, 28)
-            status_button.clicked.connect(lambda checked, o=order: self.show_status_menu(status_button, o))
-            actions_layout.addWidget(status_button)
-            
-            self.orders_table.setCellWidget(row_idx, 6, actions_widget)
-            
-        # Ajuster les hauteurs de ligne pour les produits multiples
-        for row in range(self.orders_table.rowCount()):
-            self.orders_table.resizeRowToContents(row)
+        # Mettre à jour la pagination
+        self.update_count_label()
+        self.load_more_button.setEnabled(self.next_cursor is not None)
+    
+    def update_count_label(self):
+        """Affiche le nombre de commandes visibles"""
+        self.count_label.setText(f"{self.orders_proxy.rowCount()} commande(s) affichée(s)")
+    
+    def on_search_changed(self, text):
+        """Filtre immédiatement les lignes chargées, puis relance la requête après la saisie"""
+        self.orders_proxy.set_search(text)
+        self.update_count_label()
+        self.search_timer.start()
     
     def filter_orders(self):
         """Filtre les commandes selon la recherche et le statut"""
-        search_text = self.search_input.text().lower()
-        status_filter = self.status_filter.currentData()
+        # Les filtres sont appliqués par la requête paginée
+        self.search_timer.stop()
+        self.load_orders()
+    
+    def on_order_action(self, action, index, rect):
+        """Exécute l'action d'un bouton dessiné par le délégué"""
+        row = self.orders_model.row_data(self.orders_proxy.mapToSource(index).row())
+        order_id = row[OrdersTableModel.ID]
         
-        # Récupérer toutes les commandes
-        if self.filter_status and status_filter == "all":
-            # Si on est dans un onglet filtré mais qu'on a choisi "Tous les statuts",
-            # on respecte quand même le filtre de l'onglet
-            if self.filter_status == "pending":
-                orders = self.order_controller.get_orders_by_status("En attente")
-            elif self.filter_status == "in_progress":
-                orders = self.order_controller.get_orders_by_status("En cours")
-            elif self.filter_status == "ready":
-                orders = self.order_controller.get_orders_by_status("Prêt")
-            elif self.filter_status == "shipped":
-                orders = self.order_controller.get_orders_by_status("Expédié")
-            else:
-                orders = self.order_controller.get_all_orders()
-        elif status_filter != "all":
-            orders = self.order_controller.get_orders_by_status(status_filter)
-        else:
-            orders = self.order_controller.get_all_orders()
+        if action == "status":
+            self.show_status_menu(rect, order_id, row[OrdersTableModel.STATUS])
+            return
         
-        # Filtrer par texte de recherche
-        if search_text:
-            filtered_orders = []
-            for order in orders:
-                if (search_text in order.id.lower() or 
-                    search_text in order.client.lower() or 
-                    search_text in order.email.lower()):
-                    filtered_orders.append(order)
-            orders = filtered_orders
+        # Charger la commande complète uniquement à la demande
+        order = self.order_controller.get_order_by_id(order_id)
+        if not order:
+            self.load_orders()
+            return
         
-        # Mettre à jour le tableau
-        self.update_table(orders)
+        if action == "view":
+            self.view_order(order)
+        elif action == "edit":
+            self.edit_order(order)
     
     def view_order(self, order):
         """Affiche les détails d'une commande"""
@@ -274,33 +490,33 @@ class OrdersWidget(QWidget):
         # Dans une version future, on pourrait ouvrir un formulaire d'édition complet
         QMessageBox.information(self, "Édition", f"Édition de la commande {order.id} (à implémenter)")
     
-    def show_status_menu(self, button, order):
+    def show_status_menu(self, button_rect, order_id, current_status):
         """Affiche un menu pour changer le statut de la commande"""
         menu = QMenu(self)
         
         # Ajouter les statuts possibles
         for status in ORDER_STATUSES:
-            if status != order.status:  # Ne pas inclure le statut actuel
+            if status != current_status:  # Ne pas inclure le statut actuel
                 action = menu.addAction(status)
-                action.triggered.connect(lambda checked, s=status: self.change_order_status(order, s))
+                action.triggered.connect(lambda checked, s=status: self.change_order_status(order_id, s))
         
         # Si la commande est prête, ajouter une action pour l'expédier
-        if order.status == "Prêt":
+        if current_status == "Prêt":
             menu.addSeparator()
             ship_action = menu.addAction("Expédier")
-            ship_action.triggered.connect(lambda: self.ship_order(order))
+            ship_action.triggered.connect(lambda: self.ship_order(order_id))
         
         # Afficher le menu sous le bouton
-        menu.exec_(button.mapToGlobal(button.rect().bottomLeft()))
+        menu.exec_(self.orders_table.viewport().mapToGlobal(button_rect.bottomLeft()))
     
-    def change_order_status(self, order, new_status):
+    def change_order_status(self, order_id, new_status):
         """Change le statut d'une commande"""
-        self.order_controller.update_order_status(order.id, new_status)
+        self.order_controller.update_order_status(order_id, new_status)
         self.load_orders()  # Recharger les commandes
     
-    def ship_order(self, order):
+    def ship_order(self, order_id):
         """Expédie une commande"""
-        success, message = self.workflow_controller.ship_order(order.id)
+        success, message = self.workflow_controller.ship_order(order_id)
         
         if success:
             QMessageBox.information(self, "Commande expédiée", message)
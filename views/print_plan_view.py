@@ -3,24 +3,44 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                            QFrame, QPushButton, QSizePolicy, QTableWidget,
                            QTableWidgetItem, QHeaderView, QComboBox, QCheckBox,
                            QMessageBox, QSpinBox, QStyle, QDialog, QFormLayout,
-                           QDialogButtonBox, QAbstractItemView, QMenu, QTabWidget)
+                           QDialogButtonBox, QAbstractItemView, QMenu, QTabWidget, QLineEdit)
 from PyQt5.QtCore import Qt, QTimer, QPoint
 from PyQt5.QtGui import QFont, QColor, QIcon, QCursor
 from controllers.print_controller import PrintController
 from controllers.inventory_controller import InventoryController
 from controllers.workflow_controller import WorkflowController
 from controllers.order_controller import OrderController
+from controllers.printer_controller import PrinterController
+from controllers.plate_controller import PlateController
+from utils.data_loader import DataLoader, DataVersionTracker
+from models.printer_fleet import PRINTER_AVAILABLE, PRINTER_PRINTING, PRINTER_OFFLINE
 from config import COLOR_HEX_MAP, UI_COLORS, COLORS
 
+def create_printer_combo(printers, selected_name=None):
+    """Liste des imprimantes en service ("Aucune" en tête), avec la couleur chargée"""
+    combo = QComboBox()
+    combo.addItem("Aucune", None)
+    for printer in printers:
+        if printer.status == PRINTER_OFFLINE:
+            continue
+        loaded = f" - {printer.loaded_color}" if printer.loaded_color else ""
+        combo.addItem(f"{printer.name}{loaded}", printer.id)
+        if printer.name == selected_name:
+            combo.setCurrentIndex(combo.count() - 1)
+    return combo
+
+
 class StartPrintDialog(QDialog):
     """Dialogue pour démarrer une impression partielle"""
     
-    def __init__(self, product, color, total_quantity, parent=None):
+    def __init__(self, product, color, total_quantity, printers=(), planned_printer=None, parent=None):
         super().__init__(parent)
         self.product = product
         self.color = color
         self.total_quantity = total_quantity
         self.quantity_to_print = total_quantity  # Par défaut, tout imprimer
+        self.printers = printers
+        self.planned_printer = planned_printer
         
         self.setWindowTitle(f"Démarrer l'impression de {product}")
         self.setMinimumWidth(400)
@@ -66,6 +86,10 @@ class StartPrintDialog(QDialog):
         self.remaining_label = QLabel("0")
         form_layout.addRow("Quantité restante pour plus tard:", self.remaining_label)
         
+        # Imprimante (celle prévue par la planification est proposée)
+        self.printer_combo = create_printer_combo(self.printers, self.planned_printer)
+        form_layout.addRow("Imprimante:", self.printer_combo)
+        
         layout.addLayout(form_layout)
         
         # Message d'information
@@ -97,6 +121,244 @@ class StartPrintDialog(QDialog):
     def get_quantity(self):
         """Retourne la quantité choisie pour l'impression"""
         return self.quantity_spin.value()
+    
+    def get_printer_id(self):
+        """Retourne l'imprimante choisie (None si aucune)"""
+        return self.printer_combo.currentData()
+
+
+class StartPlateDialog(QDialog):
+    """Dialogue pour démarrer l'impression d'un plateau entier"""
+    
+    def __init__(self, plate, printers=(), parent=None):
+        super().__init__(parent)
+        self.plate = plate
+        self.printers = printers
+        
+        self.setWindowTitle(f"Démarrer l'impression du plateau {plate.label}")
+        self.setMinimumWidth(400)
+        self.setup_ui()
+    
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        
+        form_layout = QFormLayout()
+        
+        # Produits du plateau
+        content_label = QLabel("<br>".join(f"{quantity} × {product}" for product, quantity in self.plate.items))
+        form_layout.addRow("Produits:", content_label)
+        form_layout.addRow("Pièces:", QLabel(f"{self.plate.piece_count} ({self.plate.fill_ratio:.0%} du plateau)"))
+        form_layout.addRow("Durée estimée:", QLabel(f"{self.plate.print_minutes / 60:.1f} h"))
+        
+        # Imprimante: celle dont la bobine est déjà de la couleur du plateau est proposée
+        loaded = next((printer.name for printer in self.printers
+                       if printer.loaded_color == self.plate.color and printer.status != PRINTER_OFFLINE), None)
+        self.printer_combo = create_printer_combo(self.printers, loaded)
+        form_layout.addRow("Imprimante:", self.printer_combo)
+        
+        layout.addLayout(form_layout)
+        
+        # Boutons
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+        layout.addWidget(self.button_box)
+    
+    def get_printer_id(self):
+        """Retourne l'imprimante choisie (None si aucune)"""
+        return self.printer_combo.currentData()
+
+
+class PrinterDialog(QDialog):
+    """Dialogue d'ajout ou de modification d'une imprimante"""
+    
+    def __init__(self, printer=None, parent=None):
+        super().__init__(parent)
+        self.printer = printer
+        
+        self.setWindowTitle(f"Modifier {printer.name}" if printer else "Ajouter une imprimante")
+        self.setMinimumWidth(350)
+        self.setup_ui()
+    
+    def setup_ui(self):
+        layout = QFormLayout(self)
+        printer = self.printer
+        
+        self.name_edit = QLineEdit(printer.name if printer else "")
+        layout.addRow("Nom:", self.name_edit)
+        
+        # Bobine chargée (Aléatoire n'est pas une bobine)
+        self.color_combo = QComboBox()
+        self.color_combo.addItem("Aucune", None)
+        for color in COLORS:
+            if color != "Aléatoire":
+                self.color_combo.addItem(color, color)
+        if printer and printer.loaded_color:
+            self.color_combo.setCurrentIndex(max(self.color_combo.findData(printer.loaded_color), 0))
+        layout.addRow("Bobine chargée:", self.color_combo)
+        
+        # Volume d'impression
+        self.size_spins = []
+        for label, value in (("Largeur du plateau (mm):", printer.bed_width if printer else 220),
+                             ("Profondeur du plateau (mm):", printer.bed_depth if printer else 220),
+                             ("Hauteur maximale (mm):", printer.max_height if printer else 250)):
+            spin = QSpinBox()
+            spin.setRange(1, 2000)
+            spin.setValue(value)
+            layout.addRow(label, spin)
+            self.size_spins.append(spin)
+        
+        # Statut: "En impression" est géré par les travaux, seul le passage Hors service est manuel
+        self.status_combo = QComboBox()
+        self.status_combo.addItems([PRINTER_AVAILABLE, PRINTER_OFFLINE])
+        if printer and printer.status == PRINTER_PRINTING:
+            self.status_combo.insertItem(0, PRINTER_PRINTING)
+        if printer:
+            self.status_combo.setCurrentText(printer.status)
+        layout.addRow("Statut:", self.status_combo)
+        
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+        layout.addRow(self.button_box)
+    
+    def accept(self):
+        if not self.name_edit.text().strip():
+            QMessageBox.warning(self, "Nom manquant", "Veuillez saisir le nom de l'imprimante.")
+            return
+        super().accept()
+    
+    def get_fields(self):
+        """Valeurs saisies, au format de PrinterController.update_printer"""
+        bed_width, bed_depth, max_height = (spin.value() for spin in self.size_spins)
+        return {
+            "name": self.name_edit.text().strip(),
+            "loaded_color": self.color_combo.currentData(),
+            "bed_width": bed_width,
+            "bed_depth": bed_depth,
+            "max_height": max_height,
+            "status": self.status_combo.currentText(),
+        }
+
+
+class PrinterFleetDialog(QDialog):
+    """Dialogue de gestion du parc d'imprimantes"""
+    
+    def __init__(self, printer_controller, parent=None):
+        super().__init__(parent)
+        self.printer_controller = printer_controller
+        self.printers = []
+        # Indique au plan d'impression qu'il doit se recharger
+        self.changed = False
+        
+        self.setWindowTitle("Parc d'imprimantes")
+        self.setMinimumSize(600, 300)
+        self.setup_ui()
+        self.load_printers()
+    
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        
+        self.table = QTableWidget()
+        self.table.setColumnCount(4)
+        self.table.setHorizontalHeaderLabels(["Nom", "Bobine chargée", "Volume (mm)", "Statut"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.doubleClicked.connect(self.edit_printer)
+        layout.addWidget(self.table)
+        
+        buttons_layout = QHBoxLayout()
+        for label, slot in (("Ajouter", self.add_printer), ("Modifier", self.edit_printer),
+                            ("Retirer", self.remove_printer)):
+            button = QPushButton(label)
+            button.clicked.connect(slot)
+            buttons_layout.addWidget(button)
+        buttons_layout.addStretch()
+        
+        close_button = QPushButton("Fermer")
+        close_button.clicked.connect(self.accept)
+        buttons_layout.addWidget(close_button)
+        layout.addLayout(buttons_layout)
+    
+    def load_printers(self):
+        """Affiche les imprimantes du parc"""
+        self.printers = self.printer_controller.get_printers()
+        self.table.setRowCount(len(self.printers))
+        
+        for row, printer in enumerate(self.printers):
+            self.table.setItem(row, 0, QTableWidgetItem(printer.name))
+            color_item = QTableWidgetItem(printer.loaded_color or "Aucune")
+            if printer.loaded_color:
+                color_item.setBackground(QColor(COLOR_HEX_MAP.get(printer.loaded_color, "#CCCCCC")))
+            self.table.setItem(row, 1, color_item)
+            self.table.setItem(row, 2, QTableWidgetItem(
+                f"{printer.bed_width} × {printer.bed_depth} × {printer.max_height}"))
+            self.table.setItem(row, 3, QTableWidgetItem(printer.status))
+    
+    def selected_printer(self):
+        """Imprimante sélectionnée, ou None"""
+        row = self.table.currentRow()
+        return self.printers[row] if 0 <= row < len(self.printers) else None
+    
+    def add_printer(self):
+        dialog = PrinterDialog(parent=self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        
+        fields = dialog.get_fields()
+        printer_id = self.printer_controller.add_printer(
+            fields["name"], fields["bed_width"], fields["bed_depth"], fields["max_height"], fields["loaded_color"])
+        if printer_id is None:
+            QMessageBox.warning(self, "Erreur", f"Impossible d'ajouter l'imprimante {fields['name']} "
+                                                 "(ce nom est peut-être déjà utilisé).")
+            return
+        if fields["status"] != PRINTER_AVAILABLE:
+            self.printer_controller.update_printer(printer_id, status=fields["status"])
+        
+        self.changed = True
+        self.load_printers()
+    
+    def edit_printer(self):
+        printer = self.selected_printer()
+        if printer is None:
+            return
+        
+        dialog = PrinterDialog(printer, self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        
+        # Seuls les champs modifiés sont écrits
+        fields = {field: value for field, value in dialog.get_fields().items()
+                  if value != getattr(printer, field)}
+        if fields and not self.printer_controller.update_printer(printer.id, **fields):
+            QMessageBox.warning(self, "Erreur", f"Impossible de modifier l'imprimante {printer.name} "
+                                                 "(ce nom est peut-être déjà utilisé).")
+            return
+        
+        self.changed = self.changed or bool(fields)
+        self.load_printers()
+    
+    def remove_printer(self):
+        printer = self.selected_printer()
+        if printer is None:
+            return
+        
+        reply = QMessageBox.question(self, "Retirer l'imprimante",
+                                     f"Retirer {printer.name} du parc, avec sa file de travaux planifiés ?",
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+        
+        try:
+            self.printer_controller.remove_printer(printer.id)
+        except ValueError as e:
+            QMessageBox.warning(self, "Imprimante en service", str(e))
+            return
+        
+        self.changed = True
+        self.load_printers()
 
 
 class CompletePrintDialog(QDialog):
@@ -199,24 +461,56 @@ class CompletePrintDialog(QDialog):
 class PrintPlanWidget(QWidget):
     """Widget principal pour le plan d'impression"""
     
+    # Tables dont dépendent le plan d'impression et les besoins en composants
+    DATA_TABLES = ("order_items", "orders", "printers", "print_jobs") + InventoryController.DATA_TABLES
+    
+    # Tables dont dépendent les plateaux (produits à imprimer, volume des imprimantes, pièces)
+    PLATE_TABLES = ("order_items", "printers", "component_print_profiles") + InventoryController.DATA_TABLES
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.print_controller = PrintController()
-        self.inventory_controller = InventoryController()
+        self.inventory_controller = InventoryController.shared()
         self.workflow_controller = WorkflowController()
         self.order_controller = OrderController()
+        self.printer_controller = PrinterController()
+        self.plate_controller = PlateController()
         
         # Données du plan d'impression
         self.print_plan = {}
+        self.assignments = {}
+        self.printers = []
+        self.plates = []
+        self.oversized = {}
         self.products_to_print = []
         self.products_printing = []
+        self.requirements = []
         
         # Configuration des colonnes du tableau
         self.COLUMN_COLOR = 0
         self.COLUMN_PRODUCT = 1
         self.COLUMN_QUANTITY = 2
         self.COLUMN_PRIORITY = 3
-        self.COLUMN_ACTIONS = 4
+        self.COLUMN_PRINTER = 4
+        self.COLUMN_ACTIONS = 5
+        
+        # Colonnes du tableau des besoins en composants
+        self.COLUMN_GROSS = 2
+        self.COLUMN_ON_HAND = 3
+        self.COLUMN_NET = 4
+        
+        # Chargement du plan d'impression hors du thread de l'interface
+        self.loader = DataLoader(self)
+        self.loader.loaded.connect(self.on_data_loaded)
+        self.loader.failed.connect(self.on_load_failed)
+        self.versions = DataVersionTracker(self.DATA_TABLES)
+        
+        # Les plateaux ne sont calculés que pour l'onglet "Plateaux" affiché
+        self.plates_loader = DataLoader(self)
+        self.plates_loader.loaded.connect(self.on_plates_loaded)
+        self.plates_loader.failed.connect(self.on_plates_load_failed)
+        self.plates_failed = False
+        self.plate_versions = DataVersionTracker(self.PLATE_TABLES)
         
         self.setup_ui()
         self.load_data()
@@ -261,6 +555,18 @@ class PrintPlanWidget(QWidget):
         
         header_layout.addStretch()
         
+        # Répartition des produits à imprimer sur le parc d'imprimantes
+        schedule_button = QPushButton("Planifier les imprimantes")
+        schedule_button.setToolTip("Répartir les produits à imprimer sur les imprimantes, selon les bobines chargées")
+        schedule_button.clicked.connect(self.schedule_printers)
+        header_layout.addWidget(schedule_button)
+        
+        # Gestion du parc (bobines chargées, volumes, mise hors service)
+        printers_button = QPushButton("Imprimantes...")
+        printers_button.setToolTip("Ajouter, modifier ou retirer des imprimantes du parc")
+        printers_button.clicked.connect(self.show_printer_fleet_dialog)
+        header_layout.addWidget(printers_button)
+        
         # Bouton rafraîchir
         refresh_button = QPushButton()
         refresh_button.setIcon(self.style().standardIcon(QStyle.SP_BrowserReload))
@@ -281,8 +587,8 @@ class PrintPlanWidget(QWidget):
         
         # Tableau des produits à imprimer
         self.to_print_table = QTableWidget()
-        self.to_print_table.setColumnCount(5)
-        self.to_print_table.setHorizontalHeaderLabels(["Couleur", "Produit", "Quantité", "Priorité", "Actions"])
+        self.to_print_table.setColumnCount(6)
+        self.to_print_table.setHorizontalHeaderLabels(["Couleur", "Produit", "Quantité", "Priorité", "Imprimante", "Actions"])
         self.to_print_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.to_print_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         
@@ -291,6 +597,7 @@ class PrintPlanWidget(QWidget):
         self.to_print_table.horizontalHeader().setSectionResizeMode(self.COLUMN_PRODUCT, QHeaderView.Stretch)
         self.to_print_table.horizontalHeader().setSectionResizeMode(self.COLUMN_QUANTITY, QHeaderView.ResizeToContents)
         self.to_print_table.horizontalHeader().setSectionResizeMode(self.COLUMN_PRIORITY, QHeaderView.ResizeToContents)
+        self.to_print_table.horizontalHeader().setSectionResizeMode(self.COLUMN_PRINTER, QHeaderView.ResizeToContents)
         self.to_print_table.horizontalHeader().setSectionResizeMode(self.COLUMN_ACTIONS, QHeaderView.ResizeToContents)
         
         # Activer le tri
@@ -325,8 +632,8 @@ class PrintPlanWidget(QWidget):
         
         # Tableau des produits en impression
         self.printing_table = QTableWidget()
-        self.printing_table.setColumnCount(5)
-        self.printing_table.setHorizontalHeaderLabels(["Couleur", "Produit", "Quantité", "Priorité", "Actions"])
+        self.printing_table.setColumnCount(6)
+        self.printing_table.setHorizontalHeaderLabels(["Couleur", "Produit", "Quantité", "Priorité", "Imprimante", "Actions"])
         self.printing_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.printing_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         
@@ -335,6 +642,7 @@ class PrintPlanWidget(QWidget):
         self.printing_table.horizontalHeader().setSectionResizeMode(self.COLUMN_PRODUCT, QHeaderView.Stretch)
         self.printing_table.horizontalHeader().setSectionResizeMode(self.COLUMN_QUANTITY, QHeaderView.ResizeToContents)
         self.printing_table.horizontalHeader().setSectionResizeMode(self.COLUMN_PRIORITY, QHeaderView.ResizeToContents)
+        self.printing_table.horizontalHeader().setSectionResizeMode(self.COLUMN_PRINTER, QHeaderView.ResizeToContents)
         self.printing_table.horizontalHeader().setSectionResizeMode(self.COLUMN_ACTIONS, QHeaderView.ResizeToContents)
         
         # Activer le tri
@@ -352,9 +660,62 @@ class PrintPlanWidget(QWidget):
         
         printing_layout.addWidget(self.printing_table)
         
+        # 3. Onglet "Plateaux": produits à imprimer regroupés par plateau
+        self.plates_widget = plates_widget = QWidget()
+        plates_layout = QVBoxLayout(plates_widget)
+        plates_layout.setContentsMargins(0, 10, 0, 0)
+        
+        self.plates_table = QTableWidget()
+        self.plates_table.setColumnCount(7)
+        self.plates_table.setHorizontalHeaderLabels(
+            ["Couleur", "Plateau", "Produits", "Pièces", "Remplissage", "Durée (h)", "Actions"])
+        self.plates_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.plates_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        
+        for column in range(self.plates_table.columnCount()):
+            mode = QHeaderView.Stretch if column == 2 else QHeaderView.ResizeToContents
+            self.plates_table.horizontalHeader().setSectionResizeMode(column, mode)
+        
+        self.plates_table.setAlternatingRowColors(True)
+        self.plates_table.setStyleSheet(self.to_print_table.styleSheet())
+        
+        plates_layout.addWidget(self.plates_table)
+        
+        self.oversized_label = QLabel()
+        self.oversized_label.setWordWrap(True)
+        self.oversized_label.setStyleSheet("color: #C00;")
+        plates_layout.addWidget(self.oversized_label)
+        
+        # 4. Onglet "Besoins en composants"
+        requirements_widget = QWidget()
+        requirements_layout = QVBoxLayout(requirements_widget)
+        requirements_layout.setContentsMargins(0, 10, 0, 0)
+        
+        # Tableau des composants nécessaires aux produits à imprimer
+        self.requirements_table = QTableWidget()
+        self.requirements_table.setColumnCount(5)
+        self.requirements_table.setHorizontalHeaderLabels(["Couleur", "Composant", "Besoin brut", "En stock", "À imprimer"])
+        self.requirements_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.requirements_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        
+        self.requirements_table.horizontalHeader().setSectionResizeMode(self.COLUMN_COLOR, QHeaderView.ResizeToContents)
+        self.requirements_table.horizontalHeader().setSectionResizeMode(self.COLUMN_PRODUCT, QHeaderView.Stretch)
+        self.requirements_table.horizontalHeader().setSectionResizeMode(self.COLUMN_GROSS, QHeaderView.ResizeToContents)
+        self.requirements_table.horizontalHeader().setSectionResizeMode(self.COLUMN_ON_HAND, QHeaderView.ResizeToContents)
+        self.requirements_table.horizontalHeader().setSectionResizeMode(self.COLUMN_NET, QHeaderView.ResizeToContents)
+        
+        self.requirements_table.setSortingEnabled(True)
+        self.requirements_table.setAlternatingRowColors(True)
+        self.requirements_table.setStyleSheet(self.to_print_table.styleSheet())
+        
+        requirements_layout.addWidget(self.requirements_table)
+        
         # Ajouter les onglets
         self.tab_widget.addTab(to_print_widget, "À imprimer")
         self.tab_widget.addTab(printing_widget, "En impression")
+        self.tab_widget.addTab(plates_widget, "Plateaux")
+        self.tab_widget.currentChanged.connect(self.refresh_plates_if_changed)
+        self.tab_widget.addTab(requirements_widget, "Besoins en composants")
         
         main_layout.addWidget(self.tab_widget)
         
@@ -368,15 +729,72 @@ class PrintPlanWidget(QWidget):
         
         # Timer pour auto-refresh périodique
         self.refresh_timer = QTimer(self)
-        self.refresh_timer.timeout.connect(self.load_data)
+        self.refresh_timer.timeout.connect(self.refresh_if_changed)
         self.refresh_timer.start(120000)  # 2 minutes
     
     def load_data(self):
-        """Charge les données du plan d'impression"""
-        self.print_plan = self.print_controller.get_print_plan(include_printing=True)
+        """Lance le chargement du plan d'impression en arrière-plan"""
+        self.loader.load(self.fetch_data)
+    
+    def refresh_if_changed(self):
+        """Recharge le plan d'impression seulement si les produits commandés ont changé"""
+        if self.versions.has_changed():
+            self.load_data()
+        else:
+            self.refresh_plates_if_changed()
+    
+    def refresh_plates_if_changed(self):
+        """Recalcule les plateaux si leur onglet est affiché et que leurs tables ont changé"""
+        if self.tab_widget.currentWidget() is self.plates_widget and self.plate_versions.has_changed():
+            self.plates_loader.load(self.fetch_plates)
+    
+    @classmethod
+    def fetch_data(cls):
+        """Lit le plan d'impression et les besoins en composants (exécuté dans un thread du pool)"""
+        versions = DataVersionTracker.read(cls.DATA_TABLES)
+        # Reprendre les modifications d'inventaire faites par un autre processus
+        InventoryController.shared().reload_if_changed()
+        
+        printer_controller = PrinterController()
+        print_controller = printer_controller.print_controller
+        return (versions, print_controller.get_print_plan(include_printing=True, with_order_ids=False),
+                print_controller.get_component_requirements(), printer_controller.get_assignments(),
+                printer_controller.get_printers())
+    
+    @classmethod
+    def fetch_plates(cls):
+        """Regroupe les produits à imprimer en plateaux (exécuté dans un thread du pool)"""
+        versions = DataVersionTracker.read(cls.PLATE_TABLES)
+        InventoryController.shared().reload_if_changed()
+        return (versions,) + PlateController().get_plates()
+    
+    def on_data_loaded(self, result):
+        """Met à jour les tableaux avec le plan d'impression chargé"""
+        versions, self.print_plan, self.requirements, self.assignments, self.printers = result
+        self.versions.mark(versions)
         self.prepare_product_lists()
         self.update_tables()
         self.update_status_bar()
+        self.refresh_plates_if_changed()
+    
+    def on_plates_loaded(self, result):
+        """Met à jour l'onglet des plateaux"""
+        versions, self.plates, self.oversized = result
+        self.plate_versions.mark(versions)
+        self.update_plates_table()
+        # Remplacer le message d'un échec précédent
+        if self.plates_failed:
+            self.plates_failed = False
+            self.update_status_bar()
+    
+    def on_load_failed(self, message):
+        """Signale l'échec du chargement: les tableaux affichés sont conservés"""
+        self.status_label.setText(f"Échec de l'actualisation du plan d'impression: {message}")
+    
+    def on_plates_load_failed(self, message):
+        """Signale l'échec du calcul des plateaux: le tableau affiché est conservé"""
+        self.plates_failed = True
+        self.status_label.setText(f"Échec du calcul des plateaux: {message}")
     
     def prepare_product_lists(self):
         """Prépare deux listes distinctes : produits à imprimer et produits en impression"""
@@ -390,11 +808,15 @@ class PrintPlanWidget(QWidget):
                 product_data = product.copy()
                 product_data["color"] = color
                 
-                # Répartir dans la liste appropriée selon le statut
+                # Répartir dans la liste appropriée selon le statut, avec les
+                # imprimantes qui l'impriment ou qui doivent l'imprimer
                 if product_data.get("status") == "En impression":
+                    job_status = "En impression"
                     self.products_printing.append(product_data)
                 else:
+                    job_status = "Planifié"
                     self.products_to_print.append(product_data)
+                product_data["printers"] = self.assignments.get((product["product"], color, job_status), [])
     
     def update_tables(self):
         """Met à jour les deux tableaux avec les données filtrées"""
@@ -403,6 +825,12 @@ class PrintPlanWidget(QWidget):
         
         # Mettre à jour le tableau des produits en impression
         self.update_printing_table()
+        
+        # Mettre à jour le tableau des plateaux
+        self.update_plates_table()
+        
+        # Mettre à jour le tableau des besoins en composants
+        self.update_requirements_table()
     
     def update_to_print_table(self):
         """Met à jour le tableau des produits à imprimer"""
@@ -430,6 +858,7 @@ class PrintPlanWidget(QWidget):
             self.add_product_cell(self.to_print_table, row, product_data["product"])
             self.add_quantity_cell(self.to_print_table, row, product_data["quantity"])
             self.add_priority_cell(self.to_print_table, row, product_data["priority"])
+            self.add_printer_cell(self.to_print_table, row, product_data["printers"])
             self.add_actions_cell(self.to_print_table, row, product_data, is_printing=False)
             
         # Réactiver le tri avec les paramètres précédents
@@ -463,6 +892,7 @@ class PrintPlanWidget(QWidget):
             self.add_product_cell(self.printing_table, row, product_data["product"])
             self.add_quantity_cell(self.printing_table, row, product_data["quantity"])
             self.add_priority_cell(self.printing_table, row, product_data["priority"])
+            self.add_printer_cell(self.printing_table, row, product_data["printers"])
             self.add_actions_cell(self.printing_table, row, product_data, is_printing=True)
             
         # Réactiver le tri avec les paramètres précédents
@@ -477,6 +907,74 @@ class PrintPlanWidget(QWidget):
         else:
             self.tab_widget.setTabText(1, "En impression")
     
+    def update_plates_table(self):
+        """Met à jour le tableau des plateaux (filtre de couleur uniquement)"""
+        self.plates_table.setRowCount(0)
+        color_filter = self.color_combo.currentText()
+        
+        for plate in self.plates:
+            if color_filter != "Toutes" and plate.color != color_filter:
+                continue
+            
+            row = self.plates_table.rowCount()
+            self.plates_table.insertRow(row)
+            
+            self.add_color_cell(self.plates_table, row, plate.color)
+            self.add_number_cell(self.plates_table, row, 1, plate.number)
+            content = ", ".join(f"{quantity} × {product}" for product, quantity in plate.items)
+            self.plates_table.setItem(row, 2, QTableWidgetItem(content))
+            self.add_number_cell(self.plates_table, row, 3, plate.piece_count)
+            self.add_number_cell(self.plates_table, row, 4, f"{plate.fill_ratio:.0%}")
+            self.add_number_cell(self.plates_table, row, 5, round(plate.print_minutes / 60, 1))
+            
+            start_btn = QPushButton("Démarrer")
+            start_btn.setFixedHeight(24)
+            start_btn.clicked.connect(lambda checked=False, p=plate: self.show_plate_dialog(p))
+            self.plates_table.setCellWidget(row, 6, start_btn)
+        
+        if self.oversized:
+            products = ", ".join(f"{quantity} × {product} ({color})"
+                                 for (product, color), quantity in sorted(self.oversized.items()))
+            self.oversized_label.setText(f"Trop grands pour le plateau, à lancer produit par produit: {products}")
+        else:
+            self.oversized_label.setText("")
+    
+    def update_requirements_table(self):
+        """Met à jour le tableau des besoins en composants"""
+        sorting_enabled = self.requirements_table.isSortingEnabled()
+        self.requirements_table.setSortingEnabled(False)
+        
+        sort_column = self.requirements_table.horizontalHeader().sortIndicatorSection()
+        sort_order = self.requirements_table.horizontalHeader().sortIndicatorOrder()
+        
+        self.requirements_table.setRowCount(0)
+        
+        # Filtre de couleur uniquement
+        color_filter = self.color_combo.currentText()
+        for requirement in self.requirements:
+            if color_filter != "Toutes" and requirement["color"] != color_filter:
+                continue
+            
+            row = self.requirements_table.rowCount()
+            self.requirements_table.insertRow(row)
+            
+            self.add_color_cell(self.requirements_table, row, requirement["color"])
+            self.add_product_cell(self.requirements_table, row, requirement["component"])
+            self.add_number_cell(self.requirements_table, row, self.COLUMN_GROSS, requirement["gross"])
+            self.add_number_cell(self.requirements_table, row, self.COLUMN_ON_HAND, requirement["on_hand"])
+            item = self.add_number_cell(self.requirements_table, row, self.COLUMN_NET, requirement["net"])
+            
+            # Composants manquants en évidence
+            if requirement["net"] > 0:
+                item.setForeground(QColor(UI_COLORS["danger"]))
+                font = item.font()
+                font.setBold(True)
+                item.setFont(font)
+        
+        self.requirements_table.setSortingEnabled(sorting_enabled)
+        if sorting_enabled:
+            self.requirements_table.sortItems(sort_column, sort_order)
+    
     def add_color_cell(self, table, row, color):
         """Ajoute une cellule pour la couleur avec l'indicateur visuel et le texte"""
         # Créer directement un QTableWidgetItem avec le nom de la couleur
@@ -510,6 +1008,19 @@ class PrintPlanWidget(QWidget):
         item.setTextAlignment(Qt.AlignCenter)
         table.setItem(row, self.COLUMN_QUANTITY, item)
     
+    def add_number_cell(self, table, row, column, value):
+        """Ajoute une cellule numérique centrée dans une colonne donnée"""
+        item = QTableWidgetItem()
+        item.setData(Qt.DisplayRole, value)  # Pour le tri numérique
+        item.setTextAlignment(Qt.AlignCenter)
+        table.setItem(row, column, item)
+        return item
+    
+    def add_printer_cell(self, table, row, printers):
+        """Ajoute une cellule pour les imprimantes affectées au produit"""
+        item = QTableWidgetItem(", ".join(printers))
+        table.setItem(row, self.COLUMN_PRINTER, item)
+    
     def add_priority_cell(self, table, row, priority):
         """Ajoute une cellule pour la priorité avec couleur appropriée"""
         item = QTableWidgetItem(priority)
@@ -613,6 +1124,10 @@ class PrintPlanWidget(QWidget):
         if high_priority > 0:
             status_text += f" • {high_priority} priorité haute"
         
+        missing = sum(1 for r in self.requirements if r["net"] > 0)
+        if missing > 0:
+            status_text += f" • {missing} composants à imprimer"
+        
         self.status_label.setText(status_text)
     
     def apply_filters(self):
@@ -645,17 +1160,18 @@ class PrintPlanWidget(QWidget):
     
     def show_print_dialog(self, product, color, quantity):
         """Affiche le dialogue pour démarrer une impression"""
-        # Ouvrir la boîte de dialogue
-        dialog = StartPrintDialog(product, color, quantity, self)
+        # Ouvrir la boîte de dialogue, avec la première imprimante prévue par la planification
+        planned = self.assignments.get((product, color, "Planifié"))
+        dialog = StartPrintDialog(product, color, quantity, self.printers, planned[0] if planned else None, self)
         if dialog.exec_() == QDialog.Accepted:
             quantity_to_print = dialog.get_quantity()
-            self.start_printing_job(product, color, quantity_to_print)
+            self.start_printing_job(product, color, quantity_to_print, dialog.get_printer_id())
     
-    def start_printing_job(self, product, color, quantity_to_print):
-        """Démarre l'impression d'un produit"""
+    def start_printing_job(self, product, color, quantity_to_print, printer_id=None):
+        """Démarre l'impression d'un produit, sur une imprimante si elle est indiquée"""
         try:
             # Appeler le contrôleur pour démarrer l'impression
-            self.print_controller.start_printing_batch_partial(product, color, quantity_to_print)
+            self.print_controller.start_printing_batch_partial(product, color, quantity_to_print, printer_id)
             
             QMessageBox.information(self, "Impression démarrée",
                                   f"L'impression de {quantity_to_print} {product}(s) en {color} a été démarrée.")
@@ -670,6 +1186,47 @@ class PrintPlanWidget(QWidget):
             QMessageBox.warning(self, "Erreur", 
                               f"Une erreur s'est produite lors du démarrage de l'impression:\n{str(e)}")
     
+    def show_plate_dialog(self, plate):
+        """Affiche le dialogue pour démarrer l'impression d'un plateau"""
+        dialog = StartPlateDialog(plate, self.printers, self)
+        if dialog.exec_() == QDialog.Accepted:
+            self.start_plate_job(plate, dialog.get_printer_id())
+    
+    def start_plate_job(self, plate, printer_id=None):
+        """Démarre l'impression de tous les produits d'un plateau"""
+        try:
+            count = self.plate_controller.start_plate(plate, printer_id)
+            
+            QMessageBox.information(self, "Impression démarrée",
+                                  f"L'impression du plateau {plate.label} ({count} produits) a été démarrée.")
+            
+            self.load_data()
+            self.tab_widget.setCurrentIndex(1)
+            
+        except Exception as e:
+            QMessageBox.warning(self, "Erreur",
+                              f"Une erreur s'est produite lors du démarrage du plateau:\n{str(e)}")
+    
+    def show_printer_fleet_dialog(self):
+        """Affiche le dialogue de gestion du parc d'imprimantes"""
+        dialog = PrinterFleetDialog(self.printer_controller, self)
+        dialog.exec_()
+        if dialog.changed:
+            self.load_data()
+    
+    def schedule_printers(self):
+        """Répartit les produits à imprimer sur les imprimantes du parc"""
+        try:
+            jobs = self.printer_controller.schedule_print_plan()
+            self.load_data()
+            
+            printer_count = len({job.printer_id for job in jobs})
+            QMessageBox.information(self, "Planification des imprimantes",
+                                  f"{len(jobs)} produits répartis sur {printer_count} imprimante(s).")
+        except Exception as e:
+            QMessageBox.warning(self, "Erreur",
+                              f"Une erreur s'est produite lors de la planification des imprimantes:\n{str(e)}")
+    
     def complete_printing_job(self, product, color, quantity):
         """Marque un job d'impression comme terminé et suggère la commande à alimenter"""
         try: